@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
 import time
+import uuid
 import traceback
 from datetime import datetime
 from cria_pdf import criar_pdf_streamlit
 from lancamento_fenix import executar_lancamento_fenix, get_recomendacao, atualizar_status_planilha, fechar_navegador_manual
+from trabalhos_lancamento import TrabalhoLancamento, obter_fila
 
 # Mantendo apenas as funções auxiliares de texto que são usadas pela interface
 
@@ -48,9 +50,90 @@ def get_consideracoes_text():
         "a área divergente a ser aproveitada e solicitar uma análise adicional à equipe de extensão tecnológica."
     )
 
+def _formatar_duracao(segundos):
+    if segundos is None:
+        return "-"
+    minutos, segundos = divmod(int(segundos), 60)
+    horas, minutos = divmod(minutos, 60)
+    return f"{horas}h{minutos:02d}m" if horas else f"{minutos}m{segundos:02d}s"
+
+def _id_sessao():
+    """Identifica a sessão do app como dona dos trabalhos que ela envia"""
+    if 'id_sessao' not in st.session_state:
+        st.session_state.id_sessao = uuid.uuid4().hex
+    return st.session_state.id_sessao
+
+def _painel_trabalhos():
+    """Situação dos lançamentos em segundo plano desta sessão, com pausar/retomar/cancelar"""
+    fila = obter_fila()
+    dono = _id_sessao()
+    trabalhos = fila.listar(dono)
+    if not trabalhos:
+        return
+    
+    st.subheader("📋 Lançamentos em Segundo Plano")
+    icones = {'na_fila': "⏳", 'executando': "🔄", 'pausado': "⏸️", 'cancelando': "🛑",
+              'cancelado': "🚫", 'concluido': "✅", 'falhou': "❌"}
+    for trabalho in trabalhos:
+        id_trabalho = trabalho['id']
+        processadas = trabalho['ups_concluidas'] + trabalho['ups_com_erro']
+        titulo = f"{icones.get(trabalho['estado'], '')} [{id_trabalho}] {trabalho['descricao']} — {trabalho['estado']}"
+        with st.expander(titulo, expanded=trabalho['estado'] in ('executando', 'pausado', 'cancelando')):
+            st.progress(trabalho['progresso'], text=f"{processadas}/{trabalho['total_ups']} UPs")
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("UP Atual", trabalho['up_atual'] or "-")
+            col2.metric("Concluídas", trabalho['ups_concluidas'])
+            col3.metric("Com Erro", trabalho['ups_com_erro'])
+            col4.metric("Previsão", _formatar_duracao(trabalho['previsao_s']),
+                        help=f"No máximo {_formatar_duracao(trabalho['previsao_max_s'])} (prazo por UP)"
+                        if trabalho['previsao_max_s'] else None)
+            
+            botoes = st.columns(3)
+            if trabalho['estado'] == 'executando' and botoes[0].button("⏸️ Pausar", key=f"pausar_{id_trabalho}"):
+                fila.pausar(id_trabalho, dono)
+            if trabalho['estado'] == 'pausado' and botoes[0].button("▶️ Retomar", key=f"retomar_{id_trabalho}"):
+                fila.retomar(id_trabalho, dono)
+            if trabalho['estado'] in ('na_fila', 'executando', 'pausado') and botoes[1].button("🛑 Cancelar", key=f"cancelar_{id_trabalho}"):
+                fila.cancelar(id_trabalho, dono)
+            
+            if trabalho['erro']:
+                st.error(f"❌ {trabalho['erro']}")
+            if trabalho['resumo'] and trabalho['resumo'].get('ups_com_sucesso'):
+                ups_lancadas = trabalho['resumo']['ups_com_sucesso']
+                st.success(f"✅ UPs lançadas: {', '.join(ups_lancadas)}")
+                # Mesma atualização de 'Laudo Existente' do lançamento direto, com a planilha enviada junto
+                df_original = st.session_state.get('planilhas_trabalhos', {}).get(id_trabalho)
+                if df_original is not None and st.checkbox("📝 Atualizar a planilha ('Laudo Existente' = SIM)", key=f"planilha_{id_trabalho}"):
+                    atualizar_status_planilha(df_original, ups_lancadas)
+            if trabalho['log']:
+                st.code("\n".join(trabalho['log'][-15:]), language=None)
+    st.markdown("---")
+
+# Atualiza o painel a cada 2 segundos sem recarregar a página (Streamlit >= 1.37)
+if hasattr(st, "fragment"):
+    painel_trabalhos = st.fragment(run_every=2)(_painel_trabalhos)
+else:
+    painel_trabalhos = _painel_trabalhos
+
+def enviar_lancamento_para_fila(df_ups, grupos_selecionados, tipo_organizacao, coluna_agrupamento, email, senha, df_original=None):
+    """Envia o lançamento como trabalho em segundo plano (desta sessão) e devolve o ID"""
+    df_trabalho = df_ups.copy()
+    organizacao = 'nucleo'
+    if tipo_organizacao.startswith("🏗️ Por Propriedade"):
+        # Mesmo ajuste do processamento direto: a propriedade ocupa a coluna 'Nucleo'
+        organizacao = 'propriedade'
+        df_trabalho['Nucleo'] = df_trabalho[coluna_agrupamento]
+    trabalho = TrabalhoLancamento(df_trabalho, grupos_selecionados, organizacao, email, senha, dono=_id_sessao())
+    if df_original is not None:
+        # Guardada na sessão para oferecer a planilha atualizada quando o trabalho terminar
+        st.session_state.setdefault('planilhas_trabalhos', {})[trabalho.id] = df_original.copy()
+    return obter_fila().enviar(trabalho)
+
 def lancamento_fenix():
     st.header("Lançamento de Informações no Fênix")
     
+    painel_trabalhos()
+    
     # Verificar se há opção de continuar lançamento
     if hasattr(st.session_state, 'mostrar_continuar_lancamento') and st.session_state.mostrar_continuar_lancamento:
         st.success("🎉 Núcleo anterior processado com sucesso!")
@@ -213,6 +296,12 @@ def lancamento_fenix():
                         st.info("🔄 Continuando com navegador aberto...")
                     
                     processar_lancamento_novo(ups_para_processar, st.session_state.grupos_selecionados, df, st.session_state.tipo_organizacao, st.session_state.coluna_agrupamento, email_completo_orig, senha_orig)
+                
+                # Alternativa: lançamento em segundo plano, acompanhado pelo painel acima
+                if st.button("📥 ENVIAR PARA A FILA (segundo plano)", key="fila_button", use_container_width=True):
+                    id_trabalho = enviar_lancamento_para_fila(ups_para_processar, st.session_state.grupos_selecionados, st.session_state.tipo_organizacao, st.session_state.coluna_agrupamento, email_completo_orig, senha_orig, df)
+                    st.success(f"📥 Lançamento enviado para a fila (trabalho {id_trabalho})")
+                    st.rerun()
                     
         except Exception as e:
             st.error(f"Erro ao ler o arquivo: {str(e)}")
@@ -0,0 +1,366 @@
+"""
+Benchmark da automação do Fênix contra o portal simulado (sem o portal real)
+
+Sobe o PortalSimulado em uma porta local, aponta lancamento_fenix.FENIX_URL
+para ele e executa a FenixAutomation completa (login, Upload de Laudos,
+preenchimento, Enviar, Assinatura e Confirmar) com um plano sintético de
+laudos e UPs. Os eventos da automação são cronometrados e o relatório traz
+os segundos por UP, por laudo e por etapa, além de conferir no portal se
+todos os laudos e UPs chegaram.
+
+Exemplos:
+    python benchmark_fenix.py --laudos 3 --ups 5
+    python benchmark_fenix.py --laudos 2 --ups 8 --latencia-pagina 1 --falha-opcoes 0.1 --semente 7
+    python benchmark_fenix.py --provisionar-linhas --ups-inexistentes 2
+    python benchmark_fenix.py --resultado depois.json --referencia antes.json
+
+Com --referencia o resultado é comparado a um benchmark anterior (mesmos
+parâmetros) e as métricas que pioraram além da tolerância são listadas.
+Código de saída: 0 sem falhas, 1 se algum laudo não chegou ao portal ou
+houve regressão, 2 erro nos parâmetros.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+import pandas as pd
+
+import lancamento_fenix
+from config import UNF_MAPPING
+from portal_simulado import PortalSimulado, adicionar_argumentos_portal, config_dos_argumentos
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+BENCHMARK_CONFIG = {
+    'laudos': 3,                  # Um laudo por núcleo
+    'ups_por_laudo': 5,
+    'ups_inexistentes': 0,        # UPs do plano fora do cadastro do portal ("Nenhum resultado")
+    'semente': 42,                # Plano e falhas do portal repetíveis
+    'email': "benchmark@fenix.local",
+    'senha': "benchmark",
+    'tolerancia': 0.10,           # Piora aceita em relação à referência (10%)
+}
+
+OCORRENCIAS_PLANO = ['VENDAVAL', 'INCENDIO', 'DEFICIT HIDRICO']
+SEVERIDADES_PLANO = ['BAIXO', 'MEDIO', 'ALTO']
+
+# Métricas comparadas com a referência (menor é melhor)
+METRICAS_COMPARADAS = [
+    ('por_up', 'media_s'), ('por_up', 'p95_s'),
+    ('por_laudo', 'media_s'), ('por_laudo', 'p95_s'),
+    ('vazao', 's_por_up'), ('vazao', 's_por_laudo'),
+]
+
+# =========================================================================
+# PLANO SINTÉTICO
+# =========================================================================
+
+def gerar_plano(laudos, ups_por_laudo, ups_inexistentes=0, semente=None):
+    """
+    Monta as UPs a lançar no formato que a automação recebe da planilha.
+
+    Cada laudo é um núcleo de UNF_MAPPING; as ups_inexistentes são sorteadas
+    entre as UPs do plano e ficam fora do cadastro do portal.
+
+    Returns:
+        tuple: (DataFrame das UPs, lista de núcleos, UPs cadastradas no portal)
+
+    Raises:
+        ValueError: quantidades inválidas ou mais laudos que núcleos
+    """
+    nucleos = list(UNF_MAPPING)
+    if laudos < 1 or ups_por_laudo < 1:
+        raise ValueError("O benchmark precisa de pelo menos 1 laudo com 1 UP")
+    if laudos > len(nucleos):
+        raise ValueError(f"No máximo {len(nucleos)} laudos (um por núcleo de UNF_MAPPING)")
+    if not 0 <= ups_inexistentes <= laudos * ups_por_laudo:
+        raise ValueError("ups_inexistentes deve estar entre 0 e o total de UPs do plano")
+
+    sorteio = random.Random(semente)
+    linhas = []
+    for nucleo in nucleos[:laudos]:
+        for numero in range(1, ups_por_laudo + 1):
+            linhas.append({
+                'UP': f"{nucleo}{numero:04d}",
+                'Nucleo': nucleo,
+                'Idade': sorteio.randint(1, 10),
+                'Fazenda': f"Fazenda {nucleo}",
+                'Ocorrência Predominante': sorteio.choice(OCORRENCIAS_PLANO),
+                'Severidade Predominante': sorteio.choice(SEVERIDADES_PLANO),
+                'Incidencia': round(sorteio.uniform(0.01, 1), 2),
+                'Laudo Existente': 'NÃO',
+                'Recomendacao': '',
+                'UNF': UNF_MAPPING[nucleo],
+            })
+
+    df_ups = pd.DataFrame(linhas)
+    inexistentes = set(sorteio.sample(list(df_ups['UP']), ups_inexistentes))
+    catalogo = [up for up in df_ups['UP'] if up not in inexistentes]
+    return df_ups, nucleos[:laudos], catalogo
+
+# =========================================================================
+# MEDIÇÃO
+# =========================================================================
+
+class ColetorTempos:
+    """
+    Callback ao_evento(evento, dados) que cronometra UPs, laudos e etapas.
+
+    Uma UP vai de up_iniciada a up_concluida/up_falhou e um laudo de
+    grupo_iniciado a grupo_concluido; as UPs abandonadas por prazo (up_falhou
+    sem up_iniciada) contam como falha, sem tempo. Os logs de erro da
+    automação ficam em erros.
+    """
+
+    def __init__(self, relogio=time.monotonic, repassar=None):
+        self.relogio = relogio
+        self.repassar = repassar
+        self.ups = []
+        self.laudos = []
+        self.etapas = {}
+        self.ups_falhas = []
+        self.laudos_falhos = []
+        self.erros = []
+        self._inicio_ups = {}
+        self._inicio_laudos = {}
+
+    def __call__(self, evento, dados):
+        agora = self.relogio()
+        if evento == 'up_iniciada':
+            self._inicio_ups[dados['up']] = agora
+        elif evento in ('up_concluida', 'up_falhou'):
+            inicio = self._inicio_ups.pop(dados['up'], None)
+            if evento == 'up_falhou':
+                self.ups_falhas.append(dados['up'])
+            elif inicio is not None:
+                self.ups.append(agora - inicio)
+        elif evento == 'grupo_iniciado':
+            self._inicio_laudos[dados['grupo']] = agora
+        elif evento == 'grupo_concluido':
+            inicio = self._inicio_laudos.pop(dados['grupo'], None)
+            if not dados.get('sucesso'):
+                self.laudos_falhos.append(dados['grupo'])
+            elif inicio is not None:
+                self.laudos.append(agora - inicio)
+        elif evento == 'etapa':
+            self.etapas.setdefault(dados['etapa'], []).append(dados['duracao_s'])
+        elif evento == 'log' and dados.get('nivel') == 'error':
+            self.erros.append(dados['mensagem'])
+
+        if self.repassar is not None:
+            self.repassar(evento, dados)
+
+def resumir(valores):
+    """Estatísticas (em segundos) de uma lista de durações"""
+    if not valores:
+        return {'n': 0}
+    ordenados = sorted(valores)
+    p95 = ordenados[min(len(ordenados) - 1, int(round(0.95 * (len(ordenados) - 1))))]
+    return {
+        'n': len(ordenados),
+        'media_s': round(statistics.fmean(ordenados), 2),
+        'mediana_s': round(statistics.median(ordenados), 2),
+        'p95_s': round(p95, 2),
+        'min_s': round(ordenados[0], 2),
+        'max_s': round(ordenados[-1], 2),
+    }
+
+# =========================================================================
+# EXECUÇÃO
+# =========================================================================
+
+def executar_benchmark(laudos=None, ups_por_laudo=None, ups_inexistentes=None, config_portal=None,
+                       headless=True, pipeline=None, ao_evento=None, provisionar_linhas=None):
+    """
+    Executa a automação completa contra um portal simulado novo.
+
+    Args:
+        config_portal: chaves de PORTAL_SIMULADO_CONFIG (latências e falhas);
+            a 'semente' também gera o plano
+        pipeline: repassado a executar_lancamento_em_lote
+        ao_evento: recebe também os eventos da automação
+        provisionar_linhas: liga/desliga AUTOMATION_CONFIG['provisionar_linhas']
+            durante a execução (com UPs inexistentes, exercita a remoção das
+            linhas que sobram)
+
+    Returns:
+        dict: parâmetros, tempos por UP/laudo/etapa, vazão e conferência do portal
+    """
+    laudos = BENCHMARK_CONFIG['laudos'] if laudos is None else laudos
+    ups_por_laudo = BENCHMARK_CONFIG['ups_por_laudo'] if ups_por_laudo is None else ups_por_laudo
+    ups_inexistentes = BENCHMARK_CONFIG['ups_inexistentes'] if ups_inexistentes is None else ups_inexistentes
+    config_portal = dict({'semente': BENCHMARK_CONFIG['semente']}, **(config_portal or {}))
+    config_portal.update(email=BENCHMARK_CONFIG['email'], senha=BENCHMARK_CONFIG['senha'])
+
+    df_ups, grupos, catalogo = gerar_plano(laudos, ups_por_laudo, ups_inexistentes, config_portal['semente'])
+    coletor = ColetorTempos(repassar=ao_evento)
+
+    url_original = lancamento_fenix.FENIX_URL
+    upload_original = lancamento_fenix.CACHE_NAVEGACAO['url_upload']
+    provisionar_original = lancamento_fenix.AUTOMATION_CONFIG['provisionar_linhas']
+    with PortalSimulado(catalogo, config_portal) as portal:
+        lancamento_fenix.FENIX_URL = portal.url
+        lancamento_fenix.CACHE_NAVEGACAO['url_upload'] = None
+        if provisionar_linhas is not None:
+            lancamento_fenix.AUTOMATION_CONFIG['provisionar_linhas'] = provisionar_linhas
+        try:
+            resumo = lancamento_fenix.executar_lancamento_em_lote(
+                df_ups, grupos, 'nucleo', BENCHMARK_CONFIG['email'], BENCHMARK_CONFIG['senha'],
+                headless=headless, ao_evento=coletor, pipeline=pipeline
+            )
+        finally:
+            lancamento_fenix.FENIX_URL = url_original
+            lancamento_fenix.CACHE_NAVEGACAO['url_upload'] = upload_original
+            lancamento_fenix.AUTOMATION_CONFIG['provisionar_linhas'] = provisionar_original
+        ups_confirmadas = portal.ups_confirmadas()
+        laudos_confirmados = len(portal.laudos_recebidos)
+        contadores = dict(portal.contadores)
+
+    esperadas = sorted(catalogo)
+    duracao = resumo['duracao_s']
+    return {
+        'parametros': {
+            'laudos': laudos, 'ups_por_laudo': ups_por_laudo, 'ups_inexistentes': ups_inexistentes,
+            'pipeline': pipeline, 'provisionar_linhas': provisionar_linhas, 'portal': {chave: valor for chave, valor in config_portal.items()
+                                             if chave not in ('email', 'senha')},
+        },
+        'duracao_s': duracao,
+        'vazao': {
+            's_por_laudo': round(duracao / laudos, 2),
+            's_por_up': round(duracao / (laudos * ups_por_laudo), 2),
+        },
+        'por_up': resumir(coletor.ups),
+        'por_laudo': resumir(coletor.laudos),
+        'etapas': {etapa: resumir(valores) for etapa, valores in sorted(coletor.etapas.items())},
+        'ups_falhas': coletor.ups_falhas,
+        'laudos_falhos': coletor.laudos_falhos,
+        'portal': {
+            'laudos_confirmados': laudos_confirmados,
+            'laudos_esperados': laudos,
+            'ups_confirmadas': len(ups_confirmadas),
+            'ups_esperadas': len(esperadas),
+            'ups_faltando': sorted(set(esperadas) - set(ups_confirmadas)),
+            'ups_duplicadas': sorted({up for up in ups_confirmadas if ups_confirmadas.count(up) > 1}),
+            'contadores': contadores,
+        },
+        'automacao': dict(
+            {chave: resumo[chave] for chave in
+             ('sucesso', 'grupos_concluidos', 'ups_processadas', 'ups_com_erro', 'reciclagens')},
+            # Erros do resumo e os logados durante a execução (ex.: Enviar recusado pelo portal)
+            erros=list(dict.fromkeys(resumo['erros'] + coletor.erros)),
+        ),
+    }
+
+def completo(resultado):
+    """True se todos os laudos e UPs cadastradas chegaram ao portal, sem duplicatas"""
+    portal = resultado['portal']
+    return (portal['laudos_confirmados'] == portal['laudos_esperados']
+            and not portal['ups_faltando'] and not portal['ups_duplicadas'])
+
+def comparar(resultado, referencia, tolerancia=None):
+    """
+    Compara as métricas de tempo com um benchmark anterior.
+
+    Returns:
+        list: uma mensagem por métrica que piorou além da tolerância
+    """
+    tolerancia = BENCHMARK_CONFIG['tolerancia'] if tolerancia is None else tolerancia
+    regressoes = []
+    for grupo, metrica in METRICAS_COMPARADAS:
+        atual = resultado.get(grupo, {}).get(metrica)
+        anterior = referencia.get(grupo, {}).get(metrica)
+        if atual is None or not anterior:
+            continue
+        if atual > anterior * (1 + tolerancia):
+            regressoes.append(f"{grupo}.{metrica}: {anterior:.2f}s → {atual:.2f}s (+{(atual / anterior - 1) * 100:.0f}%)")
+    return regressoes
+
+def formatar_relatorio(resultado):
+    """Resumo legível do benchmark"""
+    linhas = [f"⏱️ Duração total: {resultado['duracao_s']:.1f}s "
+              f"({resultado['vazao']['s_por_laudo']:.2f}s/laudo, {resultado['vazao']['s_por_up']:.2f}s/UP)"]
+    for nome, chave in (("UP", 'por_up'), ("Laudo", 'por_laudo')):
+        estatisticas = resultado[chave]
+        if estatisticas['n']:
+            linhas.append(f"   {nome}: média {estatisticas['media_s']:.2f}s | mediana {estatisticas['mediana_s']:.2f}s | "
+                          f"p95 {estatisticas['p95_s']:.2f}s (n={estatisticas['n']})")
+    for etapa, estatisticas in resultado['etapas'].items():
+        linhas.append(f"   Etapa {etapa}: média {estatisticas['media_s']:.2f}s (n={estatisticas['n']})")
+    portal = resultado['portal']
+    linhas.append(f"📨 Portal: {portal['laudos_confirmados']}/{portal['laudos_esperados']} laudos, "
+                  f"{portal['ups_confirmadas']}/{portal['ups_esperadas']} UPs confirmadas")
+    if portal['ups_faltando']:
+        linhas.append(f"   UPs faltando: {', '.join(portal['ups_faltando'])}")
+    if portal['ups_duplicadas']:
+        linhas.append(f"   UPs duplicadas: {', '.join(portal['ups_duplicadas'])}")
+    erros = resultado.get('automacao', {}).get('erros', [])
+    if erros:
+        linhas.append(f"⚠️ Erros da automação ({len(erros)}):")
+        linhas.extend(f"   {erro}" for erro in erros)
+    return "\n".join(linhas)
+
+# =========================================================================
+# LINHA DE COMANDO
+# =========================================================================
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Benchmark da automação do Fênix contra o portal simulado.")
+    parser.add_argument("--laudos", type=int, default=BENCHMARK_CONFIG['laudos'], help="Laudos (núcleos) do plano")
+    parser.add_argument("--ups", type=int, default=BENCHMARK_CONFIG['ups_por_laudo'], help="UPs por laudo")
+    parser.add_argument("--ups-inexistentes", type=int, default=BENCHMARK_CONFIG['ups_inexistentes'],
+                        help="UPs do plano fora do cadastro do portal")
+    parser.add_argument("--pipeline", action=argparse.BooleanOptionalAction, default=None,
+                        help="Liga/desliga o preparo do próximo laudo em outra aba")
+    parser.add_argument("--provisionar-linhas", action=argparse.BooleanOptionalAction, default=None,
+                        help="Liga/desliga a criação antecipada das linhas da Matriz de Decisão")
+    parser.add_argument("--com-janela", action="store_true", help="Mostra o navegador")
+    parser.add_argument("--resultado", help="Salva o resultado em JSON")
+    parser.add_argument("--referencia", help="Resultado JSON anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=BENCHMARK_CONFIG['tolerancia'],
+                        help="Piora aceita em relação à referência (padrão: 0.10)")
+    adicionar_argumentos_portal(parser)
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    referencia = None
+    try:
+        if args.referencia:
+            with open(args.referencia, 'r', encoding='utf-8') as f:
+                referencia = json.load(f)
+        gerar_plano(args.laudos, args.ups, args.ups_inexistentes)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    resultado = executar_benchmark(args.laudos, args.ups, args.ups_inexistentes, config_dos_argumentos(args),
+                                   headless=not args.com_janela, pipeline=args.pipeline,
+                                   provisionar_linhas=args.provisionar_linhas)
+    print(formatar_relatorio(resultado), file=sys.stderr)
+
+    codigo = 0 if completo(resultado) else 1
+    if referencia is not None and codigo:
+        # Tempos de uma execução que não entregou tudo não dizem nada sobre desempenho
+        print("⚠️ Execução incompleta: a comparação com a referência foi ignorada", file=sys.stderr)
+    elif referencia is not None:
+        if referencia.get('parametros') != resultado['parametros']:
+            print("⚠️ A referência foi medida com outros parâmetros; a comparação é só indicativa", file=sys.stderr)
+        regressoes = comparar(resultado, referencia, args.tolerancia)
+        resultado['regressoes'] = regressoes
+        for regressao in regressoes:
+            print(f"📉 {regressao}", file=sys.stderr)
+        if regressoes:
+            codigo = 1
+    if args.resultado:
+        with open(args.resultado, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+    return codigo
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+Navegador compartilhado entre as sessões do app (broker)
+
+Um único Chromium (o do navegador persistente, acessado via CDP) atende
+todas as sessões do Streamlit do processo. Cada sessão recebe um
+BrowserContext isolado, carregado com o login salvo do seu usuário; o
+número de contextos abertos ao mesmo tempo é limitado e sessões ociosas
+são recolhidas após um tempo sem uso.
+
+Cada sessão tem sua própria thread com um event loop permanente: os objetos
+do Playwright ficam presos ao loop que os criou, e assim o contexto da
+sessão sobrevive entre as execuções do app sem misturar as sessões.
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+
+from config import BROKER_CONFIG
+from navegador_daemon import DaemonNavegador
+from perfil_navegador import aplicar_perfil_desempenho, opcoes_contexto
+
+class ErroBroker(Exception):
+    """Sem vaga no navegador compartilhado ou sessão já encerrada"""
+
+# =========================================================================
+# SESSÃO
+# =========================================================================
+
+class SessaoNavegador:
+    """
+    Sessão de um usuário no navegador compartilhado: thread e event loop
+    próprios, conexão CDP e um contexto isolado com o login do usuário.
+    """
+
+    def __init__(self, broker, chave, usuario):
+        self.broker = broker
+        self.chave = chave
+        self.usuario = usuario
+        self.caminho_estado = broker.caminho_estado(usuario)
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.filtro_requisicoes = None
+        self.em_uso = False
+        self.encerrada = False
+        self.ultimo_uso = time.time()
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._rodar_loop, name=f"navegador_{chave}", daemon=True)
+        self._thread.start()
+
+    def _rodar_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+        self.loop.close()
+
+    def executar(self, corrotina, preparar_thread=None, timeout=None):
+        """
+        Executa a corrotina no loop da sessão e devolve o resultado,
+        bloqueando a thread chamadora.
+
+        Args:
+            preparar_thread: função chamada na thread da sessão antes da
+                corrotina (ex.: anexar o contexto do Streamlit)
+        """
+        if self.encerrada:
+            corrotina.close()
+            raise ErroBroker("Sessão do navegador já encerrada")
+
+        async def _executar():
+            if preparar_thread is not None:
+                preparar_thread()
+            self.em_uso = True
+            try:
+                return await corrotina
+            finally:
+                self.em_uso = False
+                self.ultimo_uso = time.time()
+
+        return asyncio.run_coroutine_threadsafe(_executar(), self.loop).result(timeout)
+
+    # ---------------------------------------------------------------------
+    # Contexto (executados no loop da sessão)
+    # ---------------------------------------------------------------------
+
+    async def abrir_contexto(self, headless=False):
+        """
+        Conecta ao Chromium compartilhado e abre o contexto da sessão,
+        ocupando uma vaga do broker; reaproveita o contexto se ainda aberto.
+        """
+        if self.context is not None and self.browser is not None and self.browser.is_connected():
+            return self.context
+        await self.fechar_contexto(salvar=False)
+
+        await asyncio.to_thread(self.broker.reservar_vaga, self)
+        try:
+            from playwright.async_api import async_playwright
+            self.playwright = await async_playwright().start()
+            endpoint = await asyncio.to_thread(
+                self.broker.endpoint, self.playwright.chromium.executable_path, headless, self
+            )
+            self.browser = await self.playwright.chromium.connect_over_cdp(endpoint)
+            estado = str(self.caminho_estado) if self.caminho_estado.exists() else None
+            self.context = await self.browser.new_context(storage_state=estado, **opcoes_contexto())
+            self.filtro_requisicoes = await aplicar_perfil_desempenho(self.context)
+        except Exception:
+            await self.fechar_contexto(salvar=False)
+            raise
+        return self.context
+
+    async def salvar_autenticacao(self):
+        """Grava cookies e storage do contexto para as próximas sessões do usuário"""
+        if self.context is None:
+            return
+        self.caminho_estado.parent.mkdir(parents=True, exist_ok=True)
+        await self.context.storage_state(path=str(self.caminho_estado))
+        try:
+            os.chmod(self.caminho_estado, 0o600)
+        except OSError:
+            pass
+
+    async def fechar_contexto(self, salvar=True):
+        """
+        Salva o login, fecha o contexto e desconecta do Chromium (que continua
+        atendendo as outras sessões), devolvendo a vaga ao broker.
+        """
+        try:
+            if self.context is not None:
+                if salvar:
+                    try:
+                        await self.salvar_autenticacao()
+                    except Exception:
+                        pass
+                await self.context.close()
+        except Exception:
+            pass
+        finally:
+            try:
+                if self.playwright is not None:
+                    await self.playwright.stop()
+            except Exception:
+                pass
+            self.playwright = self.browser = self.context = self.filtro_requisicoes = None
+            self.broker.devolver_vaga(self)
+
+    def encerrar(self, timeout=30):
+        """Fecha o contexto e para a thread da sessão (chamado de fora do loop)"""
+        if self.encerrada:
+            return
+        self.encerrada = True
+        try:
+            asyncio.run_coroutine_threadsafe(self.fechar_contexto(), self.loop).result(timeout)
+        except Exception:
+            self.broker.devolver_vaga(self)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+
+# =========================================================================
+# BROKER
+# =========================================================================
+
+class BrokerNavegador:
+    """
+    Distribui o Chromium do processo entre as sessões: uma SessaoNavegador
+    por chave (sessão do app), no máximo max_sessoes contextos abertos e
+    recolhimento das sessões sem uso há mais de ocioso_s segundos.
+    """
+
+    def __init__(self, config=None, daemon=None):
+        config = config or BROKER_CONFIG
+        self.max_sessoes = config['max_sessoes']
+        self.espera_vaga_s = config['espera_vaga_s']
+        self.ocioso_s = config['ocioso_s']
+        self.intervalo_recolha_s = config['intervalo_recolha_s']
+        self.falhas_para_reiniciar = config.get('falhas_para_reiniciar', 3)
+        self.pasta_sessoes = Path(config['pasta_sessoes'])
+        self.daemon = daemon or DaemonNavegador()
+
+        self.sessoes = {}
+        self.vagas = set()  # chaves das sessões com contexto aberto
+        self._condicao = threading.Condition()
+        self._lock_daemon = threading.Lock()
+        self._falhas_saude = 0
+        self._parar = threading.Event()
+        self._recolhedor = None
+
+    def caminho_estado(self, usuario):
+        """Arquivo do login salvo do usuário (nome derivado do e-mail)"""
+        nome = hashlib.sha1(str(usuario).strip().lower().encode('utf-8')).hexdigest()[:16]
+        return self.pasta_sessoes / f"{nome}.json"
+
+    def endpoint(self, executavel, headless=False, sessao=None):
+        """
+        Endpoint CDP do Chromium compartilhado, iniciado se preciso.
+
+        Uma verificação de saúde lenta não basta para reiniciar: com o
+        processo vivo, o Chromium só é reiniciado depois de
+        falhas_para_reiniciar verificações seguidas sem resposta e quando
+        nenhuma outra sessão ocupa vaga (reiniciar derrubaria as automações
+        delas). Com o processo morto não há o que derrubar e ele é iniciado.
+        """
+        with self._lock_daemon:
+            if self.daemon.verificar_saude():
+                self._falhas_saude = 0
+                return self.daemon.endpoint
+            if self.daemon.processo_ativo():
+                self._falhas_saude += 1
+                with self._condicao:
+                    outras = self.vagas - {sessao.chave} if sessao is not None else set(self.vagas)
+                if outras or self._falhas_saude < self.falhas_para_reiniciar:
+                    return self.daemon.endpoint
+            # As falhas seguidas já foram contadas aqui: garantir só confere mais uma vez
+            endpoint, _ = self.daemon.garantir(executavel, headless=headless, falhas_para_reiniciar=1)
+            self._falhas_saude = 0
+        return endpoint
+
+    # ---------------------------------------------------------------------
+    # Sessões
+    # ---------------------------------------------------------------------
+
+    def obter_sessao(self, chave, usuario):
+        """
+        Sessão da chave (criada se não existir); outro usuário na mesma
+        chave encerra a sessão anterior.
+        """
+        anterior = None
+        with self._condicao:
+            sessao = self.sessoes.get(chave)
+            if sessao is not None and (sessao.encerrada or sessao.usuario != usuario):
+                anterior, sessao = sessao, None
+            if sessao is None:
+                sessao = SessaoNavegador(self, chave, usuario)
+                self.sessoes[chave] = sessao
+        if anterior is not None:
+            anterior.encerrar()
+        self._iniciar_recolhedor()
+        return sessao
+
+    def reservar_vaga(self, sessao):
+        """Espera até haver vaga para mais um contexto aberto (ErroBroker no timeout)"""
+        limite = time.time() + self.espera_vaga_s
+        recolheu = False
+        with self._condicao:
+            while sessao.chave not in self.vagas and len(self.vagas) >= self.max_sessoes:
+                if not recolheu:
+                    # Libera o lock para fechar as ociosas nos loops delas
+                    self._condicao.release()
+                    try:
+                        self.recolher_ociosas(ignorar=sessao)
+                    finally:
+                        self._condicao.acquire()
+                    recolheu = True
+                    continue
+                restante = limite - time.time()
+                if restante <= 0:
+                    raise ErroBroker(
+                        f"Limite de {self.max_sessoes} sessões simultâneas do navegador atingido; tente novamente em instantes"
+                    )
+                self._condicao.wait(restante)
+            self.vagas.add(sessao.chave)
+
+    def devolver_vaga(self, sessao):
+        with self._condicao:
+            self.vagas.discard(sessao.chave)
+            self._condicao.notify_all()
+
+    def recolher_ociosas(self, agora=None, ignorar=None):
+        """Encerra as sessões sem uso há mais de ocioso_s; devolve as chaves recolhidas"""
+        agora = agora or time.time()
+        with self._condicao:
+            ociosas = [
+                sessao for sessao in self.sessoes.values()
+                if sessao is not ignorar and not sessao.em_uso and agora - sessao.ultimo_uso > self.ocioso_s
+            ]
+            for sessao in ociosas:
+                del self.sessoes[sessao.chave]
+        for sessao in ociosas:
+            sessao.encerrar()
+        return [sessao.chave for sessao in ociosas]
+
+    def encerrar_todas(self):
+        """Encerra todas as sessões e o recolhedor (o Chromium do daemon continua)"""
+        self._parar.set()
+        with self._condicao:
+            sessoes = list(self.sessoes.values())
+            self.sessoes.clear()
+        for sessao in sessoes:
+            sessao.encerrar()
+
+    def situacao(self):
+        with self._condicao:
+            return {
+                'sessoes': len(self.sessoes),
+                'contextos_abertos': len(self.vagas),
+                'max_sessoes': self.max_sessoes
+            }
+
+    def _iniciar_recolhedor(self):
+        with self._condicao:
+            if self._recolhedor is not None:
+                return
+            self._recolhedor = threading.Thread(target=self._recolher_periodicamente,
+                                                name="broker_recolhedor", daemon=True)
+        self._recolhedor.start()
+
+    def _recolher_periodicamente(self):
+        while not self._parar.wait(self.intervalo_recolha_s):
+            self.recolher_ociosas()
+
+# =========================================================================
+# BROKER DO PROCESSO
+# =========================================================================
+
+_broker = None
+_lock_broker = threading.Lock()
+
+def obter_broker():
+    """Broker único do processo (compartilhado por todas as sessões do app)"""
+    global _broker
+    with _lock_broker:
+        if _broker is None:
+            _broker = BrokerNavegador()
+        return _broker
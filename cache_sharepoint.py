@@ -0,0 +1,252 @@
+"""
+Cache persistente de listagens e downloads do SharePoint
+Guarda as listagens das pastas e os arquivos baixados, identificados pelos
+metadados do servidor (ETag, versão ou data de modificação + tamanho), para que
+execuções repetidas da mesma ENTREGA baixem apenas arquivos novos ou alterados.
+A listagem é refeita a cada execução, a não ser que validade_listagem_s > 0.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+from config import DATA_DIR
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+CACHE_DIR_PADRAO = DATA_DIR / "cache_sharepoint"
+
+CACHE_CONFIG = {
+    'limite_mb': 2048,             # Tamanho máximo dos arquivos em cache
+    'validade_listagem_s': 0,      # Listagem reaproveitada sem consultar o servidor (0: sempre lista)
+}
+
+NOME_INDICE = "indice.json"
+
+# =========================================================================
+# CACHE
+# =========================================================================
+
+def versao_arquivo(arquivo):
+    """
+    Identificador da versão de um arquivo a partir dos metadados do servidor:
+    o ETag quando existe, senão id + versão da listagem paginada, senão data
+    de modificação + tamanho.
+    """
+    if arquivo.get('etag'):
+        return f"etag:{arquivo['etag']}"
+    if arquivo.get('id') and arquivo.get('versao'):
+        return f"ver:{arquivo['id']}:{arquivo['versao']}:{arquivo.get('modificado')}:{arquivo.get('tamanho')}"
+    return f"mod:{arquivo.get('modificado')}:{arquivo.get('tamanho')}"
+
+class CacheSharePoint:
+    """
+    Cache em disco de listagens de pastas e conteúdo de arquivos do SharePoint.
+
+    O cliente usado é qualquer objeto com:
+        listar(folder_url) -> lista de dicts com 'nome', 'url' e, quando
+            disponíveis, 'etag' (ou 'id' e 'versao'), 'modificado' e 'tamanho'
+        iterar(folder_url) (opcional) -> os mesmos dicts, página a página
+        baixar(url, caminho_local) -> bytes transferidos
+
+    Os arquivos ficam em <diretorio>/arquivos e o índice em
+    <diretorio>/indice.json. Quando o total passa de limite_mb, os arquivos
+    usados há mais tempo são removidos.
+    """
+
+    def __init__(self, diretorio=None, limite_mb=None, validade_listagem_s=None):
+        self.diretorio = str(diretorio or CACHE_DIR_PADRAO)
+        self.limite_bytes = (limite_mb or CACHE_CONFIG['limite_mb']) * 1024 * 1024
+        self.validade_listagem_s = (
+            CACHE_CONFIG['validade_listagem_s'] if validade_listagem_s is None else validade_listagem_s
+        )
+        self.pasta_arquivos = os.path.join(self.diretorio, "arquivos")
+        os.makedirs(self.pasta_arquivos, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.indice = self._carregar_indice()
+        self.estatisticas = {
+            'listagens_do_cache': 0,
+            'listagens_do_servidor': 0,
+            'acertos': 0,
+            'faltas': 0,
+            'bytes_baixados': 0,
+            'bytes_reaproveitados': 0,
+            'removidos_por_limite': 0
+        }
+
+    # ---------------------------------------------------------------------
+    # Índice
+    # ---------------------------------------------------------------------
+
+    def _carregar_indice(self):
+        caminho = os.path.join(self.diretorio, NOME_INDICE)
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                indice = json.load(f)
+            if isinstance(indice.get('pastas'), dict) and isinstance(indice.get('arquivos'), dict):
+                return indice
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {'versao': 1, 'pastas': {}, 'arquivos': {}}
+
+    def salvar(self):
+        """Grava o índice no disco (escrita atômica, segura entre threads)"""
+        caminho = os.path.join(self.diretorio, NOME_INDICE)
+        caminho_tmp = f"{caminho}.{threading.get_ident()}.tmp"
+        with self._lock:
+            conteudo = json.dumps(self.indice, ensure_ascii=False, indent=1)
+        with open(caminho_tmp, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        os.replace(caminho_tmp, caminho)
+
+    def _caminho_blob(self, url):
+        return os.path.join(self.pasta_arquivos, hashlib.sha1(url.encode('utf-8')).hexdigest())
+
+    # ---------------------------------------------------------------------
+    # Listagens
+    # ---------------------------------------------------------------------
+
+    def listar(self, cliente, folder_url, forcar=False):
+        """
+        Lista a pasta, reaproveitando a listagem gravada se ainda estiver
+        dentro da validade. Se o servidor falhar, usa a última listagem
+        conhecida (quando houver).
+        """
+        return list(self.iterar(cliente, folder_url, forcar=forcar))
+
+    def iterar(self, cliente, folder_url, filtro=None, forcar=False):
+        """
+        Como listar(), mas entrega os arquivos (que passam no filtro) à
+        medida que as páginas chegam do servidor; a listagem completa só é
+        gravada no fim. Se o servidor falhar no meio, o restante sai da
+        última listagem conhecida.
+        """
+        with self._lock:
+            registro = self.indice['pastas'].get(folder_url)
+
+        if registro and not forcar and time.time() - registro['listado_em'] < self.validade_listagem_s:
+            with self._lock:
+                self.estatisticas['listagens_do_cache'] += 1
+            yield from (arquivo for arquivo in registro['arquivos'] if filtro is None or filtro(arquivo['nome']))
+            return
+
+        arquivos = []
+        try:
+            paginas = cliente.iterar(folder_url) if hasattr(cliente, 'iterar') else cliente.listar(folder_url)
+            for arquivo in paginas:
+                arquivos.append(arquivo)
+                if filtro is None or filtro(arquivo['nome']):
+                    yield arquivo
+        except Exception:
+            if not registro:
+                raise
+            with self._lock:
+                self.estatisticas['listagens_do_cache'] += 1
+            entregues = {arquivo['url'] for arquivo in arquivos}
+            yield from (arquivo for arquivo in registro['arquivos']
+                        if arquivo['url'] not in entregues and (filtro is None or filtro(arquivo['nome'])))
+            return
+
+        with self._lock:
+            self.indice['pastas'][folder_url] = {'listado_em': time.time(), 'arquivos': arquivos}
+            self.estatisticas['listagens_do_servidor'] += 1
+
+    # ---------------------------------------------------------------------
+    # Arquivos
+    # ---------------------------------------------------------------------
+
+    def esta_atualizado(self, arquivo):
+        """Verifica se o conteúdo em cache corresponde à versão listada no servidor"""
+        with self._lock:
+            registro = self.indice['arquivos'].get(arquivo['url'])
+        return bool(registro) and registro['versao'] == versao_arquivo(arquivo) \
+            and os.path.exists(self._caminho_blob(arquivo['url']))
+
+    def obter(self, cliente, arquivo, caminho_local):
+        """
+        Copia o arquivo para caminho_local, baixando do servidor apenas se
+        ele não estiver em cache ou tiver mudado.
+
+        A cópia do cache roda fora do lock; se outra thread despejar o
+        arquivo entre a verificação e a cópia, ele é tratado como falta.
+
+        Returns:
+            int: bytes transferidos pela rede (0 quando veio do cache)
+        """
+        url = arquivo['url']
+        blob = self._caminho_blob(url)
+
+        if self.esta_atualizado(arquivo):
+            try:
+                shutil.copyfile(blob, caminho_local)
+            except FileNotFoundError:
+                pass  # Despejado depois da verificação: baixa de novo
+            else:
+                with self._lock:
+                    registro = self.indice['arquivos'].get(url)
+                    if registro is not None:
+                        registro['ultimo_uso'] = time.time()
+                    self.estatisticas['acertos'] += 1
+                    self.estatisticas['bytes_reaproveitados'] += os.path.getsize(caminho_local)
+                return 0
+
+        # Baixar para um arquivo temporário exclusivo desta thread; o destino
+        # é copiado dele, antes de o blob ficar visível para o despejo
+        blob_tmp = f"{blob}.{threading.get_ident()}.tmp"
+        try:
+            cliente.baixar(url, blob_tmp)
+            tamanho = os.path.getsize(blob_tmp)
+            shutil.copyfile(blob_tmp, caminho_local)
+            os.replace(blob_tmp, blob)
+        finally:
+            if os.path.exists(blob_tmp):
+                os.remove(blob_tmp)
+
+        with self._lock:
+            self.indice['arquivos'][url] = {
+                'versao': versao_arquivo(arquivo),
+                'tamanho': tamanho,
+                'ultimo_uso': time.time()
+            }
+            self.estatisticas['faltas'] += 1
+            self.estatisticas['bytes_baixados'] += tamanho
+
+        self.despejar()
+        return tamanho
+
+    def tamanho_total(self):
+        with self._lock:
+            return sum(registro.get('tamanho', 0) for registro in self.indice['arquivos'].values())
+
+    def despejar(self):
+        """Remove os arquivos usados há mais tempo até o cache caber no limite"""
+        with self._lock:
+            registros = self.indice['arquivos']
+            total = sum(registro.get('tamanho', 0) for registro in registros.values())
+            if total <= self.limite_bytes:
+                return
+
+            for url, registro in sorted(registros.items(), key=lambda item: item[1].get('ultimo_uso', 0)):
+                if total <= self.limite_bytes:
+                    break
+                try:
+                    os.remove(self._caminho_blob(url))
+                except OSError:
+                    pass
+                total -= registro.get('tamanho', 0)
+                del registros[url]
+                self.estatisticas['removidos_por_limite'] += 1
+
+    def limpar(self):
+        """Apaga todo o conteúdo do cache"""
+        with self._lock:
+            shutil.rmtree(self.pasta_arquivos, ignore_errors=True)
+            os.makedirs(self.pasta_arquivos, exist_ok=True)
+            self.indice = {'versao': 1, 'pastas': {}, 'arquivos': {}}
+        self.salvar()
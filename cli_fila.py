@@ -0,0 +1,116 @@
+"""
+Fila de laudos pela linha de comando: enfileirar, trabalhar e acompanhar
+
+Vários trabalhadores (processos na mesma máquina ou em outras VMs, cada um
+com a sua conta de serviço) compartilham o mesmo arquivo SQLite da fila.
+
+Exemplos:
+    python cli_fila.py enfileirar --planilha entrega5.xlsx --grupo BA2 --grupo BA3
+    set FENIX_EMAIL=conta.servico1
+    set FENIX_SENHA=...
+    python cli_fila.py trabalhar --eventos trabalhador1.jsonl
+    python cli_fila.py trabalhar --paralelo 4
+    python cli_fila.py situacao
+
+--fila aponta para outro arquivo (por exemplo em uma pasta compartilhada;
+nesse caso ajuste FILA_CONFIG['journal_mode'] para "DELETE").
+Código de saída: 0 sem falhas, 1 se algum laudo falhou, 2 erro de entrada.
+"""
+
+import sys
+import json
+import argparse
+
+import pandas as pd
+
+from cli_lancamento import ErroPlano, EventosJSONL, credenciais_do_ambiente
+from concorrencia_adaptativa import ControladorAIMD
+from fila_laudos import FilaLaudos, executar_trabalhador, executar_trabalhadores_paralelos
+from lancamento_fenix import preparar_grupos_lancamento
+
+# =========================================================================
+# COMANDOS
+# =========================================================================
+
+def enfileirar(fila, args):
+    aba = int(args.aba) if args.aba and args.aba.isdigit() else (args.aba or 0)
+    try:
+        df = pd.read_excel(args.planilha, sheet_name=aba)
+    except Exception as e:
+        raise ErroPlano(f"Erro ao ler a planilha: {e}")
+    try:
+        df_ups, grupos = preparar_grupos_lancamento(df, args.organizacao, args.grupos)
+    except ValueError as e:
+        raise ErroPlano(str(e))
+    if not grupos:
+        raise ErroPlano("Não há UPs sem laudo para lançar")
+
+    lote = fila.enfileirar(df_ups, grupos, args.organizacao, lote=args.lote)
+    print(json.dumps({'lote': lote, 'laudos': [str(grupo) for grupo in grupos], 'ups': len(df_ups)},
+                     ensure_ascii=False))
+    return 0
+
+def trabalhar(fila, args):
+    email, senha = credenciais_do_ambiente()
+    destino = open(args.eventos, 'a', encoding='utf-8') if args.eventos else sys.stdout
+    eventos = EventosJSONL(destino)
+    opcoes = dict(trabalhador=args.nome, headless=not args.com_janela, ao_evento=eventos,
+                  parar_quando_vazia=not args.continuo, max_laudos=args.max_laudos)
+    try:
+        if args.paralelo > 1:
+            controlador = ControladorAIMD({'limite_maximo': args.paralelo})
+            contadores = executar_trabalhadores_paralelos(fila, email, senha, controlador=controlador, **opcoes)
+        else:
+            contadores = executar_trabalhador(fila, email, senha, **opcoes)
+        eventos('resumo', contadores)
+    finally:
+        if destino is not sys.stdout:
+            destino.close()
+    return 0 if contadores['falhas'] == 0 else 1
+
+def situacao(fila, args):
+    print(json.dumps(fila.situacao(args.lote), ensure_ascii=False, indent=2, default=str))
+    return 0
+
+# =========================================================================
+# LINHA DE COMANDO
+# =========================================================================
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Fila de laudos do Fênix compartilhada entre trabalhadores.")
+    parser.add_argument("--fila", help="Arquivo SQLite da fila (padrão: data/fila_laudos.sqlite)")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    p_enfileirar = comandos.add_parser("enfileirar", help="Enfileira um laudo por grupo da planilha")
+    p_enfileirar.add_argument("--planilha", required=True, help="Arquivo Excel com as UPs")
+    p_enfileirar.add_argument("--aba", help="Aba da planilha (padrão: a primeira)")
+    p_enfileirar.add_argument("--organizacao", choices=["nucleo", "propriedade"], default="nucleo")
+    p_enfileirar.add_argument("--grupo", action="append", dest="grupos", metavar="GRUPO",
+                              help="Núcleo ou propriedade (pode repetir; padrão: todos sem laudo)")
+    p_enfileirar.add_argument("--lote", help="Nome do lote (padrão: data e hora)")
+
+    p_trabalhar = comandos.add_parser("trabalhar", help="Reivindica e lança laudos da fila")
+    p_trabalhar.add_argument("--nome", help="Nome do trabalhador (padrão: máquina:pid)")
+    p_trabalhar.add_argument("--eventos", help="Arquivo JSONL dos eventos (padrão: stdout)")
+    p_trabalhar.add_argument("--continuo", action="store_true", help="Continua esperando laudos com a fila vazia")
+    p_trabalhar.add_argument("--paralelo", type=int, default=1,
+                             help="Máximo de laudos simultâneos (o limite se ajusta à resposta do portal)")
+    p_trabalhar.add_argument("--max-laudos", type=int, help="Encerra após este número de laudos")
+    p_trabalhar.add_argument("--com-janela", action="store_true", help="Mostra o navegador durante a execução")
+
+    p_situacao = comandos.add_parser("situacao", help="Laudos por estado, trabalhadores ativos e vazão")
+    p_situacao.add_argument("--lote", help="Restringe a um lote")
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    fila = FilaLaudos(args.fila)
+    comando = {'enfileirar': enfileirar, 'trabalhar': trabalhar, 'situacao': situacao}[args.comando]
+    try:
+        return comando(fila, args)
+    except (ErroPlano, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Lançamento de laudos no Fênix pela linha de comando (sem Streamlit)
+
+Executa uma planilha (ou um arquivo de plano) do login ao último laudo, com
+o navegador sem janela por padrão, e publica o progresso como eventos JSONL
+(um objeto JSON por linha).
+
+Exemplos:
+    set FENIX_EMAIL=joao.silva
+    set FENIX_SENHA=...
+    python cli_lancamento.py --planilha entrega5.xlsx --grupo BA2 --grupo BA3
+    python cli_lancamento.py --plano plano.json --eventos lancamento.jsonl
+
+Arquivo de plano (JSON); as opções da linha de comando têm prioridade:
+    {
+        "planilha": "entrega5.xlsx",
+        "aba": 0,
+        "organizacao": "nucleo",
+        "grupos": ["BA2", "BA3"],
+        "planilha_atualizada": "entrega5_lancada.xlsx"
+    }
+
+Credenciais: FENIX_EMAIL (sem @, completa com @suzano.com.br) e FENIX_SENHA.
+Código de saída: 0 sem falhas, 1 se algum grupo ou UP falhou, 2 erro nos
+parâmetros, na planilha ou nas credenciais.
+"""
+
+import os
+import sys
+import json
+import argparse
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from lancamento_fenix import preparar_grupos_lancamento, marcar_ups_com_laudo, executar_lancamento_em_lote
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+VARIAVEL_EMAIL = "FENIX_EMAIL"
+VARIAVEL_SENHA = "FENIX_SENHA"
+DOMINIO_EMAIL = "@suzano.com.br"
+
+class ErroPlano(Exception):
+    """Erro de entrada do lançamento (parâmetros, planilha ou credenciais)"""
+
+# =========================================================================
+# EVENTOS JSONL
+# =========================================================================
+
+class EventosJSONL:
+    """Escreve cada evento como uma linha JSON, com data/hora, seguro entre threads"""
+
+    def __init__(self, destino):
+        self.destino = destino
+        self._lock = threading.Lock()
+
+    def __call__(self, evento, dados=None):
+        linha = {'ts': datetime.now().isoformat(timespec='milliseconds'), 'evento': evento}
+        linha.update(dados or {})
+        conteudo = json.dumps(linha, ensure_ascii=False, default=str)
+        with self._lock:
+            self.destino.write(conteudo + "\n")
+            self.destino.flush()
+
+# =========================================================================
+# PLANO
+# =========================================================================
+
+def carregar_plano(caminho_plano=None, **opcoes):
+    """
+    Junta o arquivo de plano (opcional) com as opções da linha de comando;
+    opções com valor None não sobrescrevem o plano.
+    """
+    plano = {'aba': 0, 'organizacao': 'nucleo', 'grupos': None, 'planilha_atualizada': None, 'pipeline': None}
+    if caminho_plano:
+        try:
+            with open(caminho_plano, 'r', encoding='utf-8') as f:
+                plano.update(json.load(f))
+        except (OSError, ValueError) as e:
+            raise ErroPlano(f"Erro ao ler o plano {caminho_plano}: {e}")
+    plano.update({chave: valor for chave, valor in opcoes.items() if valor is not None})
+    if isinstance(plano['aba'], str) and plano['aba'].isdigit():
+        plano['aba'] = int(plano['aba'])
+
+    if not plano.get('planilha'):
+        raise ErroPlano("Informe a planilha (--planilha ou 'planilha' no plano)")
+    if plano['organizacao'] not in ('nucleo', 'propriedade'):
+        raise ErroPlano(f"Organização inválida: {plano['organizacao']}")
+    return plano
+
+def credenciais_do_ambiente():
+    """E-mail e senha do Fênix a partir das variáveis de ambiente"""
+    email = os.environ.get(VARIAVEL_EMAIL, "").strip()
+    senha = os.environ.get(VARIAVEL_SENHA, "")
+    if not email or not senha:
+        raise ErroPlano(f"Defina as variáveis de ambiente {VARIAVEL_EMAIL} e {VARIAVEL_SENHA}")
+    if "@" not in email:
+        email = f"{email}{DOMINIO_EMAIL}"
+    return email, senha
+
+def executar_plano(plano, email, senha, ao_evento, headless=True):
+    """
+    Executa um plano já carregado e devolve o resumo.
+
+    Emite 'inicio' com os grupos e a quantidade de UPs, os eventos da
+    automação e grava a planilha atualizada quando o plano pedir.
+    """
+    try:
+        df = pd.read_excel(plano['planilha'], sheet_name=plano['aba'])
+    except Exception as e:
+        raise ErroPlano(f"Erro ao ler a planilha: {e}")
+    try:
+        df_ups, grupos = preparar_grupos_lancamento(df, plano['organizacao'], plano['grupos'])
+    except ValueError as e:
+        raise ErroPlano(str(e))
+    if not grupos:
+        raise ErroPlano("Não há UPs sem laudo para lançar")
+
+    ao_evento('inicio', {
+        'planilha': plano['planilha'],
+        'organizacao': plano['organizacao'],
+        'grupos': [str(grupo) for grupo in grupos],
+        'ups': len(df_ups)
+    })
+
+    resumo = executar_lancamento_em_lote(
+        df_ups, grupos, plano['organizacao'], email, senha, headless=headless, ao_evento=ao_evento,
+        pipeline=plano['pipeline']
+    )
+
+    if plano['planilha_atualizada'] and resumo['ups_com_sucesso']:
+        df_atualizado, atualizadas = marcar_ups_com_laudo(df, resumo['ups_com_sucesso'])
+        df_atualizado.to_excel(plano['planilha_atualizada'], index=False)
+        resumo['planilha_atualizada'] = plano['planilha_atualizada']
+        resumo['ups_marcadas'] = atualizadas
+
+    return resumo
+
+# =========================================================================
+# LINHA DE COMANDO
+# =========================================================================
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Lança os laudos no Fênix sem interface, publicando o progresso em JSONL."
+    )
+    parser.add_argument("--plano", help="Arquivo JSON com planilha, grupos e opções")
+    parser.add_argument("--planilha", help="Arquivo Excel com as UPs")
+    parser.add_argument("--aba", help="Aba da planilha (padrão: a primeira)")
+    parser.add_argument("--organizacao", choices=["nucleo", "propriedade"], help="Agrupamento dos laudos")
+    parser.add_argument("--grupo", action="append", dest="grupos", metavar="GRUPO",
+                        help="Núcleo ou propriedade a lançar (pode repetir; padrão: todos sem laudo)")
+    parser.add_argument("--planilha-atualizada", help="Grava a planilha com 'Laudo Existente' = SIM nas UPs lançadas")
+    parser.add_argument("--eventos", help="Arquivo JSONL dos eventos (padrão: stdout)")
+    parser.add_argument("--com-janela", action="store_true", help="Mostra o navegador durante a execução")
+    parser.add_argument("--pipeline", action="store_true", default=None,
+                        help="Prepara o próximo laudo em outra aba enquanto o atual é enviado")
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+
+    destino = open(args.eventos, 'a', encoding='utf-8') if args.eventos else sys.stdout
+    eventos = EventosJSONL(destino)
+    try:
+        plano = carregar_plano(
+            args.plano, planilha=args.planilha, aba=args.aba, organizacao=args.organizacao,
+            grupos=args.grupos, planilha_atualizada=args.planilha_atualizada, pipeline=args.pipeline
+        )
+        email, senha = credenciais_do_ambiente()
+        resumo = executar_plano(plano, email, senha, eventos, headless=not args.com_janela)
+        eventos('resumo', resumo)
+    except (ErroPlano, ValueError) as e:
+        eventos('erro', {'mensagem': str(e)})
+        return 2
+    finally:
+        if destino is not sys.stdout:
+            destino.close()
+
+    return 0 if resumo['sucesso'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
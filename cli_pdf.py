@@ -0,0 +1,249 @@
+"""
+Geração de PDFs em lote pela linha de comando (sem Streamlit e sem tela)
+
+Processa várias UNFs de uma planilha na mesma execução, em paralelo, com
+arquivos locais ou do SharePoint, e termina com um resumo em JSON.
+
+Exemplos:
+    python cli_pdf.py --planilha entrega5.xlsx --imagens D:/FOTOS --croquis D:/CROQUIS
+        --saida D:/PDFs --entrega "Entrega 5" --unf BA --unf ES
+
+    python cli_pdf.py --planilha entrega5.xlsx --sharepoint --todas-unfs
+        --imagens "/sites/TOPS-VALIDAO/Documentos Compartilhados/TOPS/ENTREGA_5/FOTOS"
+        --croquis "/sites/TOPS-VALIDAO/Documentos Compartilhados/TOPS/ENTREGA_5/CROQUIS"
+        --saida /srv/pdfs --entrega "Entrega 5" --resumo resumo.json
+
+No modo SharePoint as credenciais vêm das variáveis de ambiente
+SHAREPOINT_USUARIO e SHAREPOINT_SENHA. O resumo vai para o stdout (ou para o
+arquivo de --resumo) e as mensagens de progresso para o stderr.
+
+Código de saída: 0 sem falhas, 1 se alguma UNF teve falhas, 2 erro nos
+parâmetros, na planilha ou na conexão.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+import cria_pdf
+from cache_sharepoint import CacheSharePoint
+from interface_console import InterfaceConsole
+from pipeline_pdf import PIPELINE_CONFIG
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+LOTE_CONFIG = {
+    'aba_padrao': "Export",    # Aba da planilha (a mesma da interface)
+    'unfs_paralelas': 2,       # UNFs processadas ao mesmo tempo
+}
+
+VARIAVEL_USUARIO = "SHAREPOINT_USUARIO"
+VARIAVEL_SENHA = "SHAREPOINT_SENHA"
+
+class ErroLote(Exception):
+    """Erro de entrada do lote (parâmetros, planilha ou conexão)"""
+
+# =========================================================================
+# PLANILHA E UNFS
+# =========================================================================
+
+def carregar_planilha(caminho, aba=None):
+    """Lê a aba da planilha; a primeira coluna identifica a UNF"""
+    if not os.path.exists(caminho):
+        raise ErroLote(f"Planilha não encontrada: {caminho}")
+    try:
+        return pd.read_excel(caminho, sheet_name=aba or LOTE_CONFIG['aba_padrao'])
+    except Exception as e:
+        raise ErroLote(f"Erro ao ler a planilha: {e}")
+
+def separar_unfs(df, unfs=None):
+    """
+    Separa as linhas da planilha por UNF (primeira coluna).
+
+    Args:
+        unfs: UNFs desejadas; None ou vazio seleciona todas
+
+    Returns:
+        list: pares (unf, DataFrame da UNF), na ordem da planilha
+    """
+    coluna_unf = df.columns[0]
+    valores = df[coluna_unf].dropna()
+    disponiveis = sorted(valores.astype(str).str.strip().unique().tolist())
+
+    if unfs:
+        pedidas = [str(unf).strip() for unf in unfs]
+        faltando = [unf for unf in pedidas if unf not in disponiveis]
+        if faltando:
+            raise ErroLote(
+                f"UNF(s) não encontrada(s) na planilha: {', '.join(faltando)}. "
+                f"Disponíveis: {', '.join(disponiveis)}"
+            )
+    else:
+        pedidas = disponiveis
+
+    chave = df[coluna_unf].astype(str).str.strip()
+    return [(unf, df[chave == unf].copy()) for unf in dict.fromkeys(pedidas)]
+
+# =========================================================================
+# EXECUÇÃO
+# =========================================================================
+
+def executar_lote(df, unfs, imagens, croquis, saida, entrega, sharepoint=False, ctx=None,
+                  organizacao="por_nucleo", formato="por_up", incremental=True,
+                  unfs_paralelas=None, max_downloads=None, usar_cache=True, interface=None):
+    """
+    Gera os PDFs das UNFs em paralelo e devolve o resumo do lote.
+
+    As UNFs rodam em threads (unfs_paralelas ao mesmo tempo) e compartilham
+    um único pool de processos para a otimização das imagens, então o total
+    de processos não cresce com o número de UNFs.
+
+    Args:
+        df: planilha completa (primeira coluna = UNF)
+        unfs: UNFs a processar (None ou vazio = todas)
+        sharepoint: True para baixar imagens e croquis do SharePoint
+            (imagens e croquis são caminhos no site e ctx é obrigatório)
+        interface: InterfaceConsole das mensagens (padrão: stderr)
+
+    Returns:
+        dict: resumo do lote com o resumo de cada UNF em 'unfs'
+    """
+    interface = interface or InterfaceConsole()
+    cria_pdf.usar_interface(interface)
+
+    if sharepoint:
+        if ctx is None:
+            raise ErroLote("O modo SharePoint precisa de um contexto conectado")
+        imagens = cria_pdf.convert_sharepoint_url_to_path(imagens)
+        croquis = cria_pdf.convert_sharepoint_url_to_path(croquis)
+        cache = CacheSharePoint() if usar_cache else None
+    else:
+        for pasta in (imagens, croquis):
+            if not os.path.isdir(pasta):
+                raise ErroLote(f"Pasta não encontrada: {pasta}")
+
+    grupos = separar_unfs(df, unfs)
+    inicio = time.time()
+
+    def _processar_unf(unf, df_unf, executor_imagens):
+        interface.definir_contexto(unf)
+        inicio_unf = time.time()
+        try:
+            if sharepoint:
+                resumo = cria_pdf.process_properties_streamlit(
+                    df_unf, ctx, imagens, croquis, saida, entrega, organizacao, unf,
+                    max_downloads=max_downloads, cache=cache, executor_imagens=executor_imagens
+                )
+            else:
+                resumo = cria_pdf.process_properties_local(
+                    df_unf, imagens, croquis, saida, entrega, organizacao, unf,
+                    incremental=incremental, formato_saida=formato, executor_imagens=executor_imagens
+                )
+        except Exception as e:
+            interface.error(f"Erro ao processar a UNF {unf}: {e}")
+            resumo = cria_pdf._resumo_processamento(unf, saida, len(df_unf), erro=str(e))
+        finally:
+            interface.definir_contexto(None)
+        resumo['duracao_s'] = round(time.time() - inicio_unf, 2)
+        return resumo
+
+    with ProcessPoolExecutor(max_workers=PIPELINE_CONFIG['processos_imagem']) as executor_imagens:
+        with ThreadPoolExecutor(max_workers=unfs_paralelas or LOTE_CONFIG['unfs_paralelas'],
+                                thread_name_prefix="lote_unf") as executor_unfs:
+            futuros = [
+                executor_unfs.submit(_processar_unf, unf, df_unf, executor_imagens)
+                for unf, df_unf in grupos
+            ]
+            resumos = [futuro.result() for futuro in futuros]
+
+    return {
+        'inicio': datetime.fromtimestamp(inicio).isoformat(timespec='seconds'),
+        'duracao_s': round(time.time() - inicio, 2),
+        'modo': "sharepoint" if sharepoint else "local",
+        'entrega': entrega,
+        'sucesso': all(resumo['sucesso'] for resumo in resumos),
+        'total_ups': sum(resumo['total_ups'] for resumo in resumos),
+        'pdfs_gerados': sum(resumo['pdfs_gerados'] for resumo in resumos),
+        'falhas': sum(resumo['falhas'] for resumo in resumos),
+        'unfs': resumos
+    }
+
+# =========================================================================
+# LINHA DE COMANDO
+# =========================================================================
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Gera os PDFs das UPs em lote, sem interface, para uma ou várias UNFs."
+    )
+    parser.add_argument("--planilha", required=True, help="Arquivo Excel da entrega")
+    parser.add_argument("--aba", default=LOTE_CONFIG['aba_padrao'], help="Aba da planilha (padrão: %(default)s)")
+    unfs = parser.add_mutually_exclusive_group(required=True)
+    unfs.add_argument("--unf", action="append", dest="unfs", metavar="UNF", help="UNF a processar (pode repetir)")
+    unfs.add_argument("--todas-unfs", action="store_true", help="Processa todas as UNFs da planilha")
+    parser.add_argument("--imagens", required=True, help="Pasta das imagens (local ou caminho/URL no SharePoint)")
+    parser.add_argument("--croquis", required=True, help="Pasta dos croquis (local ou caminho/URL no SharePoint)")
+    parser.add_argument("--sharepoint", action="store_true", help="Baixa imagens e croquis do SharePoint")
+    parser.add_argument("--saida", required=True, help="Pasta de saída dos PDFs")
+    parser.add_argument("--entrega", default="Entrega", help="Nome da entrega (padrão: %(default)s)")
+    parser.add_argument("--organizacao", choices=["por_nucleo", "por_propriedade"], default="por_nucleo")
+    parser.add_argument("--formato", choices=["por_up", "consolidado"], default="por_up",
+                        help="Um PDF por UP ou um documento por pasta (modo local)")
+    parser.add_argument("--sem-incremental", action="store_true", help="Gera todos os PDFs, ignorando o manifesto")
+    parser.add_argument("--paralelo", type=int, default=LOTE_CONFIG['unfs_paralelas'],
+                        help="UNFs processadas ao mesmo tempo (padrão: %(default)s)")
+    parser.add_argument("--max-downloads", type=int, default=cria_pdf.DOWNLOAD_CONFIG['max_workers'],
+                        help="Downloads simultâneos no SharePoint (padrão: %(default)s)")
+    parser.add_argument("--sem-cache", action="store_true", help="Não usa o cache local do SharePoint")
+    parser.add_argument("--resumo", help="Grava o resumo JSON neste arquivo em vez do stdout")
+    parser.add_argument("--verboso", action="store_true", help="Mostra também o progresso detalhado")
+    return parser
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    interface = InterfaceConsole(verboso=args.verboso)
+
+    try:
+        df = carregar_planilha(args.planilha, args.aba)
+
+        ctx = None
+        if args.sharepoint:
+            usuario = os.environ.get(VARIAVEL_USUARIO, cria_pdf.default_username)
+            senha = os.environ.get(VARIAVEL_SENHA)
+            if not senha:
+                raise ErroLote(f"Defina a senha do SharePoint na variável de ambiente {VARIAVEL_SENHA}")
+            try:
+                ctx = cria_pdf.connect_to_sharepoint(cria_pdf.site_url, usuario, senha)
+            except Exception as e:
+                raise ErroLote(f"Erro ao conectar ao SharePoint: {e}")
+
+        resumo = executar_lote(
+            df, args.unfs, args.imagens, args.croquis, args.saida, args.entrega,
+            sharepoint=args.sharepoint, ctx=ctx, organizacao=args.organizacao, formato=args.formato,
+            incremental=not args.sem_incremental, unfs_paralelas=args.paralelo,
+            max_downloads=args.max_downloads, usar_cache=not args.sem_cache, interface=interface
+        )
+    except ErroLote as e:
+        interface.error(str(e))
+        return 2
+
+    conteudo = json.dumps(resumo, ensure_ascii=False, indent=2, default=str)
+    if args.resumo:
+        with open(args.resumo, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        interface.info(f"Resumo gravado em {args.resumo}")
+    else:
+        print(conteudo)
+
+    return 0 if resumo['sucesso'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Concorrência adaptativa (AIMD) dos lançamentos em paralelo
+
+O controlador acompanha os eventos da automação (duração de cada etapa,
+UPs com falha, "Nenhum resultado" e timeouts) e ajusta quantos laudos
+podem rodar ao mesmo tempo: soma um ao limite enquanto as etapas seguem
+rápidas e sem erros, e o divide quando o portal começa a demorar ou falhar
+(aumento aditivo, redução multiplicativa). As decisões ficam registradas
+para o relatório da execução.
+"""
+
+import time
+import threading
+from collections import deque
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+CONCORRENCIA_CONFIG = {
+    'limite_inicial': 1,
+    'limite_minimo': 1,
+    'limite_maximo': 6,
+    'incremento': 1,              # Aumento aditivo por decisão saudável
+    'fator_reducao': 0.5,         # Redução multiplicativa por decisão ruim
+    'amostras_decisao': 10,       # Etapas medidas entre uma decisão e a próxima
+    'tolerancia_latencia': 1.5,   # Etapa lenta: duração acima de referência x tolerância
+    'taxa_lentas_max': 0.3,       # Fração de etapas lentas que provoca redução
+    'taxa_erros_max': 0.2,        # Fração de falhas/anomalias que provoca redução
+    'peso_referencia': 0.2,       # Peso da média móvel da duração de referência
+    'max_decisoes': 100,          # Decisões guardadas para o relatório
+}
+
+# =========================================================================
+# CONTROLADOR
+# =========================================================================
+
+class ControladorAIMD:
+    """
+    Limite de laudos simultâneos ajustado pelos eventos da automação.
+
+    Uso: registrar() como callback ao_evento das automações, e
+    adquirir()/liberar() em volta de cada laudo.
+    """
+
+    def __init__(self, config=None):
+        self.config = dict(CONCORRENCIA_CONFIG, **(config or {}))
+        self.limite = self.config['limite_inicial']
+        self.ativos = 0
+        self.referencias = {}  # etapa -> duração típica sem sobrecarga (média móvel)
+        self.decisoes = deque(maxlen=self.config['max_decisoes'])
+        self._janela = {'amostras': 0, 'lentas': 0, 'erros': 0, 'pico_ativos': 0}
+        self._condicao = threading.Condition()
+        # Cada automação emite os eventos na própria thread: sinais da etapa em andamento
+        self._por_thread = threading.local()
+
+    # ---------------------------------------------------------------------
+    # Vagas
+    # ---------------------------------------------------------------------
+
+    def adquirir(self, cancelado=None):
+        """
+        Espera até haver vaga dentro do limite atual.
+
+        Args:
+            cancelado: threading.Event opcional que desiste da espera
+
+        Returns:
+            bool: True com a vaga reservada, False se cancelado
+        """
+        with self._condicao:
+            while self.ativos >= self.limite:
+                if cancelado is not None and cancelado.is_set():
+                    return False
+                self._condicao.wait(timeout=1)
+            self.ativos += 1
+            self._janela['pico_ativos'] = max(self._janela['pico_ativos'], self.ativos)
+            return True
+
+    def liberar(self):
+        with self._condicao:
+            self.ativos = max(self.ativos - 1, 0)
+            self._condicao.notify_all()
+
+    # ---------------------------------------------------------------------
+    # Eventos da automação
+    # ---------------------------------------------------------------------
+
+    def registrar(self, evento, dados):
+        """
+        Callback ao_evento: mede etapas e conta falhas e anomalias.
+
+        Uma UP que falha gera vários eventos (anomalia "Nenhum resultado",
+        etapa processar_up sem sucesso e up_falhou); ela conta como um
+        único erro. Anomalias e timeouts marcam a etapa em andamento na
+        thread, e up_falhou só conta quando não vem logo depois de um
+        processar_up sem sucesso (UPs abandonadas pelo prazo do laudo, sem
+        etapa própria).
+        """
+        estado = self._por_thread
+        if evento == 'etapa':
+            falhou = not dados.get('sucesso', True) or getattr(estado, 'sinal', False)
+            estado.sinal = False
+            estado.up_falhou = dados.get('etapa') == 'processar_up' and not dados.get('sucesso', True)
+            self._registrar_etapa(dados.get('etapa'), dados.get('duracao_s', 0), not falhou)
+        elif evento == 'anomalia':
+            estado.sinal = True
+        elif evento == 'up_falhou':
+            if getattr(estado, 'up_falhou', False):
+                estado.up_falhou = False
+            else:
+                self._contar_erro()
+        elif evento == 'log' and dados.get('nivel') in ('warning', 'error') \
+                and 'timeout' in str(dados.get('mensagem', '')).lower():
+            estado.sinal = True
+
+    def _contar_erro(self):
+        with self._condicao:
+            self._janela['erros'] += 1
+
+    def _registrar_etapa(self, etapa, duracao, sucesso):
+        with self._condicao:
+            janela = self._janela
+            janela['amostras'] += 1
+            if not sucesso:
+                janela['erros'] += 1
+
+            referencia = self.referencias.get(etapa)
+            if referencia is None:
+                self.referencias[etapa] = duracao
+            elif duracao > referencia * self.config['tolerancia_latencia']:
+                janela['lentas'] += 1
+            elif sucesso:
+                # A referência só acompanha etapas saudáveis
+                peso = self.config['peso_referencia']
+                self.referencias[etapa] = referencia * (1 - peso) + duracao * peso
+
+            if janela['amostras'] >= self.config['amostras_decisao']:
+                self._decidir()
+
+    def _decidir(self):
+        """Fecha a janela e ajusta o limite (chamado com o lock)"""
+        janela = self._janela
+        taxa_lentas = janela['lentas'] / janela['amostras']
+        taxa_erros = janela['erros'] / janela['amostras']
+        anterior = self.limite
+
+        if taxa_erros > self.config['taxa_erros_max'] or taxa_lentas > self.config['taxa_lentas_max']:
+            self.limite = max(self.config['limite_minimo'], int(self.limite * self.config['fator_reducao']))
+            motivo = 'erros' if taxa_erros > self.config['taxa_erros_max'] else 'latencia'
+        elif janela['pico_ativos'] >= self.limite:
+            self.limite = min(self.config['limite_maximo'], self.limite + self.config['incremento'])
+            motivo = 'saudavel'
+        else:
+            motivo = 'limite_ocioso'  # Nem todas as vagas foram usadas: não há por que aumentar
+
+        self.decisoes.append({
+            'ts': time.strftime('%H:%M:%S'),
+            'limite_anterior': anterior,
+            'limite': self.limite,
+            'motivo': motivo,
+            'amostras': janela['amostras'],
+            'taxa_lentas': round(taxa_lentas, 2),
+            'taxa_erros': round(taxa_erros, 2)
+        })
+        self._janela = {'amostras': 0, 'lentas': 0, 'erros': 0, 'pico_ativos': self.ativos}
+        self._condicao.notify_all()
+
+    # ---------------------------------------------------------------------
+    # Relatório
+    # ---------------------------------------------------------------------
+
+    def relatorio(self):
+        """Limite atual, maior limite alcançado e decisões para o resumo da execução"""
+        with self._condicao:
+            decisoes = list(self.decisoes)
+            return {
+                'limite_atual': self.limite,
+                'limite_maximo_alcancado': max([self.config['limite_inicial']] + [d['limite'] for d in decisoes]),
+                'ativos': self.ativos,
+                'referencias_s': {etapa: round(valor, 2) for etapa, valor in self.referencias.items()},
+                'decisoes': decisoes
+            }
@@ -39,6 +39,71 @@ AUTOMATION_CONFIG = {
     'timeout': 30000,       # Timeout em ms
     'wait_between_actions': 1000,  # Pausa entre ações em ms
     'max_retries': 3,       # Máximo de tentativas por ação
+    'fator_espera': 1.0,    # Multiplica as pausas fixas entre os passos (ex.: 0.5 = metade)
+    'laudos_em_pipeline': False,  # Prepara o próximo laudo em outra aba durante o envio do atual
+    'link_direto_upload': True,   # Abre o Upload de Laudos pelo endereço aprendido em vez do menu
+    'provisionar_linhas': False,  # Cria de uma vez as linhas da Matriz de Decisão do laudo (remoção das sobras ainda não validada no portal)
+    # Prazos (orçamento de tempo): as esperas de cada etapa saem do tempo restante
+    'prazo_preparo_s': 180,  # Navegação, cabeçalho e textos do laudo
+    'prazo_up_s': 90,        # Cada UP da Matriz de Decisão, com todas as tentativas
+    'prazo_envio_s': 120,    # Enviar, Assinatura Funcional e Confirmar
+    'prazo_limpeza_s': 15,   # Limpeza da linha de uma UP abandonada por prazo
+    'max_recuperacoes_laudo': 2,  # Recuperações em página nova (diário) por laudo antes de desistir
+    # Login automático (máquina de estados guiada pela página)
+    'prazo_login_s': 60,     # Login inteiro, sem contar a espera do MFA
+    'prazo_mfa_s': 120,      # Espera pela aprovação do MFA a partir da tela de desafio
+    'intervalo_login_s': 0.25,  # Reavaliação da tela quando não há navegação
+}
+
+# Perfil de desempenho do navegador da automação
+NAVEGADOR_CONFIG = {
+    'bloquear_recursos': False,  # Liga o filtro de requisições do contexto (ainda não validado no portal real)
+    'tipos_bloqueados': ['image', 'font', 'media'],  # Tipos de recurso do Playwright
+    'dominios_bloqueados': [     # Analytics e telemetria (sufixo do host)
+        'google-analytics.com', 'googletagmanager.com', 'doubleclick.net',
+        'hotjar.com', 'clarity.ms', 'nr-data.net', 'newrelic.com',
+        'sentry.io', 'segment.io', 'applicationinsights.azure.com',
+        'dc.services.visualstudio.com',
+    ],
+    # Bloqueia hosts fora de dominios_permitidos; exige route('**/*'), que desliga
+    # o cache HTTP do Chromium (os bundles do portal são baixados a cada página)
+    'bloquear_terceiros': False,
+    'dominios_permitidos': [     # Portal e login corporativo (Microsoft)
+        'suzanonet.com.br', 'suzano.com.br',
+        'microsoftonline.com', 'microsoft.com', 'live.com',
+        'msauth.net', 'msftauth.net', 'msidentity.com', 'windows.net',
+    ],
+    'desativar_animacoes': True, # Injeta CSS sem transições/animações (react-select)
+}
+
+# Reciclagem do contexto do navegador entre laudos (memória estável em sessões longas)
+RECICLAGEM_CONFIG = {
+    'reciclar': True,
+    'a_cada_laudos': 10,         # Laudos lançados no mesmo contexto (0 desliga)
+    'a_cada_s': 3600,            # Tempo de vida do contexto em segundos (0 desliga)
+    'memoria_mb': 800,           # Heap JS da página acima do qual recicla (0 desliga)
+}
+
+# Navegador persistente (daemon) acessado via CDP
+DAEMON_CONFIG = {
+    'usar_daemon': False,        # True: conecta ao Chromium persistente em vez de abrir um novo
+    'host': "127.0.0.1",
+    'porta_cdp': 9222,           # Porta do --remote-debugging-port
+    'pasta_perfil': DATA_DIR / "perfil_chromium",  # user-data-dir (cookies e sessão do login)
+    'timeout_inicio_s': 20,      # Espera pelo CDP após iniciar o Chromium
+    'timeout_saude_s': 3,        # Resposta máxima da verificação de saúde
+    'falhas_para_reiniciar': 3,  # Verificações seguidas sem resposta antes de reiniciar um Chromium vivo
+}
+
+# Navegador compartilhado entre os usuários do Streamlit (um Chromium, um contexto por sessão)
+BROKER_CONFIG = {
+    'usar_broker': False,        # True: sessões do app compartilham o Chromium do daemon
+    'max_sessoes': 4,            # Contextos (sessões) abertos ao mesmo tempo
+    'espera_vaga_s': 120,        # Espera por uma vaga antes de desistir
+    'ocioso_s': 900,             # Sessões sem uso por mais tempo são recolhidas
+    'intervalo_recolha_s': 60,   # Frequência da verificação de sessões ociosas
+    'falhas_para_reiniciar': 3,  # Verificações seguidas sem resposta antes de reiniciar um Chromium vivo
+    'pasta_sessoes': DATA_DIR / "sessoes",  # storage_state (login) de cada usuário
 }
 
 # =========================================================================
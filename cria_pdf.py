@@ -1,26 +1,69 @@
-import streamlit as st
 import os
+import re
 import sys
-from urllib.parse import quote
+import json
+import hashlib
+from urllib.parse import quote, urlparse
 import pandas as pd
 import tempfile
+import shutil
 import getpass
-import tkinter as tk
-from tkinter import filedialog
+import time
+import threading
+import requests
 
 # Importando bibliotecas necessárias
-from office365.runtime.auth.authentication_context import AuthenticationContext
-from office365.sharepoint.client_context import ClientContext
-from office365.sharepoint.files.file import File
+# (tkinter, office365 e streamlit são importados apenas quando usados, para
+# que o modo em lote rode em servidores sem tela e sem essas dependências)
 from fpdf import FPDF
 from PIL import Image
 
+from cache_sharepoint import CacheSharePoint
+from pipeline_pdf import executar_pipeline
+from interface_console import StreamlitPreguicoso
+
+# Interface das mensagens: Streamlit por padrão, console no modo em lote
+st = StreamlitPreguicoso()
+
+def usar_interface(interface):
+    """
+    Define a interface usada pelas mensagens do processamento (o módulo
+    streamlit ou uma InterfaceConsole)
+    """
+    global st
+    st = interface
+
 # =========================================================================
 # CONFIGURAÇÕES
 # =========================================================================
 
 site_url = "https://suzano.sharepoint.com/sites/TOPS-VALIDAO"
 
+# Campos da planilha que aparecem no texto do PDF (ordem do texto)
+CAMPOS_TEXTO_PDF = [
+    'UP-C-R', 'UP', 'Nucleo', 'Data_Ocorrência', 'Idade', 'Quant.Ocorrências',
+    'Ocorrência Predominante', 'Severidade Predominante', 'Area UP', 'Area Liquida',
+    'Incidencia', 'Quantidade de Imagens*', 'Recomendacao'
+]
+
+# Parâmetros de renderização de create_pdf_with_placeholders.
+# Entram na assinatura do manifesto: qualquer alteração aqui força a
+# regeneração de todos os PDFs no próximo processamento incremental.
+CONFIG_RENDERIZACAO = {
+    'versao': 1,
+    'formato_pagina': (1920, 1080),
+    'fonte': ('Arial', 12),
+    'max_width_px': 600,
+    'max_height_px': 450,
+    'image_quality': 60,
+}
+
+# Nome do arquivo de manifesto gravado em cada pasta de saída
+NOME_MANIFESTO = ".manifesto_pdfs.json"
+
+# Tamanho máximo de cada PDF (documentos consolidados são divididos em volumes)
+LIMITE_TAMANHO_PDF_MB = 9.0
+
 # =========================================================================
 # FUNÇÃO PARA SELEÇÃO DE PASTA
 # =========================================================================
@@ -30,6 +73,9 @@ def selecionar_pasta(titulo="Selecione uma pasta"):
     Abre uma janela para seleção de pasta usando tkinter
     """
     try:
+        import tkinter as tk
+        from tkinter import filedialog
+
         # Criar uma janela root temporária (oculta)
         root = tk.Tk()
         root.withdraw()
@@ -91,6 +137,9 @@ def convert_sharepoint_url_to_path(url):
 # =========================================================================
 
 def connect_to_sharepoint(site_url, username, password):
+    from office365.runtime.auth.authentication_context import AuthenticationContext
+    from office365.sharepoint.client_context import ClientContext
+
     ctx_auth = AuthenticationContext(site_url)
     if ctx_auth.acquire_token_for_user(username, password):
         return ClientContext(site_url, ctx_auth)
@@ -98,15 +147,152 @@ def connect_to_sharepoint(site_url, username, password):
         raise Exception("Erro ao autenticar. Verifique suas credenciais.")
 
 # =========================================================================
-# 2) LISTAR ARQUIVOS (SEM SUBPASTAS) - SHAREPOINT
+# 2) LISTAGEM PAGINADA E FILTRADA (SEM SUBPASTAS) - SHAREPOINT
 # =========================================================================
 
-def list_files(ctx, folder_url):
-    folder = ctx.web.get_folder_by_server_relative_url(folder_url)
-    files = folder.files
-    ctx.load(files)
-    ctx.execute_query()
-    return [(f.properties["Name"], f.properties["ServerRelativeUrl"]) for f in files]
+# Requisições que usam a autenticação do ClientContext passam por este lock
+# (listagem na thread principal e downloads nas threads do pool)
+LOCK_AUTENTICACAO = threading.RLock()
+
+# Itens por página na listagem paginada
+TAMANHO_PAGINA_LISTAGEM = 500
+
+# Somente os campos que o casamento com as UPs e o cache precisam
+# (UniqueId + _UIVersionString identificam a versão do arquivo; 'Modified.'
+# na resposta é a data ISO com segundos, 'Modified' vem formatada ao minuto)
+CAMPOS_LISTAGEM = ['FileLeafRef', 'FileRef', 'UniqueId', '_UIVersionString', 'Modified', 'File_x0020_Size', 'FSObjType']
+
+def _url_biblioteca(ctx, folder_url):
+    """
+    Caminho da biblioteca de documentos que contém a pasta:
+    '/sites/X/Documentos Compartilhados/TOPS/FOTOS' -> '/sites/X/Documentos Compartilhados'
+    """
+    caminho_site = urlparse(ctx.base_url).path.rstrip('/')
+    relativo = folder_url[len(caminho_site):] if folder_url.startswith(caminho_site) else folder_url
+    return f"{caminho_site}/{relativo.strip('/').split('/')[0]}"
+
+# Form digest por ClientContext: id(ctx) -> (valor, validade em time.monotonic())
+_DIGESTS = {}
+
+def _assinar(ctx, request):
+    """Autenticação do ClientContext, a mesma dos downloads (sob LOCK_AUTENTICACAO)"""
+    with LOCK_AUTENTICACAO:
+        ctx.authentication_context.authenticate_request(request)
+
+def _form_digest(ctx, sessao=None):
+    """
+    X-RequestDigest exigido nos POST da API REST, pedido em /_api/contextinfo
+    e reaproveitado até perto de expirar
+    """
+    valor, validade = _DIGESTS.get(id(ctx), (None, 0))
+    if valor and time.monotonic() < validade:
+        return valor
+
+    from office365.runtime.http.request_options import RequestOptions
+
+    request = RequestOptions(f"{ctx.base_url.rstrip('/')}/_api/contextinfo")
+    request.set_header('Accept', 'application/json;odata=nometadata')
+    _assinar(ctx, request)
+    response = (sessao or requests).post(request.url, headers=request.headers, auth=request.auth,
+                                         timeout=DOWNLOAD_CONFIG['timeout'])
+    response.raise_for_status()
+    info = response.json()
+    valor = info['FormDigestValue']
+    _DIGESTS[id(ctx)] = (valor, time.monotonic() + int(info.get('FormDigestTimeoutSeconds', 1800)) - 60)
+    return valor
+
+def _enviar_listagem(ctx, request, sessao=None):
+    """
+    Assina a requisição sob LOCK_AUTENTICACAO e a envia fora dele, para que
+    os downloads possam assinar as suas enquanto a página da listagem está a
+    caminho.
+    """
+    _assinar(ctx, request)
+    request.set_header('X-RequestDigest', _form_digest(ctx, sessao))
+    response = (sessao or requests).post(
+        request.url, data=request.data, headers=request.headers, auth=request.auth,
+        timeout=DOWNLOAD_CONFIG['timeout']
+    )
+    response.raise_for_status()
+    return response
+
+def iterar_arquivos_sharepoint(ctx, folder_url, filtro=None, tamanho_pagina=TAMANHO_PAGINA_LISTAGEM, sessao=None):
+    """
+    Lista os arquivos da pasta página a página (RenderListDataAsStream com
+    RowLimit paginado, que não esbarra no limite de exibição da lista),
+    pedindo apenas os campos necessários.
+
+    É um gerador: cada página é entregue assim que chega, então o consumo
+    (por exemplo os downloads) começa antes do fim da listagem.
+
+    Args:
+        filtro: função opcional nome -> bool aplicada a cada arquivo
+        sessao: requests.Session usada no envio (padrão: requests)
+
+    Yields:
+        dict: 'nome', 'url', 'etag' (None), 'id', 'versao', 'modificado'
+        (ISO) e 'tamanho'
+    """
+    biblioteca = _url_biblioteca(ctx, folder_url).replace("'", "''")
+    endpoint = (
+        f"{ctx.base_url.rstrip('/')}/_api/web/GetList(@lista)/RenderListDataAsStream"
+        f"?@lista='{quote(biblioteca)}'"
+    )
+    view_xml = (
+        "<View Scope='FilesOnly'><Query/><ViewFields>"
+        + "".join(f"<FieldRef Name='{campo}'/>" for campo in CAMPOS_LISTAGEM)
+        + f"</ViewFields><RowLimit Paged='TRUE'>{tamanho_pagina}</RowLimit></View>"
+    )
+    corpo = json.dumps({
+        'parameters': {
+            'RenderOptions': 2,  # Apenas os dados das linhas
+            'FolderServerRelativeUrl': folder_url,
+            'ViewXml': view_xml
+        }
+    })
+
+    from office365.runtime.http.request_options import RequestOptions
+    from office365.runtime.http.http_method import HttpMethod
+
+    proxima_pagina = ""
+    while True:
+        request = RequestOptions(endpoint + proxima_pagina)
+        request.method = HttpMethod.Post
+        request.data = corpo
+        request.set_header('Accept', 'application/json;odata=nometadata')
+        request.set_header('Content-Type', 'application/json;odata=nometadata')
+        pagina = _enviar_listagem(ctx, request, sessao).json()
+
+        for linha in pagina.get('Row', []):
+            if str(linha.get('FSObjType', '0')) != '0':
+                continue  # Subpastas
+            nome = linha['FileLeafRef']
+            if filtro is not None and not filtro(nome):
+                continue
+            yield {
+                'nome': nome,
+                'url': linha['FileRef'],
+                'etag': None,
+                'id': linha.get('UniqueId'),
+                'versao': linha.get('_UIVersionString'),
+                'modificado': linha.get('Modified.') or linha.get('Modified'),
+                'tamanho': linha.get('File_x0020_Size')
+            }
+
+        next_href = pagina.get('NextHref')
+        if not next_href:
+            break
+        proxima_pagina = "&" + next_href.lstrip('?')
+
+def filtro_imagens_das_ups(codigos_up):
+    """Filtro de listagem para imagens: nome começa com o código (6 caracteres) de uma das UPs"""
+    codigos = {codigo.upper() for codigo in codigos_up}
+    return lambda nome: nome[:6].upper() in codigos
+
+def filtro_croquis_das_ups(codigos_up):
+    """Filtro de listagem para croquis: nome contém o código de uma das UPs"""
+    codigos = [codigo.upper() for codigo in codigos_up]
+    return lambda nome: any(codigo in nome.upper() for codigo in codigos)
 
 # =========================================================================
 # 2B) LISTAR ARQUIVOS LOCAIS
@@ -145,10 +331,157 @@ def list_files_local(folder_path):
 # 3) BAIXAR ARQUIVO DO SHAREPOINT
 # =========================================================================
 
-def download_file(ctx, server_relative_file_url, local_path):
-    response = File.open_binary(ctx, server_relative_file_url)
-    with open(local_path, "wb") as local_file:
-        local_file.write(response.content)
+# Parâmetros dos downloads do SharePoint
+DOWNLOAD_CONFIG = {
+    'max_workers': 6,            # Downloads simultâneos
+    'chunk_size': 256 * 1024,    # Bytes gravados por vez (o arquivo nunca fica inteiro em memória)
+    'tentativas': 4,             # Tentativas por arquivo em erros transitórios
+    'espera_inicial': 1.0,       # Segundos antes da 2ª tentativa (dobra a cada tentativa)
+    'timeout': 60                # Segundos sem resposta antes de desistir da tentativa
+}
+
+# Status HTTP que indicam falha transitória (vale tentar de novo)
+STATUS_TRANSITORIOS = {408, 429, 500, 502, 503, 504}
+
+class ErroTransitorioDownload(Exception):
+    """Falha de download que pode ser resolvida com nova tentativa"""
+
+class SessaoDownloadSharePoint:
+    """
+    Sessão HTTP compartilhada pelas threads de download.
+
+    Reaproveita as conexões (pool do requests) e a autenticação do
+    ClientContext já conectado; a resposta é gravada em blocos num arquivo
+    .part, renomeado só quando o download termina.
+    """
+
+    def __init__(self, ctx, max_workers=None):
+        self.ctx = ctx
+        max_workers = max_workers or DOWNLOAD_CONFIG['max_workers']
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # A autenticação do Office365 não é garantidamente thread-safe
+        self._lock_auth = LOCK_AUTENTICACAO
+
+    def _url_arquivo(self, server_relative_url):
+        caminho = server_relative_url.replace("'", "''")
+        return f"{self.ctx.base_url.rstrip('/')}/_api/web/getFileByServerRelativePath(DecodedUrl='{quote(caminho)}')/$value"
+
+    def _requisicao_autenticada(self, url):
+        from office365.runtime.http.request_options import RequestOptions
+
+        request = RequestOptions(url)
+        with self._lock_auth:
+            self.ctx.authentication_context.authenticate_request(request)
+        return request
+
+    def _baixar_uma_vez(self, server_relative_url, local_path):
+        request = self._requisicao_autenticada(self._url_arquivo(server_relative_url))
+        caminho_parcial = f"{local_path}.part"
+        try:
+            with self.session.get(request.url, headers=request.headers, auth=request.auth,
+                                  stream=True, timeout=DOWNLOAD_CONFIG['timeout']) as response:
+                if response.status_code in STATUS_TRANSITORIOS:
+                    raise ErroTransitorioDownload(f"HTTP {response.status_code}")
+                response.raise_for_status()
+
+                total_bytes = 0
+                with open(caminho_parcial, "wb") as local_file:
+                    for bloco in response.iter_content(chunk_size=DOWNLOAD_CONFIG['chunk_size']):
+                        local_file.write(bloco)
+                        total_bytes += len(bloco)
+
+            os.replace(caminho_parcial, local_path)
+            return total_bytes
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            raise ErroTransitorioDownload(str(e)) from e
+        finally:
+            if os.path.exists(caminho_parcial):
+                os.remove(caminho_parcial)
+
+    def baixar(self, server_relative_url, local_path):
+        """
+        Baixa um arquivo, tentando de novo com espera exponencial em erros
+        transitórios (rede, timeout, 429/5xx). Retorna os bytes baixados.
+        """
+        espera = DOWNLOAD_CONFIG['espera_inicial']
+        for tentativa in range(1, DOWNLOAD_CONFIG['tentativas'] + 1):
+            try:
+                return self._baixar_uma_vez(server_relative_url, local_path)
+            except ErroTransitorioDownload:
+                if tentativa == DOWNLOAD_CONFIG['tentativas']:
+                    raise
+                time.sleep(espera)
+                espera *= 2
+
+    def fechar(self):
+        self.session.close()
+
+class ClienteSharePoint:
+    """
+    Acesso ao SharePoint usado pelos downloads e pelo CacheSharePoint:
+    listar(folder_url) e baixar(url, caminho_local) sobre o mesmo ClientContext.
+    """
+
+    def __init__(self, ctx, max_workers=None):
+        self.ctx = ctx
+        self.sessao = SessaoDownloadSharePoint(ctx, max_workers)
+
+    def listar(self, folder_url):
+        return list(self.iterar(folder_url))
+
+    def iterar(self, folder_url, filtro=None):
+        return iterar_arquivos_sharepoint(self.ctx, folder_url, filtro, sessao=self.sessao.session)
+
+    def baixar(self, server_relative_url, local_path):
+        return self.sessao.baixar(server_relative_url, local_path)
+
+    def fechar(self):
+        self.sessao.fechar()
+
+class DownloadsCompartilhados:
+    """
+    Etapa de busca do pipeline: baixa cada URL uma única vez, do cache quando
+    os metadados da listagem (url -> dict, em metadados) não mudaram no
+    servidor. Outras threads que pedem a mesma URL (um croqui usado por
+    várias UPs) aguardam o primeiro download e copiam o arquivo.
+    """
+
+    def __init__(self, cliente, cache=None, metadados=None):
+        self.cliente = cliente
+        self.cache = cache
+        self.metadados = metadados if metadados is not None else {}
+        self.bytes_transferidos = 0
+        self._downloads = {}
+        self._lock = threading.Lock()
+
+    def obter(self, url, destino):
+        """Grava o arquivo da URL em destino; relança o erro do download"""
+        with self._lock:
+            registro = self._downloads.get(url)
+            dono = registro is None
+            if dono:
+                registro = self._downloads[url] = {'pronto': threading.Event(), 'caminho': destino, 'erro': None}
+        if not dono:
+            registro['pronto'].wait()
+            if registro['erro'] is not None:
+                raise registro['erro']
+            shutil.copy2(registro['caminho'], destino)
+            return
+        try:
+            if self.cache is not None and url in self.metadados:
+                transferidos = self.cache.obter(self.cliente, self.metadados[url], destino)
+            else:
+                transferidos = self.cliente.baixar(url, destino)
+            with self._lock:
+                self.bytes_transferidos += transferidos or 0
+        except Exception as e:
+            registro['erro'] = e
+            raise
+        finally:
+            registro['pronto'].set()
 
 # =========================================================================
 # 3B) COPIAR ARQUIVO LOCAL
@@ -170,7 +503,8 @@ def copy_local_file(source_path, destination_path):
 # 4) FUNÇÃO PARA OTIMIZAR E REDIMENSIONAR IMAGEM
 # =========================================================================
 
-def optimize_and_resize_image(image_path, max_width_px=800, max_height_px=600, quality=70):
+def optimize_and_resize_image(image_path, max_width_px=800, max_height_px=600, quality=70, optimized_path=None,
+                              erros=None):
     """
     Otimiza uma imagem redimensionando e comprimindo para reduzir tamanho do arquivo.
     Cria uma versão otimizada temporária da imagem.
@@ -180,6 +514,10 @@ def optimize_and_resize_image(image_path, max_width_px=800, max_height_px=600, q
         max_width_px: Largura máxima em pixels
         max_height_px: Altura máxima em pixels  
         quality: Qualidade JPEG (1-100, menor = arquivo menor)
+        optimized_path: Caminho de destino da versão otimizada
+            (padrão: "<imagem>_optimized.jpg" ao lado da original)
+        erros: lista que recebe a mensagem de erro em vez do st.error
+            (processos do pipeline, sem Streamlit)
     
     Returns:
         tuple: (caminho_otimizado, largura_final_pt, altura_final_pt)
@@ -204,8 +542,9 @@ def optimize_and_resize_image(image_path, max_width_px=800, max_height_px=600, q
             img_resized = img.resize((new_width_px, new_height_px), Image.Resampling.LANCZOS)
             
             # Criar nome do arquivo temporário otimizado
-            base_name = os.path.splitext(image_path)[0]
-            optimized_path = f"{base_name}_optimized.jpg"
+            if optimized_path is None:
+                base_name = os.path.splitext(image_path)[0]
+                optimized_path = f"{base_name}_optimized.jpg"
             
             # Salvar imagem otimizada
             img_resized.save(optimized_path, 'JPEG', quality=quality, optimize=True)
@@ -217,7 +556,11 @@ def optimize_and_resize_image(image_path, max_width_px=800, max_height_px=600, q
             return optimized_path, width_pt, height_pt
             
     except Exception as e:
-        st.error(f"Erro ao otimizar imagem {image_path}: {e}")
+        mensagem = f"Erro ao otimizar imagem {image_path}: {e}"
+        if erros is None:
+            st.error(mensagem)
+        else:
+            erros.append(mensagem)
         # Retornar valores padrão em caso de erro
         return image_path, 400, 300
 
@@ -230,11 +573,189 @@ def get_file_size_mb(file_path):
     except:
         return 0
 
+# =========================================================================
+# 4B) MANIFESTO DE BUILD INCREMENTAL
+# =========================================================================
+
+def identidade_arquivo(caminho):
+    """
+    Retorna a identidade de um arquivo de origem (caminho, tamanho e mtime).
+    Retorna None se o arquivo não existir.
+    """
+    if not caminho:
+        return None
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    return {
+        'caminho': os.path.abspath(caminho),
+        'tamanho': info.st_size,
+        'mtime_ns': info.st_mtime_ns
+    }
+
+def calcular_assinatura_up(up_data, origem_imagem, origem_croqui):
+    """
+    Calcula a assinatura (hash) de tudo que define o PDF de uma UP:
+    campos do texto, identidade da imagem e do croqui de origem e
+    parâmetros de renderização.
+    """
+    entradas = {
+        'campos': {campo: str(up_data.get(campo, 'N/A')) for campo in CAMPOS_TEXTO_PDF},
+        'imagem': identidade_arquivo(origem_imagem),
+        'croqui': identidade_arquivo(origem_croqui),
+        'renderizacao': CONFIG_RENDERIZACAO
+    }
+    conteudo = json.dumps(entradas, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def carregar_manifesto(folder_path):
+    """
+    Lê o manifesto de uma pasta de saída.
+    Retorna um manifesto vazio se não existir ou estiver corrompido.
+    """
+    caminho = os.path.join(folder_path, NOME_MANIFESTO)
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            manifesto = json.load(f)
+        if isinstance(manifesto.get('ups'), dict):
+            return manifesto
+    except (OSError, ValueError):
+        pass
+    return {'versao': 1, 'ups': {}}
+
+def salvar_manifesto(folder_path, manifesto):
+    """Grava o manifesto de forma atômica (arquivo temporário + rename)"""
+    caminho = os.path.join(folder_path, NOME_MANIFESTO)
+    caminho_tmp = caminho + ".tmp"
+    with open(caminho_tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(caminho_tmp, caminho)
+
+def pdf_esta_atualizado(manifesto, up_code, assinatura, pdf_path):
+    """Verifica se o PDF da UP existe e foi gerado com as mesmas entradas"""
+    registro = manifesto['ups'].get(up_code)
+    return (
+        registro is not None
+        and registro.get('assinatura') == assinatura
+        and os.path.exists(pdf_path)
+    )
+
+def remover_saidas_up(folder_path, up_code):
+    """Remove o PDF e as cópias de trabalho (imagem/croqui) de uma UP"""
+    removidos = 0
+    for nome in (f"{up_code}.pdf", f"{up_code}_image.jpg", f"{up_code}_croqui.jpg"):
+        caminho = os.path.join(folder_path, nome)
+        try:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+                removidos += 1
+        except OSError:
+            pass
+    return removidos
+
+def calcular_assinatura_consolidado(paginas, limite_mb):
+    """
+    Assinatura de um documento consolidado: assinaturas das UPs na ordem
+    das páginas mais o limite de tamanho usado para dividir os volumes.
+    """
+    entradas = {
+        'paginas': [
+            [pagina['up'], calcular_assinatura_up(pagina['dados'], pagina['imagem'], pagina['croqui'])]
+            for pagina in paginas
+        ],
+        'limite_mb': limite_mb
+    }
+    conteudo = json.dumps(entradas, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def consolidado_esta_atualizado(manifesto, assinatura, folder_path):
+    """Verifica se o documento consolidado da pasta corresponde à assinatura e se todos os volumes existem"""
+    registro = manifesto.get('consolidado')
+    if not registro or registro.get('assinatura') != assinatura:
+        return False
+    return all(os.path.exists(os.path.join(folder_path, volume)) for volume in registro.get('volumes', []))
+
+def remover_consolidado(folder_path, manifesto):
+    """Remove os volumes do documento consolidado registrado no manifesto"""
+    registro = manifesto.pop('consolidado', None) or {}
+    for volume in registro.get('volumes', []):
+        caminho = os.path.join(folder_path, volume)
+        try:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+        except OSError:
+            pass
+    return registro.get('volumes', [])
+
+def remover_volumes_consolidado(pdf_path):
+    """
+    Remove os volumes " - Vol NN" de um documento consolidado pelo nome
+    (sem manifesto, volumes de uma geração anterior não estão registrados)
+    """
+    pasta = os.path.dirname(pdf_path)
+    padrao = re.compile(re.escape(os.path.splitext(os.path.basename(pdf_path))[0]) + r" - Vol \d{2,}\.pdf$")
+    removidos = []
+    for nome in os.listdir(pasta):
+        if padrao.match(nome):
+            try:
+                os.remove(os.path.join(pasta, nome))
+                removidos.append(nome)
+            except OSError:
+                pass
+    return removidos
+
+def podar_manifestos(output_dir, entrega_nome, unf_selecionada, ups_por_pasta):
+    """
+    Remove os PDFs de UPs que não fazem mais parte da entrega.
+
+    Percorre as pastas da entrega em output_dir e, para cada registro do
+    manifesto que pertence à UNF processada mas não está em ups_por_pasta
+    (dict pasta -> conjunto de UPs esperadas), apaga os arquivos da UP.
+
+    Returns:
+        list: UPs removidas no formato "pasta/UP"
+    """
+    removidas = []
+    if not os.path.isdir(output_dir):
+        return removidas
+
+    prefixo = f"{entrega_nome} - "
+    for nome_pasta in os.listdir(output_dir):
+        folder_path = os.path.join(output_dir, nome_pasta)
+        if not nome_pasta.startswith(prefixo) or not os.path.isfile(os.path.join(folder_path, NOME_MANIFESTO)):
+            continue
+
+        manifesto = carregar_manifesto(folder_path)
+        esperadas = ups_por_pasta.get(folder_path, set())
+        obsoletas = [
+            up for up, registro in manifesto['ups'].items()
+            if registro.get('unf') == unf_selecionada and up not in esperadas
+        ]
+
+        # Documento consolidado de uma pasta que não tem mais nenhuma UP
+        consolidado = manifesto.get('consolidado')
+        consolidado_obsoleto = bool(consolidado) and consolidado.get('unf') == unf_selecionada and not esperadas
+
+        if not obsoletas and not consolidado_obsoleto:
+            continue
+
+        for up in obsoletas:
+            remover_saidas_up(folder_path, up)
+            del manifesto['ups'][up]
+            removidas.append(f"{nome_pasta}/{up}")
+        if consolidado_obsoleto:
+            for volume in remover_consolidado(folder_path, manifesto):
+                removidas.append(f"{nome_pasta}/{volume}")
+        salvar_manifesto(folder_path, manifesto)
+
+    return removidas
+
 # =========================================================================
 # 5) CRIAR PLACEHOLDER PARA IMAGEM AUSENTE
 # =========================================================================
 
-def create_image_placeholder(width_pt, height_pt):
+def create_image_placeholder(width_pt, height_pt, caminho_destino=None):
     """
     Cria um placeholder temporário para imagem ausente
     """
@@ -269,7 +790,7 @@ def create_image_placeholder(width_pt, height_pt):
         draw.text((x, y), text, fill='black', font=font)
         
         # Salvar placeholder temporário
-        temp_path = os.path.join(tempfile.gettempdir(), f"placeholder_{os.getpid()}.jpg")
+        temp_path = caminho_destino or os.path.join(tempfile.gettempdir(), f"placeholder_{os.getpid()}_{threading.get_ident()}.jpg")
         placeholder_img.save(temp_path, 'JPEG', quality=85)
         
         return temp_path
@@ -282,95 +803,113 @@ def create_image_placeholder(width_pt, height_pt):
 # 6) CRIAR O PDF COM SUPORTE A PLACEHOLDERS
 # =========================================================================
 
-def create_pdf_with_placeholders(up_data, image_path, croqui_path, pdf_path):
+def _novo_documento_pdf():
+    """Cria o FPDF no formato de slide usado por todos os PDFs de UP"""
+    # PDF de 1920 pt de largura e 1080 pt de altura (como slide 16:9)
+    pdf = FPDF(unit='pt', format=CONFIG_RENDERIZACAO['formato_pagina'])
+    fonte, tamanho_fonte = CONFIG_RENDERIZACAO['fonte']
+    pdf.set_font(fonte, size=tamanho_fonte)
+    return pdf
+
+def _tamanho_placeholder():
+    """Dimensões (pt) do placeholder usado no lugar de imagens ausentes"""
+    return (int(CONFIG_RENDERIZACAO['max_width_px'] * 0.75),
+            int(CONFIG_RENDERIZACAO['max_height_px'] * 0.75))
+
+def _renderizar_pagina_up(pdf, up_data, imagem, croqui):
     """
-    Cria um PDF otimizado com placeholders para imagens ausentes.
+    Adiciona ao documento uma página com o texto da UP e as duas imagens lado a lado.
+
+    Args:
+        imagem, croqui: tuplas (caminho, largura_pt, altura_pt). Com caminho
+            None o espaço é reservado mas nada é desenhado.
     """
-    # Lista para armazenar arquivos temporários para limpeza posterior
-    temp_files = []
-    
-    try:
-        # PDF de 1920 pt de largura e 1080 pt de altura (como slide 16:9)
-        pdf = FPDF(unit='pt', format=(1920, 1080))
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
+    pdf.add_page()
+
+    # Montar o texto em uma única string, separado por '||'
+    text_line = (
+        f"UP-C-R: {up_data['UP-C-R']} || "
+        f"UP: {up_data['UP']} || "
+        f"Nucleo: {up_data['Nucleo']} || "
+        f"Data_Ocorrência: {up_data['Data_Ocorrência']} || "
+        f"Idade: {up_data['Idade']} || "
+        f"Quant.Ocorrências: {up_data['Quant.Ocorrências']} || "
+        f"Ocorrência Predominante: {up_data['Ocorrência Predominante']} || "
+        f"Severidade Predominante: {up_data['Severidade Predominante']} || "
+        f"Area UP: {up_data['Area UP']} || "
+        f"Area Liquida: {up_data['Area Liquida']} || "
+        f"Incidencia: {up_data['Incidencia']} || "
+        f"Quantidade de Imagens*: {up_data['Quantidade de Imagens*']} || "
+        f"Recomendacao: {up_data['Recomendacao']}"
+    )
 
-        # Montar o texto em uma única string, separado por '||'
-        text_line = (
-            f"UP-C-R: {up_data['UP-C-R']} || "
-            f"UP: {up_data['UP']} || "
-            f"Nucleo: {up_data['Nucleo']} || "
-            f"Data_Ocorrência: {up_data['Data_Ocorrência']} || "
-            f"Idade: {up_data['Idade']} || "
-            f"Quant.Ocorrências: {up_data['Quant.Ocorrências']} || "
-            f"Ocorrência Predominante: {up_data['Ocorrência Predominante']} || "
-            f"Severidade Predominante: {up_data['Severidade Predominante']} || "
-            f"Area UP: {up_data['Area UP']} || "
-            f"Area Liquida: {up_data['Area Liquida']} || "
-            f"Incidencia: {up_data['Incidencia']} || "
-            f"Quantidade de Imagens*: {up_data['Quantidade de Imagens*']} || "
-            f"Recomendacao: {up_data['Recomendacao']}"
-        )
+    # Usar multi_cell para quebrar linha automaticamente
+    pdf.multi_cell(0, 25, text_line)
 
-        # Usar multi_cell para quebrar linha automaticamente
-        pdf.multi_cell(0, 25, text_line)
+    # Posições
+    x1 = 50  # Margem esquerda para primeira imagem
+    y_images = 180  # Posição Y para ambas as imagens
+    spacing = 40  # Espaçamento entre as imagens
 
-        # Configurações para otimização das imagens
-        max_width_px = 600   # Pixels
-        max_height_px = 450  # Pixels
-        image_quality = 60   # Qualidade JPEG
-        
-        # Posições iniciais
-        x1 = 50  # Margem esquerda para primeira imagem
-        y_images = 180  # Posição Y para ambas as imagens
-        spacing = 40  # Espaçamento entre as imagens
+    # PRIMEIRA IMAGEM
+    caminho1, img1_width, img1_height = imagem
+    if caminho1:
+        pdf.image(caminho1, x=x1, y=y_images, w=img1_width, h=img1_height)
 
-        # Variáveis para controlar posicionamento
-        x2 = x1
+    # SEGUNDA IMAGEM, ao lado da primeira
+    x2 = x1 + img1_width + spacing
+    caminho2, img2_width, img2_height = croqui
+    if caminho2:
+        pdf.image(caminho2, x=x2, y=y_images, w=img2_width, h=img2_height)
 
-        # PRIMEIRA IMAGEM (otimizada ou placeholder)
-        if os.path.exists(image_path):
-            optimized_path1, img1_width, img1_height = optimize_and_resize_image(
-                image_path, max_width_px, max_height_px, image_quality
-            )
-            temp_files.append(optimized_path1)
-            
-            pdf.image(optimized_path1, x=x1, y=y_images, w=img1_width, h=img1_height)
-            
-            # Calcular posição da segunda imagem
-            x2 = x1 + img1_width + spacing
-        else:
-            # Criar placeholder para primeira imagem
-            st.warning(f"Imagem não encontrada: {image_path}. Usando placeholder.")
-            placeholder_width = int(max_width_px * 0.75)
-            placeholder_height = int(max_height_px * 0.75)
-            
-            placeholder_path = create_image_placeholder(placeholder_width, placeholder_height)
-            if placeholder_path:
-                temp_files.append(placeholder_path)
-                pdf.image(placeholder_path, x=x1, y=y_images, w=placeholder_width, h=placeholder_height)
-                x2 = x1 + placeholder_width + spacing
+def preparar_imagens_pdf(caminhos, erros=None):
+    """
+    Otimiza as imagens de uma UP (etapa de CPU, pode rodar em outro processo).
+    Com erros (lista), as falhas vão para ela em vez do st.error.
+
+    Returns:
+        list: para cada caminho, (caminho_otimizado, largura_pt, altura_pt)
+            ou None se o arquivo não existir
+    """
+    return [
+        optimize_and_resize_image(
+            caminho,
+            CONFIG_RENDERIZACAO['max_width_px'],
+            CONFIG_RENDERIZACAO['max_height_px'],
+            CONFIG_RENDERIZACAO['image_quality'],
+            erros=erros
+        ) if caminho and os.path.exists(caminho) else None
+        for caminho in caminhos
+    ]
+
+def renderizar_pdf_up(up_data, imagens, pdf_path, caminhos_originais=("", "")):
+    """
+    Grava o PDF da UP a partir das imagens já otimizadas (preparar_imagens_pdf),
+    usando placeholders no lugar das ausentes. Remove os arquivos otimizados.
+    """
+    # Lista para armazenar arquivos temporários para limpeza posterior
+    temp_files = [imagem[0] for imagem in imagens if imagem]
+    
+    try:
+        pdf = _novo_documento_pdf()
+        placeholder_width, placeholder_height = _tamanho_placeholder()
+
+        paginas_imagens = []
+        for imagem, caminho, aviso in zip(imagens, caminhos_originais, (
+            "Imagem não encontrada: {}. Usando placeholder.",
+            "Croqui não encontrado: {}. Usando placeholder."
+        )):
+            if imagem:
+                paginas_imagens.append(imagem)
             else:
-                x2 = x1 + placeholder_width + spacing
+                # Placeholder para imagem ausente
+                st.warning(aviso.format(caminho))
+                placeholder_path = create_image_placeholder(placeholder_width, placeholder_height)
+                if placeholder_path:
+                    temp_files.append(placeholder_path)
+                paginas_imagens.append((placeholder_path, placeholder_width, placeholder_height))
 
-        # SEGUNDA IMAGEM (otimizada ou placeholder)
-        if os.path.exists(croqui_path):
-            optimized_path2, img2_width, img2_height = optimize_and_resize_image(
-                croqui_path, max_width_px, max_height_px, image_quality
-            )
-            temp_files.append(optimized_path2)
-            
-            pdf.image(optimized_path2, x=x2, y=y_images, w=img2_width, h=img2_height)
-        else:
-            # Criar placeholder para segunda imagem
-            st.warning(f"Croqui não encontrado: {croqui_path}. Usando placeholder.")
-            placeholder_width = int(max_width_px * 0.75)
-            placeholder_height = int(max_height_px * 0.75)
-            
-            placeholder_path = create_image_placeholder(placeholder_width, placeholder_height)
-            if placeholder_path:
-                temp_files.append(placeholder_path)
-                pdf.image(placeholder_path, x=x2, y=y_images, w=placeholder_width, h=placeholder_height)
+        _renderizar_pagina_up(pdf, up_data, paginas_imagens[0], paginas_imagens[1])
 
         # Salvar o PDF
         pdf.output(pdf_path)
@@ -379,7 +918,7 @@ def create_pdf_with_placeholders(up_data, image_path, croqui_path, pdf_path):
         file_size = get_file_size_mb(pdf_path)
         
         # Alertar se ainda estiver muito grande
-        if file_size > 9.0:
+        if file_size > LIMITE_TAMANHO_PDF_MB:
             st.warning(f"PDF ainda está grande ({file_size} MB). Considere usar compressão extra.")
             
         return file_size, True
@@ -397,6 +936,136 @@ def create_pdf_with_placeholders(up_data, image_path, croqui_path, pdf_path):
             except Exception as e:
                 pass
 
+def create_pdf_with_placeholders(up_data, image_path, croqui_path, pdf_path):
+    """
+    Cria um PDF otimizado com placeholders para imagens ausentes.
+    """
+    try:
+        imagens = preparar_imagens_pdf([image_path, croqui_path])
+    except Exception as e:
+        st.error(f"Erro ao criar PDF com placeholders: {e}")
+        return 0, False
+    return renderizar_pdf_up(up_data, imagens, pdf_path, (image_path, croqui_path))
+
+# =========================================================================
+# 6B) PDF CONSOLIDADO (UMA PÁGINA POR UP)
+# =========================================================================
+
+# Estimativa do conteúdo de uma página além das imagens (texto e estrutura)
+BYTES_ESTIMADOS_POR_PAGINA = 8 * 1024
+
+def _imagem_da_pagina(origem, cache, temp_dir):
+    """
+    Retorna (caminho, largura_pt, altura_pt) da imagem otimizada para a página.
+
+    O cache garante que cada imagem de origem seja otimizada uma única vez e
+    que todas as páginas que a usam apontem para o mesmo arquivo; o FPDF
+    embute cada arquivo uma só vez no documento. Imagens ausentes usam um
+    único placeholder compartilhado.
+    """
+    if origem and os.path.exists(origem):
+        chave = os.path.abspath(origem)
+        if chave not in cache:
+            destino = os.path.join(temp_dir, f"imagem_{len(cache):05d}.jpg")
+            cache[chave] = optimize_and_resize_image(
+                origem,
+                CONFIG_RENDERIZACAO['max_width_px'],
+                CONFIG_RENDERIZACAO['max_height_px'],
+                CONFIG_RENDERIZACAO['image_quality'],
+                optimized_path=destino
+            )
+        return cache[chave]
+
+    if None not in cache:
+        largura, altura = _tamanho_placeholder()
+        destino = os.path.join(temp_dir, "placeholder.jpg")
+        cache[None] = (create_image_placeholder(largura, altura, caminho_destino=destino), largura, altura)
+    return cache[None]
+
+def dividir_em_volumes(paginas, limite_mb=LIMITE_TAMANHO_PDF_MB):
+    """
+    Distribui as páginas em volumes cujo tamanho estimado fique abaixo do limite.
+
+    Args:
+        paginas: lista de (pagina, imagem, croqui), com imagem e croqui no
+            formato (caminho, largura_pt, altura_pt)
+
+    Returns:
+        list: lista de volumes, cada um uma lista de páginas
+    """
+    limite_bytes = limite_mb * 1024 * 1024 * 0.95  # Margem para a estrutura do PDF
+    volumes = []
+    volume_atual, imagens_volume, tamanho_volume = [], set(), 0
+
+    for item in paginas:
+        _, imagem, croqui = item
+        # Imagens já embutidas no volume não ocupam espaço de novo
+        novas = {c for c, _, _ in (imagem, croqui) if c and c not in imagens_volume}
+        acrescimo = BYTES_ESTIMADOS_POR_PAGINA + sum(
+            os.path.getsize(c) for c in novas if os.path.exists(c)
+        )
+
+        if volume_atual and tamanho_volume + acrescimo > limite_bytes:
+            volumes.append(volume_atual)
+            volume_atual, imagens_volume, tamanho_volume = [], set(), 0
+            novas = {c for c, _, _ in (imagem, croqui) if c}
+            acrescimo = BYTES_ESTIMADOS_POR_PAGINA + sum(
+                os.path.getsize(c) for c in novas if os.path.exists(c)
+            )
+
+        volume_atual.append(item)
+        imagens_volume |= novas
+        tamanho_volume += acrescimo
+
+    if volume_atual:
+        volumes.append(volume_atual)
+    return volumes
+
+def create_pdf_consolidado(paginas, pdf_path, limite_mb=LIMITE_TAMANHO_PDF_MB):
+    """
+    Cria um único documento com uma página por UP, dividido em volumes
+    quando o tamanho estimado ultrapassa o limite.
+
+    Args:
+        paginas: lista de dicts com 'up', 'dados' (up_data), 'imagem' e
+            'croqui' (caminhos de origem ou None)
+        pdf_path: caminho do documento; com mais de um volume os arquivos
+            recebem o sufixo " - Vol NN"
+
+    Returns:
+        tuple: (lista de (caminho_pdf, tamanho_mb, ups_do_volume), sucesso)
+    """
+    temp_dir = tempfile.mkdtemp(prefix="pdf_consolidado_")
+    try:
+        cache = {}
+        preparadas = [
+            (pagina,
+             _imagem_da_pagina(pagina['imagem'], cache, temp_dir),
+             _imagem_da_pagina(pagina['croqui'], cache, temp_dir))
+            for pagina in paginas
+        ]
+
+        volumes = dividir_em_volumes(preparadas, limite_mb)
+        base_path = os.path.splitext(pdf_path)[0]
+
+        gerados = []
+        for numero, volume in enumerate(volumes, start=1):
+            caminho_volume = pdf_path if len(volumes) == 1 else f"{base_path} - Vol {numero:02d}.pdf"
+            pdf = _novo_documento_pdf()
+            for pagina, imagem, croqui in volume:
+                _renderizar_pagina_up(pdf, pagina['dados'], imagem, croqui)
+            pdf.output(caminho_volume)
+            gerados.append((caminho_volume, get_file_size_mb(caminho_volume), [p['up'] for p, _, _ in volume]))
+
+        return gerados, True
+
+    except Exception as e:
+        st.error(f"Erro ao criar PDF consolidado {os.path.basename(pdf_path)}: {e}")
+        return [], False
+
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
 # =========================================================================
 # 7) CRIAR O PDF OTIMIZADO COM IMAGENS COMPRIMIDAS (FUNÇÃO ORIGINAL)
 # =========================================================================
@@ -571,7 +1240,60 @@ def create_pdf_extra_compressed(up_data, image_path, croqui_path, pdf_path):
 # 6) PROCESSAMENTO DAS LINHAS (UPs) COM STREAMLIT
 # =========================================================================
 
-def process_properties_streamlit(df, ctx, images_folder_url, croquis_folder_url, output_dir, entrega_nome, organizacao_tipo="por_nucleo", unf_selecionada="UNF"):
+def _pasta_saida_sharepoint(row, df, up_code, output_dir, entrega_nome, organizacao_tipo, unf_selecionada):
+    """Define (e cria) a pasta de saída da UP conforme o tipo de organização"""
+    if organizacao_tipo == "por_propriedade":
+        # Buscar nome da propriedade
+        nome_propriedade = None
+        for coluna in ['Propriedade', 'Nome Propriedade', 'Fazenda', 'Nome']:
+            if coluna in df.columns:
+                nome_propriedade = str(row.get(coluna, f'Propriedade_{up_code}'))
+                break
+        
+        if not nome_propriedade or nome_propriedade == 'nan':
+            nome_propriedade = f"Propriedade_{up_code}"
+        
+        folder_name = f"{entrega_nome} - {unf_selecionada} - {nome_propriedade}"
+    else:
+        nucleo = str(row['Nucleo']).strip()
+        ocorrencia_predominante = str(row['Ocorrência Predominante']).strip()
+        folder_name = f"{entrega_nome} - {nucleo} - {ocorrencia_predominante}"
+    folder_path = os.path.join(output_dir, folder_name)
+    os.makedirs(folder_path, exist_ok=True)
+    return folder_path
+
+def _resumo_processamento(unf_selecionada, output_dir, total_ups=0, successful_pdfs=0, failed_up_list=(),
+                          large_files=(), erro=None, **extras):
+    """Resumo serializável (JSON) de uma execução, devolvido pelas funções de processamento"""
+    resumo = {
+        'unf': str(unf_selecionada),
+        'pasta_saida': output_dir,
+        'sucesso': erro is None and not failed_up_list,
+        'erro': erro,
+        'total_ups': total_ups,
+        'pdfs_gerados': successful_pdfs,
+        'falhas': len(failed_up_list),
+        'ups_com_falha': list(failed_up_list),
+        'arquivos_grandes': list(large_files)
+    }
+    resumo.update(extras)
+    return resumo
+
+def process_properties_streamlit(df, ctx, images_folder_url, croquis_folder_url, output_dir, entrega_nome, organizacao_tipo="por_nucleo", unf_selecionada="UNF", max_downloads=None, cache=None, executor_imagens=None):
+    """
+    Processa as UPs baixando imagens e croquis do SharePoint.
+
+    Tudo roda no pipeline em estágios: as pastas são listadas em páginas,
+    filtradas pelos códigos das UPs; cada UP liberada pela listagem é baixada
+    (max_downloads threads compartilhando a sessão autenticada), tem as
+    imagens otimizadas no pool de processos e o PDF gravado, enquanto as
+    próximas ainda estão sendo listadas e baixadas. Com um CacheSharePoint,
+    arquivos que não mudaram no servidor não são transferidos de novo. executor_imagens permite compartilhar o pool de
+    otimização de imagens entre execuções simultâneas.
+
+    Returns:
+        dict: resumo da execução (ver _resumo_processamento)
+    """
     # Preparar diretório de saída
     os.makedirs(output_dir, exist_ok=True)
     
@@ -579,31 +1301,7 @@ def process_properties_streamlit(df, ctx, images_folder_url, croquis_folder_url,
     progress_container = st.empty()
     status_container = st.empty()
     
-    with st.spinner("Obtendo lista de arquivos do SharePoint..."):
-        # Obter lista de arquivos das pastas
-        try:
-            image_files = list_files(ctx, images_folder_url)
-            croquis_files = list_files(ctx, croquis_folder_url)
-        except Exception as e:
-            st.error(f"Erro ao listar arquivos no SharePoint: {str(e)}")
-            return
-    
-    # Exibir informações sobre arquivos encontrados
-    st.write("### Arquivos encontrados")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.write(f"Total de imagens: {len(image_files)}")
-        if len(image_files) > 0:
-            st.write("Exemplos de imagens:")
-            for (n, _) in image_files[:3]:
-                st.write(f"- {n}")
-    
-    with col2:
-        st.write(f"Total de croquis: {len(croquis_files)}")
-        if len(croquis_files) > 0:
-            st.write("Exemplos de croquis:")
-            for (n, _) in croquis_files[:3]:
-                st.write(f"- {n}")
+    cliente = ClienteSharePoint(ctx, max_downloads)
     
     # Contadores para relatório final
     total_ups = len(df)
@@ -612,134 +1310,109 @@ def process_properties_streamlit(df, ctx, images_folder_url, croquis_folder_url,
     failed_up_list = []
     large_files = []  # Para rastrear arquivos que ficaram grandes
     
-    # Criar barra de progresso
-    progress_bar = st.progress(0)
-    
-    # Para cada linha no DataFrame
+    # Planejar o trabalho de cada UP: pasta de saída e caminhos dos arquivos
+    ups_por_codigo = {}
     for index, row in df.iterrows():
-        # Atualizar barra de progresso
-        progress = int((index / total_ups) * 100)
-        progress_bar.progress(progress)
-        
         up_code = str(row['UP']).strip()
-        status_container.write(f"Processando UP {up_code} ({index+1} de {total_ups})...")
-        
-        nucleo = str(row['Nucleo']).strip()
-        ocorrencia_predominante = str(row['Ocorrência Predominante']).strip()
-
-        # Filtrar imagem e croqui
-        possible_image_files = [
-            (n, u)
-            for (n, u) in image_files
-            if n[:6].upper() == up_code.upper()
-        ]
-        possible_croquis_files = [
-            (n, u)
-            for (n, u) in croquis_files
-            if up_code.upper() in n.upper()
-        ]
-
-        if not possible_image_files and not possible_croquis_files:
-            st.warning(f"Nenhum arquivo encontrado para UP {up_code}. Criando PDF com placeholders.")
-            
-            # Criar pasta mesmo sem arquivos baseada no tipo de organização
-            if organizacao_tipo == "por_propriedade":
-                # Buscar nome da propriedade
-                nome_propriedade = None
-                for coluna in ['Propriedade', 'Nome Propriedade', 'Fazenda', 'Nome']:
-                    if coluna in df.columns:
-                        nome_propriedade = str(row.get(coluna, f'Propriedade_{up_code}'))
-                        break
-                
-                if not nome_propriedade or nome_propriedade == 'nan':
-                    nome_propriedade = f"Propriedade_{up_code}"
-                
-                folder_name = f"{entrega_nome} - {unf_selecionada} - {nome_propriedade}"
-            else:
-                folder_name = f"{entrega_nome} - {nucleo} - {ocorrencia_predominante}"
-            folder_path = os.path.join(output_dir, folder_name)
-            os.makedirs(folder_path, exist_ok=True)
-            
-            # Definir caminhos mesmo que os arquivos não existam
-            image_path = os.path.join(folder_path, f"{up_code}_image.jpg")
-            croqui_path = os.path.join(folder_path, f"{up_code}_croqui.jpg")
-            
-            try:
-                # Criar PDF com placeholders para ambas as imagens
-                pdf_path = os.path.join(folder_path, f"{up_code}.pdf")
-                file_size, success = create_pdf_with_placeholders(row, image_path, croqui_path, pdf_path)
-                
-                if success:
-                    processed_ups += 1
-                    if file_size > 9.0:
-                        large_files += 1
-                    st.success(f"PDF criado com placeholders para UP {up_code} ({file_size} MB)")
-                else:
-                    failed_ups += 1
-                    failed_up_list.append(f"{up_code} (erro ao criar PDF com placeholders)")
-                continue
-                
-            except Exception as e:
-                st.error(f"Erro ao processar UP {up_code} com placeholders: {e}")
-                failed_ups += 1
-                failed_up_list.append(f"{up_code} (erro geral com placeholders)")
-                continue
-
-        # Criar pasta quando pelo menos um arquivo for encontrado baseada no tipo de organização
-        if organizacao_tipo == "por_propriedade":
-            # Buscar nome da propriedade
-            nome_propriedade = None
-            for coluna in ['Propriedade', 'Nome Propriedade', 'Fazenda', 'Nome']:
-                if coluna in df.columns:
-                    nome_propriedade = str(row.get(coluna, f'Propriedade_{up_code}'))
-                    break
-            
-            if not nome_propriedade or nome_propriedade == 'nan':
-                nome_propriedade = f"Propriedade_{up_code}"
-            
-            folder_name = f"{entrega_nome} - {unf_selecionada} - {nome_propriedade}"
-        else:
-            folder_name = f"{entrega_nome} - {nucleo} - {ocorrencia_predominante}"
-        folder_path = os.path.join(output_dir, folder_name)
-        os.makedirs(folder_path, exist_ok=True)
-
-        # Definir caminhos e URLs dos arquivos
-        image_name, image_url = possible_image_files[0] if possible_image_files else (None, None)
-        croqui_name, croqui_url = possible_croquis_files[0] if possible_croquis_files else (None, None)
+        folder_path = _pasta_saida_sharepoint(row, df, up_code, output_dir, entrega_nome, organizacao_tipo, unf_selecionada)
 
+        # Caminhos definidos mesmo que os arquivos não existam (placeholders)
         image_path = os.path.join(folder_path, f"{up_code}_image.jpg")
         croqui_path = os.path.join(folder_path, f"{up_code}_croqui.jpg")
 
+        ups_por_codigo.setdefault(up_code.upper(), []).append((up_code, row, folder_path, image_path, croqui_path))
+    
+    # Arquivo escolhido para cada UP (o primeiro da listagem que casa com o código)
+    imagens_das_ups = {}
+    croquis_das_ups = {}
+    metadados = {}
+    
+    def _listar(folder_url, filtro):
+        if cache is not None:
+            return cache.iterar(cliente, folder_url, filtro)
+        return cliente.iterar(folder_url, filtro)
+    
+    def _trabalhos_da_up(codigo):
+        imagem = imagens_das_ups.get(codigo)
+        croqui = croquis_das_ups.get(codigo)
+        for up_code, row, folder_path, image_path, croqui_path in ups_por_codigo[codigo]:
+            yield {
+                'up': up_code,
+                'dados': _montar_up_data(row, up_code),
+                'pdf_path': os.path.join(folder_path, f"{up_code}.pdf"),
+                'image_path': image_path,
+                'croqui_path': croqui_path,
+                'url_imagem': imagem['url'] if imagem else None,
+                'url_croqui': croqui['url'] if croqui else None
+            }
+    
+    def _trabalhos():
+        """
+        Gera os trabalhos à medida que a listagem (paginada e filtrada pelas
+        UPs) avança. Os croquis são listados primeiro; depois cada UP é
+        liberada para o pipeline assim que sua imagem aparece.
+        """
+        for arquivo in _listar(croquis_folder_url, filtro_croquis_das_ups(ups_por_codigo)):
+            metadados[arquivo['url']] = arquivo
+            nome = arquivo['nome'].upper()
+            for codigo in ups_por_codigo:
+                if codigo in nome and codigo not in croquis_das_ups:
+                    croquis_das_ups[codigo] = arquivo
+
+        pendentes = set(ups_por_codigo)
+        for arquivo in _listar(images_folder_url, filtro_imagens_das_ups(ups_por_codigo)):
+            metadados[arquivo['url']] = arquivo
+            codigo = arquivo['nome'][:6].upper()
+            if codigo in pendentes:
+                pendentes.discard(codigo)
+                imagens_das_ups[codigo] = arquivo
+                yield from _trabalhos_da_up(codigo)
+
+        # UPs sem imagem (croqui ou placeholders)
+        for codigo in [c for c in ups_por_codigo if c in pendentes]:
+            yield from _trabalhos_da_up(codigo)
+    
+    # Downloads: cada URL é baixada uma vez; pedidos repetidos aguardam e copiam
+    downloads = DownloadsCompartilhados(cliente, cache, metadados)
+    
+    def _buscar_arquivos_sharepoint(trabalho):
+        """Etapa de busca do modo SharePoint: baixa imagem e croqui da UP"""
+        for url, destino in ((trabalho['url_imagem'], trabalho['image_path']),
+                             (trabalho['url_croqui'], trabalho['croqui_path'])):
+            if url:
+                downloads.obter(url, destino)
+        return trabalho
+    
+    def _renderizar_trabalho(trabalho, resultado, erro):
+        """Etapa final do pipeline: grava o PDF, com compressão extra se necessário"""
+        nonlocal successful_pdfs, failed_ups
+        up_code = trabalho['up']
+        if erro is not None:
+            failed_ups += 1
+            failed_up_list.append(f"{up_code} (erro no download: {str(erro)[:50]}...)")
+            return
+        
         try:
-            # Baixar arquivos que existem
-            if possible_image_files:
-                download_file(ctx, image_url, image_path)
-            else:
-                st.warning(f"Imagem não encontrada para UP {up_code}. Será usado placeholder.")
-                
-            if possible_croquis_files:
-                download_file(ctx, croqui_url, croqui_path)
-            else:
-                st.warning(f"Croqui não encontrado para UP {up_code}. Será usado placeholder.")
-
+            imagens = _imagens_do_resultado(resultado)
             # Criar PDF otimizado com suporte a placeholders
-            pdf_path = os.path.join(folder_path, f"{up_code}.pdf")
-            file_size, success = create_pdf_with_placeholders(row, image_path, croqui_path, pdf_path)
+            file_size, success = renderizar_pdf_up(trabalho['dados'], imagens, trabalho['pdf_path'],
+                                                   (trabalho['image_path'], trabalho['croqui_path']))
             
             if not success:
                 failed_ups += 1
                 failed_up_list.append(f"{up_code} (erro ao criar PDF)")
-                continue
+                return
             
             # Verificar tamanho e aplicar compressão extra se necessário
             if file_size > 9.0:
                 status_container.write(f"PDF muito grande ({file_size} MB), aplicando compressão extra...")
-                file_size, success = create_pdf_extra_compressed(row, image_path, croqui_path, pdf_path)
+                file_size, success = create_pdf_extra_compressed(trabalho['dados'], trabalho['image_path'],
+                                                                 trabalho['croqui_path'], trabalho['pdf_path'])
                 
                 if not success:
                     failed_ups += 1
                     failed_up_list.append(f"{up_code} (erro na compressão extra)")
-                    continue
+                    return
                 
                 if file_size > 9.0:
                     large_files.append(f"{up_code} ({file_size} MB)")
@@ -752,6 +1425,76 @@ def process_properties_streamlit(df, ctx, images_folder_url, croquis_folder_url,
             failed_ups += 1
             failed_up_list.append(f"{up_code} (erro: {str(e)[:50]}...)")
     
+    # Listar, baixar, otimizar e gerar os PDFs ao mesmo tempo
+    st.write("### ⚙️ Listagem, downloads e geração dos PDFs")
+    progress_bar = st.progress(0)
+    painel_pipeline = st.empty()
+    painel_downloads = st.empty()
+    inicio = time.time()
+    
+    def _progresso_pipeline(resumo):
+        progress_bar.progress(min(resumo['renderizacao']['concluidos'] / total_ups, 1.0))
+        _exibir_progresso_pipeline(painel_pipeline, resumo, total_ups)
+        decorrido = max(time.time() - inicio, 0.001)
+        megabytes = downloads.bytes_transferidos / (1024 * 1024)
+        painel_downloads.text(f"⬇️ {megabytes:.1f} MB baixados • {megabytes / decorrido:.1f} MB/s")
+    
+    try:
+        resumo_pipeline = executar_pipeline(
+            _trabalhos(), _buscar_arquivos_sharepoint, _processar_imagens_trabalho, _renderizar_trabalho,
+            ao_progredir=_progresso_pipeline, threads_busca=max_downloads or DOWNLOAD_CONFIG['max_workers'],
+            executor=executor_imagens
+        )
+    except Exception as e:
+        st.error(f"Erro ao listar arquivos no SharePoint: {str(e)}")
+        return _resumo_processamento(unf_selecionada, output_dir, total_ups, erro=str(e))
+    finally:
+        cliente.fechar()
+        if cache is not None:
+            cache.salvar()
+    progress_bar.progress(1.0)
+    
+    st.success(
+        f"✅ Concluído em {resumo_pipeline['decorrido_s']}s • tempo médio por UP: "
+        f"download {resumo_pipeline['busca']['media_s']}s, imagens {resumo_pipeline['imagens']['media_s']}s, "
+        f"PDF {resumo_pipeline['renderizacao']['media_s']}s"
+    )
+    if cache is not None:
+        estatisticas = cache.estatisticas
+        st.info(
+            f"💾 Cache: {estatisticas['acertos']} arquivo(s) reaproveitado(s) "
+            f"({estatisticas['bytes_reaproveitados'] / (1024 * 1024):.1f} MB), "
+            f"{estatisticas['faltas']} baixado(s) "
+            f"({estatisticas['bytes_baixados'] / (1024 * 1024):.1f} MB)"
+        )
+    
+    # Exibir informações sobre arquivos encontrados
+    st.write("### Arquivos encontrados")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write(f"UPs com imagem: {len(imagens_das_ups)}")
+        if len(imagens_das_ups) > 0:
+            st.write("Exemplos de imagens:")
+            for arquivo in list(imagens_das_ups.values())[:3]:
+                st.write(f"- {arquivo['nome']}")
+    
+    with col2:
+        st.write(f"UPs com croqui: {len(croquis_das_ups)}")
+        if len(croquis_das_ups) > 0:
+            st.write("Exemplos de croquis:")
+            for arquivo in list(croquis_das_ups.values())[:3]:
+                st.write(f"- {arquivo['nome']}")
+    
+    for codigo in ups_por_codigo:
+        tem_imagem = codigo in imagens_das_ups
+        tem_croqui = codigo in croquis_das_ups
+        if not tem_imagem and not tem_croqui:
+            st.warning(f"Nenhum arquivo encontrado para UP {codigo}. PDF criado com placeholders.")
+        elif not tem_imagem:
+            st.warning(f"Imagem não encontrada para UP {codigo}. Foi usado placeholder.")
+        elif not tem_croqui:
+            st.warning(f"Croqui não encontrado para UP {codigo}. Foi usado placeholder.")
+    
     # Limpar contêineres de progresso
     progress_container.empty()
     status_container.empty()
@@ -793,16 +1536,27 @@ def process_properties_streamlit(df, ctx, images_folder_url, croquis_folder_url,
                     subprocess.Popen(['open', output_dir])  # macOS
                 except:
                     st.error("Não foi possível abrir o diretório automaticamente.")
+    
+    return _resumo_processamento(
+        unf_selecionada, output_dir, total_ups, successful_pdfs, failed_up_list, large_files,
+        ups_com_imagem=len(imagens_das_ups),
+        ups_com_croqui=len(croquis_das_ups),
+        pipeline=resumo_pipeline
+    )
 
 # =========================================================================
 # 7) PROCESSAMENTO COM ARQUIVOS LOCAIS
 # =========================================================================
 
-def _processar_up_individual(row, up_code, folder_path, image_files, croquis_files, status_container, index, total_ups, successful_pdfs, failed_ups, failed_up_list, large_files, ups_sem_croqui):
-    """
-    Função auxiliar para processar uma UP individual
-    """
-    # Filtrar imagem e croqui pelo código da UP
+def _montar_up_data(row, up_code):
+    """Monta o dicionário com os campos do texto do PDF a partir da linha da planilha"""
+    up_data = {campo: str(row.get(campo, 'N/A')) for campo in CAMPOS_TEXTO_PDF}
+    up_data['UP-C-R'] = str(row.get('UP-C-R', up_code))
+    up_data['UP'] = up_code
+    return up_data
+
+def _localizar_arquivos_up(up_code, image_files, croquis_files):
+    """Filtra as imagens (prefixo de 6 caracteres) e croquis (contém o código) da UP"""
     possible_image_files = [
         (n, path)
         for (n, path) in image_files
@@ -813,57 +1567,171 @@ def _processar_up_individual(row, up_code, folder_path, image_files, croquis_fil
         for (n, path) in croquis_files
         if up_code.upper() in n.upper()
     ]
+    return possible_image_files, possible_croquis_files
 
-    # Definir caminhos dos arquivos de trabalho
-    image_path = os.path.join(folder_path, f"{up_code}_image.jpg")
-    croqui_path = os.path.join(folder_path, f"{up_code}_croqui.jpg")
+def _gerar_documento_consolidado(folder_path, paginas, manifesto=None, unf_selecionada="UNF", limite_mb=LIMITE_TAMANHO_PDF_MB):
+    """
+    Gera o documento consolidado de uma pasta (nome da pasta + .pdf).
 
-    # Copiar arquivos se existirem
-    if possible_image_files:
-        image_name, source_image_path = possible_image_files[0]
-        copy_local_file(source_image_path, image_path)
-        st.info(f"📷 Imagem copiada: {image_name}")
-    else:
-        st.warning(f"⚠️ Imagem não encontrada para UP {up_code}. Será usado placeholder.")
+    Com manifesto, o documento é reaproveitado se nenhuma página mudou; ao
+    gerar de novo, os volumes anteriores e os PDFs individuais da UNF na
+    pasta são removidos, pois passam a estar contidos no consolidado. Sem
+    manifesto, os volumes anteriores são encontrados pelo nome.
 
-    if possible_croquis_files:
-        croqui_name, source_croqui_path = possible_croquis_files[0]
-        copy_local_file(source_croqui_path, croqui_path)
-        st.info(f"🗺️ Croqui copiado: {croqui_name}")
+    Returns:
+        tuple: (lista de (caminho_pdf, tamanho_mb, ups), sucesso, reaproveitado)
+    """
+    pdf_path = os.path.join(folder_path, f"{os.path.basename(folder_path)}.pdf")
+    assinatura = calcular_assinatura_consolidado(paginas, limite_mb)
+
+    if manifesto is not None:
+        if consolidado_esta_atualizado(manifesto, assinatura, folder_path):
+            registro = manifesto['consolidado']
+            volumes = [
+                (os.path.join(folder_path, volume), get_file_size_mb(os.path.join(folder_path, volume)), [])
+                for volume in registro['volumes']
+            ]
+            return volumes, True, True
+
+        remover_consolidado(folder_path, manifesto)
+        for up, registro in list(manifesto['ups'].items()):
+            if registro.get('unf') == unf_selecionada:
+                remover_saidas_up(folder_path, up)
+                del manifesto['ups'][up]
     else:
+        remover_volumes_consolidado(pdf_path)
+
+    volumes, success = create_pdf_consolidado(paginas, pdf_path, limite_mb)
+
+    if manifesto is not None and success:
+        manifesto['consolidado'] = {
+            'assinatura': assinatura,
+            'volumes': [os.path.basename(caminho) for caminho, _, _ in volumes],
+            'unf': unf_selecionada,
+            'ups': [pagina['up'] for pagina in paginas],
+            'tamanho_mb': round(sum(tamanho for _, tamanho, _ in volumes), 2)
+        }
+
+    return volumes, success, False
+
+def _preparar_trabalho_up(row, up_code, folder_path, image_files, croquis_files, ups_sem_croqui, manifesto=None, ups_inalteradas=None):
+    """
+    Monta o trabalho de uma UP para o pipeline (arquivos de origem, caminhos
+    de trabalho e dados do PDF).
+
+    Se um manifesto for informado e as entradas da UP (campos, imagem, croqui
+    ou renderização) não mudaram, retorna None: o PDF existente é mantido.
+    """
+    # Filtrar imagem e croqui pelo código da UP
+    possible_image_files, possible_croquis_files = _localizar_arquivos_up(up_code, image_files, croquis_files)
+    origem_imagem = possible_image_files[0][1] if possible_image_files else None
+    origem_croqui = possible_croquis_files[0][1] if possible_croquis_files else None
+
+    # Criar dados para o PDF
+    up_data = _montar_up_data(row, up_code)
+    pdf_path = os.path.join(folder_path, f"{up_code}.pdf")
+
+    # Build incremental: pular a UP se nada mudou desde a última geração
+    assinatura = None
+    if manifesto is not None:
+        assinatura = calcular_assinatura_up(up_data, origem_imagem, origem_croqui)
+
+        if pdf_esta_atualizado(manifesto, up_code, assinatura, pdf_path):
+            if not possible_croquis_files:
+                ups_sem_croqui.append(up_code)
+            if ups_inalteradas is not None:
+                ups_inalteradas.append(up_code)
+            return None
+
+    if not possible_image_files:
+        st.warning(f"⚠️ Imagem não encontrada para UP {up_code}. Será usado placeholder.")
+    if not possible_croquis_files:
         st.warning(f"⚠️ Croqui não encontrado para UP {up_code}. Será usado placeholder.")
         ups_sem_croqui.append(up_code)  # Adicionar à lista de UPs sem croqui
 
-    # Criar dados para o PDF
-    up_data = {
-        'UP-C-R': str(row.get('UP-C-R', up_code)),
-        'UP': up_code,
-        'Nucleo': str(row.get('Nucleo', 'N/A')),
-        'Data_Ocorrência': str(row.get('Data_Ocorrência', 'N/A')),
-        'Idade': str(row.get('Idade', 'N/A')),
-        'Quant.Ocorrências': str(row.get('Quant.Ocorrências', 'N/A')),
-        'Ocorrência Predominante': str(row.get('Ocorrência Predominante', 'N/A')),
-        'Severidade Predominante': str(row.get('Severidade Predominante', 'N/A')),
-        'Area UP': str(row.get('Area UP', 'N/A')),
-        'Area Liquida': str(row.get('Area Liquida', 'N/A')),
-        'Incidencia': str(row.get('Incidencia', 'N/A')),
-        'Quantidade de Imagens*': str(row.get('Quantidade de Imagens*', 'N/A')),
-        'Recomendacao': str(row.get('Recomendacao', 'N/A'))
+    return {
+        'up': up_code,
+        'dados': up_data,
+        'pasta': folder_path,
+        'pdf_path': pdf_path,
+        'origem_imagem': origem_imagem,
+        'origem_croqui': origem_croqui,
+        # Definir caminhos dos arquivos de trabalho
+        'image_path': os.path.join(folder_path, f"{up_code}_image.jpg"),
+        'croqui_path': os.path.join(folder_path, f"{up_code}_croqui.jpg"),
+        'assinatura': assinatura
     }
 
-    # Criar PDF usando a função existente com placeholders
-    pdf_path = os.path.join(folder_path, f"{up_code}.pdf")
-    file_size, success = create_pdf_with_placeholders(up_data, image_path, croqui_path, pdf_path)
-    
-    return file_size, success
+def _buscar_arquivos_locais(trabalho):
+    """Etapa de busca do modo local: copia imagem e croqui para a pasta da UP"""
+    for origem, destino in ((trabalho['origem_imagem'], trabalho['image_path']),
+                            (trabalho['origem_croqui'], trabalho['croqui_path'])):
+        if origem:
+            shutil.copy2(origem, destino)
+    return trabalho
 
-def process_properties_local(df, images_folder_path, croquis_folder_path, output_dir, entrega_nome, organizacao_tipo="por_nucleo", unf_selecionada="UNF"):
+def _processar_imagens_trabalho(trabalho):
+    """
+    Etapa de imagens do pipeline (roda no pool de processos, sem Streamlit).
+
+    Returns:
+        tuple: (imagens de preparar_imagens_pdf, mensagens de erro para o
+            processo principal exibir)
+    """
+    erros = []
+    imagens = preparar_imagens_pdf([trabalho['image_path'], trabalho['croqui_path']], erros)
+    return imagens, erros
+
+def _imagens_do_resultado(resultado):
+    """Exibe, no processo principal, os erros da etapa de imagens e devolve as imagens"""
+    imagens, erros = resultado
+    for mensagem in erros:
+        st.error(mensagem)
+    return imagens
+
+def _registrar_pdf_no_manifesto(manifesto, trabalho, success, file_size, unf_selecionada):
+    """Registra no manifesto apenas PDFs gerados com sucesso"""
+    if manifesto is None:
+        return
+    if success:
+        manifesto['ups'][trabalho['up']] = {
+            'assinatura': trabalho['assinatura'],
+            'pdf': os.path.basename(trabalho['pdf_path']),
+            'unf': unf_selecionada,
+            'tamanho_mb': file_size
+        }
+    else:
+        manifesto['ups'].pop(trabalho['up'], None)
+
+def _exibir_progresso_pipeline(container, resumo, total):
+    """Mostra a vazão de cada estágio do pipeline"""
+    busca, imagens, renderizacao = resumo['busca'], resumo['imagens'], resumo['renderizacao']
+    texto = (
+        f"📥 Busca: {busca['concluidos']}/{total} ({busca['itens_por_s']}/s) • "
+        f"🖼️ Imagens: {imagens['concluidos']}/{total} ({imagens['itens_por_s']}/s) • "
+        f"📄 PDFs: {renderizacao['concluidos']}/{total} ({renderizacao['itens_por_s']}/s) • "
+        f"⏱️ {resumo['decorrido_s']}s"
+    )
+    if 'filas' in resumo:
+        texto += f" • fila: {resumo['filas']['buscados']} aguardando imagens"
+    container.text(texto)
+
+def process_properties_local(df, images_folder_path, croquis_folder_path, output_dir, entrega_nome, organizacao_tipo="por_nucleo", unf_selecionada="UNF", incremental=True, formato_saida="por_up", executor_imagens=None):
     """
     Processa as UPs usando arquivos locais ao invés do SharePoint
     
     Args:
         organizacao_tipo: "por_nucleo" ou "por_propriedade"
         unf_selecionada: Nome da UNF selecionada pelo usuário
+        incremental: Se True, usa o manifesto de cada pasta para gerar apenas
+            os PDFs cujas entradas mudaram e remove PDFs de UPs que saíram da entrega
+        formato_saida: "por_up" (um PDF por UP) ou "consolidado" (um documento
+            por pasta, uma página por UP, dividido em volumes de até 9 MB)
+        executor_imagens: pool de otimização de imagens compartilhado entre
+            execuções simultâneas (opcional)
+
+    Returns:
+        dict: resumo da execução (ver _resumo_processamento)
     """
     # Preparar diretório de saída
     os.makedirs(output_dir, exist_ok=True)
@@ -879,7 +1747,7 @@ def process_properties_local(df, images_folder_path, croquis_folder_path, output
             croquis_files = list_files_local(croquis_folder_path)
         except Exception as e:
             st.error(f"❌ Erro ao listar arquivos das pastas: {str(e)}")
-            return
+            return _resumo_processamento(unf_selecionada, output_dir, len(df), erro=str(e))
     
     # Exibir informações sobre arquivos encontrados
     st.write("### 📁 Arquivos encontrados nas pastas locais")
@@ -909,6 +1777,79 @@ def process_properties_local(df, images_folder_path, croquis_folder_path, output
     failed_up_list = []
     large_files = []  # Para rastrear arquivos que ficaram grandes
     ups_sem_croqui = []  # Para rastrear UPs sem croqui encontrado
+    ups_inalteradas = []  # UPs cujo PDF foi reaproveitado (build incremental)
+    ups_removidas = []  # PDFs removidos de UPs que não existem mais
+    
+    # Manifestos por pasta de saída e UPs esperadas em cada pasta
+    manifestos = {}
+    ups_por_pasta = {}
+    
+    def _manifesto_da_pasta(folder_path, up_code):
+        ups_por_pasta.setdefault(folder_path, set()).add(up_code)
+        if not incremental:
+            return None
+        if folder_path not in manifestos:
+            manifestos[folder_path] = carregar_manifesto(folder_path)
+        return manifestos[folder_path]
+    
+    # Formato consolidado: páginas acumuladas por pasta e geradas no final
+    paginas_por_pasta = {}
+    documentos_consolidados = []
+    documentos_reaproveitados = 0
+    
+    # Um PDF por UP: trabalhos gerados no final pelo pipeline (cópia -> imagens -> PDF)
+    trabalhos = []
+    
+    def _processar_up(row, up_code, folder_path):
+        """
+        Agenda a UP. Retorna (tamanho, True) para PDF inalterado (build
+        incremental) ou (0, None) quando a UP foi agendada.
+        """
+        manifesto = _manifesto_da_pasta(folder_path, up_code)
+        if formato_saida != "consolidado":
+            trabalho = _preparar_trabalho_up(row, up_code, folder_path, image_files, croquis_files,
+                                             ups_sem_croqui, manifesto=manifesto,
+                                             ups_inalteradas=ups_inalteradas)
+            if trabalho is None:
+                return get_file_size_mb(os.path.join(folder_path, f"{up_code}.pdf")), True
+            trabalhos.append(trabalho)
+            return 0, None
+        
+        possible_image_files, possible_croquis_files = _localizar_arquivos_up(up_code, image_files, croquis_files)
+        if not possible_croquis_files:
+            ups_sem_croqui.append(up_code)
+        paginas_por_pasta.setdefault(folder_path, []).append({
+            'up': up_code,
+            'dados': _montar_up_data(row, up_code),
+            'imagem': possible_image_files[0][1] if possible_image_files else None,
+            'croqui': possible_croquis_files[0][1] if possible_croquis_files else None
+        })
+        return 0, None
+    
+    def _renderizar_trabalho(trabalho, resultado, erro):
+        """Estágio final do pipeline: grava o PDF e atualiza contadores e manifesto"""
+        nonlocal successful_pdfs, failed_ups
+        up_code = trabalho['up']
+        if erro is None:
+            imagens = _imagens_do_resultado(resultado)
+            file_size, success = renderizar_pdf_up(trabalho['dados'], imagens, trabalho['pdf_path'],
+                                                   (trabalho['image_path'], trabalho['croqui_path']))
+        else:
+            st.error(f"❌ Erro ao processar UP {up_code}: {str(erro)}")
+            file_size, success = 0, False
+        
+        _registrar_pdf_no_manifesto(manifestos.get(trabalho['pasta']), trabalho, success, file_size, unf_selecionada)
+        
+        if success:
+            successful_pdfs += 1
+            if file_size > 9.0:
+                large_files.append(f"{up_code} ({file_size} MB)")
+                st.warning(f"⚠️ PDF grande: {file_size} MB")
+            else:
+                st.success(f"✅ PDF criado: {up_code} ({file_size} MB)")
+        else:
+            failed_ups += 1
+            failed_up_list.append(f"{up_code} (erro ao criar PDF)")
     
     # Criar barra de progresso
     progress_bar = st.progress(0)
@@ -1000,13 +1941,16 @@ def process_properties_local(df, images_folder_path, croquis_folder_path, output
                         # folder_path já foi definido acima para esta propriedade
                         
                         # Processar arquivos da UP na pasta da propriedade
-                        file_size, success = _processar_up_individual(row, up_code, folder_path, image_files, croquis_files, 
-                                                                     status_container, ups_processadas_global, total_ups, successful_pdfs, 
-                                                                     failed_ups, failed_up_list, large_files, ups_sem_croqui)
+                        file_size, success = _processar_up(row, up_code, folder_path)
                         
-                        if success:
+                        if success is None:
+                            if formato_saida == "consolidado":
+                                st.info(f"📑 UP {up_code} adicionada ao documento da propriedade")
+                        elif success:
                             successful_pdfs += 1
-                            if file_size > 9.0:
+                            if up_code in ups_inalteradas:
+                                st.info(f"♻️ PDF inalterado, reaproveitado: {up_code}")
+                            elif file_size > 9.0:
                                 large_files.append(f"{up_code} ({file_size} MB)")
                                 st.warning(f"⚠️ PDF grande: {file_size} MB")
                             else:
@@ -1029,7 +1973,8 @@ def process_properties_local(df, images_folder_path, croquis_folder_path, output
                         continue
         else:
             st.error("❌ Nenhuma coluna de propriedade encontrada para organização por propriedade")
-            return
+            return _resumo_processamento(unf_selecionada, output_dir, total_ups,
+                                         erro="Nenhuma coluna de propriedade encontrada")
     else:
         # Organização original por UP individual
         for index, row in df.iterrows():
@@ -1050,13 +1995,16 @@ def process_properties_local(df, images_folder_path, croquis_folder_path, output
                 os.makedirs(folder_path, exist_ok=True)
                 
                 # Processar UP individual
-                file_size, success = _processar_up_individual(row, up_code, folder_path, image_files, croquis_files, 
-                                                            status_container, index, total_ups, successful_pdfs, 
-                                                            failed_ups, failed_up_list, large_files, ups_sem_croqui)
+                file_size, success = _processar_up(row, up_code, folder_path)
                 
-                if success:
+                if success is None:
+                    if formato_saida == "consolidado":
+                        st.info(f"📑 UP {up_code} adicionada ao documento do núcleo")
+                elif success:
                     successful_pdfs += 1
-                    if file_size > 9.0:
+                    if up_code in ups_inalteradas:
+                        st.info(f"♻️ PDF inalterado, reaproveitado: {up_code}")
+                    elif file_size > 9.0:
                         large_files.append(f"{up_code} ({file_size} MB)")
                         st.warning(f"⚠️ PDF grande: {file_size} MB")
                     else:
@@ -1073,6 +2021,53 @@ def process_properties_local(df, images_folder_path, croquis_folder_path, output
             # Atualizar progresso
             progress_bar.progress((index + 1) / total_ups)
     
+    # Gerar os PDFs individuais pelo pipeline em estágios
+    resumo_pipeline = None
+    if trabalhos:
+        st.write(f"### ⚙️ Gerando {len(trabalhos)} PDF(s)")
+        progress_bar.progress(0)
+        painel_pipeline = st.empty()
+        
+        def _progresso_pipeline(resumo):
+            progress_bar.progress(min(resumo['renderizacao']['concluidos'] / len(trabalhos), 1.0))
+            _exibir_progresso_pipeline(painel_pipeline, resumo, len(trabalhos))
+        
+        resumo_pipeline = executar_pipeline(
+            trabalhos, _buscar_arquivos_locais, _processar_imagens_trabalho, _renderizar_trabalho,
+            ao_progredir=_progresso_pipeline, executor=executor_imagens
+        )
+    
+    # Gerar os documentos consolidados de cada pasta
+    for folder_path, paginas in paginas_por_pasta.items():
+        status_container.text(f"📑 Gerando documento consolidado: {os.path.basename(folder_path)} ({len(paginas)} páginas)...")
+        volumes, success, reaproveitado = _gerar_documento_consolidado(
+            folder_path, paginas, manifestos.get(folder_path), unf_selecionada
+        )
+        if success:
+            successful_pdfs += len(paginas)
+            documentos_consolidados.extend(volumes)
+            if reaproveitado:
+                documentos_reaproveitados += 1
+                st.info(f"♻️ Documento inalterado, reaproveitado: {os.path.basename(folder_path)}")
+            for caminho_volume, tamanho, _ in volumes:
+                if tamanho > LIMITE_TAMANHO_PDF_MB:
+                    large_files.append(f"{os.path.basename(caminho_volume)} ({tamanho} MB)")
+        else:
+            failed_ups += len(paginas)
+            failed_up_list.extend(f"{pagina['up']} (erro no documento consolidado)" for pagina in paginas)
+    
+    # Gravar manifestos e remover PDFs de UPs que saíram da entrega
+    if incremental:
+        for folder_path, manifesto in manifestos.items():
+            # Em "um PDF por UP" o consolidado anterior da pasta deixa de valer
+            if formato_saida != "consolidado" and (manifesto.get('consolidado') or {}).get('unf') == unf_selecionada:
+                remover_consolidado(folder_path, manifesto)
+            try:
+                salvar_manifesto(folder_path, manifesto)
+            except OSError as e:
+                st.warning(f"⚠️ Não foi possível gravar o manifesto em {folder_path}: {e}")
+        ups_removidas = podar_manifestos(output_dir, entrega_nome, unf_selecionada, ups_por_pasta)
+    
     # Limpar contêineres de progresso
     progress_container.empty()
     status_container.empty()
@@ -1084,9 +2079,32 @@ def process_properties_local(df, images_folder_path, croquis_folder_path, output
     st.write(f"✅ PDFs gerados com sucesso: {successful_pdfs}")
     st.write(f"❌ UPs que falharam: {failed_ups}")
     
+    if documentos_consolidados:
+        st.write(f"📑 Documentos consolidados: {len(documentos_consolidados)} arquivo(s) em {len(paginas_por_pasta)} pasta(s)")
+        if incremental:
+            st.write(f"♻️ Documentos reaproveitados (sem alterações): {documentos_reaproveitados}")
+        for caminho_volume, tamanho, _ in documentos_consolidados:
+            st.write(f"- {os.path.basename(caminho_volume)} ({tamanho} MB)")
+    
+    if incremental:
+        if formato_saida != "consolidado":
+            st.write(f"♻️ PDFs reaproveitados (sem alterações): {len(ups_inalteradas)}")
+            st.write(f"🔨 PDFs gerados novamente: {successful_pdfs - len(ups_inalteradas)}")
+        if ups_removidas:
+            st.write(f"🧹 PDFs removidos (UPs que não existem mais): {len(ups_removidas)}")
+            for up_removida in sorted(ups_removidas):
+                st.write(f"- {up_removida}")
+    
     if successful_pdfs > 0:
         st.write(f"🎯 Taxa de sucesso: {(successful_pdfs/total_ups)*100:.1f}%")
     
+    if resumo_pipeline:
+        st.write(
+            f"⚙️ Pipeline: {resumo_pipeline['decorrido_s']}s no total • tempo médio por UP: "
+            f"cópia {resumo_pipeline['busca']['media_s']}s, imagens {resumo_pipeline['imagens']['media_s']}s, "
+            f"PDF {resumo_pipeline['renderizacao']['media_s']}s"
+        )
+    
     if large_files:
         st.warning("### ⚠️ Arquivos que ainda ficaram grandes (>9MB):")
         for large_file in large_files:
@@ -1121,6 +2139,18 @@ def process_properties_local(df, images_folder_path, croquis_folder_path, output
                     subprocess.Popen(['open', output_dir])  # macOS
                 except:
                     st.error("❌ Não foi possível abrir o diretório automaticamente.")
+    
+    return _resumo_processamento(
+        unf_selecionada, output_dir, total_ups, successful_pdfs, failed_up_list, large_files,
+        ups_sem_croqui=sorted(ups_sem_croqui),
+        pdfs_reaproveitados=len(ups_inalteradas),
+        pdfs_removidos=sorted(ups_removidas),
+        documentos_consolidados=[
+            {'arquivo': caminho_volume, 'tamanho_mb': tamanho, 'ups': len(ups)}
+            for caminho_volume, tamanho, ups in documentos_consolidados
+        ],
+        pipeline=resumo_pipeline
+    )
 
 # =========================================================================
 # INTERFACE STREAMLIT
@@ -1214,6 +2244,15 @@ def criar_pdf_streamlit():
                 help="Núcleo: Todos os PDFs da UNF ficam na mesma pasta. Propriedade: Cada UP tem sua própria pasta."
             )
             
+            formato_saida = st.radio(
+                "Formato dos PDFs:",
+                [
+                    "📄 Um PDF por UP",
+                    "📑 Documento único por pasta (uma página por UP)"
+                ],
+                help="Documento único: cada pasta recebe um só PDF com todas as suas UPs, dividido em volumes de até 9 MB. Menos arquivos tornam cópias e uploads mais rápidos. Disponível no modo Pastas Locais."
+            )
+            
             # Usar DataFrame filtrado para o restante do processamento
             df = df_filtered
             
@@ -1251,6 +2290,18 @@ def criar_pdf_streamlit():
                 images_folder_input = st.text_input("URL/Caminho da pasta de IMAGENS no SharePoint:")
                 croquis_folder_input = st.text_input("URL/Caminho da pasta de CROQUIS no SharePoint:")
                 
+                max_downloads = st.slider(
+                    "⬇️ Downloads simultâneos:",
+                    min_value=1, max_value=16, value=DOWNLOAD_CONFIG['max_workers'],
+                    help="Quantidade de arquivos baixados ao mesmo tempo do SharePoint. Valores altos podem gerar bloqueios temporários (HTTP 429), que são tratados com novas tentativas."
+                )
+                
+                usar_cache = st.checkbox(
+                    "💾 Usar cache local dos arquivos do SharePoint",
+                    value=True,
+                    help="Guarda as listagens e os arquivos baixados em data/cache_sharepoint. Nas próximas execuções só são baixados arquivos novos ou alterados no SharePoint."
+                )
+                
                 # Converter caminhos do SharePoint
                 if images_folder_input and croquis_folder_input:
                     images_folder_url = convert_sharepoint_url_to_path(images_folder_input)
@@ -1371,6 +2422,12 @@ def criar_pdf_streamlit():
             
             output_dir = st.session_state.output_folder_path
             
+            build_incremental = st.checkbox(
+                "♻️ Gerar apenas PDFs alterados (build incremental)",
+                value=True,
+                help="Usa o manifesto gravado em cada pasta de saída para pular UPs cujos dados, imagens e croquis não mudaram, e remove PDFs de UPs que saíram da entrega. Disponível no modo Pastas Locais."
+            )
+            
             # Botão para iniciar processamento
             if st.button("🚀 Iniciar Processamento", type="primary"):
                 
@@ -1393,7 +2450,9 @@ def criar_pdf_streamlit():
                             # Iniciar processamento SharePoint
                             organizacao_param = "por_propriedade" if organizacao_tipo.startswith("🗂️") else "por_nucleo"
                             process_properties_streamlit(
-                                df, ctx, images_folder_url, croquis_folder_url, output_dir, entrega_nome, organizacao_param, unf_selecionada
+                                df, ctx, images_folder_url, croquis_folder_url, output_dir, entrega_nome, organizacao_param, unf_selecionada,
+                                max_downloads=max_downloads,
+                                cache=CacheSharePoint() if usar_cache else None
                             )
                         except Exception as e:
                             st.error(f"❌ Erro no processamento SharePoint: {str(e)}")
@@ -1415,7 +2474,9 @@ def criar_pdf_streamlit():
                             # Iniciar processamento com arquivos locais
                             organizacao_param = "por_propriedade" if organizacao_tipo.startswith("🗂️") else "por_nucleo"
                             process_properties_local(
-                                df, images_folder_path, croquis_folder_path, output_dir, entrega_nome, organizacao_param, unf_selecionada
+                                df, images_folder_path, croquis_folder_path, output_dir, entrega_nome, organizacao_param, unf_selecionada,
+                                incremental=build_incremental,
+                                formato_saida="consolidado" if formato_saida.startswith("📑") else "por_up"
                             )
                         except Exception as e:
                             st.error(f"❌ Erro no processamento local: {str(e)}")
@@ -0,0 +1,128 @@
+"""
+Disjuntores por etapa da automação
+
+Quando o portal muda um layout, a mesma etapa (dropdown UNF, botão
+"Adicionar linha", campo Recomendação %...) falha igual em todas as UPs e
+laudos, cada vez depois de esgotar a cadeia de seletores. O disjuntor de
+cada etapa conta as falhas seguidas: depois de falhas_para_abrir ele abre
+e a etapa passa a ser pulada na hora, com um único alerta. Passado o
+tempo de espera, uma tentativa de teste (meio-aberto) decide se ele fecha
+de novo ou continua aberto.
+"""
+
+import time
+import threading
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+DISJUNTOR_CONFIG = {
+    'falhas_para_abrir': 3,   # Falhas seguidas que abrem o disjuntor da etapa
+    'espera_s': 300,          # Tempo aberto antes da tentativa de teste
+}
+
+ESTADOS_DISJUNTOR = ('fechado', 'aberto', 'meio_aberto')
+
+# =========================================================================
+# DISJUNTORES
+# =========================================================================
+
+class DisjuntorEtapa:
+    """Estado do disjuntor de uma etapa"""
+
+    def __init__(self, etapa, falhas_para_abrir, espera_s):
+        self.etapa = etapa
+        self.falhas_para_abrir = falhas_para_abrir
+        self.espera_s = espera_s
+        self.estado = 'fechado'
+        self.falhas_seguidas = 0
+        self.aberto_em = None
+        self.puladas = 0
+        self.aberturas = 0
+        self._teste_em_andamento = False
+
+    def permitir(self, agora):
+        """True se a etapa pode rodar (fechado, ou a tentativa de teste do meio-aberto)"""
+        if self.estado == 'aberto' and agora - self.aberto_em >= self.espera_s:
+            self.estado = 'meio_aberto'
+        if self.estado == 'fechado':
+            return True
+        if self.estado == 'meio_aberto' and not self._teste_em_andamento:
+            self._teste_em_andamento = True
+            return True
+        self.puladas += 1
+        return False
+
+    def sucesso(self):
+        """Devolve o estado anterior (para saber se o disjuntor fechou agora)"""
+        anterior = self.estado
+        self.estado = 'fechado'
+        self.falhas_seguidas = 0
+        self._teste_em_andamento = False
+        return anterior
+
+    def falha(self, agora):
+        """Devolve True se a falha abriu o disjuntor"""
+        self.falhas_seguidas += 1
+        teste_falhou = self.estado == 'meio_aberto'
+        self._teste_em_andamento = False
+        if teste_falhou or (self.estado == 'fechado' and self.falhas_seguidas >= self.falhas_para_abrir):
+            self.estado = 'aberto'
+            self.aberto_em = agora
+            self.aberturas += 1
+            return True
+        return False
+
+    def liberar_teste(self):
+        """Tentativa sem resultado (prazo, cancelamento): o meio-aberto aceita outro teste"""
+        self._teste_em_andamento = False
+
+    def situacao(self):
+        return {
+            'estado': self.estado,
+            'falhas_seguidas': self.falhas_seguidas,
+            'puladas': self.puladas,
+            'aberturas': self.aberturas
+        }
+
+class Disjuntores:
+    """
+    Disjuntores de todas as etapas de uma execução (ou de um trabalhador,
+    compartilhados entre os laudos que ele lança)
+    """
+
+    def __init__(self, config=None, relogio=time.monotonic):
+        self.config = dict(DISJUNTOR_CONFIG, **(config or {}))
+        self._relogio = relogio
+        self._etapas = {}
+        self._lock = threading.Lock()
+
+    def _disjuntor(self, etapa):
+        if etapa not in self._etapas:
+            self._etapas[etapa] = DisjuntorEtapa(etapa, self.config['falhas_para_abrir'], self.config['espera_s'])
+        return self._etapas[etapa]
+
+    def permitir(self, etapa):
+        with self._lock:
+            return self._disjuntor(etapa).permitir(self._relogio())
+
+    def registrar_sucesso(self, etapa):
+        """Devolve True se o sucesso fechou um disjuntor que estava aberto (alerta de volta)"""
+        with self._lock:
+            return self._disjuntor(etapa).sucesso() != 'fechado'
+
+    def registrar_falha(self, etapa):
+        """Devolve True se a falha abriu o disjuntor (alerta único da abertura)"""
+        with self._lock:
+            return self._disjuntor(etapa).falha(self._relogio())
+
+    def liberar_teste(self, etapa):
+        """A tentativa terminou sem sucesso nem falha registrados"""
+        with self._lock:
+            self._disjuntor(etapa).liberar_teste()
+
+    def situacao(self):
+        """Estado de cada etapa que já rodou (para o relatório)"""
+        with self._lock:
+            return {etapa: disjuntor.situacao() for etapa, disjuntor in self._etapas.items()}
@@ -0,0 +1,452 @@
+"""
+Fila de laudos em SQLite para vários trabalhadores
+
+Os planos de lançamento são enfileirados como laudos (um por núcleo ou
+propriedade) em um arquivo SQLite local ou em uma pasta compartilhada.
+Processos trabalhadores, na mesma máquina ou em outras, reivindicam laudos
+com uma concessão (lease) renovada por batimentos; laudos de trabalhadores
+que pararam de responder voltam para a fila quando a concessão expira.
+
+Antes do Enviar o trabalhador renova a concessão e registra o início do
+envio. Um laudo cuja concessão expira depois disso pode já estar no portal:
+em vez de voltar para a fila, ele fica em 'revisar' para conferência manual.
+
+Não há servidor: a reivindicação é uma transação BEGIN IMMEDIATE, que o
+SQLite serializa entre os processos.
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from contextlib import closing
+
+import pandas as pd
+
+from config import DATA_DIR
+from trabalhos_lancamento import LancamentoCancelado
+from disjuntor_etapas import Disjuntores
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+FILA_CONFIG = {
+    'caminho': DATA_DIR / "fila_laudos.sqlite",
+    'concessao_s': 300,      # Validade da concessão sem batimento
+    'batimento_s': 30,       # Intervalo de renovação da concessão
+    'max_tentativas': 3,     # Reivindicações de um laudo antes de desistir
+    'journal_mode': "WAL",   # Use "DELETE" em pastas de rede (WAL exige disco local)
+    'janela_vazao_s': 3600,  # Janela da vazão na visão do coordenador
+}
+
+ESTADOS_LAUDO = ('pendente', 'em_execucao', 'concluido', 'falhou', 'revisar')
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS laudos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    lote TEXT NOT NULL,
+    grupo TEXT NOT NULL,
+    organizacao TEXT NOT NULL,
+    ups_json TEXT NOT NULL,
+    total_ups INTEGER NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    trabalhador TEXT,
+    concessao_ate REAL,
+    criado_em REAL NOT NULL,
+    iniciado_em REAL,
+    envio_iniciado_em REAL,
+    concluido_em REAL,
+    ups_com_sucesso INTEGER,
+    resultado_json TEXT,
+    erro TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_laudos_estado ON laudos (estado, concessao_ate);
+"""
+
+def nome_trabalhador():
+    """Identificador padrão do trabalhador: máquina e processo"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+# =========================================================================
+# FILA
+# =========================================================================
+
+class FilaLaudos:
+    """Fila de laudos persistida em um arquivo SQLite"""
+
+    def __init__(self, caminho=None, config=None):
+        self.config = dict(FILA_CONFIG, **(config or {}))
+        self.caminho = str(caminho or self.config['caminho'])
+        os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+        with closing(self._conectar()) as conexao:
+            conexao.execute(f"PRAGMA journal_mode={self.config['journal_mode']}")
+            conexao.executescript(ESQUEMA)
+            colunas = {linha['name'] for linha in conexao.execute("PRAGMA table_info(laudos)")}
+            if 'envio_iniciado_em' not in colunas:  # Filas criadas antes do registro do envio
+                conexao.execute("ALTER TABLE laudos ADD COLUMN envio_iniciado_em REAL")
+
+    def _conectar(self):
+        conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+        conexao.row_factory = sqlite3.Row
+        return conexao
+
+    # ---------------------------------------------------------------------
+    # Produtor
+    # ---------------------------------------------------------------------
+
+    def enfileirar(self, df_ups, grupos, organizacao='nucleo', lote=None):
+        """
+        Enfileira um laudo por grupo com as UPs do grupo ('Nucleo' das UPs,
+        como preparado por preparar_grupos_lancamento).
+
+        Returns:
+            str: identificador do lote
+        """
+        lote = lote or time.strftime("%Y%m%d_%H%M%S")
+        agora = time.time()
+        linhas = []
+        for grupo in grupos:
+            ups = df_ups[df_ups['Nucleo'] == grupo]
+            linhas.append((lote, str(grupo), organizacao, ups.to_json(orient='records', force_ascii=False),
+                           len(ups), agora))
+        with closing(self._conectar()) as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            conexao.executemany(
+                "INSERT INTO laudos (lote, grupo, organizacao, ups_json, total_ups, criado_em) VALUES (?, ?, ?, ?, ?, ?)",
+                linhas
+            )
+            conexao.execute("COMMIT")
+        return lote
+
+    # ---------------------------------------------------------------------
+    # Trabalhador
+    # ---------------------------------------------------------------------
+
+    def reivindicar(self, trabalhador, concessao_s=None):
+        """
+        Reivindica o próximo laudo pendente (ou com concessão expirada).
+
+        Na mesma transação, laudos com a concessão expirada depois do início
+        do envio vão para 'revisar' (podem já estar no portal) e os que
+        esgotaram as tentativas são marcados como 'falhou'.
+
+        Returns:
+            dict com id, lote, grupo, organizacao, tentativas e df_ups, ou
+            None se não houver laudo disponível
+        """
+        agora = time.time()
+        concessao_s = concessao_s or self.config['concessao_s']
+        with closing(self._conectar()) as conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            try:
+                conexao.execute(
+                    "UPDATE laudos SET estado = 'revisar', concluido_em = ?, "
+                    "erro = 'Concessão expirada depois do Enviar: conferir no portal antes de relançar' "
+                    "WHERE estado = 'em_execucao' AND concessao_ate < ? AND envio_iniciado_em IS NOT NULL",
+                    (agora, agora)
+                )
+                conexao.execute(
+                    "UPDATE laudos SET estado = 'falhou', concluido_em = ?, "
+                    "erro = 'Concessão expirada após ' || tentativas || ' tentativa(s)' "
+                    "WHERE estado = 'em_execucao' AND concessao_ate < ? AND tentativas >= ?",
+                    (agora, agora, self.config['max_tentativas'])
+                )
+                linha = conexao.execute(
+                    "SELECT * FROM laudos WHERE estado = 'pendente' "
+                    "OR (estado = 'em_execucao' AND concessao_ate < ?) ORDER BY id LIMIT 1",
+                    (agora,)
+                ).fetchone()
+                if linha is None:
+                    conexao.execute("COMMIT")
+                    return None
+                conexao.execute(
+                    "UPDATE laudos SET estado = 'em_execucao', trabalhador = ?, concessao_ate = ?, "
+                    "tentativas = tentativas + 1, iniciado_em = ? WHERE id = ?",
+                    (trabalhador, agora + concessao_s, agora, linha['id'])
+                )
+                conexao.execute("COMMIT")
+            except Exception:
+                conexao.execute("ROLLBACK")
+                raise
+
+        df_ups = pd.DataFrame(json.loads(linha['ups_json']))
+        if 'Nucleo' in df_ups.columns:
+            df_ups['Nucleo'] = df_ups['Nucleo'].astype(str)  # Mesmo tipo do grupo gravado
+        return {
+            'id': linha['id'],
+            'lote': linha['lote'],
+            'grupo': linha['grupo'],
+            'organizacao': linha['organizacao'],
+            'tentativas': linha['tentativas'] + 1,
+            'df_ups': df_ups
+        }
+
+    def renovar(self, id_laudo, trabalhador, concessao_s=None):
+        """Batimento: estende a concessão; False se o laudo não é mais deste trabalhador"""
+        concessao_s = concessao_s or self.config['concessao_s']
+        with closing(self._conectar()) as conexao:
+            cursor = conexao.execute(
+                "UPDATE laudos SET concessao_ate = ? WHERE id = ? AND trabalhador = ? AND estado = 'em_execucao'",
+                (time.time() + concessao_s, id_laudo, trabalhador)
+            )
+            return cursor.rowcount == 1
+
+    def marcar_envio(self, id_laudo, trabalhador, concessao_s=None):
+        """
+        Renova a concessão e registra o início do envio; False se o laudo
+        não é mais deste trabalhador (o envio não deve acontecer)
+        """
+        concessao_s = concessao_s or self.config['concessao_s']
+        agora = time.time()
+        with closing(self._conectar()) as conexao:
+            cursor = conexao.execute(
+                "UPDATE laudos SET concessao_ate = ?, envio_iniciado_em = ? "
+                "WHERE id = ? AND trabalhador = ? AND estado = 'em_execucao' AND concessao_ate >= ?",
+                (agora + concessao_s, agora, id_laudo, trabalhador, agora)
+            )
+            return cursor.rowcount == 1
+
+    def concluir(self, id_laudo, trabalhador, resumo):
+        """Registra o resumo da automação ('concluido' se sucesso, senão 'falhou')"""
+        estado = 'concluido' if resumo.get('sucesso') else 'falhou'
+        erro = "; ".join(resumo.get('erros', [])) or None
+        return self._encerrar(id_laudo, trabalhador, estado, resumo, erro)
+
+    def falhar(self, id_laudo, trabalhador, erro):
+        """Registra uma falha sem resumo (ex.: erro ao abrir o navegador)"""
+        return self._encerrar(id_laudo, trabalhador, 'falhou', None, str(erro))
+
+    def devolver(self, id_laudo, trabalhador):
+        """Devolve o laudo à fila (trabalhador encerrado antes de começar)"""
+        with closing(self._conectar()) as conexao:
+            cursor = conexao.execute(
+                "UPDATE laudos SET estado = 'pendente', trabalhador = NULL, concessao_ate = NULL, "
+                "tentativas = MAX(tentativas - 1, 0) WHERE id = ? AND trabalhador = ? AND estado = 'em_execucao'",
+                (id_laudo, trabalhador)
+            )
+            return cursor.rowcount == 1
+
+    def _encerrar(self, id_laudo, trabalhador, estado, resumo, erro):
+        sucesso = len(resumo.get('ups_com_sucesso', [])) if resumo else 0
+        with closing(self._conectar()) as conexao:
+            cursor = conexao.execute(
+                "UPDATE laudos SET estado = ?, concluido_em = ?, ups_com_sucesso = ?, resultado_json = ?, "
+                "erro = ?, concessao_ate = NULL WHERE id = ? AND trabalhador = ? AND estado = 'em_execucao'",
+                (estado, time.time(), sucesso, json.dumps(resumo, ensure_ascii=False, default=str) if resumo else None,
+                 erro, id_laudo, trabalhador)
+            )
+            return cursor.rowcount == 1
+
+    # ---------------------------------------------------------------------
+    # Coordenador
+    # ---------------------------------------------------------------------
+
+    def situacao(self, lote=None):
+        """
+        Visão do coordenador: laudos por estado, trabalhadores ativos e
+        vazão (laudos e UPs por hora) na janela configurada, no total e por
+        trabalhador.
+        """
+        agora = time.time()
+        janela = self.config['janela_vazao_s']
+        filtro, parametros = ("WHERE lote = ?", (lote,)) if lote else ("", ())
+        with closing(self._conectar()) as conexao:
+            por_estado = {estado: 0 for estado in ESTADOS_LAUDO}
+            for linha in conexao.execute(f"SELECT estado, COUNT(*) AS n FROM laudos {filtro} GROUP BY estado", parametros):
+                por_estado[linha['estado']] = linha['n']
+
+            ativos = [dict(linha) for linha in conexao.execute(
+                "SELECT trabalhador, grupo, tentativas, iniciado_em FROM laudos "
+                "WHERE estado = 'em_execucao' AND concessao_ate >= ? " + ("AND lote = ? " if lote else "") + "ORDER BY trabalhador",
+                (agora,) + parametros
+            )]
+
+            trabalhadores = {}
+            for linha in conexao.execute(
+                "SELECT trabalhador, COUNT(*) AS laudos, COALESCE(SUM(ups_com_sucesso), 0) AS ups, "
+                "AVG(concluido_em - iniciado_em) AS duracao_media FROM laudos "
+                "WHERE estado = 'concluido' AND concluido_em >= ? " + ("AND lote = ? " if lote else "") + "GROUP BY trabalhador",
+                (agora - janela,) + parametros
+            ):
+                trabalhadores[linha['trabalhador']] = {
+                    'laudos_por_hora': round(linha['laudos'] * 3600 / janela, 2),
+                    'ups_por_hora': round(linha['ups'] * 3600 / janela, 2),
+                    'duracao_media_s': round(linha['duracao_media'] or 0, 1)
+                }
+
+        return {
+            'laudos': por_estado,
+            'total': sum(por_estado.values()),
+            'em_execucao': ativos,
+            'laudos_por_hora': round(sum(t['laudos_por_hora'] for t in trabalhadores.values()), 2),
+            'ups_por_hora': round(sum(t['ups_por_hora'] for t in trabalhadores.values()), 2),
+            'trabalhadores': trabalhadores
+        }
+
+# =========================================================================
+# TRABALHADOR
+# =========================================================================
+
+class _ControleConcessao:
+    """
+    Interrompe a automação entre UPs quando a concessão do laudo é perdida
+    e confirma a concessão (registrando o envio) logo antes do Enviar
+    """
+
+    def __init__(self, fila, id_laudo, trabalhador):
+        self.fila = fila
+        self.id_laudo = id_laudo
+        self.trabalhador = trabalhador
+        self.perdida = threading.Event()
+
+    async def aguardar_liberacao(self):
+        if self.perdida.is_set():
+            raise LancamentoCancelado("Concessão do laudo perdida")
+
+    async def antes_do_envio(self):
+        await self.aguardar_liberacao()
+        if not self.fila.marcar_envio(self.id_laudo, self.trabalhador):
+            self.perdida.set()
+            raise LancamentoCancelado("Concessão do laudo perdida antes do envio")
+
+def _bater(fila, id_laudo, trabalhador, controle, parar):
+    """Renova a concessão a cada batimento até o laudo terminar"""
+    while not parar.wait(fila.config['batimento_s']):
+        if not fila.renovar(id_laudo, trabalhador):
+            controle.perdida.set()
+            return
+
+def _processar_laudo(fila, item, trabalhador, email, senha, headless, ao_evento, contadores,
+                    somente_nesta_thread=False, disjuntores=None):
+    """Lança um laudo reivindicado, com batimentos, e registra o resultado na fila"""
+    from lancamento_fenix import executar_lancamento_em_lote
+
+    ao_evento('laudo_reivindicado', {'laudo': item['id'], 'grupo': item['grupo'],
+                                     'tentativa': item['tentativas'], 'trabalhador': trabalhador})
+    controle = _ControleConcessao(fila, item['id'], trabalhador)
+    parar = threading.Event()
+    batimento = threading.Thread(target=_bater, args=(fila, item['id'], trabalhador, controle, parar),
+                                 name=f"batimento_{item['id']}", daemon=True)
+    batimento.start()
+    try:
+        resumo = executar_lancamento_em_lote(
+            item['df_ups'], [item['grupo']], item['organizacao'], email, senha,
+            headless=headless, ao_evento=ao_evento, controle=controle,
+            somente_nesta_thread=somente_nesta_thread, disjuntores=disjuntores
+        )
+        registrado = fila.concluir(item['id'], trabalhador, resumo)
+        contadores['concluidos' if resumo['sucesso'] else 'falhas'] += 1
+        ao_evento('laudo_concluido', {'laudo': item['id'], 'grupo': item['grupo'], 'sucesso': resumo['sucesso'],
+                                      'ups_com_sucesso': resumo['ups_com_sucesso'], 'registrado': registrado})
+    except LancamentoCancelado:
+        contadores['abandonados'] += 1
+        ao_evento('laudo_abandonado', {'laudo': item['id'], 'grupo': item['grupo'], 'motivo': "concessão perdida"})
+    except Exception as e:
+        fila.falhar(item['id'], trabalhador, e)
+        contadores['falhas'] += 1
+        ao_evento('laudo_falhou', {'laudo': item['id'], 'grupo': item['grupo'], 'erro': str(e)})
+    finally:
+        parar.set()
+        batimento.join()
+
+def executar_trabalhador(fila, email, senha, trabalhador=None, headless=True, ao_evento=None,
+                         parar_quando_vazia=True, espera_s=10, max_laudos=None):
+    """
+    Reivindica e lança laudos da fila até ela esvaziar (ou para sempre, com
+    parar_quando_vazia=False), renovando a concessão em uma thread de
+    batimentos. Cada laudo roda com executar_lancamento_em_lote; se a
+    concessão for perdida, a automação para antes da próxima UP (ou do
+    Enviar) e o laudo fica para quem o reivindicou de novo.
+
+    Returns:
+        dict: trabalhador e contadores de laudos concluídos, com falha e abandonados
+    """
+    if headless and not (email and senha):
+        raise ValueError("O trabalhador sem janela precisa de e-mail e senha para o login automático")
+    trabalhador = trabalhador or nome_trabalhador()
+    ao_evento = ao_evento or (lambda evento, dados: None)
+    contadores = {'trabalhador': trabalhador, 'laudos': 0, 'concluidos': 0, 'falhas': 0, 'abandonados': 0}
+    disjuntores = Disjuntores()  # Uma etapa quebrada no portal é pulada também nos laudos seguintes
+
+    while max_laudos is None or contadores['laudos'] < max_laudos:
+        item = fila.reivindicar(trabalhador)
+        if item is None:
+            if parar_quando_vazia:
+                break
+            time.sleep(espera_s)
+            continue
+
+        contadores['laudos'] += 1
+        _processar_laudo(fila, item, trabalhador, email, senha, headless, ao_evento, contadores,
+                         disjuntores=disjuntores)
+
+    contadores['disjuntores'] = disjuntores.situacao()
+    return contadores
+
+def executar_trabalhadores_paralelos(fila, email, senha, trabalhador=None, headless=True, ao_evento=None,
+                                     parar_quando_vazia=True, espera_s=10, max_laudos=None,
+                                     controlador=None):
+    """
+    Como executar_trabalhador, mas com vários laudos ao mesmo tempo (um
+    navegador por laudo). Quantos rodam juntos é decidido pelo controlador
+    AIMD a partir da duração das etapas e das falhas da automação; o
+    relatório do controlador vai em contadores['concorrencia'].
+    """
+    from concorrencia_adaptativa import ControladorAIMD
+
+    if headless and not (email and senha):
+        raise ValueError("O trabalhador sem janela precisa de e-mail e senha para o login automático")
+    trabalhador = trabalhador or nome_trabalhador()
+    ao_evento = ao_evento or (lambda evento, dados: None)
+    controlador = controlador or ControladorAIMD()
+    disjuntores = Disjuntores()
+    contadores = {'trabalhador': trabalhador, 'laudos': 0, 'concluidos': 0, 'falhas': 0, 'abandonados': 0}
+    lock = threading.Lock()
+    encerrar = threading.Event()
+
+    def _ao_evento(evento, dados):
+        controlador.registrar(evento, dados)
+        ao_evento(evento, dados)
+
+    def _trabalhar(numero):
+        nome = f"{trabalhador}#{numero}"
+        while not encerrar.is_set():
+            if not controlador.adquirir(cancelado=encerrar):
+                return
+            try:
+                with lock:
+                    if max_laudos is not None and contadores['laudos'] >= max_laudos:
+                        encerrar.set()
+                        return
+                    item = fila.reivindicar(nome)
+                    if item is not None:
+                        contadores['laudos'] += 1
+                if item is None:
+                    if parar_quando_vazia:
+                        encerrar.set()
+                        return
+                    encerrar.wait(espera_s)
+                    continue
+                parciais = {'concluidos': 0, 'falhas': 0, 'abandonados': 0}
+                _processar_laudo(fila, item, nome, email, senha, headless, _ao_evento, parciais,
+                                 somente_nesta_thread=True, disjuntores=disjuntores)
+                with lock:
+                    for chave, valor in parciais.items():
+                        contadores[chave] += valor
+            finally:
+                controlador.liberar()
+
+    threads = [threading.Thread(target=_trabalhar, args=(numero,), name=f"trabalhador_{numero}", daemon=True)
+               for numero in range(1, controlador.config['limite_maximo'] + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    contadores['concorrencia'] = controlador.relatorio()
+    contadores['disjuntores'] = disjuntores.situacao()
+    return contadores
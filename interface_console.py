@@ -0,0 +1,244 @@
+"""
+Interface de console para executar o processamento sem Streamlit
+Implementa as chamadas do Streamlit usadas pelos módulos de processamento
+(st.write, st.info, st.progress, st.empty, st.columns...) escrevendo as
+mensagens no terminal, para rodar o mesmo código em servidores sem tela e
+sem servidor Streamlit. Também fornece o carregamento preguiçoso do
+Streamlit, para que importar os módulos não dependa dele.
+"""
+
+import sys
+import threading
+from contextlib import contextmanager
+
+# =========================================================================
+# STREAMLIT PREGUIÇOSO
+# =========================================================================
+
+class StreamlitPreguicoso:
+    """Importa o streamlit apenas no primeiro uso de um atributo"""
+
+    def __init__(self):
+        self._modulo = None
+
+    def __getattr__(self, nome):
+        if self._modulo is None:
+            import streamlit
+            self._modulo = streamlit
+        return getattr(self._modulo, nome)
+
+# =========================================================================
+# INTERFACE DE CONSOLE
+# =========================================================================
+
+class EstadoSessao(dict):
+    """Equivalente ao st.session_state: acesso por chave e por atributo"""
+
+    def __getattr__(self, nome):
+        try:
+            return self[nome]
+        except KeyError:
+            raise AttributeError(nome)
+
+    def __setattr__(self, nome, valor):
+        self[nome] = valor
+
+    def __delattr__(self, nome):
+        try:
+            del self[nome]
+        except KeyError:
+            raise AttributeError(nome)
+
+NIVEIS = ('detalhe', 'info', 'aviso', 'erro')
+
+PREFIXOS = {'detalhe': '  ', 'info': 'ℹ️ ', 'aviso': '⚠️ ', 'erro': '❌'}
+
+class InterfaceConsole:
+    """
+    Substituto do módulo streamlit para execuções sem interface.
+
+    As mensagens vão para ao_emitir(nivel, mensagem, contexto) ou, sem
+    callback, para a saída (stderr por padrão, deixando o stdout livre para
+    o resumo). Atualizações de progresso e de espaços reservados (st.empty)
+    são de nível 'detalhe' e só aparecem com verboso=True. Widgets devolvem
+    seus valores padrão e botões nunca são clicados.
+
+    O contexto (por exemplo a UNF em processamento) é definido por thread
+    com definir_contexto, e identifica as mensagens de execuções paralelas.
+    """
+
+    def __init__(self, saida=None, verboso=False, ao_emitir=None):
+        self.saida = saida or sys.stderr
+        self.verboso = verboso
+        self.ao_emitir = ao_emitir
+        self.session_state = EstadoSessao()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # ---------------------------------------------------------------------
+    # Contexto e emissão
+    # ---------------------------------------------------------------------
+
+    def definir_contexto(self, contexto):
+        self._local.contexto = contexto
+
+    @property
+    def contexto(self):
+        return getattr(self._local, 'contexto', None)
+
+    def emitir(self, nivel, mensagem):
+        texto = str(mensagem).strip()
+        if not texto or (nivel == 'detalhe' and not self.verboso):
+            return
+        if self.ao_emitir is not None:
+            self.ao_emitir(nivel, texto, self.contexto)
+            return
+        rotulo = f"[{self.contexto}] " if self.contexto else ""
+        with self._lock:
+            print(f"{PREFIXOS[nivel]} {rotulo}{texto}", file=self.saida, flush=True)
+
+    # ---------------------------------------------------------------------
+    # Mensagens
+    # ---------------------------------------------------------------------
+
+    def write(self, *args, **kwargs):
+        self.emitir('info', " ".join(str(arg) for arg in args))
+
+    markdown = text = caption = title = header = subheader = write
+
+    def info(self, mensagem, **kwargs):
+        self.emitir('info', mensagem)
+
+    success = info
+
+    def warning(self, mensagem, **kwargs):
+        self.emitir('aviso', mensagem)
+
+    def error(self, mensagem, **kwargs):
+        self.emitir('erro', mensagem)
+
+    def exception(self, excecao):
+        self.emitir('erro', excecao)
+
+    def code(self, conteudo, **kwargs):
+        self.emitir('detalhe', conteudo)
+
+    def metric(self, rotulo, valor, *args, **kwargs):
+        self.emitir('info', f"{rotulo}: {valor}")
+
+    def dataframe(self, *args, **kwargs):
+        pass
+
+    table = json = dataframe
+
+    # ---------------------------------------------------------------------
+    # Elementos de layout e progresso
+    # ---------------------------------------------------------------------
+
+    def progress(self, valor=0, text=None):
+        return _ProgressoConsole(self, valor, text)
+
+    def empty(self):
+        return _EspacoConsole(self)
+
+    def columns(self, spec, **kwargs):
+        quantidade = spec if isinstance(spec, int) else len(spec)
+        return [self] * quantidade
+
+    def container(self, *args, **kwargs):
+        return self
+
+    expander = container
+
+    @contextmanager
+    def spinner(self, texto="", **kwargs):
+        self.emitir('detalhe', texto)
+        yield
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    # ---------------------------------------------------------------------
+    # Widgets (sem usuário: valores padrão)
+    # ---------------------------------------------------------------------
+
+    def button(self, *args, **kwargs):
+        return False
+
+    download_button = button
+
+    def balloons(self):
+        pass
+
+    def checkbox(self, rotulo, value=False, **kwargs):
+        return value
+
+    def rerun(self):
+        pass
+
+# =========================================================================
+# INTERFACE POR THREAD
+# =========================================================================
+
+class InterfacePorThread:
+    """
+    Encaminha cada chamada para a interface definida na thread atual ou, sem
+    ela, para a interface padrão: uma automação em segundo plano escreve no
+    console enquanto o app continua desenhando no Streamlit.
+    """
+
+    def __init__(self, padrao):
+        self._padrao = padrao
+        self._local = threading.local()
+
+    def definir(self, interface):
+        """Interface da thread atual (None volta para a padrão)"""
+        self._local.interface = interface
+
+    def __getattr__(self, nome):
+        interface = getattr(self._local, 'interface', None)
+        return getattr(interface if interface is not None else self._padrao, nome)
+
+class _EspacoConsole:
+    """Espaço reservado (st.empty): mensagens transitórias de status"""
+
+    def __init__(self, interface):
+        self._interface = interface
+
+    def _detalhe(self, *args, **kwargs):
+        self._interface.emitir('detalhe', " ".join(str(arg) for arg in args))
+
+    write = text = markdown = info = success = _detalhe
+
+    def warning(self, mensagem, **kwargs):
+        self._interface.warning(mensagem)
+
+    def error(self, mensagem, **kwargs):
+        self._interface.error(mensagem)
+
+    def progress(self, valor=0, text=None):
+        return _ProgressoConsole(self._interface, valor, text)
+
+    def empty(self):
+        pass
+
+class _ProgressoConsole:
+    """Barra de progresso (st.progress): reporta a cada 10% no modo verboso"""
+
+    def __init__(self, interface, valor=0, text=None):
+        self._interface = interface
+        self._ultimo_passo = -1
+        self.progress(valor, text)
+
+    def progress(self, valor, text=None):
+        valor = valor / 100 if isinstance(valor, int) and valor > 1 else valor
+        passo = int(valor * 10)
+        if passo != self._ultimo_passo or text:
+            self._ultimo_passo = passo
+            self._interface.emitir('detalhe', f"{text or 'Progresso'}: {valor:.0%}")
+
+    def empty(self):
+        pass
@@ -3,14 +3,47 @@ Módulo de Lançamento no Fênix - Sistema RPA
 Este módulo contém toda a lógica de automação para o portal Fênix Florestal
 """
 
-import streamlit as st
 import pandas as pd
 import time
+import copy
+from contextlib import contextmanager, asynccontextmanager
 import io
 from datetime import datetime
 from playwright.async_api import async_playwright
 import asyncio
 import sys
+import threading
+
+from config import COLUNAS_OBRIGATORIAS, AUTOMATION_CONFIG, DAEMON_CONFIG, BROKER_CONFIG, RECICLAGEM_CONFIG
+from interface_console import InterfaceConsole, InterfacePorThread, StreamlitPreguicoso
+from perfil_navegador import ARGUMENTOS_CHROMIUM, aplicar_perfil_desempenho, opcoes_contexto
+from navegador_daemon import DaemonNavegador
+from broker_navegador import obter_broker
+from disjuntor_etapas import Disjuntores
+from vigia_automacao import Vigia, VIGIA_CONFIG
+
+# Interface das mensagens: Streamlit por padrão, console no modo em lote
+st = StreamlitPreguicoso()
+_lock_interface = threading.Lock()
+
+def usar_interface(interface):
+    """
+    Define a interface usada pelas mensagens da automação (o módulo
+    streamlit ou uma InterfaceConsole)
+    """
+    global st
+    st = interface
+
+def usar_interface_na_thread(interface):
+    """
+    Define a interface das mensagens apenas para a thread atual (None volta
+    para a interface do módulo), sem afetar as sessões do app
+    """
+    global st
+    with _lock_interface:
+        if not isinstance(st, InterfacePorThread):
+            st = InterfacePorThread(st)
+    st.definir(interface)
 
 # =========================================================================
 # CONFIGURAÇÕES E CONSTANTES
@@ -72,6 +105,101 @@ UNF_MAPPING = {
     'BA': 'BA', 'CS': 'CS', 'ES': 'ES', 'MA': 'MA', 'MS': 'MS', 'SP': 'SP'
 }
 
+# Campo que só existe no formulário do Upload de Laudos (página pronta para o preenchimento)
+SELETOR_FORMULARIO_UPLOAD = 'input[placeholder="Data da visita de campo"]'
+
+# Preenchimento em lote de inputs e textareas (React): o valor entra pelo
+# setter nativo do protótipo e os eventos input/change avisam o React, como
+# na digitação. Cada campo tem uma lista de seletores (CSS ou xpath=...).
+_JS_ACHAR_CAMPO = """
+    const achar = (seletor) => seletor.startsWith('xpath=')
+        ? document.evaluate(seletor.slice(6), document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(seletor);
+"""
+
+SCRIPT_PREENCHER_CAMPOS = """(campos) => {""" + _JS_ACHAR_CAMPO + """
+    return campos.map(({seletores, valor}) => {
+        for (const seletor of seletores) {
+            const campo = achar(seletor);
+            if (!campo) continue;
+            const prototipo = campo instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(prototipo, 'value').set.call(campo, valor);
+            campo.dispatchEvent(new Event('input', {bubbles: true}));
+            campo.dispatchEvent(new Event('change', {bubbles: true}));
+            return seletor;
+        }
+        return null;
+    });
+}"""
+
+SCRIPT_LER_CAMPOS = """(seletores) => {""" + _JS_ACHAR_CAMPO + """
+    return seletores.map((seletor) => {
+        const campo = seletor ? achar(seletor) : null;
+        return campo ? campo.value : null;
+    });
+}"""
+
+# Botão "Adicionar linha da Matriz de decisão" (do mais confiável ao menos)
+SELETORES_ADICIONAR_LINHA = [
+    # MAIS CONFIÁVEL: aria-label é mais estável que classes CSS
+    ("ARIA-LABEL (mais confiável)", 'xpath=//button[@aria-label="Adicionar linha da Matriz de decisão"]'),
+    # Alternativo com aria-label
+    ("ARIA-LABEL CSS", 'button[aria-label="Adicionar linha da Matriz de decisão"]'),
+    # XPath absoluto fornecido pelo usuário
+    ("XPATH Absoluto", 'xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/div/div/form/div[2]/div/div[3]/button'),
+    # CSS Selector fornecido pelo usuário
+    ("CSS Selector", '#__next > div.max-w-screen-xl.mx-auto.px-2.sm\\:px-4.lg\\:px-0.py-0.bg-white.rounded-md.shadow-md.h-min-screen > div > div > div > div.z-0 > div > div > div > div > div.sm\\:mx-0.lg\\:mt-4 > div > div > form > div:nth-child(2) > div > div.absolute.-right-4.bottom-12.z-50 > button'),
+    # Seletores baseados no SVG interno (fallback)
+    ("SVG ViewBox", 'xpath=//button[.//svg[@stroke="currentColor" and @fill="currentColor" and contains(@viewBox, "0 0 1024 1024")]]'),
+    ("SVG Classes", 'xpath=//button[.//svg[contains(@class, "h-8") and contains(@class, "w-8")]]'),
+]
+
+# Linhas da Matriz de Decisão: uma por rótulo "UP avaliada:"
+_XPATH_ROTULOS_LINHAS = '//fieldset//span[contains(text(), "UP avaliada:")]'
+
+SCRIPT_CONTAR_LINHAS = """() => document.evaluate('count(%s)', document, null, XPathResult.NUMBER_TYPE, null).numberValue""" % _XPATH_ROTULOS_LINHAS
+
+# Remove as linhas a partir de 'usadas', da última para a primeira, pelo botão de remover de cada linha
+SCRIPT_REMOVER_LINHAS = """(usadas) => {
+    const rotulos = document.evaluate('%s', document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    let removidas = 0;
+    for (let i = rotulos.snapshotLength - 1; i >= usadas; i--) {
+        const linha = document.evaluate('ancestor::div[contains(@class, "lg:flex-row")][1]', rotulos.snapshotItem(i),
+                                        null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        const botao = linha && linha.querySelector(
+            'button[aria-label*="Remover"], button[aria-label*="Excluir"], button[title*="Remover"], button[title*="Excluir"]');
+        if (!botao) break;
+        botao.click();
+        removidas++;
+    }
+    return removidas;
+}""" % _XPATH_ROTULOS_LINHAS
+
+SELETORES_SOLICITANTE = ['xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/div/div/form/div[1]/div[1]/div/div/div[1]/div/div/input']
+SELETORES_DATA_VISITA = [
+    'input[placeholder="Data da visita de campo"]',
+    'xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/div/div/form/div[1]/div[1]/div/div/div[2]/div[2]/div/div/div/input',
+]
+
+# Endereço do Upload de Laudos aprendido na primeira navegação pelo menu (vale para o processo todo)
+CACHE_NAVEGACAO = {'url_upload': None}
+
+# Telas do login (Fênix + Microsoft), na ordem em que são reconhecidas:
+# cada tela é identificada pelo primeiro seletor visível
+TELAS_LOGIN = [
+    ('fenix', ['button:has-text("Submissão de Laudos")', 'text="Submissão de Laudos"',
+               'button:has-text("Laudos")', 'text="Dashboard"']),
+    ('erro', ['#usernameError', '#passwordError', '#idTD_Error']),
+    ('mfa', ['#idRichContext_DisplaySign', '#idDiv_SAOTCAS_Title', '#idDiv_SAOTCC_Title',
+             'input[name="otc"]', '#idDiv_SAASDS_Title']),
+    ('manter_conectado', ['#KmsiCheckboxField', 'input[name="DontShowAgain"]', '#KmsiDescription']),
+    ('senha', ['input[type="password"]', 'input[name="passwd"]', 'input[name="password"]',
+               'input[id*="password"]', '#i0118', 'input[placeholder*="senha"]', 'input[placeholder*="password"]']),
+    ('email', ['input[type="email"]', 'input[name="email"]', 'input[name="loginfmt"]',
+               'input[placeholder*="email"]', 'input[placeholder*="Email"]', 'input[id*="email"]', '#i0116']),
+    ('inicial', ['xpath=//*[@id="__next"]/div[1]/div[2]/button']),
+]
+
 # =========================================================================
 # FUNÇÕES DE REGRAS DE NEGÓCIO
 # =========================================================================
@@ -191,16 +319,182 @@ def detectar_unf_por_nucleo(nucleo):
     # Default fallback
     return 'CS'
 
+# =========================================================================
+# PREPARAÇÃO DOS GRUPOS DE LANÇAMENTO
+# =========================================================================
+
+def preparar_grupos_lancamento(df, tipo_organizacao='nucleo', grupos=None):
+    """
+    Seleciona as UPs sem laudo e os grupos (núcleos ou propriedades) a lançar,
+    com as mesmas regras da interface.
+
+    Por propriedade, a coluna 4 da planilha define o grupo e o seu valor
+    substitui o 'Nucleo' das UPs, como a automação espera.
+
+    Args:
+        grupos: grupos desejados (comparados como texto); None = todos
+
+    Returns:
+        tuple: (DataFrame das UPs a lançar, lista de grupos)
+
+    Raises:
+        ValueError: colunas obrigatórias ausentes ou grupo inexistente
+    """
+    faltando = [coluna for coluna in COLUNAS_OBRIGATORIAS if coluna not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias não encontradas: {', '.join(faltando)}")
+
+    df_sem_laudo = df[df['Laudo Existente'].astype(str).str.upper() == 'NÃO'].copy()
+    coluna_agrupamento = df.columns[3] if tipo_organizacao == 'propriedade' else 'Nucleo'
+    disponiveis = sorted(df_sem_laudo[coluna_agrupamento].dropna().unique().tolist(), key=str)
+
+    if grupos:
+        por_texto = {str(grupo).strip(): grupo for grupo in disponiveis}
+        faltando = [str(grupo) for grupo in grupos if str(grupo).strip() not in por_texto]
+        if faltando:
+            raise ValueError(
+                f"Grupo(s) sem UPs pendentes na planilha: {', '.join(faltando)}. "
+                f"Disponíveis: {', '.join(map(str, disponiveis))}"
+            )
+        selecionados = list(dict.fromkeys(por_texto[str(grupo).strip()] for grupo in grupos))
+    else:
+        selecionados = disponiveis
+
+    df_ups = df_sem_laudo[df_sem_laudo[coluna_agrupamento].isin(selecionados)].copy()
+    if tipo_organizacao == 'propriedade':
+        df_ups['Nucleo'] = df_ups[coluna_agrupamento]
+    return df_ups, selecionados
+
+def marcar_ups_com_laudo(df, ups):
+    """
+    Marca 'Laudo Existente' = 'SIM' nas UPs lançadas com sucesso.
+
+    Returns:
+        tuple: (DataFrame atualizado, UPs encontradas na planilha)
+    """
+    df_atualizado = df.copy()
+    ups_texto = {str(up).strip().upper() for up in ups}
+    mascara = df_atualizado['UP'].astype(str).str.strip().str.upper().isin(ups_texto)
+    df_atualizado.loc[mascara, 'Laudo Existente'] = 'SIM'
+    encontradas = sorted(df_atualizado.loc[mascara, 'UP'].astype(str).str.strip().unique().tolist())
+    return df_atualizado, encontradas
+
+# =========================================================================
+# PRAZOS (ORÇAMENTO DE TEMPO DE LAUDOS E UPS)
+# =========================================================================
+
+class PrazoEsgotado(Exception):
+    """O tempo reservado para a etapa (UP, preparo, envio) acabou"""
+
+class Prazo:
+    """Momento limite de uma etapa, no relógio monotônico"""
+
+    def __init__(self, segundos):
+        self.segundos = segundos
+        self.limite = time.monotonic() + segundos
+        self.estourado = False  # Alguma espera foi interrompida por este prazo (etapa incompleta)
+
+    def restante(self):
+        return self.limite - time.monotonic()
+
+    @property
+    def esgotado(self):
+        return self.restante() <= 0
+
+class PaginaComPrazo:
+    """
+    Página do Playwright cujas esperas respeitam o prazo ativo da automação:
+    o timeout de cada espera é limitado ao tempo restante e, sem tempo,
+    a espera falha na hora com PrazoEsgotado.
+    """
+
+    def __init__(self, pagina, automacao):
+        self._pagina = pagina
+        self._automacao = automacao
+
+    def __getattr__(self, nome):
+        return getattr(self._pagina, nome)
+
+    async def wait_for_selector(self, seletor, **opcoes):
+        opcoes['timeout'] = self._automacao.limitar_timeout(opcoes.get('timeout'))
+        return await self._automacao.esperar_pagina(self._pagina.wait_for_selector(seletor, **opcoes))
+
+    async def wait_for_load_state(self, *args, **opcoes):
+        opcoes['timeout'] = self._automacao.limitar_timeout(opcoes.get('timeout'))
+        return await self._automacao.esperar_pagina(self._pagina.wait_for_load_state(*args, **opcoes))
+
+    async def goto(self, url, **opcoes):
+        opcoes['timeout'] = self._automacao.limitar_timeout(opcoes.get('timeout'))
+        return await self._automacao.esperar_pagina(self._pagina.goto(url, **opcoes))
+
+    async def reload(self, **opcoes):
+        opcoes['timeout'] = self._automacao.limitar_timeout(opcoes.get('timeout'))
+        return await self._automacao.esperar_pagina(self._pagina.reload(**opcoes))
+
+    async def click(self, seletor, **opcoes):
+        opcoes['timeout'] = self._automacao.limitar_timeout(opcoes.get('timeout'))
+        return await self._automacao.esperar_pagina(self._pagina.click(seletor, **opcoes))
+
+# =========================================================================
+# DIÁRIO DO LAUDO (RECUPERAÇÃO NO MEIO DO LAUDO)
+# =========================================================================
+
+class DiarioLaudo:
+    """
+    O que já foi preenchido no laudo atual: grupo, cabeçalho/textos e as
+    linhas da Matriz de Decisão confirmadas, na ordem. Se a página travar,
+    o laudo é refeito a partir daqui em uma página nova.
+    """
+
+    def __init__(self, nucleo, ups_nucleo):
+        self.nucleo = nucleo
+        self.ups_nucleo = ups_nucleo
+        self.preparado = False  # Cabeçalho e textos preenchidos
+        self.linhas = []        # up_data de cada linha confirmada, na ordem da matriz
+        self.recuperacoes = 0
+
+    def registrar_linha(self, linha, up_data):
+        if linha != len(self.linhas):
+            raise ValueError(f"Linha {linha + 1} fora de ordem no diário (esperada {len(self.linhas) + 1})")
+        self.linhas.append(dict(up_data))
+
 # =========================================================================
 # CLASSE PRINCIPAL DE AUTOMAÇÃO
 # =========================================================================
 
 class FenixAutomation:
-    def __init__(self, tipo_organizacao='nucleo'):
+    def __init__(self, tipo_organizacao='nucleo', headless=None, ao_evento=None, manter_navegador=True):
+        """
+        Args:
+            tipo_organizacao: 'nucleo' ou 'propriedade'
+            headless: abre o Chromium sem janela (padrão: AUTOMATION_CONFIG['headless'])
+            ao_evento: callback(evento, dados) que recebe os logs e os
+                eventos de progresso; quando definido, nada é desenhado no
+                Streamlit durante a automação
+            manter_navegador: mantém o navegador aberto após um único grupo
+                para continuar pela interface (False fecha sempre ao final)
+        """
         self.browser = None
         self.page = None
         self.playwright = None
         self.tipo_organizacao = tipo_organizacao  # 'nucleo' ou 'propriedade'
+        self.headless = AUTOMATION_CONFIG['headless'] if headless is None else headless
+        self.fator_espera = AUTOMATION_CONFIG.get('fator_espera', 1.0)
+        self.filtro_requisicoes = None
+        self.via_daemon = False  # Conectado ao Chromium persistente (CDP)
+        self.sessao_broker = None  # Sessão no navegador compartilhado (BROKER_CONFIG)
+        self.controle = None  # Pausa/cancelamento entre UPs (trabalhos em segundo plano)
+        self.pipeline = AUTOMATION_CONFIG.get('laudos_em_pipeline', False)  # Prepara o próximo laudo em outra aba
+        self._prazos = []  # Prazos ativos (laudo, UP...): vale o mais próximo
+        self.disjuntores = Disjuntores()  # Etapas que falham sempre são puladas (DISJUNTOR_CONFIG)
+        self.diario = None  # DiarioLaudo do laudo em preenchimento
+        self.linhas_matriz = 1  # Linhas da Matriz de Decisão existentes no laudo em preenchimento
+        self.vigia = None  # Vigia da última execução (VIGIA_CONFIG)
+        self._pagina_travada = None  # asyncio.Event ligado pela vigia quando a página trava
+        self.uso_contexto = {'desde': time.monotonic(), 'laudos': 0}  # Para a reciclagem (RECICLAGEM_CONFIG)
+        self.reciclagens = 0
+        self.ao_evento = ao_evento
+        self.manter_navegador = manter_navegador
         self.email = None
         self.senha = None
         
@@ -213,8 +507,216 @@ class FenixAutomation:
             'erros': []
         }
     
+    @property
+    def page(self):
+        return self._pagina
+    
+    @page.setter
+    def page(self, pagina):
+        if isinstance(pagina, PaginaComPrazo):
+            pagina = pagina._pagina
+        self._pagina = PaginaComPrazo(pagina, self) if pagina is not None else None
+        if getattr(self, '_pagina_travada', None) is not None:
+            self._pagina_travada.clear()  # Página nova: as esperas voltam a valer
+    
+    def emitir_evento(self, evento: str, **dados):
+        """Envia um evento de progresso ao callback (execuções sem interface)"""
+        if self.ao_evento is not None:
+            self.ao_evento(evento, dados)
+    
+    async def aguardar_controle(self):
+        """
+        Ponto de pausa/cancelamento entre UPs e grupos: espera enquanto o
+        trabalho estiver pausado e interrompe a automação se foi cancelado
+        """
+        if self.controle is not None:
+            await self.controle.aguardar_liberacao()
+    
+    async def pausa(self, segundos):
+        """
+        Pausa fixa entre passos, escalada por AUTOMATION_CONFIG['fator_espera']
+        e limitada ao prazo ativo
+        """
+        segundos *= self.fator_espera
+        restante = self.prazo_restante()
+        if restante is not None:
+            if restante <= 0:
+                self._estourar_prazos()
+            segundos = min(segundos, restante)
+        await asyncio.sleep(segundos)
+    
+    @contextmanager
+    def orcamento(self, segundos, isolado=False):
+        """
+        Abre um prazo para o bloco; prazos aninhados valem pelo mais próximo
+        (a UP não passa do prazo do laudo). isolado ignora os prazos de fora
+        (limpeza e envio depois de um prazo esgotado).
+        """
+        anteriores = self._prazos
+        if isolado:
+            self._prazos = []
+        prazo = Prazo(segundos) if segundos else None
+        if prazo is not None:
+            self._prazos.append(prazo)
+        try:
+            yield prazo
+        finally:
+            if prazo is not None:
+                self._prazos.remove(prazo)
+            self._prazos = anteriores
+    
+    async def com_prazo(self, segundos, corrotina, isolado=False):
+        """Executa a corrotina dentro de um prazo"""
+        with self.orcamento(segundos, isolado=isolado):
+            return await corrotina
+    
+    def prazo_restante(self):
+        """Segundos até o prazo mais próximo (None sem prazo ativo)"""
+        if not self._prazos:
+            return None
+        return min(prazo.restante() for prazo in self._prazos)
+    
+    def limitar_timeout(self, timeout_ms):
+        """Timeout de uma espera do Playwright (ms) limitado ao prazo ativo"""
+        restante = self.prazo_restante()
+        if restante is None:
+            return timeout_ms
+        if restante <= 0:
+            self._estourar_prazos()
+        restante_ms = max(restante * 1000, 1)
+        return restante_ms if timeout_ms is None else min(timeout_ms, restante_ms)
+    
+    async def esperar_pagina(self, corrotina):
+        """
+        Aguarda uma ação da página; se a vigia der a página como travada, a
+        espera é interrompida na hora como um prazo esgotado
+        """
+        travada = self._pagina_travada
+        if travada is None:
+            return await corrotina
+        if travada.is_set():
+            corrotina.close()
+            self._estourar_prazos()
+        acao = asyncio.ensure_future(corrotina)
+        alarme = asyncio.ensure_future(travada.wait())
+        interrompida = False
+        try:
+            await asyncio.wait({acao, alarme}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            alarme.cancel()
+            if not acao.done():
+                # Aguarda a ação sair de fato: ela não pode continuar clicando
+                # na página depois que a recuperação trocar a página
+                interrompida = True
+                acao.cancel()
+                await asyncio.gather(acao, return_exceptions=True)
+        if interrompida:
+            self._estourar_prazos()
+        return acao.result()
+    
+    def interromper_esperas(self):
+        """Chamado pela vigia: interrompe as esperas da página travada até a próxima página"""
+        if self._pagina_travada is not None:
+            self._pagina_travada.set()
+    
+    def retomar_esperas(self):
+        """A página voltou a responder: as esperas voltam a valer"""
+        if self._pagina_travada is not None:
+            self._pagina_travada.clear()
+    
+    @asynccontextmanager
+    async def vigiar(self, config=None):
+        """Roda a vigia (VIGIA_CONFIG) enquanto o bloco lança os laudos"""
+        if not VIGIA_CONFIG['usar_vigia']:
+            yield None
+            return
+        self._pagina_travada = asyncio.Event()
+        self.vigia = Vigia(self, config)
+        self.vigia.iniciar()
+        try:
+            yield self.vigia
+        finally:
+            await self.vigia.parar()
+            self._pagina_travada = None
+    
+    def _estourar_prazos(self):
+        """Marca os prazos ativos como estourados (as etapas ficam incompletas) e interrompe a espera"""
+        for prazo in self._prazos:
+            prazo.estourado = True
+        raise PrazoEsgotado()
+    
+    async def executar_com_disjuntor(self, etapa, corrotina, valor_pulado=False):
+        """
+        Executa uma etapa protegida por disjuntor. Com o disjuntor aberto a
+        etapa é pulada na hora e devolve valor_pulado; resultado falso ou
+        exceção contam como falha (prazo esgotado e cancelamento não contam).
+        """
+        if not self.disjuntores.permitir(etapa):
+            corrotina.close()
+            self.log_status(f"⛔ Etapa '{etapa}' pulada (disjuntor aberto)")
+            self.emitir_evento('etapa_pulada', etapa=etapa)
+            return valor_pulado
+        registrado = False
+        try:
+            try:
+                resultado = await corrotina
+            except PrazoEsgotado:
+                raise
+            except Exception:
+                registrado = True
+                self._falha_com_disjuntor(etapa)
+                raise
+            if not resultado:
+                restante = self.prazo_restante()
+                if restante is None or restante > 0:
+                    registrado = True
+                    self._falha_com_disjuntor(etapa)
+            else:
+                registrado = True
+                if self.disjuntores.registrar_sucesso(etapa):
+                    self.log_status(f"✅ Etapa '{etapa}' voltou a funcionar: disjuntor fechado", "success")
+                    self.emitir_evento('disjuntor_fechado', etapa=etapa)
+            return resultado
+        finally:
+            if not registrado:
+                # Prazo, cancelamento ou falha sem prazo: a tentativa não decide o
+                # disjuntor, e o teste do meio-aberto fica livre para a próxima
+                self.disjuntores.liberar_teste(etapa)
+    
+    def _falha_com_disjuntor(self, etapa):
+        if self.disjuntores.registrar_falha(etapa):
+            config = self.disjuntores.config
+            mensagem = (f"🚨 Etapa '{etapa}' falhou {config['falhas_para_abrir']} vezes seguidas: "
+                        f"será pulada nos próximos {config['espera_s']}s (provável mudança no portal)")
+            self.log_status(mensagem, "error")
+            self.stats['erros'].append(mensagem)
+            self.emitir_evento('disjuntor_aberto', etapa=etapa, espera_s=config['espera_s'])
+    
+    def prazo_laudo(self, ups_nucleo):
+        """Prazo do laudo até o envio: preparo mais o prazo de cada UP"""
+        return AUTOMATION_CONFIG['prazo_preparo_s'] + AUTOMATION_CONFIG['prazo_up_s'] * len(ups_nucleo)
+    
+    async def medir_etapa(self, etapa, corrotina):
+        """
+        Executa uma etapa do laudo e emite o evento 'etapa' com a duração e o
+        resultado (usado pelo controle de concorrência adaptativa)
+        """
+        inicio = time.monotonic()
+        resultado = False
+        try:
+            resultado = await corrotina
+            return resultado
+        finally:
+            self.emitir_evento('etapa', etapa=etapa, duracao_s=round(time.monotonic() - inicio, 2),
+                               sucesso=bool(resultado))
+    
     def log_status(self, message: str, level: str = "info"):
         """Log de status integrado com Streamlit"""
+        # Sem interface: o log vira um evento e nada é desenhado
+        if self.ao_evento is not None:
+            self.ao_evento('log', {'nivel': level, 'mensagem': message})
+            return
+        
         timestamp = datetime.now().strftime("%H:%M:%S")
         formatted_message = f"[{timestamp}] {message}"
         
@@ -264,17 +766,22 @@ class FenixAutomation:
             if sys.platform == 'win32':
                 asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
                 
+            if self.sessao_broker is not None:
+                return await self.conectar_broker()
+            
             self.playwright = await async_playwright().start()
+            if DAEMON_CONFIG['usar_daemon']:
+                return await self.conectar_daemon()
+            
             self.browser = await self.playwright.chromium.launch(
-                headless=False,
-                args=[
-                    '--disable-web-security',
-                    '--disable-features=VizDisplayCompositor',
-                    '--no-sandbox'
-                ]
+                headless=self.headless,
+                args=ARGUMENTOS_CHROMIUM
             )
-            self.context = await self.browser.new_context()
+            self.context = await self.browser.new_context(**opcoes_contexto())
+            # Perfil de desempenho: sem imagens/fontes/analytics e sem animações
+            self.filtro_requisicoes = await aplicar_perfil_desempenho(self.context)
             self.page = await self.context.new_page()
+            self.uso_contexto = {'desde': time.monotonic(), 'laudos': 0}
             
             self.log_status("✅ Navegador inicializado com sucesso!", "success")
             return True
@@ -283,6 +790,130 @@ class FenixAutomation:
             self.log_status(f"❌ Erro ao inicializar navegador: {str(e)}", "error")
             return False
     
+    async def conectar_daemon(self):
+        """
+        Conecta ao Chromium persistente via CDP (iniciando-o se não responder)
+        e reaproveita o contexto padrão, com a sessão do login, e a aba do
+        Fênix se já houver uma aberta.
+        """
+        daemon = DaemonNavegador()
+        inicio = time.time()
+        endpoint, reiniciado = await asyncio.to_thread(
+            daemon.garantir, self.playwright.chromium.executable_path, self.headless
+        )
+        if reiniciado:
+            self.log_status(f"🚀 Navegador persistente iniciado em {endpoint}")
+        
+        self.browser = await self.playwright.chromium.connect_over_cdp(endpoint)
+        self.via_daemon = True
+        self.context = self.browser.contexts[0] if self.browser.contexts else await self.browser.new_context()
+        self.filtro_requisicoes = await aplicar_perfil_desempenho(self.context)
+        
+        abas_fenix = [pagina for pagina in self.context.pages if pagina.url.startswith(FENIX_URL)]
+        self.page = abas_fenix[0] if abas_fenix else await self.context.new_page()
+        if opcoes_contexto():
+            await self.page.emulate_media(reduced_motion='reduce')
+        
+        self.log_status(f"🔗 Conectado ao navegador persistente em {time.time() - inicio:.1f}s", "success")
+        return True
+    
+    async def conectar_broker(self):
+        """
+        Abre (ou reaproveita) o contexto isolado desta sessão no navegador
+        compartilhado, já com o login salvo do usuário
+        """
+        sessao = self.sessao_broker
+        self.context = await sessao.abrir_contexto(self.headless)
+        self.playwright, self.browser = sessao.playwright, sessao.browser
+        self.filtro_requisicoes = sessao.filtro_requisicoes
+        self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+        
+        situacao = sessao.broker.situacao()
+        self.log_status(
+            f"🔗 Contexto isolado no navegador compartilhado "
+            f"({situacao['contextos_abertos']}/{situacao['max_sessoes']} sessões)", "success"
+        )
+        return True
+    
+    async def memoria_pagina_mb(self):
+        """Heap JS usado pela página em MB (None se o navegador não informar)"""
+        try:
+            usado = await asyncio.wait_for(self.page.evaluate(
+                'performance.memory ? performance.memory.usedJSHeapSize : null'), timeout=3)
+        except Exception:
+            return None
+        return usado / 1024 / 1024 if usado else None
+    
+    async def motivo_reciclagem(self):
+        """Por que o contexto deve ser reciclado antes do próximo laudo (None: não precisa)"""
+        if not RECICLAGEM_CONFIG['reciclar'] or self.page is None:
+            return None
+        laudos = self.uso_contexto['laudos']
+        if RECICLAGEM_CONFIG['a_cada_laudos'] and laudos >= RECICLAGEM_CONFIG['a_cada_laudos']:
+            return f"{laudos} laudos no mesmo contexto"
+        idade = time.monotonic() - self.uso_contexto['desde']
+        if RECICLAGEM_CONFIG['a_cada_s'] and idade >= RECICLAGEM_CONFIG['a_cada_s']:
+            return f"contexto aberto há {idade / 60:.0f} min"
+        if RECICLAGEM_CONFIG['memoria_mb'] and laudos > 0:
+            memoria = await self.memoria_pagina_mb()
+            if memoria is not None and memoria >= RECICLAGEM_CONFIG['memoria_mb']:
+                return f"página com {memoria:.0f} MB de heap JS"
+        return None
+    
+    async def reciclar_contexto(self, motivo):
+        """
+        Troca o contexto e a página por novos sem refazer o login: o
+        storage_state (cookies e storage) do contexto atual é carregado no
+        novo. No navegador persistente (daemon) o contexto padrão guarda a
+        sessão, então só a página é trocada; no compartilhado (broker) o
+        contexto da sessão é salvo e reaberto.
+        """
+        self.log_status(f"♻️ Reciclando o contexto do navegador ({motivo})...")
+        inicio = time.monotonic()
+        try:
+            if self.sessao_broker is not None:
+                await self.sessao_broker.fechar_contexto(salvar=True)
+                await self.conectar_broker()
+            elif self.via_daemon:
+                pagina_antiga = self.page
+                self.page = await self.context.new_page()
+                await pagina_antiga.close()
+            else:
+                estado = await self.context.storage_state()
+                await self.context.close()
+                self.context = await self.browser.new_context(storage_state=estado, **opcoes_contexto())
+                self.filtro_requisicoes = await aplicar_perfil_desempenho(self.context)
+                self.page = await self.context.new_page()
+            
+            # O login vem do storage_state; aguardar_login só confere (ou refaz, se a sessão expirou)
+            if not await self.navegar_para_fenix() or not await self.aguardar_login():
+                return False
+        except Exception as e:
+            self.log_status(f"❌ Erro ao reciclar o contexto: {str(e)}", "error")
+            return False
+        
+        self.uso_contexto = {'desde': time.monotonic(), 'laudos': 0}
+        self.reciclagens += 1
+        duracao = round(time.monotonic() - inicio, 1)
+        self.log_status(f"✅ Contexto reciclado em {duracao}s", "success")
+        self.emitir_evento('contexto_reciclado', motivo=motivo, duracao_s=duracao)
+        return True
+    
+    async def reciclar_se_preciso(self):
+        """Recicla o contexto entre laudos quando RECICLAGEM_CONFIG pedir"""
+        motivo = await self.motivo_reciclagem()
+        if motivo is not None:
+            await self.reciclar_contexto(motivo)
+    
+    async def salvar_login(self):
+        """Guarda o login do usuário para as próximas sessões no navegador compartilhado"""
+        if self.sessao_broker is None:
+            return
+        try:
+            await self.sessao_broker.salvar_autenticacao()
+        except Exception as e:
+            self.log_status(f"⚠️ Não foi possível salvar o login: {str(e)}", "warning")
+    
     async def navegar_para_fenix(self):
         """Navega para o site do Fênix"""
         try:
@@ -320,7 +951,7 @@ class FenixAutomation:
                         self.log_status("✅ Login detectado! Continuando...", "success")
                         return True
                     
-                    await asyncio.sleep(2)
+                    await self.pausa(2)
                     tentativa += 1
                     
                     # Feedback a cada 30 segundos
@@ -328,7 +959,7 @@ class FenixAutomation:
                         self.log_status(f"⏳ Ainda aguardando login... ({tentativa * 2}s)")
                         
                 except Exception:
-                    await asyncio.sleep(2)
+                    await self.pausa(2)
                     tentativa += 1
             
             # Se chegou aqui, assumir que o login foi feito
@@ -339,167 +970,110 @@ class FenixAutomation:
             self.log_status(f"❌ Erro durante aguardo de login: {str(e)}", "error")
             return False
     
+    async def identificar_tela_login(self):
+        """
+        Tela atual do login (TELAS_LOGIN): devolve (tela, elemento) da
+        primeira tela com um seletor visível, ou (None, None) em transição
+        """
+        for tela, seletores in TELAS_LOGIN:
+            for seletor in seletores:
+                try:
+                    elemento = await self.page.query_selector(seletor)
+                    if elemento and await elemento.is_visible():
+                        return tela, elemento
+                except Exception:
+                    continue
+        return None, None
+    
     async def fazer_login_automatico(self):
-        """Faz login automático usando as credenciais fornecidas"""
+        """
+        Faz login automático usando as credenciais fornecidas.
+        
+        Máquina de estados guiada pela página: a cada navegação (ou a cada
+        intervalo_login_s) identifica a tela atual e reage a ela, então cada
+        tela pode aparecer antes ou depois do esperado sem pausas fixas. O
+        MFA é acompanhado até prazo_mfa_s; o login todo, até prazo_login_s.
+        """
+        if not self.email or not self.senha:
+            self.log_status("❌ Email ou senha não fornecidos", "error")
+            return False
+        
+        self.log_status("🔐 Iniciando login automático...")
+        inicio = time.monotonic()
+        limite = inicio + AUTOMATION_CONFIG['prazo_login_s']
+        intervalo = AUTOMATION_CONFIG['intervalo_login_s']
+        reacao_s = 5  # Repete a ação se a mesma tela continuar depois disso
+        ultima_acao = (None, 0)
+        mfa_desde = None
+        
+        # Navegações acordam a máquina na hora, sem esperar o intervalo
+        navegou = asyncio.Event()
+        ao_navegar = lambda frame: navegou.set()
         try:
-            self.log_status("🔐 Iniciando login automático...")
-            
-            if not self.email or not self.senha:
-                self.log_status("❌ Email ou senha não fornecidos", "error")
-                return False
-            
-            # Aguardar página carregar
-            self.log_status("⏳ Aguardando página carregar...")
-            await asyncio.sleep(3)
-            
-            # Verificar se já estamos logados
-            try:
-                submissao_btn = await self.page.query_selector('button:has-text("Submissão de Laudos")')
-                if submissao_btn:
-                    self.log_status("✅ Usuário já está logado!", "success")
-                    return True
-            except:
-                pass
-            
-            # PASSO 1: Clicar no botão específico //*[@id="__next"]/div[1]/div[2]/button
-            self.log_status("�️ Clicando no botão de login inicial...")
-            try:
-                login_btn_xpath = '//*[@id="__next"]/div[1]/div[2]/button'
-                login_btn = await self.page.wait_for_selector(f'xpath={login_btn_xpath}', timeout=10000)
-                await login_btn.click()
-                self.log_status("✅ Botão de login inicial clicado")
-                await asyncio.sleep(2)
-            except Exception as e:
-                self.log_status(f"❌ Erro ao clicar no botão de login inicial: {str(e)}", "error")
-                return False
-            
-            # PASSO 2: Aguardar tela de email aparecer e preencher
-            self.log_status("📧 Aguardando tela de email aparecer...")
-            try:
-                # Múltiplas estratégias para encontrar campo de email
-                email_selectors = [
-                    'input[type="email"]',
-                    'input[name="email"]',
-                    'input[name="loginfmt"]',  # Campo comum do Microsoft
-                    'input[placeholder*="email"]',
-                    'input[placeholder*="Email"]',
-                    'input[id*="email"]',
-                    '#i0116',  # ID comum do campo email Microsoft
-                    'input[type="text"]:first-of-type'
-                ]
-                
-                email_field = None
-                for selector in email_selectors:
-                    try:
-                        email_field = await self.page.wait_for_selector(selector, timeout=5000)
-                        if email_field:
-                            self.log_status(f"✅ Campo de email encontrado: {selector}")
-                            break
-                    except:
-                        continue
-                
-                if not email_field:
-                    self.log_status("❌ Campo de email não encontrado", "error")
-                    return False
-                
-                await email_field.fill(self.email)
-                self.log_status(f"✅ Email preenchido: {self.email}")
-                
-                # Pressionar Enter após email
-                self.log_status("⌨️ Pressionando Enter após email...")
-                await self.page.keyboard.press('Enter')
-                await asyncio.sleep(3)
-                
-            except Exception as e:
-                self.log_status(f"❌ Erro ao preencher email: {str(e)}", "error")
-                return False
-            
-            # PASSO 3: Aguardar tela de senha aparecer e preencher
-            self.log_status("🔒 Aguardando tela de senha aparecer...")
-            try:
-                # Múltiplas estratégias para encontrar campo de senha
-                senha_selectors = [
-                    'input[type="password"]',
-                    'input[name="passwd"]',  # Campo comum do Microsoft
-                    'input[name="password"]',
-                    'input[id*="password"]',
-                    '#i0118',  # ID comum do campo senha Microsoft
-                    'input[placeholder*="senha"]',
-                    'input[placeholder*="password"]'
-                ]
+            self.page.on('framenavigated', ao_navegar)
+        except Exception:
+            ao_navegar = None
+        
+        try:
+            while time.monotonic() < limite:
+                tela, elemento = await self.identificar_tela_login()
+                agora = time.monotonic()
+                repetida = ultima_acao[0] == tela and agora - ultima_acao[1] < reacao_s
                 
-                senha_field = None
-                for selector in senha_selectors:
-                    try:
-                        senha_field = await self.page.wait_for_selector(selector, timeout=5000)
-                        if senha_field:
-                            self.log_status(f"✅ Campo de senha encontrado: {selector}")
-                            break
-                    except:
-                        continue
+                if tela == 'fenix':
+                    self.log_status(f"✅ Login realizado com sucesso em {agora - inicio:.1f}s!", "success")
+                    return True
                 
-                if not senha_field:
-                    self.log_status("❌ Campo de senha não encontrado", "error")
+                if tela == 'erro':
+                    mensagem = (await elemento.inner_text()).strip()
+                    self.log_status(f"❌ Login recusado: {mensagem}", "error")
                     return False
                 
-                await senha_field.fill(self.senha)
-                self.log_status("✅ Senha preenchida")
-                
-                # Pressionar Enter após senha
-                self.log_status("⌨️ Pressionando Enter após senha...")
-                await self.page.keyboard.press('Enter')
-                
-            except Exception as e:
-                self.log_status(f"❌ Erro ao preencher senha: {str(e)}", "error")
-                return False
-            
-            # PASSO 4: Aguardar 10 segundos para autenticação 2 fatores
-            self.log_status("🔐 Aguardando 10 segundos para autenticação 2 fatores...")
-            await asyncio.sleep(10)
-            
-            # PASSO 5: Verificar se aparece tela para guardar informações e pressionar Enter
-            self.log_status("💾 Verificando tela para guardar informações...")
-            try:
-                # Aguardar um pouco para a tela aparecer
-                await asyncio.sleep(3)
-                
-                # Pressionar Enter para aceitar guardar informações
-                self.log_status("⌨️ Pressionando Enter para guardar informações...")
-                await self.page.keyboard.press('Enter')
-                
-                # Aguardar redirecionamento final
-                await asyncio.sleep(5)
+                if tela == 'mfa':
+                    if mfa_desde is None:
+                        mfa_desde = agora
+                        limite = max(limite, agora + AUTOMATION_CONFIG['prazo_mfa_s'])
+                        aviso = "📱 Aguardando aprovação da autenticação de 2 fatores"
+                        if await elemento.get_attribute('id') == 'idRichContext_DisplaySign':
+                            aviso += f" (número {(await elemento.inner_text()).strip()})"
+                        self.log_status(f"{aviso}...", "warning")
+                elif tela is not None and not repetida:
+                    ultima_acao = (tela, agora)
+                    if tela == 'inicial':
+                        self.log_status("🖱️ Clicando no botão de login inicial...")
+                        await elemento.click()
+                    elif tela == 'email':
+                        await elemento.fill(self.email)
+                        self.log_status(f"✅ Email preenchido: {self.email}")
+                        await self.page.keyboard.press('Enter')
+                    elif tela == 'senha':
+                        await elemento.fill(self.senha)
+                        self.log_status("✅ Senha preenchida")
+                        await self.page.keyboard.press('Enter')
+                    elif tela == 'manter_conectado':
+                        self.log_status("💾 Aceitando manter a sessão conectada...")
+                        await self.page.keyboard.press('Enter')
                 
-            except Exception as e:
-                self.log_status(f"⚠️ Possível erro ao guardar informações: {str(e)}", "warning")
-            
-            # Aguardar login ser processado
-            self.log_status("⏳ Aguardando processamento do login...")
-            await asyncio.sleep(5)
-            
-            # Verificar se login foi bem-sucedido
-            success_selectors = [
-                'button:has-text("Submissão de Laudos")',
-                'text="Submissão de Laudos"',
-                'button:has-text("Laudos")',
-                'text="Dashboard"'
-            ]
-            
-            for selector in success_selectors:
+                navegou.clear()
                 try:
-                    success_element = await self.page.wait_for_selector(selector, timeout=15000)
-                    if success_element:
-                        self.log_status("✅ Login realizado com sucesso!", "success")
-                        return True
-                except:
-                    continue
+                    await asyncio.wait_for(navegou.wait(), timeout=intervalo)
+                except asyncio.TimeoutError:
+                    pass
             
-            self.log_status("❌ Login falhou - não foi possível verificar página principal", "error")
+            etapa = "aprovação do MFA" if mfa_desde is not None else "página principal"
+            self.log_status(f"❌ Login falhou - tempo esgotado aguardando {etapa}", "error")
             return False
                 
         except Exception as e:
             self.log_status(f"❌ Erro durante login automático: {str(e)}", "error")
             return False
+        
+        finally:
+            if ao_navegar is not None:
+                try:
+                    self.page.remove_listener('framenavigated', ao_navegar)
+                except Exception:
+                    pass
     
     async def verificar_estado_navegador(self):
         """Verifica se o navegador está responsivo e em que página estamos"""
@@ -519,6 +1093,15 @@ class FenixAutomation:
             self.log_status(f"❌ Navegador não está responsivo: {str(e)}")
             return False
 
+    async def pagina_responde(self, timeout_s=5):
+        """Teste rápido de página travada: o JavaScript da página responde em timeout_s?"""
+        try:
+            await asyncio.wait_for(self.page.evaluate('document.readyState'), timeout=timeout_s)
+        except Exception:
+            return False
+        self.retomar_esperas()
+        return True
+
     async def voltar_para_inicio(self):
         """Navega de volta para a página inicial se necessário"""
         try:
@@ -535,34 +1118,34 @@ class FenixAutomation:
                 await self.page.wait_for_selector('button:has-text("Submissão de Laudos")', timeout=3000)
                 self.log_status("✅ Já estamos na página inicial correta!")
                 return True
-            except:
+            except Exception:
                 # Não estamos na página inicial
                 pass
             
             # Se não estamos na página inicial, voltar
-            if "fenixflorestal.suzanonet.com.br" not in current_url or "upload" in current_url.lower() or "assinatura" in current_url.lower():
+            if not current_url.startswith(FENIX_URL) or "upload" in current_url.lower() or "assinatura" in current_url.lower():
                 self.log_status("🔄 Navegando de volta para a página inicial...")
-                await self.page.goto("https://fenixflorestal.suzanonet.com.br/")
-                await asyncio.sleep(2)
+                await self.page.goto(FENIX_URL)
+                await self.pausa(2)
                 
                 # Verificar se chegamos na página inicial
                 try:
                     await self.page.wait_for_selector('button:has-text("Submissão de Laudos")', timeout=15000)
                     self.log_status("✅ Página inicial carregada com sucesso!")
                     return True
-                except:
+                except Exception:
                     self.log_status("⚠️ Botão 'Submissão de Laudos' ainda não encontrado após navegar...")
                     
                     # Tentar recarregar a página
                     self.log_status("🔄 Tentando recarregar a página...")
                     await self.page.reload()
-                    await asyncio.sleep(2)
+                    await self.pausa(2)
                     
                     try:
                         await self.page.wait_for_selector('button:has-text("Submissão de Laudos")', timeout=15000)
                         self.log_status("✅ Página inicial carregada após recarregar!")
                         return True
-                    except:
+                    except Exception:
                         self.log_status("❌ Não foi possível carregar a página inicial corretamente")
                         return False
             
@@ -573,7 +1156,50 @@ class FenixAutomation:
             return False
 
     async def navegar_para_upload(self):
-        """Navega para a seção de upload de laudos"""
+        """
+        Abre o Upload de Laudos: direto pelo endereço já aprendido, com uma
+        única conferência do formulário, ou pelo menu na primeira vez (e
+        sempre que o link direto falhar)
+        """
+        url = CACHE_NAVEGACAO['url_upload']
+        if AUTOMATION_CONFIG['link_direto_upload'] and url:
+            if await self.ir_direto_para_upload(url):
+                return True
+            self.log_status("⚠️ Link direto do Upload de Laudos falhou, navegando pelo menu...", "warning")
+            CACHE_NAVEGACAO['url_upload'] = None
+        
+        if not await self.navegar_pelo_menu():
+            return False
+        await self.aprender_url_upload()
+        return True
+    
+    async def ir_direto_para_upload(self, url):
+        """goto no endereço do Upload de Laudos e espera o formulário"""
+        try:
+            await self.page.goto(url, wait_until='domcontentloaded')
+            await self.page.wait_for_selector(SELETOR_FORMULARIO_UPLOAD, timeout=10000)
+            self.log_status("✅ Upload de Laudos aberto pelo link direto", "success")
+            return True
+        except PrazoEsgotado:
+            raise
+        except Exception:
+            return False
+    
+    async def aprender_url_upload(self):
+        """Guarda o endereço da página se o formulário do upload estiver nela"""
+        if not AUTOMATION_CONFIG['link_direto_upload'] or CACHE_NAVEGACAO['url_upload']:
+            return
+        try:
+            url = self.page.url
+            if url.rstrip('/') == FENIX_URL.rstrip('/') or not await self.page.query_selector(SELETOR_FORMULARIO_UPLOAD):
+                return  # Mesma URL da página inicial: não há link direto
+        except Exception:
+            return
+        CACHE_NAVEGACAO['url_upload'] = url
+        self.log_status(f"🔗 Endereço do Upload de Laudos memorizado: {url}")
+    
+    async def navegar_pelo_menu(self):
+        """Navega para a seção de upload de laudos pelo menu do portal"""
         try:
             self.log_status("📁 Navegando para 'Submissão de Laudos'...")
             
@@ -586,7 +1212,7 @@ class FenixAutomation:
                 raise Exception("Não foi possível navegar para a página inicial")
             
             # CORREÇÃO: Aguardar página carregar antes de procurar elementos
-            await asyncio.sleep(2)
+            await self.pausa(2)
             
             # Verificar se já estamos na página de upload
             try:
@@ -594,7 +1220,7 @@ class FenixAutomation:
                 await self.page.wait_for_selector('text="Upload de Laudos"', timeout=3000)
                 self.log_status("✅ Já na página de upload!", "success")
                 return True
-            except:
+            except Exception:
                 # Não estamos na página de upload, precisamos navegar
                 pass
             
@@ -625,12 +1251,12 @@ class FenixAutomation:
                 # CORREÇÃO: Tentar uma última vez com recarregamento da página
                 self.log_status("🔄 Última tentativa - recarregando página...")
                 await self.page.reload()
-                await asyncio.sleep(2)
+                await self.pausa(2)
                 
                 try:
                     submissao_btn = await self.page.wait_for_selector('button:has-text("Submissão de Laudos")', timeout=10000)
                     self.log_status("✅ Botão encontrado após recarregar página!")
-                except:
+                except Exception:
                     # Debug: Mostrar todos os botões disponíveis
                     try:
                         buttons = await self.page.query_selector_all('button')
@@ -638,13 +1264,13 @@ class FenixAutomation:
                         for idx, btn in enumerate(buttons[:5]):  # Mostrar apenas os primeiros 5
                             text = await btn.text_content()
                             self.log_status(f"   Botão {idx+1}: '{text[:30]}'")
-                    except:
+                    except Exception:
                         pass
                     raise Exception("Botão 'Submissão de Laudos' não encontrado mesmo após recarregar")
             
             # Clicar em "Submissão de Laudos"
             await submissao_btn.click()
-            await asyncio.sleep(2)  # Aguardar menu expandir
+            await self.pausa(2)  # Aguardar menu expandir
             
             # Múltiplas estratégias para encontrar "Upload de Laudos"
             self.log_status("📤 Clicando em 'Upload de Laudos'...")
@@ -672,14 +1298,14 @@ class FenixAutomation:
                 raise Exception("Link 'Upload de Laudos' não encontrado com nenhum seletor")
             
             await upload_link.click()
-            await asyncio.sleep(2)
+            await self.pausa(2)
             
             # Validar se chegamos na página correta
             try:
                 await self.page.wait_for_selector('text="Upload de Laudos"', timeout=5000)
                 self.log_status("✅ Página de upload carregada!", "success")
                 return True
-            except:
+            except Exception:
                 self.log_status("⚠️ Não foi possível confirmar se a página de upload carregou", "warning")
                 return True  # Assumir que funcionou para continuar
             
@@ -696,9 +1322,9 @@ class FenixAutomation:
                 # Tentar recuperação se estivermos em uma página inesperada
                 if "assinatura" in current_url.lower() or "finalizado" in current_url.lower():
                     self.log_status("🔄 Detectada página de finalização, tentando voltar ao início...")
-                    await self.page.goto("https://fenixflorestal.suzanonet.com.br/")
-                    await asyncio.sleep(2)
-                    return await self.navegar_para_upload()  # Tentar novamente recursivamente
+                    await self.page.goto(FENIX_URL)
+                    await self.pausa(2)
+                    return await self.navegar_pelo_menu()  # Tentar novamente recursivamente
                     
             except Exception as diag_error:
                 self.log_status(f"⚠️ Erro no diagnóstico: {str(diag_error)}", "warning")
@@ -746,38 +1372,31 @@ class FenixAutomation:
             else:
                 self.log_status(f"⚠️ ups_nucleo não é um DataFrame válido", "warning")
             
-            # Campo Solicitante (preencher com "Geocat")
-            self.log_status("✏️ Preenchendo Solicitante: Geocat")
-            try:
-                solicitante_input = await self.page.wait_for_selector('xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/div/div/form/div[1]/div[1]/div/div/div[1]/div/div/input', timeout=5000)
-                await solicitante_input.fill("Geocat")
-            except:
-                self.log_status("⚠️ Campo Solicitante não encontrado ou já preenchido", "warning")
-            
-            # Campo Data de Visita Campo - usando xpath mais específico
-            self.log_status(f"✏️ Preenchendo Data de Visita: {data_atual}")
-            try:
-                # Tentar primeiro por placeholder
-                visita_campo = await self.page.wait_for_selector('input[placeholder="Data da visita de campo"]', timeout=5000)
-                await visita_campo.fill(data_atual)
-            except:
-                # Se falhar, usar xpath
-                visita_campo = await self.page.wait_for_selector('xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/div/div/form/div[1]/div[1]/div/div/div[2]/div[2]/div/div/div/input', timeout=5000)
-                await visita_campo.fill(data_atual)
+            # Solicitante ("Geocat") e Data de Visita: em lote; o que não confirmar vai campo a campo
+            self.log_status(f"✏️ Preenchendo Solicitante: Geocat | Data de Visita: {data_atual}")
+            pendentes = await self.preencher_campos_em_lote([
+                ("Solicitante", "Geocat", SELETORES_SOLICITANTE),
+                ("Data de Visita", data_atual, SELETORES_DATA_VISITA),
+            ])
+            for campo_nome, valor, seletores in pendentes:
+                if not await self.preencher_campo(seletores, valor):
+                    if campo_nome == "Data de Visita":
+                        raise Exception("Campo Data de Visita não encontrado")
+                    self.log_status("⚠️ Campo Solicitante não encontrado ou já preenchido", "warning")
             
             # Dropdown UNF - logo após Visita Campo
             self.log_status(f"✏️ Selecionando UNF: {unf}")
-            await self.selecionar_unf(unf)
+            await self.executar_com_disjuntor('selecionar_unf', self.selecionar_unf(unf))
             
             # Dropdown Urgência (sempre "Média") - xpath correto
             self.log_status("✏️ Selecionando Urgência: Média")
             try:
                 urgencia_dropdown = await self.page.wait_for_selector('xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/div/div/form/div[1]/div[1]/div/div/div[6]/div[1]/div/div/div', timeout=5000)
                 await urgencia_dropdown.click()
-                await asyncio.sleep(1)
+                await self.pausa(1)
                 media_option = await self.page.wait_for_selector('text="Média"', timeout=3000)
                 await media_option.click()
-            except:
+            except Exception:
                 self.log_status("⚠️ Campo Urgência não encontrado, continuando...", "warning")
             
             # Dropdown Tipo Ocorrência (sempre "Sinistro") - usando xpath específico
@@ -786,12 +1405,12 @@ class FenixAutomation:
                 # Tentar clicar no dropdown usando xpath
                 tipo_dropdown = await self.page.wait_for_selector('xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/div/div/form/div[1]/div[1]/div/div/div[6]/div[2]/div/div/div', timeout=5000)
                 await tipo_dropdown.click()
-                await asyncio.sleep(1)
+                await self.pausa(1)
                 
                 # Selecionar "Sinistro" do dropdown
                 sinistro_option = await self.page.wait_for_selector('text="Sinistro"', timeout=3000)
                 await sinistro_option.click()
-                await asyncio.sleep(1)
+                await self.pausa(1)
             except Exception as e:
                 self.log_status(f"⚠️ Erro ao selecionar Tipo Ocorrência: {str(e)}", "warning")
             
@@ -808,7 +1427,7 @@ class FenixAutomation:
             self.log_status(f"🔍 Iniciando seleção UNF: {unf}")
             
             # Aguardar um pouco para garantir que a página carregou
-            await asyncio.sleep(1)
+            await self.pausa(1)
             
             # Múltiplos seletores baseados no DOM fornecido
             seletores_dropdown = [
@@ -843,6 +1462,8 @@ class FenixAutomation:
                             break
                         else:
                             self.log_status(f"⚠️ Dropdown encontrado mas não visível (tentativa {i+1})")
+                except PrazoEsgotado:
+                    raise  # Página travada ou prazo: não é falha do portal
                 except Exception as e:
                     self.log_status(f"⚠️ Tentativa {i+1} falhou: {str(e)[:50]}...")
                     continue
@@ -853,7 +1474,7 @@ class FenixAutomation:
             
             # Scroll para garantir que o elemento está visível
             await dropdown_element.scroll_into_view_if_needed()
-            await asyncio.sleep(0.5)
+            await self.pausa(0.5)
             
             # Debug: Mostrar informações do elemento encontrado
             try:
@@ -868,13 +1489,15 @@ class FenixAutomation:
                     }
                 """)
                 self.log_status(f"🔍 Debug elemento: {element_info['tagName']}, classes: {element_info['className'][:50]}")
-            except:
+            except PrazoEsgotado:
+                raise
+            except Exception:
                 pass
             
             # Clicar no dropdown para abrir
             self.log_status("🖱️ Clicando no dropdown UNF...")
             await dropdown_element.click()
-            await asyncio.sleep(1.5)  # Aguardo maior para dropdown abrir
+            await self.pausa(1.5)  # Aguardo maior para dropdown abrir
             
             # Verificar se o dropdown abriu
             try:
@@ -883,7 +1506,9 @@ class FenixAutomation:
                     self.log_status("✅ Menu UNF aberto com sucesso")
                 else:
                     self.log_status("⚠️ Menu pode não ter aberto")
-            except:
+            except PrazoEsgotado:
+                raise
+            except Exception:
                 self.log_status("⚠️ Timeout aguardando menu abrir, continuando...")
             
             # Procurar pela opção do UNF com múltiplas estratégias
@@ -914,6 +1539,8 @@ class FenixAutomation:
                             break
                         else:
                             self.log_status(f"⚠️ Opção encontrada mas não visível (tentativa {i+1})")
+                except PrazoEsgotado:
+                    raise
                 except Exception as e:
                     self.log_status(f"⚠️ Tentativa {i+1} falhou: {str(e)[:50]}...")
                     continue
@@ -929,14 +1556,16 @@ class FenixAutomation:
                             self.log_status(f"   Opção {idx+1}: '{texto}'")
                     else:
                         self.log_status("⚠️ Nenhuma opção encontrada no dropdown")
-                except:
+                except PrazoEsgotado:
+                    raise
+                except Exception:
                     pass
                 
                 self.log_status(f"❌ Opção '{unf}' não encontrada no dropdown UNF", "error")
                 return False
             
             # Aguardar seleção ser aplicada
-            await asyncio.sleep(1)
+            await self.pausa(1)
             
             # Validar se a seleção foi aplicada
             try:
@@ -953,10 +1582,16 @@ class FenixAutomation:
                 else:
                     self.log_status("⚠️ Não foi possível validar a seleção", "warning")
                     return True  # Assumir sucesso se não conseguir validar
+            except PrazoEsgotado:
+                raise
             except Exception as e:
                 self.log_status(f"⚠️ Erro na validação: {str(e)}", "warning")
                 return True  # Assumir sucesso se não conseguir validar
                 
+        except PrazoEsgotado:
+                
+            raise
+                
         except Exception as e:
             self.log_status(f"❌ Erro ao selecionar UNF: {str(e)}", "error")
             return False
@@ -982,14 +1617,13 @@ class FenixAutomation:
                 ("Considerações Finais", TEXTOS_PADRAO['consideracoes_finais'], 'textarea[name="consideracoesFinais"]')
             ]
             
-            for campo_nome, texto, selector in campos:
+            # Os quatro textos em um único script; o que não confirmar vai campo a campo
+            pendentes = await self.preencher_campos_em_lote(
+                [(campo_nome, texto, [selector]) for campo_nome, texto, selector in campos])
+            for campo_nome, texto, seletores in pendentes:
                 self.log_status(f"📝 Preenchendo {campo_nome}...")
-                try:
-                    campo = await self.page.wait_for_selector(selector, timeout=5000)
-                    await campo.fill(texto)
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    self.log_status(f"⚠️ Erro ao preencher {campo_nome}: {str(e)}", "warning")
+                if not await self.preencher_campo(seletores, texto):
+                    self.log_status(f"⚠️ Erro ao preencher {campo_nome}", "warning")
             
             self.log_status("✅ Campos de texto preenchidos!", "success")
             return True
@@ -998,6 +1632,45 @@ class FenixAutomation:
             self.log_status(f"❌ Erro geral ao preencher campos de texto: {str(e)}", "error")
             return False
     
+    async def preencher_campos_em_lote(self, campos):
+        """
+        Preenche inputs e textareas simples em um único page.evaluate
+        (SCRIPT_PREENCHER_CAMPOS) e confere tudo com uma única leitura.
+        
+        Args:
+            campos: lista de (nome, valor, seletores)
+        
+        Returns:
+            Campos não confirmados, para o preenchimento campo a campo
+        """
+        try:
+            usados = await self.esperar_pagina(self.page.evaluate(
+                SCRIPT_PREENCHER_CAMPOS, [{'seletores': seletores, 'valor': valor} for _, valor, seletores in campos]))
+            lidos = await self.esperar_pagina(self.page.evaluate(SCRIPT_LER_CAMPOS, usados))
+        except PrazoEsgotado:
+            raise
+        except Exception as e:
+            self.log_status(f"⚠️ Preenchimento em lote indisponível: {str(e)[:80]}", "warning")
+            return list(campos)
+        
+        pendentes = [campo for campo, lido in zip(campos, lidos)
+                     if lido is None or lido.replace('\r\n', '\n') != campo[1].replace('\r\n', '\n')]
+        self.log_status(f"⚡ {len(campos) - len(pendentes)}/{len(campos)} campos preenchidos em lote")
+        return pendentes
+    
+    async def preencher_campo(self, seletores, valor, timeout=5000):
+        """Preenche um campo com fill(), tentando os seletores em ordem"""
+        for seletor in seletores:
+            try:
+                campo = await self.page.wait_for_selector(seletor, timeout=timeout)
+                await campo.fill(valor)
+                return True
+            except PrazoEsgotado:
+                raise
+            except Exception:
+                continue
+        return False
+    
     async def limpar_campo_up_avaliada(self, up_index):
         """Limpa o campo UP avaliada após falha para preparar próxima tentativa"""
         try:
@@ -1005,13 +1678,14 @@ class FenixAutomation:
             
             # Primeiro tentar fechar qualquer dropdown aberto
             await self.page.keyboard.press('Escape')
-            await asyncio.sleep(0.5)
+            await self.pausa(0.5)
             
             # NOVA ABORDAGEM: Múltiplos seletores baseados na estrutura HTML real
             selectors_up_limpar = [
                 f'xpath=(//fieldset//div[contains(@class, "flex") and contains(@class, "flex-col") and contains(@class, "lg:flex-row")])[{up_index + 1}]//span[contains(text(), "UP avaliada:")]/following::div[1]//div[contains(@class, "css-1ek14t9-control")]',
                 f'xpath=//input[@name="sinistros[{up_index}].idade"]/ancestor::div[contains(@class, "flex-col") and contains(@class, "lg:flex-row")]//span[contains(text(), "UP avaliada:")]/following::div[1]//div[contains(@class, "control")]',
-                f'xpath=(//*[contains(text(), "UP avaliada:")]/following::div[contains(@class, "control")])[{up_index + 1}]'
+                # Rótulo da própria linha (contar os controles no documento todo cai nos campos de outras linhas)
+                f'xpath=(//*[contains(text(), "UP avaliada:")])[{up_index + 1}]/following::div[1]//div[contains(@class, "control")]'
             ]
             
             # Tentar encontrar e clicar no botão de limpar (X)
@@ -1033,12 +1707,12 @@ class FenixAutomation:
                             try:
                                 clear_button = await self.page.wait_for_selector(clear_selector, timeout=1000)
                                 await clear_button.click()
-                                await asyncio.sleep(0.5)
+                                await self.pausa(0.5)
                                 self.log_status(f"✅ Campo UP avaliada limpo")
                                 return
-                            except:
+                            except Exception:
                                 continue
-                except:
+                except Exception:
                     continue
             
             # Se não conseguiu limpar com o botão X, tentar método alternativo
@@ -1046,17 +1720,17 @@ class FenixAutomation:
                 try:
                     up_dropdown = await self.page.wait_for_selector(selector, timeout=2000)
                     await up_dropdown.click()
-                    await asyncio.sleep(0.5)
+                    await self.pausa(0.5)
                     
                     # Selecionar tudo e deletar
                     await self.page.keyboard.press('Control+a')
-                    await asyncio.sleep(0.2)
+                    await self.pausa(0.2)
                     await self.page.keyboard.press('Delete')
-                    await asyncio.sleep(0.5)
+                    await self.pausa(0.5)
                     
                     # Fechar dropdown
                     await self.page.keyboard.press('Escape')
-                    await asyncio.sleep(0.5)
+                    await self.pausa(0.5)
                     
                     self.log_status(f"✅ Campo UP avaliada limpo (método alternativo)")
                     return
@@ -1068,19 +1742,50 @@ class FenixAutomation:
             self.log_status(f"⚠️ Não foi possível limpar campo UP avaliada com nenhum método", "warning")
             # Pelo menos tentar fechar dropdown
             await self.page.keyboard.press('Escape')
-            await asyncio.sleep(0.5)
+            await self.pausa(0.5)
                 
         except Exception as e:
             self.log_status(f"⚠️ Erro ao limpar campo UP avaliada: {str(e)}", "warning")
             # Garantir que dropdown seja fechado
             try:
                 await self.page.keyboard.press('Escape')
-                await asyncio.sleep(0.5)
-            except:
+                await self.pausa(0.5)
+            except Exception:
                 pass
 
-    async def processar_up(self, up_data, up_index=0):
-        """Processa uma UP individual na Matriz de Decisão"""
+    @staticmethod
+    def seletores_recomendacao_pct(up_index):
+        """Seletores do campo Recomendação (%) da linha, baseados na estrutura HTML real"""
+        return [
+            f'xpath=(//fieldset//div[contains(@class, "flex") and contains(@class, "flex-col") and contains(@class, "lg:flex-row")])[{up_index + 1}]//span[contains(text(), "Recomendação(%)")]/following::div[1]//input',
+            f'xpath=//input[@name="sinistros[{up_index}].idade"]/ancestor::div[contains(@class, "flex-col") and contains(@class, "lg:flex-row")]//span[contains(text(), "Recomendação(%)")]/following::div[1]//input',
+            f'xpath=(//*[contains(text(), "Recomendação(%)")]/following::input)[{up_index + 1}]'
+        ]
+    
+    async def localizar_campo_recomendacao_pct(self, up_index):
+        """Procura o campo Recomendação (%) da linha; None se nenhum seletor funcionar"""
+        for i, selector in enumerate(self.seletores_recomendacao_pct(up_index)):
+            try:
+                self.log_status(f"🔍 Tentativa {i+1} Recomendação %: {selector[:60]}...")
+                recomendacao_input = await self.page.wait_for_selector(selector, timeout=3000)
+                if recomendacao_input:
+                    self.log_status(f"✅ Seletor Recomendação % funcionou na tentativa {i+1}")
+                    return recomendacao_input
+            except PrazoEsgotado:
+                raise
+            except Exception as e:
+                self.log_status(f"⚠️ Tentativa {i+1} falhou: {str(e)[:50]}...")
+                continue
+        return None
+    
+    async def processar_up(self, up_data, up_index=0, reposicao=False):
+        """
+        Processa uma UP individual na Matriz de Decisão.
+
+        Com reposicao=True (linha já lançada, refeita pela recuperação do
+        laudo) a Recomendação (%) fica para o preenchimento em lote de quem
+        chamou e a UP não entra de novo nas estatísticas.
+        """
         try:
             self.log_status(f"📍 Processando UP: {up_data['UP']} na LINHA {up_index + 1} da matriz")
             self.log_status(f"🔢 Índice técnico: {up_index} (linha {up_index + 1} visualmente)")
@@ -1089,7 +1794,7 @@ class FenixAutomation:
             try:
                 # Primeiro, garantir que qualquer dropdown aberto seja fechado
                 await self.page.keyboard.press('Escape')
-                await asyncio.sleep(0.5)
+                await self.pausa(0.5)
                 
                 # VALIDAÇÃO PRÉVIA: Verificar se a linha já tem dados preenchidos
                 try:
@@ -1107,9 +1812,9 @@ class FenixAutomation:
                                     self.log_status(f"⚠️ ATENÇÃO: Linha {up_index + 1} já contém UP '{existing_up_text}'!", "warning")
                                     self.log_status(f"🚨 Possível sobreposição detectada - essa linha deveria estar vazia", "warning")
                                     break
-                        except:
+                        except Exception:
                             continue
-                except:
+                except Exception:
                     pass
                 
                 # NOVA ABORDAGEM: Usar estrutura HTML real baseada na posição das linhas
@@ -1122,10 +1827,10 @@ class FenixAutomation:
                     f'xpath=(//fieldset/div/div[contains(@class, "flex") and contains(@class, "flex-col") and contains(@class, "lg:flex-row")])[{up_index + 1}]//span[contains(text(), "UP avaliada:")]/following::div[1]//div[contains(@class, "control")]',
                     # Usando o padrão do name do input "idade" como referência (sinistros[0], sinistros[1], etc.)
                     f'xpath=//input[@name="sinistros[{up_index}].idade"]/ancestor::div[contains(@class, "flex-col") and contains(@class, "lg:flex-row")]//span[contains(text(), "UP avaliada:")]/following::div[1]//div[contains(@class, "control")]',
-                    # Seletor baseado na ordem absoluta dos campos UP avaliada
-                    f'xpath=(//*[contains(text(), "UP avaliada:")]/following::div[contains(@class, "control")])[{up_index + 1}]',
+                    # Seletor baseado na ordem absoluta dos rótulos UP avaliada
+                    f'xpath=(//*[contains(text(), "UP avaliada:")])[{up_index + 1}]/following::div[1]//div[contains(@class, "control")]',
                     # Fallback: se for a primeira linha (índice 0), usar o primeiro campo disponível vazio
-                    'xpath=//span[contains(text(), "UP avaliada:")]/following::div[1]//div[contains(@class, "control") and not(.//div[contains(@class, "singleValue")])]' if up_index == 0 else f'xpath=(//*[contains(text(), "UP avaliada:")]/following::div[contains(@class, "control")])[{up_index + 1}]'
+                    'xpath=//span[contains(text(), "UP avaliada:")]/following::div[1]//div[contains(@class, "control") and not(.//div[contains(@class, "singleValue")])]' if up_index == 0 else f'xpath=(//*[contains(text(), "UP avaliada:")])[{up_index + 1}]/following::div[1]//div[contains(@class, "control")]'
                 ]
                 
                 up_dropdown = None
@@ -1152,7 +1857,7 @@ class FenixAutomation:
                     existing_value_selectors = [
                         f'xpath=(//fieldset//div[contains(@class, "flex") and contains(@class, "flex-col") and contains(@class, "lg:flex-row")])[{up_index + 1}]//span[contains(text(), "UP avaliada:")]/following::div[1]//div[contains(@class, "singleValue")]',
                         f'xpath=//input[@name="sinistros[{up_index}].idade"]/ancestor::div[contains(@class, "flex-col") and contains(@class, "lg:flex-row")]//span[contains(text(), "UP avaliada:")]/following::div[1]//div[contains(@class, "singleValue")]',
-                        f'xpath=(//*[contains(text(), "UP avaliada:")]/following::div[contains(@class, "singleValue")])[{up_index + 1}]'
+                        f'xpath=(//*[contains(text(), "UP avaliada:")])[{up_index + 1}]/following::div[1]//div[contains(@class, "singleValue")]'
                     ]
                     
                     existing_value = None
@@ -1161,7 +1866,7 @@ class FenixAutomation:
                             existing_value = await self.page.query_selector(val_selector)
                             if existing_value:
                                 break
-                        except:
+                        except Exception:
                             continue
                     
                     if existing_value:
@@ -1176,22 +1881,22 @@ class FenixAutomation:
                             try:
                                 clear_button = await self.page.wait_for_selector(clear_selector, timeout=2000)
                                 await clear_button.click()
-                                await asyncio.sleep(1)
+                                await self.pausa(1)
                                 self.log_status(f"🧹 Campo UP avaliada linha {up_index + 1} limpo")
                                 cleared = True
                                 break
-                            except:
+                            except Exception:
                                 continue
                         
                         if not cleared:
                             # Se não conseguir limpar, pelo menos registrar
                             self.log_status(f"⚠️ Campo UP avaliada linha {up_index + 1} tem conteúdo mas não foi possível limpar", "warning")
-                except:
+                except Exception:
                     pass
                 
                 # Clicar no dropdown para abrir
                 await up_dropdown.click()
-                await asyncio.sleep(1)
+                await self.pausa(1)
                 
                 # NOVA ABORDAGEM: Digitar o valor da UP para filtrar as opções
                 up_value = str(up_data["UP"])
@@ -1199,12 +1904,12 @@ class FenixAutomation:
                 
                 # Digitar o valor da UP no campo de busca do dropdown
                 await self.page.keyboard.type(up_value)
-                await asyncio.sleep(2)  # Aguardar o filtro funcionar
+                await self.pausa(2)  # Aguardar o filtro funcionar
                 
                 # Tentar selecionar o primeiro item que aparecer
                 try:
                     # Aguardar opções aparecerem após digitação
-                    await asyncio.sleep(1)
+                    await self.pausa(1)
                     
                     # PRIMEIRO: Verificar se existe "Nenhum Resultado"
                     nenhum_resultado_selectors = [
@@ -1224,14 +1929,15 @@ class FenixAutomation:
                                 self.log_status(f"❌ UP não encontrada: '{result_text}'", "warning")
                                 nenhum_resultado_encontrado = True
                                 break
-                        except:
+                        except Exception:
                             continue
                     
                     if nenhum_resultado_encontrado:
+                        self.emitir_evento('anomalia', tipo='nenhum_resultado', up=up_value)
                         self.log_status(f"🚫 UP '{up_value}' não existe no sistema - pulando para próxima", "warning")
                         # Pressionar Escape para fechar dropdown
                         await self.page.keyboard.press('Escape')
-                        await asyncio.sleep(1)
+                        await self.pausa(1)
                         
                         # Limpar o campo para reutilizar na próxima UP
                         await self.limpar_campo_up_avaliada(up_index)
@@ -1254,9 +1960,10 @@ class FenixAutomation:
                                 
                                 # Verificar se não é mensagem de "Nenhum resultado"
                                 if "nenhum" in option_text.lower() or "no result" in option_text.lower():
+                                    self.emitir_evento('anomalia', tipo='nenhum_resultado', up=up_value)
                                     self.log_status(f"🚫 UP '{up_value}' não encontrada - mensagem: '{option_text}'", "warning")
                                     await self.page.keyboard.press('Escape')
-                                    await asyncio.sleep(1)
+                                    await self.pausa(1)
                                     await self.limpar_campo_up_avaliada(up_index)
                                     return False
                                 
@@ -1265,22 +1972,22 @@ class FenixAutomation:
                                 self.log_status(f"✅ Opção selecionada: '{option_text}'")
                                 option_selected = True
                                 break
-                        except:
+                        except Exception:
                             continue
                     
                     if not option_selected:
                         self.log_status(f"⚠️ Nenhuma opção encontrada após digitar '{up_value}'", "warning")
                         # Tentar pressionar Enter como fallback
                         await self.page.keyboard.press('Enter')
-                        await asyncio.sleep(1)
+                        await self.pausa(1)
                     
-                    await asyncio.sleep(2)  # Aguardar o campo ser preenchido
+                    await self.pausa(2)  # Aguardar o campo ser preenchido
                     
                 except Exception as selection_error:
                     self.log_status(f"⚠️ Erro ao selecionar opções: {str(selection_error)}", "warning")
                     # Tentar pressionar Escape para fechar o dropdown
                     await self.page.keyboard.press('Escape')
-                    await asyncio.sleep(1)
+                    await self.pausa(1)
                 
                 # VALIDAÇÃO CRÍTICA: Verificar se o campo foi realmente preenchido
                 try:
@@ -1288,7 +1995,7 @@ class FenixAutomation:
                     validation_selectors = [
                         f'xpath=(//fieldset//div[contains(@class, "flex") and contains(@class, "flex-col") and contains(@class, "lg:flex-row")])[{up_index + 1}]//span[contains(text(), "UP avaliada:")]/following::div[1]//div[contains(@class, "singleValue")]',
                         f'xpath=//input[@name="sinistros[{up_index}].idade"]/ancestor::div[contains(@class, "flex-col") and contains(@class, "lg:flex-row")]//span[contains(text(), "UP avaliada:")]/following::div[1]//div[contains(@class, "singleValue")]',
-                        f'xpath=(//*[contains(text(), "UP avaliada:")]/following::div[contains(@class, "singleValue")])[{up_index + 1}]'
+                        f'xpath=(//*[contains(text(), "UP avaliada:")])[{up_index + 1}]/following::div[1]//div[contains(@class, "singleValue")]'
                     ]
                     
                     # Tentar localizar o campo de valor com timeout menor
@@ -1378,29 +2085,29 @@ class FenixAutomation:
                 try:
                     # Clicar em área neutra para fechar dropdowns abertos
                     await self.page.click('body', position={'x': 10, 'y': 10})
-                    await asyncio.sleep(0.5)
-                except:
+                    await self.pausa(0.5)
+                except Exception:
                     pass
                 
                 await tipo_dano_dropdown.click()
-                await asyncio.sleep(0.3)  # Reduzido de 1s para 0.3s
+                await self.pausa(0.3)  # Reduzido de 1s para 0.3s
                 
                 # DIAGNÓSTICO: Verificar quantos menus estão abertos
                 try:
                     all_menus = await self.page.query_selector_all('xpath=//div[contains(@class, "menu")]')
                     active_menus = await self.page.query_selector_all('xpath=//div[contains(@class, "menu") and @aria-hidden="false"]')
                     self.log_status(f"🔍 DIAGNÓSTICO: {len(all_menus)} menus total, {len(active_menus)} menus ativos")
-                except:
+                except Exception:
                     pass
                 
                 # Verificar se o dropdown abriu corretamente
                 try:
                     await self.page.wait_for_selector('xpath=//div[contains(@class, "menu")]', timeout=2000)
                     self.log_status(f"✅ Dropdown Tipo Dano aberto com sucesso")
-                except:
+                except Exception:
                     self.log_status(f"⚠️ Dropdown Tipo Dano pode não ter aberto, tentando novamente...")
                     await tipo_dano_dropdown.click()
-                    await asyncio.sleep(1)
+                    await self.pausa(1)
                 
                 # Mapear Ocorrência Predominante para Tipo Dano do sistema
                 dano_mapping = {
@@ -1419,7 +2126,7 @@ class FenixAutomation:
                 # CORREÇÃO CRÍTICA: Garantir que estamos selecionando a opção do dropdown correto
                 
                 # Aguardar um pouco para garantir que o dropdown está aberto
-                await asyncio.sleep(0.2)  # Reduzido de 1s para 0.2s
+                await self.pausa(0.2)  # Reduzido de 1s para 0.2s
                 
                 # Seletores mais específicos que garantem o contexto da UP atual
                 tipo_dano_option_selectors = [
@@ -1445,7 +2152,7 @@ class FenixAutomation:
                             if is_visible:
                                 # Scroll para o elemento se necessário
                                 await dano_option.scroll_into_view_if_needed()
-                                await asyncio.sleep(0.5)
+                                await self.pausa(0.5)
                                 
                                 # Obter texto da opção para validação
                                 option_text = await dano_option.inner_text()
@@ -1453,7 +2160,7 @@ class FenixAutomation:
                                 
                                 # Clicar na opção
                                 await dano_option.click()
-                                await asyncio.sleep(1)
+                                await self.pausa(1)
                                 
                                 self.log_status(f"✅ Tipo Dano selecionado: '{option_text}' (tentativa {i+1})")
                                 option_found = True
@@ -1469,7 +2176,7 @@ class FenixAutomation:
                     raise Exception(f"Não foi possível encontrar opção '{tipo_dano}' no dropdown")
                 
                 # CORREÇÃO: Aguardar seleção ser aplicada e validar
-                await asyncio.sleep(0.5)  # Reduzido de 2s para 0.5s
+                await self.pausa(0.5)  # Reduzido de 2s para 0.5s
                 
                 # VALIDAR se o Tipo Dano foi realmente selecionado
                 validation_selectors = [
@@ -1489,7 +2196,7 @@ class FenixAutomation:
                             break
                         else:
                             self.log_status(f"⚠️ VALIDAÇÃO: Campo mostra '{selected_text}', esperado '{tipo_dano}'", "warning")
-                    except:
+                    except Exception:
                         continue
                 
                 if not validation_ok:
@@ -1499,7 +2206,7 @@ class FenixAutomation:
                     # Tentar novamente com aguardo maior
                     try:
                         await tipo_dano_dropdown.click()
-                        await asyncio.sleep(1.5)  # Aguardo maior para dropdown abrir
+                        await self.pausa(1.5)  # Aguardo maior para dropdown abrir
                         
                         # Usar os mesmos seletores específicos
                         retry_selectors = [
@@ -1513,17 +2220,17 @@ class FenixAutomation:
                                 dano_option = await self.page.wait_for_selector(selector, timeout=3000)
                                 if await dano_option.is_visible():
                                     await dano_option.scroll_into_view_if_needed()
-                                    await asyncio.sleep(0.5)
+                                    await self.pausa(0.5)
                                     await dano_option.click()
-                                    await asyncio.sleep(3)  # Aguardo maior para confirmar seleção
+                                    await self.pausa(3)  # Aguardo maior para confirmar seleção
                                     self.log_status(f"🔄 Segunda tentativa de seleção do Tipo Dano realizada")
                                     break
-                            except:
+                            except Exception:
                                 continue
                     except Exception as retry_error:
                         self.log_status(f"❌ Falha na segunda tentativa: {str(retry_error)}", "error")
                         
-                await asyncio.sleep(1)
+                await self.pausa(1)
             except Exception as e:
                 self.log_status(f"❌ Erro ao selecionar Tipo Dano: {str(e)}", "error")
             
@@ -1555,24 +2262,24 @@ class FenixAutomation:
                 try:
                     # Clicar em área neutra para fechar dropdowns abertos
                     await self.page.click('body', position={'x': 10, 'y': 10})
-                    await asyncio.sleep(0.5)
-                except:
+                    await self.pausa(0.5)
+                except Exception:
                     pass
                     
                 await ocorrencia_dropdown.click()
-                await asyncio.sleep(0.3)  # Reduzido de 1s para 0.3s
+                await self.pausa(0.3)  # Reduzido de 1s para 0.3s
                 
                 # DIAGNÓSTICO: Verificar quantos menus estão abertos
                 try:
                     all_menus = await self.page.query_selector_all('xpath=//div[contains(@class, "menu")]')
                     active_menus = await self.page.query_selector_all('xpath=//div[contains(@class, "menu") and @aria-hidden="false"]')
                     self.log_status(f"🔍 DIAGNÓSTICO Ocorrência: {len(all_menus)} menus total, {len(active_menus)} menus ativos")
-                except:
+                except Exception:
                     pass
                 
                 # Múltiplos seletores para encontrar a primeira opção do dropdown
                 # CORREÇÃO CRÍTICA: Garantir que estamos no dropdown correto
-                await asyncio.sleep(0.2)  # Reduzido de 1s para 0.2s (Aguardar dropdown abrir completamente)
+                await self.pausa(0.2)  # Reduzido de 1s para 0.2s (Aguardar dropdown abrir completamente)
                 
                 option_selectors = [
                     # Opção 1: Buscar dentro do menu ativo (mais recente)
@@ -1600,7 +2307,7 @@ class FenixAutomation:
                                 
                                 # Scroll até o elemento se necessário
                                 await primeiro_item.scroll_into_view_if_needed()
-                                await asyncio.sleep(0.5)
+                                await self.pausa(0.5)
                                 
                                 await primeiro_item.click()
                                 self.log_status(f"✅ Primeira ocorrência selecionada: '{option_text}'")
@@ -1618,116 +2325,103 @@ class FenixAutomation:
                     self.log_status(f"⚠️ Usando fallback: pressionar Enter", "warning")
                     await self.page.keyboard.press('Enter')
                     
-                await asyncio.sleep(0.3)  # Reduzido de 1s para 0.3s
+                await self.pausa(0.3)  # Reduzido de 1s para 0.3s
             except Exception as e:
                 self.log_status(f"❌ Erro ao selecionar Ocorrência: {str(e)}", "error")
             
-            # 4. Preencher Recomendação (%) com incidência
-            try:
-                # NOVA ABORDAGEM: Múltiplos seletores baseados na estrutura HTML real
-                recomendacao_pct_selectors = [
-                    f'xpath=(//fieldset//div[contains(@class, "flex") and contains(@class, "flex-col") and contains(@class, "lg:flex-row")])[{up_index + 1}]//span[contains(text(), "Recomendação(%)")]/following::div[1]//input',
-                    f'xpath=//input[@name="sinistros[{up_index}].idade"]/ancestor::div[contains(@class, "flex-col") and contains(@class, "lg:flex-row")]//span[contains(text(), "Recomendação(%)")]/following::div[1]//input',
-                    f'xpath=(//*[contains(text(), "Recomendação(%)")]/following::input)[{up_index + 1}]'
-                ]
+            # 4. Preencher Recomendação (%) com incidência (na reposição, em lote por quem chamou)
+            if not reposicao:
+                try:
+                    # NOVA ABORDAGEM: Múltiplos seletores baseados na estrutura HTML real
+                    recomendacao_input = await self.executar_com_disjuntor(
+                        'campo_recomendacao_pct', self.localizar_campo_recomendacao_pct(up_index), valor_pulado=None
+                    )
                 
-                recomendacao_input = None
-                for i, selector in enumerate(recomendacao_pct_selectors):
-                    try:
-                        self.log_status(f"🔍 Tentativa {i+1} Recomendação %: {selector[:60]}...")
-                        recomendacao_input = await self.page.wait_for_selector(selector, timeout=3000)
-                        if recomendacao_input:
-                            self.log_status(f"✅ Seletor Recomendação % funcionou na tentativa {i+1}")
-                            break
-                    except Exception as e:
-                        self.log_status(f"⚠️ Tentativa {i+1} falhou: {str(e)[:50]}...")
-                        continue
+                    if not recomendacao_input:
+                        raise Exception("Nenhum seletor para 'Recomendação %' funcionou")
+                
+                    # CORREÇÃO: Formatar valor para campo input[type="number"]
+                    # Campos input[type="number"] precisam usar ponto (.) como separador decimal
+                    incidencia_valor = f"{up_data['Incidencia']:.2f}"
+                    self.log_status(f"📝 Preenchendo Recomendação % com: {incidencia_valor}%")
                 
-                if not recomendacao_input:
-                    raise Exception("Nenhum seletor para 'Recomendação %' funcionou")
-                
-                # CORREÇÃO: Formatar valor para campo input[type="number"]
-                # Campos input[type="number"] precisam usar ponto (.) como separador decimal
-                incidencia_valor = f"{up_data['Incidencia']:.2f}"
-                self.log_status(f"📝 Preenchendo Recomendação % com: {incidencia_valor}%")
-                
-                # Limpar campo primeiro e usar múltiplas estratégias de preenchimento
-                await recomendacao_input.click()
-                await asyncio.sleep(0.2)  # Reduzido de 0.5s para 0.2s
-                
-                # Estratégia 1: Limpar com Ctrl+A e preencher
-                await self.page.keyboard.press('Control+a')
-                await asyncio.sleep(0.1)  # Reduzido de 0.2s para 0.1s
-                await recomendacao_input.fill("")
-                await asyncio.sleep(0.1)  # Reduzido de 0.2s para 0.1s
-                await recomendacao_input.fill(incidencia_valor)
-                await asyncio.sleep(0.2)  # Reduzido de 0.5s para 0.2s
-                
-                # Estratégia 2: Se não funcionou, tentar com type()
-                field_check = await recomendacao_input.input_value()
-                if not field_check or field_check.strip() == "":
-                    self.log_status("⚠️ Fill() não funcionou, tentando type()...")
+                    # Limpar campo primeiro e usar múltiplas estratégias de preenchimento
                     await recomendacao_input.click()
+                    await self.pausa(0.2)  # Reduzido de 0.5s para 0.2s
+                
+                    # Estratégia 1: Limpar com Ctrl+A e preencher
                     await self.page.keyboard.press('Control+a')
-                    await asyncio.sleep(0.1)  # Reduzido de 0.2s para 0.1s
-                    await recomendacao_input.type(incidencia_valor)
-                    await asyncio.sleep(0.2)  # Reduzido de 0.5s para 0.2s
-                # VALIDAÇÃO: Verificar se o valor foi preenchido
-                try:
-                    field_value = await recomendacao_input.input_value()
-                    if field_value and field_value.strip():
-                        # Converter valores para comparação (aceitar tanto . quanto , como separador)
-                        field_normalized = field_value.replace(',', '.')
-                        expected_normalized = incidencia_valor.replace(',', '.')
-                        if abs(float(field_normalized) - float(expected_normalized)) < 0.01:
-                            self.log_status(f"✅ Recomendação % CONFIRMADA: {field_value}%", "success")
+                    await self.pausa(0.1)  # Reduzido de 0.2s para 0.1s
+                    await recomendacao_input.fill("")
+                    await self.pausa(0.1)  # Reduzido de 0.2s para 0.1s
+                    await recomendacao_input.fill(incidencia_valor)
+                    await self.pausa(0.2)  # Reduzido de 0.5s para 0.2s
+                
+                    # Estratégia 2: Se não funcionou, tentar com type()
+                    field_check = await recomendacao_input.input_value()
+                    if not field_check or field_check.strip() == "":
+                        self.log_status("⚠️ Fill() não funcionou, tentando type()...")
+                        await recomendacao_input.click()
+                        await self.page.keyboard.press('Control+a')
+                        await self.pausa(0.1)  # Reduzido de 0.2s para 0.1s
+                        await recomendacao_input.type(incidencia_valor)
+                        await self.pausa(0.2)  # Reduzido de 0.5s para 0.2s
+                    # VALIDAÇÃO: Verificar se o valor foi preenchido
+                    try:
+                        field_value = await recomendacao_input.input_value()
+                        if field_value and field_value.strip():
+                            # Converter valores para comparação (aceitar tanto . quanto , como separador)
+                            field_normalized = field_value.replace(',', '.')
+                            expected_normalized = incidencia_valor.replace(',', '.')
+                            if abs(float(field_normalized) - float(expected_normalized)) < 0.01:
+                                self.log_status(f"✅ Recomendação % CONFIRMADA: {field_value}%", "success")
+                            else:
+                                self.log_status(f"⚠️ Recomendação % valor divergente: esperado {incidencia_valor}%, obtido {field_value}%", "warning")
                         else:
-                            self.log_status(f"⚠️ Recomendação % valor divergente: esperado {incidencia_valor}%, obtido {field_value}%", "warning")
-                    else:
-                        # Estratégia 3: Última tentativa usando JavaScript direto no selector
-                        self.log_status("⚠️ Campo vazio, tentando JavaScript...")
-                        try:
-                            # Usar o primeiro selector que funcionou para localizar o elemento via JavaScript
-                            await self.page.evaluate(f'''
-                                () => {{
-                                    // Tentar encontrar o input pelo XPath ou CSS
-                                    let input = null;
+                            # Estratégia 3: Última tentativa usando JavaScript direto no selector
+                            self.log_status("⚠️ Campo vazio, tentando JavaScript...")
+                            try:
+                                # Usar o primeiro selector que funcionou para localizar o elemento via JavaScript
+                                await self.page.evaluate(f'''
+                                    () => {{
+                                        // Tentar encontrar o input pelo XPath ou CSS
+                                        let input = null;
                                     
-                                    // Tentar diferentes abordagens para encontrar o campo
-                                    const inputs = document.querySelectorAll('input[type="number"]');
-                                    for (let inp of inputs) {{
-                                        const span = inp.closest('div').previousElementSibling;
-                                        if (span && span.textContent.includes('Recomendação(%)')) {{
-                                            input = inp;
-                                            break;
+                                        // Tentar diferentes abordagens para encontrar o campo
+                                        const inputs = document.querySelectorAll('input[type="number"]');
+                                        for (let inp of inputs) {{
+                                            const span = inp.closest('div').previousElementSibling;
+                                            if (span && span.textContent.includes('Recomendação(%)')) {{
+                                                input = inp;
+                                                break;
+                                            }}
                                         }}
-                                    }}
                                     
-                                    if (input) {{
-                                        input.value = "{incidencia_valor}";
-                                        input.dispatchEvent(new Event('input', {{ bubbles: true }}));
-                                        input.dispatchEvent(new Event('change', {{ bubbles: true }}));
-                                        return true;
+                                        if (input) {{
+                                            input.value = "{incidencia_valor}";
+                                            input.dispatchEvent(new Event('input', {{ bubbles: true }}));
+                                            input.dispatchEvent(new Event('change', {{ bubbles: true }}));
+                                            return true;
+                                        }}
+                                        return false;
                                     }}
-                                    return false;
-                                }}
-                            ''')
-                            await asyncio.sleep(0.5)
+                                ''')
+                                await self.pausa(0.5)
                             
-                            # Verificar novamente
-                            final_check = await recomendacao_input.input_value()
-                            if final_check:
-                                self.log_status(f"✅ Recomendação % via JavaScript: {final_check}%", "success")
-                            else:
-                                self.log_status(f"❌ Falha total ao preencher Recomendação %", "error")
+                                # Verificar novamente
+                                final_check = await recomendacao_input.input_value()
+                                if final_check:
+                                    self.log_status(f"✅ Recomendação % via JavaScript: {final_check}%", "success")
+                                else:
+                                    self.log_status(f"❌ Falha total ao preencher Recomendação %", "error")
                                 
-                        except Exception as js_error:
-                            self.log_status(f"⚠️ Erro no JavaScript: {str(js_error)}", "warning")
+                            except Exception as js_error:
+                                self.log_status(f"⚠️ Erro no JavaScript: {str(js_error)}", "warning")
                             
-                except Exception as val_error:
-                    self.log_status(f"⚠️ Erro na validação de Recomendação %: {str(val_error)}", "warning")
-            except Exception as e:
-                self.log_status(f"❌ Erro ao preencher Recomendação %: {str(e)}", "error")
+                    except Exception as val_error:
+                        self.log_status(f"⚠️ Erro na validação de Recomendação %: {str(val_error)}", "warning")
+                except Exception as e:
+                    self.log_status(f"❌ Erro ao preencher Recomendação %: {str(e)}", "error")
             
             # 5. Selecionar Severidade
             try:
@@ -1757,29 +2451,29 @@ class FenixAutomation:
                 try:
                     # Clicar em área neutra para fechar dropdowns abertos
                     await self.page.click('body', position={'x': 10, 'y': 10})
-                    await asyncio.sleep(0.5)
-                except:
+                    await self.pausa(0.5)
+                except Exception:
                     pass
                 
                 await severidade_dropdown.click()
-                await asyncio.sleep(0.3)  # Reduzido de 1s para 0.3s
+                await self.pausa(0.3)  # Reduzido de 1s para 0.3s
                 
                 # DIAGNÓSTICO: Verificar quantos menus estão abertos
                 try:
                     all_menus = await self.page.query_selector_all('xpath=//div[contains(@class, "menu")]')
                     active_menus = await self.page.query_selector_all('xpath=//div[contains(@class, "menu") and @aria-hidden="false"]')
                     self.log_status(f"🔍 DIAGNÓSTICO Severidade: {len(all_menus)} menus total, {len(active_menus)} menus ativos")
-                except:
+                except Exception:
                     pass
                 
                 # Verificar se o dropdown abriu corretamente
                 try:
                     await self.page.wait_for_selector('xpath=//div[contains(@class, "menu")]', timeout=2000)
                     self.log_status(f"✅ Dropdown Severidade aberto com sucesso")
-                except:
+                except Exception:
                     self.log_status(f"⚠️ Dropdown Severidade pode não ter aberto, tentando novamente...")
                     await severidade_dropdown.click()
-                    await asyncio.sleep(0.3)  # Reduzido de 1s para 0.3s
+                    await self.pausa(0.3)  # Reduzido de 1s para 0.3s
                 
                 # Normalizar severidade - mapeamento para as opções EXATAS do sistema
                 severidade_original = str(up_data.get('Severidade', '')).strip()
@@ -1806,7 +2500,7 @@ class FenixAutomation:
                 
                 # CORREÇÃO CRÍTICA: Seletores específicos para encontrar a opção no menu ativo
                 # Aguardar um pouco para garantir que o dropdown está aberto
-                await asyncio.sleep(0.2)  # Reduzido de 1s para 0.2s
+                await self.pausa(0.2)  # Reduzido de 1s para 0.2s
                 
                 # Seletores mais específicos que garantem o contexto correto
                 severidade_option_selectors = [
@@ -1832,7 +2526,7 @@ class FenixAutomation:
                         if await severidade_option.is_visible():
                             # Scroll até o elemento se necessário
                             await severidade_option.scroll_into_view_if_needed()
-                            await asyncio.sleep(0.5)
+                            await self.pausa(0.5)
                             
                             # Clicar na opção
                             await severidade_option.click()
@@ -1850,7 +2544,7 @@ class FenixAutomation:
                     raise Exception(f"Não foi possível encontrar opção '{severidade_valor}' no dropdown")
                 
                 # CORREÇÃO: Aguardar seleção ser aplicada e validar
-                await asyncio.sleep(0.5)  # Reduzido de 2s para 0.5s
+                await self.pausa(0.5)  # Reduzido de 2s para 0.5s
                 
                 # VALIDAR se a Severidade foi realmente selecionada
                 validation_selectors = [
@@ -1870,7 +2564,7 @@ class FenixAutomation:
                             break
                         else:
                             self.log_status(f"⚠️ VALIDAÇÃO: Campo mostra '{selected_text}', esperado '{severidade_valor}'", "warning")
-                    except:
+                    except Exception:
                         continue
                 
                 if not validation_ok:
@@ -1880,7 +2574,7 @@ class FenixAutomation:
                     # Tentar novamente com aguardo maior
                     try:
                         await severidade_dropdown.click()
-                        await asyncio.sleep(0.5)  # Reduzido de 1.5s para 0.5s (Aguardo maior para dropdown abrir)
+                        await self.pausa(0.5)  # Reduzido de 1.5s para 0.5s (Aguardo maior para dropdown abrir)
                         
                         # Usar os mesmos seletores específicos
                         retry_selectors = [
@@ -1894,17 +2588,17 @@ class FenixAutomation:
                                 severidade_option = await self.page.wait_for_selector(selector, timeout=3000)
                                 if await severidade_option.is_visible():
                                     await severidade_option.scroll_into_view_if_needed()
-                                    await asyncio.sleep(0.5)
+                                    await self.pausa(0.5)
                                     await severidade_option.click()
-                                    await asyncio.sleep(3)  # Aguardo maior para confirmar seleção
+                                    await self.pausa(3)  # Aguardo maior para confirmar seleção
                                     self.log_status(f"🔄 Segunda tentativa de seleção da Severidade realizada")
                                     break
-                            except:
+                            except Exception:
                                 continue
                     except Exception as retry_error:
                         self.log_status(f"❌ Falha na segunda tentativa: {str(retry_error)}", "error")
                         
-                await asyncio.sleep(0.2)  # Reduzido de 1s para 0.2s
+                await self.pausa(0.2)  # Reduzido de 1s para 0.2s
             except Exception as e:
                 self.log_status(f"❌ Erro ao selecionar Severidade: {str(e)}", "error")
             
@@ -1936,19 +2630,19 @@ class FenixAutomation:
                 try:
                     # Clicar em área neutra para fechar dropdowns abertos
                     await self.page.click('body', position={'x': 10, 'y': 10})
-                    await asyncio.sleep(0.5)
-                except:
+                    await self.pausa(0.5)
+                except Exception:
                     pass
                 
                 await recomendacao_dropdown.click()
-                await asyncio.sleep(0.3)  # Reduzido de 1s para 0.3s
+                await self.pausa(0.3)  # Reduzido de 1s para 0.3s
                 
                 # DIAGNÓSTICO: Verificar quantos menus estão abertos
                 try:
                     all_menus = await self.page.query_selector_all('xpath=//div[contains(@class, "menu")]')
                     active_menus = await self.page.query_selector_all('xpath=//div[contains(@class, "menu") and @aria-hidden="false"]')
                     self.log_status(f"🔍 DIAGNÓSTICO Recomendação: {len(all_menus)} menus total, {len(active_menus)} menus ativos")
-                except:
+                except Exception:
                     pass
                 
                 # CORREÇÃO: Melhorar seleção da recomendação com validação
@@ -1957,7 +2651,7 @@ class FenixAutomation:
                 
                 # CORREÇÃO CRÍTICA: Seletores específicos para encontrar a opção no menu ativo
                 # Aguardar um pouco para garantir que o dropdown está aberto
-                await asyncio.sleep(0.2)  # Reduzido de 1s para 0.2s
+                await self.pausa(0.2)  # Reduzido de 1s para 0.2s
                 
                 # Seletores mais específicos que garantem o contexto correto
                 recomendacao_option_selectors = [
@@ -1983,18 +2677,18 @@ class FenixAutomation:
                             if is_visible:
                                 # Scroll para o elemento se necessário
                                 await recomendacao_option.scroll_into_view_if_needed()
-                                await asyncio.sleep(0.5)
+                                await self.pausa(0.5)
                                 
                                 # Obter texto da opção para validação
                                 try:
                                     option_text = await recomendacao_option.inner_text()
                                     self.log_status(f"🎯 Clicando em opção Recomendação: '{option_text}'")
-                                except:
+                                except Exception:
                                     option_text = recomendacao_final
                                 
                                 # Clicar na opção
                                 await recomendacao_option.click()
-                                await asyncio.sleep(2)
+                                await self.pausa(2)
                                 
                                 # VALIDAÇÃO: Verificar se a opção foi realmente selecionada
                                 validation_selectors = [
@@ -2012,7 +2706,7 @@ class FenixAutomation:
                                             selection_confirmed = True
                                             option_found = True
                                             break
-                                    except:
+                                    except Exception:
                                         continue
                                 
                                 if selection_confirmed:
@@ -2034,15 +2728,256 @@ class FenixAutomation:
             except Exception as e:
                 self.log_status(f"❌ Erro ao selecionar Recomendação: {str(e)}", "error")
             
-            self.stats['ups_processadas'] += 1
+            if not reposicao:
+                self.stats['ups_processadas'] += 1
             self.log_status(f"✅ UP {up_data['UP']} processada!", "success")
             return True
             
         except Exception as e:
             self.log_status(f"❌ Erro na UP {up_data['UP']}: {str(e)}", "error")
-            self.stats['ups_com_erro'] += 1
+            if not reposicao:
+                self.stats['ups_com_erro'] += 1
             return False
     
+    async def adicionar_linha_matriz(self):
+        """Clica em "Adicionar linha da Matriz de decisão"; False se nenhum seletor funcionar"""
+        try:
+            add_button_clicked = False
+            for i, (selector_name, add_selector) in enumerate(SELETORES_ADICIONAR_LINHA):
+                try:
+                    self.log_status(f"🔍 Tentativa {i+1} - {selector_name}: {add_selector[:70]}...")
+                    
+                    add_button = await self.page.wait_for_selector(add_selector, timeout=3000)
+                    if add_button:
+                        await add_button.click()
+                        await self.pausa(2)
+                        self.log_status(f"➕ Nova linha adicionada com sucesso usando {selector_name}")
+                        add_button_clicked = True
+                        break
+                except Exception as btn_error:
+                    self.log_status(f"⚠️ {selector_name} falhou: {str(btn_error)[:60]}...")
+                    continue
+            
+            if not add_button_clicked:
+                self.log_status(f"⚠️ Não foi possível adicionar nova linha automaticamente", "warning")
+                self.log_status(f"💡 Continuando com as linhas existentes...", "info")
+            return add_button_clicked
+                
+        except Exception as add_error:
+            self.log_status(f"⚠️ Erro ao adicionar nova linha: {str(add_error)}", "warning")
+            return False
+    
+    async def contar_linhas_matriz(self):
+        """Número de linhas da Matriz de Decisão, em uma única leitura do DOM"""
+        return int(await self.esperar_pagina(self.page.evaluate(SCRIPT_CONTAR_LINHAS)))
+    
+    async def provisionar_linhas_matriz(self, total):
+        """
+        Cria de uma vez as linhas da Matriz de Decisão que o laudo vai usar:
+        localiza o botão "Adicionar linha" uma vez, clica as vezes que
+        faltam, sem pausas, e confere o total até o React redesenhar a
+        matriz. As linhas que faltarem continuam sendo adicionadas uma a
+        uma depois de cada UP.
+        """
+        existentes = cliques = 0
+        try:
+            existentes = await self.contar_linhas_matriz()
+            if existentes == 0:
+                self.log_status("⚠️ Linhas da matriz não reconhecidas, adicionando uma a uma", "warning")
+                return
+            if existentes < total:
+                botao = None
+                for _, seletor in SELETORES_ADICIONAR_LINHA:
+                    try:
+                        botao = await self.page.wait_for_selector(seletor, timeout=3000)
+                        break
+                    except PrazoEsgotado:
+                        raise
+                    except Exception:
+                        continue
+                if botao is None:
+                    self.log_status("⚠️ Botão 'Adicionar linha' não encontrado para provisionar a matriz", "warning")
+                    return
+                for _ in range(total - existentes):
+                    await botao.click()
+                    cliques += 1
+                existentes = await self.aguardar_linhas_matriz(total)
+        except PrazoEsgotado:
+            raise
+        except Exception as e:
+            self.log_status(f"⚠️ Erro ao provisionar linhas da matriz: {str(e)[:80]}", "warning")
+            # Cliques que já entraram contam: a remoção das sobras depende do total real
+            try:
+                existentes = await self.aguardar_linhas_matriz(existentes + cliques)
+            except PrazoEsgotado:
+                raise
+            except Exception:
+                return
+            if not existentes:
+                return
+        
+        self.linhas_matriz = existentes
+        self.log_status(f"🧱 Matriz de Decisão com {existentes} linha(s) para {total} UP(s)")
+    
+    async def aguardar_linhas_matriz(self, total, espera_s=2.0):
+        """Relê o número de linhas até chegar a total ou acabar espera_s; devolve a última contagem"""
+        limite = time.monotonic() + espera_s
+        while True:
+            existentes = await self.contar_linhas_matriz()
+            if existentes >= total or time.monotonic() >= limite:
+                return existentes
+            await asyncio.sleep(0.1)
+    
+    async def remover_linhas_sobrando(self, usadas):
+        """Remove as linhas da matriz que ficaram vazias (UPs puladas) antes do envio"""
+        sobrando = self.linhas_matriz - usadas
+        if sobrando <= 0 or usadas == 0:
+            return True
+        try:
+            await self.esperar_pagina(self.page.evaluate(SCRIPT_REMOVER_LINHAS, usadas))
+            await self.pausa(0.3)
+            self.linhas_matriz = await self.contar_linhas_matriz()
+        except PrazoEsgotado:
+            raise
+        except Exception as e:
+            self.log_status(f"⚠️ Erro ao remover linhas vazias da matriz: {str(e)[:80]}", "warning")
+            return False
+        
+        if self.linhas_matriz > usadas:
+            self.log_status(f"⚠️ {self.linhas_matriz - usadas} linha(s) vazia(s) continuam na matriz", "warning")
+            return False
+        self.log_status(f"🧹 {sobrando} linha(s) vazia(s) removidas da matriz")
+        return True
+    
+    async def lancar_up_com_prazo(self, up_data, linha):
+        """
+        processar_up dentro de AUTOMATION_CONFIG['prazo_up_s']; False se a UP não foi lançada.
+
+        As esperas da página já saem do prazo, mas as ações em ElementHandle
+        (click, fill, inner_text...) usam o timeout padrão do Playwright: a
+        UP inteira também é cortada no prazo e pela vigia de página travada.
+        O corte é um cancelamento; por isso a automação usa só
+        'except Exception' (um 'except:' engoliria o CancelledError e a UP
+        seguiria até o fim).
+        """
+        with self.orcamento(AUTOMATION_CONFIG['prazo_up_s']) as prazo_up:
+            try:
+                up_ok = await asyncio.wait_for(
+                    self.esperar_pagina(self.medir_etapa('processar_up', self.processar_up(up_data, linha))),
+                    self.prazo_restante()
+                )
+            except (asyncio.TimeoutError, PrazoEsgotado):
+                for prazo in self._prazos:
+                    if prazo.esgotado or prazo is prazo_up:
+                        prazo.estourado = True
+                up_ok = False
+        
+        # Prazo da UP esgotado no meio: a linha pode estar incompleta, então a UP é abandonada
+        if prazo_up is not None and prazo_up.estourado:
+            up_ok = await self.abandonar_up_por_prazo(up_data['UP'], linha, up_ok)
+        return up_ok
+    
+    async def recuperar_laudo(self):
+        """
+        Recupera o laudo atual depois de a página travar: abre uma página
+        nova no mesmo contexto, refaz cabeçalho e textos e repõe as linhas
+        confirmadas do diário, deixando a próxima linha pronta para a UP
+        que falhou. O laudo continua de onde parou em vez de ser perdido.
+        """
+        diario = self.diario
+        if diario is None or not diario.preparado or not getattr(self, 'context', None):
+            return False
+        if diario.recuperacoes >= AUTOMATION_CONFIG['max_recuperacoes_laudo']:
+            self.log_status(f"❌ Laudo {diario.nucleo} já foi recuperado {diario.recuperacoes} vez(es)", "error")
+            return False
+        
+        linhas = list(diario.linhas)
+        self.log_status(f"🩹 Página travada: recuperando o laudo {diario.nucleo} em uma página nova "
+                        f"({len(linhas)} linha(s) confirmadas)", "warning")
+        inicio = time.monotonic()
+        
+        pagina_antiga = self.page
+        try:
+            self.page = await self.context.new_page()
+        except Exception as e:
+            self.log_status(f"❌ Não foi possível abrir uma página nova: {str(e)}", "error")
+            return False
+        try:
+            await asyncio.wait_for(pagina_antiga.close(), timeout=5)
+        except Exception:
+            pass
+        
+        # A reposição tem prazo próprio, proporcional ao que precisa ser refeito; o
+        # prazo do laudo continua correndo (a recuperação não ganha tempo extra)
+        prazo = AUTOMATION_CONFIG['prazo_preparo_s'] + AUTOMATION_CONFIG['prazo_up_s'] * (len(linhas) + 1)
+        try:
+            with self.orcamento(prazo, isolado=True):
+                if not await self.preparar_laudo(diario.nucleo, diario.ups_nucleo):
+                    return False
+                self.diario.recuperacoes = diario.recuperacoes + 1
+                for linha, up_data in enumerate(linhas):
+                    if linha >= self.linhas_matriz:
+                        if not await self.adicionar_linha_matriz():
+                            return False
+                        self.linhas_matriz += 1
+                    # Linhas já contadas: só os seletores; a Recomendação (%) vai em lote no fim
+                    if not await self.processar_up(up_data, linha, reposicao=True):
+                        self.log_status(f"❌ Falha ao repor a linha {linha + 1} ({up_data['UP']})", "error")
+                        return False
+                    self.diario.registrar_linha(linha, up_data)
+                if not await self.repor_recomendacoes_pct(linhas):
+                    return False
+                if len(linhas) >= self.linhas_matriz:
+                    if not await self.adicionar_linha_matriz():
+                        return False
+                    self.linhas_matriz += 1
+        except PrazoEsgotado:
+            self.log_status("❌ Prazo da recuperação esgotado", "error")
+            return False
+        
+        duracao = time.monotonic() - inicio
+        self.log_status(f"✅ Laudo {diario.nucleo} recuperado em {duracao:.1f}s; continuando da linha {len(linhas) + 1}", "success")
+        self.emitir_evento('laudo_recuperado', grupo=str(diario.nucleo), linhas=len(linhas), duracao_s=round(duracao, 1))
+        return True
+    
+    async def repor_recomendacoes_pct(self, linhas):
+        """
+        Recomendação (%) das linhas repostas em um único preenchimento em
+        lote; as que não confirmarem vão campo a campo
+        """
+        if not linhas:
+            return True
+        pendentes = await self.preencher_campos_em_lote([
+            (f"Recomendação % da linha {linha + 1}", f"{up_data['Incidencia']:.2f}", self.seletores_recomendacao_pct(linha))
+            for linha, up_data in enumerate(linhas)
+        ])
+        for campo_nome, valor, seletores in pendentes:
+            if not await self.preencher_campo(seletores, valor):
+                self.log_status(f"❌ Falha ao repor {campo_nome}", "error")
+                return False
+        return True
+    
+    async def abandonar_up_por_prazo(self, up, linha, concluida):
+        """
+        Registra a UP cujo prazo acabou e limpa a linha da matriz para a
+        próxima UP, com um prazo curto próprio. Devolve False (UP não lançada).
+        """
+        self.log_status(f"⏱️ UP {up} abandonada: prazo de {AUTOMATION_CONFIG['prazo_up_s']}s esgotado", "warning")
+        self.stats['erros'].append(f"UP {up}: prazo de {AUTOMATION_CONFIG['prazo_up_s']}s esgotado")
+        if concluida:
+            # processar_up chegou ao fim com etapas interrompidas: não conta como lançada
+            self.stats['ups_processadas'] -= 1
+        self.stats['ups_com_erro'] += 1
+        self.emitir_evento('up_prazo_esgotado', up=str(up), etapa='up')
+        
+        with self.orcamento(AUTOMATION_CONFIG['prazo_limpeza_s'], isolado=True):
+            try:
+                await self.page.keyboard.press('Escape')
+                await self.limpar_campo_up_avaliada(linha)
+            except Exception as e:
+                self.log_status(f"⚠️ Não foi possível limpar a linha {linha + 1}: {str(e)}", "warning")
+        return False
+    
     async def processar_ups_nucleo(self, ups_nucleo):
         """Processa todas as UPs de um núcleo"""
         try:
@@ -2055,6 +2990,22 @@ class FenixAutomation:
             linha_atual = 0  # Controla qual linha da matriz usar (não incrementa quando UP falha)
             
             for idx, (_, up_row) in enumerate(ups_nucleo.iterrows()):
+                await self.aguardar_controle()
+                
+                # Prazo do laudo esgotado: as UPs restantes ficam para outro laudo
+                restante = self.prazo_restante()
+                if restante is not None and restante <= 0:
+                    abandonadas = [str(up) for up in ups_nucleo['UP'].iloc[idx:]]
+                    self.log_status(f"⏱️ Prazo do laudo esgotado: {len(abandonadas)} UP(s) não lançadas: {', '.join(abandonadas)}", "warning")
+                    self.stats['ups_com_erro'] += len(abandonadas)
+                    self.stats['erros'].append(f"Prazo do laudo esgotado; UPs não lançadas: {', '.join(abandonadas)}")
+                    for up in abandonadas:
+                        self.emitir_evento('up_prazo_esgotado', up=up, etapa='laudo')
+                        self.emitir_evento('up_falhou', up=up, total=len(ups_nucleo))
+                    break
+                
+                self.emitir_evento('up_iniciada', up=str(up_row['UP']), indice=idx + 1, total=len(ups_nucleo))
+                
                 # CORREÇÃO: Converter incidência corretamente 
                 incidencia_raw = str(up_row['Incidencia']).replace('%', '').replace(',', '.').strip()
                 try:
@@ -2108,71 +3059,41 @@ class FenixAutomation:
                 self.log_status(f"🔄 Processando UP {up_row['UP']} ({idx + 1}/{len(ups_nucleo)}) na linha {linha_atual + 1}...")
                 self.log_status(f"📊 Status: ups_processadas={ups_processadas}, linha_atual={linha_atual}, idx={idx}")
                 
-                if await self.processar_up(up_data, linha_atual):
+                up_ok = await self.lancar_up_com_prazo(up_data, linha_atual)
+                
+                # Página travada no meio do laudo: refaz o laudo do diário em uma página nova e repete a UP
+                if not up_ok and self.diario is not None and not await self.pagina_responde():
+                    if not await self.recuperar_laudo():
+                        raise Exception("Página travada e não foi possível recuperar o laudo")
+                    linha_atual = len(self.diario.linhas)
+                    up_ok = await self.lancar_up_com_prazo(up_data, linha_atual)
+                
+                if up_ok:
+                    if self.diario is not None:
+                        self.diario.registrar_linha(linha_atual, up_data)
                     ups_processadas += 1
                     # CORREÇÃO: Registrar UP processada com sucesso
                     self.stats['ups_com_sucesso'].append(up_row['UP'])
+                    self.emitir_evento('up_concluida', up=str(up_row['UP']), indice=idx + 1,
+                                       total=len(ups_nucleo), linha=linha_atual + 1)
                     self.log_status(f"✅ UP {up_row['UP']} processada com sucesso na linha {linha_atual + 1}!", "success")
                     
                     # IMPORTANTE: Incrementar linha_atual ANTES de decidir se adiciona nova linha
                     linha_atual += 1
                     self.log_status(f"📈 Próxima UP usará linha {linha_atual + 1} (índice {linha_atual})")
                     
-                    # Adicionar nova linha para próxima UP (se ainda há UPs para processar)
+                    # Adicionar nova linha para próxima UP (se ainda há UPs para processar e a linha não foi provisionada)
                     if idx + 1 < len(ups_nucleo):  # Se não é a última UP
-                        self.log_status(f"➕ Adicionando nova linha para próxima UP ({idx + 2}/{len(ups_nucleo)})")
-                        try:
-                            # Múltiplos seletores para o botão de adicionar linha (do mais confiável ao menos)
-                            add_button_selectors = [
-                                # MAIS CONFIÁVEL: aria-label é mais estável que classes CSS
-                                'xpath=//button[@aria-label="Adicionar linha da Matriz de decisão"]',
-                                # Alternativo com aria-label
-                                'button[aria-label="Adicionar linha da Matriz de decisão"]',
-                                # XPath absoluto fornecido pelo usuário  
-                                'xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/div/div/form/div[2]/div/div[3]/button',
-                                # CSS Selector fornecido pelo usuário
-                                '#__next > div.max-w-screen-xl.mx-auto.px-2.sm\\:px-4.lg\\:px-0.py-0.bg-white.rounded-md.shadow-md.h-min-screen > div > div > div > div.z-0 > div > div > div > div > div.sm\\:mx-0.lg\\:mt-4 > div > div > form > div:nth-child(2) > div > div.absolute.-right-4.bottom-12.z-50 > button',
-                                # Seletores baseados no SVG interno (fallback)
-                                'xpath=//button[.//svg[@stroke="currentColor" and @fill="currentColor" and contains(@viewBox, "0 0 1024 1024")]]',
-                                'xpath=//button[.//svg[contains(@class, "h-8") and contains(@class, "w-8")]]'
-                            ]
-                            
-                            add_button_clicked = False
-                            for i, add_selector in enumerate(add_button_selectors):
-                                try:
-                                    # Mapear nome amigável para cada seletor
-                                    selector_names = [
-                                        "ARIA-LABEL (mais confiável)",
-                                        "ARIA-LABEL CSS",
-                                        "XPATH Absoluto",
-                                        "CSS Selector",
-                                        "SVG ViewBox",
-                                        "SVG Classes"
-                                    ]
-                                    
-                                    selector_name = selector_names[i] if i < len(selector_names) else f"Seletor {i+1}"
-                                    self.log_status(f"🔍 Tentativa {i+1} - {selector_name}: {add_selector[:70]}...")
-                                    
-                                    add_button = await self.page.wait_for_selector(add_selector, timeout=3000)
-                                    if add_button:
-                                        await add_button.click()
-                                        await asyncio.sleep(2)
-                                        self.log_status(f"➕ Nova linha adicionada com sucesso usando {selector_name}")
-                                        add_button_clicked = True
-                                        break
-                                except Exception as btn_error:
-                                    self.log_status(f"⚠️ {selector_name} falhou: {str(btn_error)[:60]}...")
-                                    continue
-                            
-                            if not add_button_clicked:
-                                self.log_status(f"⚠️ Não foi possível adicionar nova linha automaticamente", "warning")
-                                self.log_status(f"💡 Continuando com as linhas existentes...", "info")
-                                
-                        except Exception as add_error:
-                            self.log_status(f"⚠️ Erro ao adicionar nova linha: {str(add_error)}", "warning")
+                        if linha_atual < self.linhas_matriz:
+                            self.log_status(f"🧱 Próxima UP usa a linha {linha_atual + 1}, já provisionada")
+                        else:
+                            self.log_status(f"➕ Adicionando nova linha para próxima UP ({idx + 2}/{len(ups_nucleo)})")
+                            if await self.executar_com_disjuntor('adicionar_linha', self.adicionar_linha_matriz()):
+                                self.linhas_matriz += 1
                     else:
                         self.log_status(f"🏁 Última UP processada - não precisa adicionar nova linha")
                 else:
+                    self.emitir_evento('up_falhou', up=str(up_row['UP']), indice=idx + 1, total=len(ups_nucleo))
                     self.log_status(f"⚠️ UP {up_row['UP']} foi PULADA - linha {linha_atual + 1} permanece disponível", "warning")
                     self.log_status(f"� Próxima UP tentará usar a mesma linha {linha_atual + 1}", "info")
                     # IMPORTANTE: NÃO incrementar linha_atual quando UP falha
@@ -2180,6 +3101,12 @@ class FenixAutomation:
                 # Atualizar progresso
                 progress_bar.progress((idx + 1) / len(ups_nucleo))
             
+            # Linhas provisionadas que sobraram (UPs puladas) não podem ir vazias no envio
+            if not await self.remover_linhas_sobrando(linha_atual):
+                self.log_status("❌ Linhas vazias na matriz: o laudo não será enviado", "error")
+                self.stats['erros'].append(f"Linhas vazias não removidas da matriz ({self.linhas_matriz - linha_atual})")
+                return False
+            
             self.log_status(f"✅ {ups_processadas}/{len(ups_nucleo)} UPs processadas!", "success")
             return ups_processadas > 0
             
@@ -2197,33 +3124,33 @@ class FenixAutomation:
             try:
                 enviar_btn = await self.page.wait_for_selector('xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/div/div/form/div[3]/button', timeout=10000)
                 await enviar_btn.click()
-            except:
+            except Exception:
                 # Método alternativo
                 enviar_btn = await self.page.wait_for_selector('button:has-text("Enviar")', timeout=10000)
                 await enviar_btn.click()
             
-            await asyncio.sleep(1)  # Reduzido de 3s para 1s
+            await self.pausa(1)  # Reduzido de 3s para 1s
             
             # Aguardar página de assinatura
             self.log_status("✍️ Aguardando página de assinatura...")
-            await asyncio.sleep(1)  # Reduzido de 2s para 1s
+            await self.pausa(1)  # Reduzido de 2s para 1s
             
             # Clicar em Assinatura Funcional usando xpath específico
             try:
                 assinatura_btn = await self.page.wait_for_selector('xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/button/div/div/div[1]', timeout=7000)
                 await assinatura_btn.click()
-                await asyncio.sleep(1)  # Reduzido de 2s para 1s
+                await self.pausa(1)  # Reduzido de 2s para 1s
                 self.log_status("✅ Assinatura Funcional clicada!")
-            except:
+            except Exception:
                 self.log_status("⚠️ Botão 'Assinatura Funcional' não encontrado, continuando...", "warning")
             
             # Clicar em Confirmar usando xpath específico
             try:
                 confirmar_btn = await self.page.wait_for_selector('xpath=//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/div[2]/button', timeout=5000)
                 await confirmar_btn.click()
-                await asyncio.sleep(1)  # Reduzido de 2s para 1s
+                await self.pausa(1)  # Reduzido de 2s para 1s
                 self.log_status("✅ Confirmação clicada!")
-            except:
+            except Exception:
                 self.log_status("⚠️ Botão 'Confirmar' não encontrado, continuando...", "warning")
             
             self.log_status("🎉 Laudo finalizado com sucesso!", "success")
@@ -2233,29 +3160,54 @@ class FenixAutomation:
             self.log_status(f"❌ Erro ao finalizar laudo: {str(e)}", "error")
             return False
     
-    async def processar_nucleo_completo(self, nucleo, ups_nucleo):
-        """Processa um núcleo completo"""
-        try:
-            self.log_status(f"🏢 PROCESSANDO NÚCLEO: {nucleo}")
-            
+    async def preparar_laudo(self, nucleo, ups_nucleo):
+        """
+        Abre o Upload de Laudos e preenche o cabeçalho e os textos do laudo,
+        dentro de AUTOMATION_CONFIG['prazo_preparo_s']
+        """
+        self.diario = DiarioLaudo(nucleo, ups_nucleo)
+        with self.orcamento(AUTOMATION_CONFIG['prazo_preparo_s']):
             # Navegar para upload
-            if not await self.navegar_para_upload():
+            if not await self.medir_etapa('navegar_para_upload', self.navegar_para_upload()):
                 return False
             
             # Preencher informações básicas - passar o ups_nucleo para acessar a coluna UNF
-            if not await self.preencher_informacoes_basicas(nucleo, ups_nucleo):
+            if not await self.medir_etapa('informacoes_basicas', self.preencher_informacoes_basicas(nucleo, ups_nucleo)):
                 self.log_status("⚠️ Erro nas informações básicas, mas continuando...", "warning")
             
             # Preencher campos de texto
             # Determinar tipo de organização baseado no context
             tipo_organizacao = getattr(self, 'tipo_organizacao', 'nucleo')
-            if not await self.preencher_campos_texto(nucleo, tipo_organizacao):
+            if not await self.medir_etapa('campos_texto', self.preencher_campos_texto(nucleo, tipo_organizacao)):
                 self.log_status("⚠️ Erro nos campos de texto, mas continuando...", "warning")
+            self.linhas_matriz = 1
+            if AUTOMATION_CONFIG['provisionar_linhas']:
+                await self.medir_etapa('provisionar_linhas', self.provisionar_linhas_matriz(len(ups_nucleo)))
+            self.diario.preparado = True
+            return True
+    
+    async def enviar_laudo(self):
+        """Finaliza o laudo dentro do próprio prazo (vale mesmo com o prazo do laudo esgotado)"""
+        if self.controle is not None and hasattr(self.controle, 'antes_do_envio'):
+            await self.controle.antes_do_envio()  # Fila de laudos: a concessão precisa valer no Enviar
+        return await self.com_prazo(AUTOMATION_CONFIG['prazo_envio_s'],
+                                    self.medir_etapa('finalizar_laudo', self.finalizar_laudo()), isolado=True)
+    
+    async def processar_nucleo_completo(self, nucleo, ups_nucleo):
+        """Processa um núcleo completo"""
+        try:
+            self.log_status(f"🏢 PROCESSANDO NÚCLEO: {nucleo}")
             
-            # Processar UPs
-            if await self.processar_ups_nucleo(ups_nucleo):
+            with self.orcamento(self.prazo_laudo(ups_nucleo)):
+                if not await self.preparar_laudo(nucleo, ups_nucleo):
+                    return False
+                
+                # Processar UPs
+                ups_ok = await self.processar_ups_nucleo(ups_nucleo)
+            
+            if ups_ok:
                 # Finalizar laudo
-                if await self.finalizar_laudo():
+                if await self.enviar_laudo():
                     self.stats['nucleos_processados'] += 1
                     return True
             
@@ -2266,6 +3218,82 @@ class FenixAutomation:
             self.stats['erros'].append(f"Núcleo {nucleo}: {str(e)}")
             return False
     
+    def aba_paralela(self, pagina):
+        """
+        Cópia da automação que trabalha em outra aba do mesmo contexto
+        (estatísticas, eventos e controle compartilhados). A vigia não
+        sonda esta aba: sem detecção de página travada, as esperas dela
+        terminam só pelos prazos.
+        """
+        aba = copy.copy(self)
+        aba._prazos = []
+        aba._pagina_travada = None  # A vigia acompanha a aba principal
+        aba.page = pagina
+        return aba
+    
+    async def processar_grupos_em_pipeline(self, df_ups, nucleos_selecionados):
+        """
+        Lança os grupos sobrepondo o fim de um laudo com o início do próximo:
+        enquanto uma aba envia e assina o laudo N, a outra já abre o Upload de
+        Laudos e preenche o cabeçalho e os textos do laudo N+1. Se a
+        preparação antecipada falhar, o laudo seguinte é preparado de novo na
+        vez dele, como no modo sequencial.
+        """
+        grupos = [(nucleo, df_ups[df_ups['Nucleo'] == nucleo]) for nucleo in nucleos_selecionados]
+        pagina_extra = await self.context.new_page()
+        atual, reserva = self, self.aba_paralela(pagina_extra)
+        preparado = False
+        self.log_status("🔀 Lançamento em pipeline: o próximo laudo é preparado em outra aba")
+        
+        try:
+            for indice, (nucleo, ups_nucleo) in enumerate(grupos):
+                await self.aguardar_controle()
+                self.emitir_evento('grupo_iniciado', grupo=str(nucleo), ups=len(ups_nucleo))
+                self.log_status(f"🏢 PROCESSANDO NÚCLEO: {nucleo}")
+                
+                sucesso = proximo_preparado = False
+                try:
+                    with atual.orcamento(self.prazo_laudo(ups_nucleo)):
+                        if not preparado:
+                            preparado = await atual.preparar_laudo(nucleo, ups_nucleo)
+                        ups_ok = preparado and await atual.processar_ups_nucleo(ups_nucleo)
+                    if ups_ok:
+                        etapas = [atual.enviar_laudo()]
+                        if indice + 1 < len(grupos):
+                            etapas.append(reserva.preparar_laudo(*grupos[indice + 1]))
+                        resultados = await asyncio.gather(*etapas, return_exceptions=True)
+                        sucesso = resultados[0] is True
+                        proximo_preparado = len(resultados) > 1 and resultados[1] is True
+                        for resultado in resultados:
+                            if isinstance(resultado, Exception):
+                                self.stats['erros'].append(f"Núcleo {nucleo}: {str(resultado)}")
+                except Exception as e:
+                    self.log_status(f"❌ Erro crítico no núcleo {nucleo}: {str(e)}", "error")
+                    self.stats['erros'].append(f"Núcleo {nucleo}: {str(e)}")
+                
+                if sucesso:
+                    self.stats['nucleos_processados'] += 1
+                    self.emitir_evento('grupo_concluido', grupo=str(nucleo), sucesso=True)
+                    self.log_status(f"✅ Núcleo {nucleo} concluído!", "success")
+                else:
+                    self.emitir_evento('grupo_concluido', grupo=str(nucleo), sucesso=False)
+                    self.log_status(f"❌ Falha no núcleo {nucleo}", "error")
+                
+                # O próximo laudo continua na aba em que foi preparado
+                if proximo_preparado:
+                    atual, reserva = reserva, atual
+                preparado = proximo_preparado
+        finally:
+            # recuperar_laudo na cópia pode ter trocado a aba extra por outra:
+            # fecha todas as abas que não são a da automação principal
+            abas = {id(pagina): pagina for pagina in (pagina_extra, atual.page, reserva.page)
+                    if pagina is not None and pagina is not self.page}
+            for pagina in abas.values():
+                try:
+                    await pagina.close()
+                except Exception:
+                    pass
+    
     async def tentar_recuperar_navegador(self):
         """
         Tenta recuperar um navegador não responsivo usando várias estratégias
@@ -2278,7 +3306,7 @@ class FenixAutomation:
             try:
                 self.log_status("📄 Estratégia 1: Tentando refresh da página...")
                 await self.page.reload(wait_until='networkidle')
-                await asyncio.sleep(2)
+                await self.pausa(2)
                 
                 # Testar se voltou a responder
                 titulo = await self.page.title()
@@ -2291,8 +3319,8 @@ class FenixAutomation:
             # Estratégia 2: Tentar navegar para URL principal
             try:
                 self.log_status("🌐 Estratégia 2: Tentando navegar para página inicial...")
-                await self.page.goto('https://fenixflorestal.suzanonet.com.br/', wait_until='networkidle')
-                await asyncio.sleep(2)
+                await self.page.goto(FENIX_URL, wait_until='networkidle')
+                await self.pausa(2)
                 
                 # Testar se voltou a responder
                 titulo = await self.page.title()
@@ -2307,13 +3335,13 @@ class FenixAutomation:
                 self.log_status("📑 Estratégia 3: Tentando criar nova aba no mesmo navegador...")
                 if self.context:
                     nova_pagina = await self.context.new_page()
-                    await nova_pagina.goto('https://fenixflorestal.suzanonet.com.br/', wait_until='networkidle')
-                    await asyncio.sleep(2)
+                    await nova_pagina.goto(FENIX_URL, wait_until='networkidle')
+                    await self.pausa(2)
                     
                     # Fechar página antiga e usar nova
                     try:
                         await self.page.close()
-                    except:
+                    except Exception:
                         pass
                     
                     self.page = nova_pagina
@@ -2386,6 +3414,7 @@ class FenixAutomation:
                 # Aguardar login
                 if not await self.aguardar_login():
                     return False
+                await self.salvar_login()
                 
                 # Marcar navegador como ativo
                 st.session_state.browser_ativo = True
@@ -2407,12 +3436,13 @@ class FenixAutomation:
                                 await old_instance.page.evaluate('document.title')
                                 current_url = old_instance.page.url
                                 
-                                if current_url and 'suzanonet' in current_url:
+                                if current_url and current_url.startswith(FENIX_URL):
                                     # Se chegou aqui, navegador está válido - reutilizar
                                     self.browser = old_instance.browser
                                     self.page = old_instance.page
                                     self.context = old_instance.context
                                     self.playwright = old_instance.playwright
+                                    self.uso_contexto = old_instance.uso_contexto
                                     self.log_status("🔄 Reutilizando navegador já aberto")
                                     
                                     # Verificar se precisa navegar de volta ao início
@@ -2471,6 +3501,7 @@ class FenixAutomation:
                         # Aguardar login
                         if not await self.aguardar_login():
                             return False
+                        await self.salvar_login()
                         
                         # Marcar navegador como ativo
                         st.session_state.browser_ativo = True
@@ -2491,27 +3522,39 @@ class FenixAutomation:
                     # Aguardar login
                     if not await self.aguardar_login():
                         return False
+                    await self.salvar_login()
                     
                     # Marcar navegador como ativo
                     st.session_state.browser_ativo = True
                     st.session_state.automation_instance = self
             
-            # Processar cada núcleo
-            for nucleo in nucleos_selecionados:
-                ups_nucleo = df_ups[df_ups['Nucleo'] == nucleo]
-                
-                if await self.processar_nucleo_completo(nucleo, ups_nucleo):
-                    self.log_status(f"✅ Núcleo {nucleo} concluído!", "success")
+            # Processar cada núcleo (em pipeline, com duas abas, se configurado), com a vigia rodando
+            async with self.vigiar():
+                if self.pipeline and len(nucleos_selecionados) > 1:
+                    await self.processar_grupos_em_pipeline(df_ups, nucleos_selecionados)
                 else:
-                    self.log_status(f"❌ Falha no núcleo {nucleo}", "error")
-                
-                # Pausa entre núcleos se houver mais de um
-                if len(nucleos_selecionados) > 1:
-                    self.log_status("⏳ Aguardando 10 segundos antes do próximo núcleo...")
-                    await asyncio.sleep(5)
+                    for nucleo in nucleos_selecionados:
+                        await self.aguardar_controle()
+                        await self.reciclar_se_preciso()
+                        ups_nucleo = df_ups[df_ups['Nucleo'] == nucleo]
+                        self.emitir_evento('grupo_iniciado', grupo=str(nucleo), ups=len(ups_nucleo))
+                    
+                        sucesso = await self.processar_nucleo_completo(nucleo, ups_nucleo)
+                        self.uso_contexto['laudos'] += 1
+                        if sucesso:
+                            self.emitir_evento('grupo_concluido', grupo=str(nucleo), sucesso=True)
+                            self.log_status(f"✅ Núcleo {nucleo} concluído!", "success")
+                        else:
+                            self.emitir_evento('grupo_concluido', grupo=str(nucleo), sucesso=False)
+                            self.log_status(f"❌ Falha no núcleo {nucleo}", "error")
+                    
+                        # Pausa entre núcleos se houver mais de um
+                        if len(nucleos_selecionados) > 1:
+                            self.log_status("⏳ Aguardando 10 segundos antes do próximo núcleo...")
+                            await self.pausa(5)
             
             # NOVA LÓGICA: Se processou apenas 1 núcleo, perguntar se quer continuar
-            if len(nucleos_selecionados) == 1:
+            if len(nucleos_selecionados) == 1 and self.manter_navegador:
                 self.log_status("🎊 Núcleo processado com sucesso!", "success")
                 st.session_state.mostrar_continuar_lancamento = True
                 return True
@@ -2525,22 +3568,37 @@ class FenixAutomation:
         
         finally:
             # Só fechar o navegador se processou todos os núcleos ou se houve erro
-            if len(nucleos_selecionados) > 1 or not hasattr(st.session_state, 'mostrar_continuar_lancamento'):
+            if not self.manter_navegador or len(nucleos_selecionados) > 1 or not hasattr(st.session_state, 'mostrar_continuar_lancamento'):
                 await self.fechar_browser()
                 if hasattr(st.session_state, 'browser_ativo'):
                     st.session_state.browser_ativo = False
-                    del st.session_state.automation_instance
+                    if hasattr(st.session_state, 'automation_instance'):
+                        del st.session_state.automation_instance
             
             self.exibir_relatorio_final()
     
     async def fechar_browser(self):
         """Fecha o browser"""
         try:
-            if self.browser:
-                await self.browser.close()
-            if self.playwright:
-                await self.playwright.stop()
-            self.log_status("🔧 Navegador fechado")
+            if self.filtro_requisicoes is not None:
+                self.log_status(f"🚫 Requisições bloqueadas pelo perfil de desempenho: {self.filtro_requisicoes.bloqueadas}")
+            if self.sessao_broker is not None:
+                # Navegador compartilhado: fecha só o contexto desta sessão
+                await self.sessao_broker.fechar_contexto()
+                self.playwright = self.browser = self.context = self.page = None
+                self.log_status("🔌 Contexto do navegador compartilhado fechado")
+            elif self.via_daemon:
+                # Navegador persistente: apenas desconecta, mantendo abas e sessão
+                if self.playwright:
+                    await self.playwright.stop()
+                self.via_daemon = False
+                self.log_status("🔌 Desconectado do navegador persistente")
+            else:
+                if self.browser:
+                    await self.browser.close()
+                if self.playwright:
+                    await self.playwright.stop()
+                self.log_status("🔧 Navegador fechado")
             
             # Limpar session_state
             if hasattr(st.session_state, 'browser_ativo'):
@@ -2585,6 +3643,16 @@ class FenixAutomation:
             for erro in self.stats['erros']:
                 st.error(f"• {erro}")
         
+        abertos = [etapa for etapa, situacao in self.disjuntores.situacao().items() if situacao['estado'] != 'fechado']
+        if abertos:
+            st.warning(f"⛔ Etapas com disjuntor aberto (provável mudança no portal): {', '.join(abertos)}")
+        
+        if self.vigia is not None:
+            vigia = self.vigia.relatorio()
+            if vigia['travamentos'] or vigia['atrasos_alerta']:
+                st.warning(f"🐕 Vigia: {vigia['travamentos']} travamento(s) de página, "
+                           f"{vigia['atrasos_alerta']} atraso(s) do event loop (máx. {vigia['atraso_loop_max_s']}s)")
+        
         # Taxa de sucesso
         total_ups = self.stats['ups_processadas'] + self.stats['ups_com_erro']
         taxa_sucesso = (self.stats['ups_processadas'] / total_ups * 100) if total_ups > 0 else 0
@@ -2594,6 +3662,29 @@ class FenixAutomation:
 # FUNÇÃO PRINCIPAL PARA USO NO APP.PY
 # =========================================================================
 
+def _chave_sessao_streamlit():
+    """Identificador da sessão do Streamlit (uma por aba do app) para o broker"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except ImportError:
+        ctx = None
+    return ctx.session_id if ctx is not None else "sem_streamlit"
+
+def _preparar_thread_streamlit():
+    """
+    Função que anexa o contexto da sessão atual do Streamlit à thread em que
+    for chamada, para que as mensagens da automação apareçam na sessão certa
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx, add_script_run_ctx
+    except ImportError:
+        return None
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None
+    return lambda: add_script_run_ctx(threading.current_thread(), ctx)
+
 def executar_lancamento_fenix(df_ups, nucleos_selecionados, tipo_organizacao=None, email=None, senha=None):
     """Função principal que executa o lançamento no Fênix"""
     # Determinar tipo de organização
@@ -2619,39 +3710,53 @@ def executar_lancamento_fenix(df_ups, nucleos_selecionados, tipo_organizacao=Non
         if sys.platform == 'win32':
             asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
         
-        # Executar automação diretamente com asyncio.run
-        try:
-            resultado = asyncio.run(
-                automation.executar_automacao_completa(df_ups, nucleos_selecionados)
+        if BROKER_CONFIG['usar_broker']:
+            # Navegador compartilhado: a automação roda no loop da sessão do usuário
+            sessao = obter_broker().obter_sessao(_chave_sessao_streamlit(), automation.email or "login_manual")
+            if getattr(automation, 'sessao_broker', None) not in (None, sessao):
+                # Sessão recolhida por ociosidade: recomeça com uma automação nova
+                st.session_state.browser_ativo = False
+                automation = FenixAutomation(organizacao_tipo)
+                automation.email, automation.senha = email, senha
+            automation.sessao_broker = sessao
+            resultado = sessao.executar(
+                automation.executar_automacao_completa(df_ups, nucleos_selecionados),
+                preparar_thread=_preparar_thread_streamlit()
             )
-        except RuntimeError as e:
-            if "cannot be called from a running event loop" in str(e):
-                # Se há um loop rodando no Streamlit, usar uma abordagem diferente
-                import threading
-                import queue
+        else:
+            # Executar automação diretamente com asyncio.run
+            try:
+                resultado = asyncio.run(
+                    automation.executar_automacao_completa(df_ups, nucleos_selecionados)
+                )
+            except RuntimeError as e:
+                if "cannot be called from a running event loop" in str(e):
+                    # Se há um loop rodando no Streamlit, usar uma abordagem diferente
+                    import threading
+                    import queue
                 
-                result_queue = queue.Queue()
+                    result_queue = queue.Queue()
                 
-                def run_automation():
-                    try:
-                        new_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(new_loop)
-                        result = new_loop.run_until_complete(
-                            automation.executar_automacao_completa(df_ups, nucleos_selecionados)
-                        )
-                        result_queue.put(result)
-                    except Exception as e:
-                        result_queue.put(e)
-                    finally:
-                        new_loop.close()
+                    def run_automation():
+                        try:
+                            new_loop = asyncio.new_event_loop()
+                            asyncio.set_event_loop(new_loop)
+                            result = new_loop.run_until_complete(
+                                automation.executar_automacao_completa(df_ups, nucleos_selecionados)
+                            )
+                            result_queue.put(result)
+                        except Exception as e:
+                            result_queue.put(e)
+                        finally:
+                            new_loop.close()
                 
-                thread = threading.Thread(target=run_automation)
-                thread.start()
-                thread.join()
+                    thread = threading.Thread(target=run_automation)
+                    thread.start()
+                    thread.join()
                 
-                resultado = result_queue.get()
-                if isinstance(resultado, Exception):
-                    raise resultado
+                    resultado = result_queue.get()
+                    if isinstance(resultado, Exception):
+                        raise resultado
         
         # CORREÇÃO: Salvar UPs processadas com sucesso no session_state
         if resultado and hasattr(automation, 'stats') and 'ups_com_sucesso' in automation.stats:
@@ -2669,6 +3774,86 @@ def executar_lancamento_fenix(df_ups, nucleos_selecionados, tipo_organizacao=Non
         st.error(f"❌ Erro crítico na execução: {str(e)}")
         return False
 
+# =========================================================================
+# EXECUÇÃO SEM INTERFACE (LINHA DE COMANDO / API)
+# =========================================================================
+
+def executar_lancamento_em_lote(df_ups, grupos, tipo_organizacao='nucleo', email=None, senha=None,
+                                headless=True, ao_evento=None, controle=None, somente_nesta_thread=False,
+                                pipeline=None, disjuntores=None):
+    """
+    Executa o lançamento sem Streamlit, do login ao último laudo.
+
+    Os logs e eventos de progresso (grupo_iniciado, up_concluida, up_falhou,
+    grupo_concluido e log) vão para ao_evento(evento, dados); as mensagens
+    que a automação mostraria na interface chegam como eventos 'log'. O
+    navegador é sempre fechado ao final.
+
+    Args:
+        controle: objeto com aguardar_liberacao() (corrotina) consultado
+            entre UPs para pausar ou cancelar a automação e, opcionalmente,
+            antes_do_envio() (corrotina) chamada logo antes do Enviar
+        somente_nesta_thread: troca a interface só na thread atual (execução
+            em segundo plano dentro do app)
+        pipeline: prepara o próximo laudo em outra aba enquanto o atual é
+            enviado (padrão: AUTOMATION_CONFIG['laudos_em_pipeline'])
+        disjuntores: Disjuntores compartilhados entre execuções (ex.: os
+            laudos de um trabalhador da fila); padrão: novos por execução
+
+    Returns:
+        dict: resumo com os contadores da automação
+
+    Raises:
+        ValueError: headless sem credenciais (não há como fazer login manual)
+    """
+    if headless and not (email and senha):
+        raise ValueError("O lançamento sem janela precisa de e-mail e senha para o login automático")
+
+    def _log_da_interface(nivel, mensagem, contexto):
+        if ao_evento is not None:
+            ao_evento('log', {'nivel': nivel, 'mensagem': mensagem})
+
+    interface = InterfaceConsole(ao_emitir=_log_da_interface)
+    if somente_nesta_thread:
+        usar_interface_na_thread(interface)
+    else:
+        usar_interface(interface)
+
+    automation = FenixAutomation(tipo_organizacao, headless=headless, manter_navegador=False,
+                                 ao_evento=ao_evento or (lambda evento, dados: None))
+    automation.email = email
+    automation.senha = senha
+    automation.controle = controle
+    if pipeline is not None:
+        automation.pipeline = pipeline
+    if disjuntores is not None:
+        automation.disjuntores = disjuntores
+
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+    inicio = time.time()
+    try:
+        sucesso = asyncio.run(automation.executar_automacao_completa(df_ups, grupos))
+    finally:
+        if somente_nesta_thread:
+            usar_interface_na_thread(None)
+    stats = automation.stats
+
+    return {
+        'sucesso': bool(sucesso) and stats['nucleos_processados'] == len(grupos) and stats['ups_com_erro'] == 0,
+        'duracao_s': round(time.time() - inicio, 1),
+        'grupos': [str(grupo) for grupo in grupos],
+        'grupos_concluidos': stats['nucleos_processados'],
+        'ups_processadas': stats['ups_processadas'],
+        'ups_com_erro': stats['ups_com_erro'],
+        'ups_com_sucesso': [str(up) for up in stats['ups_com_sucesso']],
+        'erros': list(stats['erros']),
+        'disjuntores': automation.disjuntores.situacao(),
+        'vigia': automation.vigia.relatorio() if automation.vigia is not None else None,
+        'reciclagens': automation.reciclagens
+    }
+
 def fechar_navegador_manual():
     """Função para fechar navegador via app.py"""
     try:
@@ -2681,8 +3866,14 @@ def fechar_navegador_manual():
                 asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
             
             # Executar fechamento
+            automation = st.session_state.automation_instance
             try:
-                asyncio.run(st.session_state.automation_instance.fechar_browser())
+                if getattr(automation, 'sessao_broker', None) is not None:
+                    # Navegador compartilhado: fecha o contexto no loop da sessão
+                    automation.sessao_broker.executar(automation.fechar_browser(),
+                                                      preparar_thread=_preparar_thread_streamlit())
+                else:
+                    asyncio.run(automation.fechar_browser())
             except RuntimeError as e:
                 if "cannot be called from a running event loop" in str(e):
                     import threading
@@ -0,0 +1,259 @@
+"""
+Navegador persistente (daemon) da automação do Fênix
+
+Mantém um Chromium de longa duração, com pasta de perfil persistente
+(cookies e sessão do login Microsoft), ao qual a FenixAutomation se conecta
+via CDP em vez de abrir um navegador novo a cada execução. Reinícios do
+Streamlit ou recargas do código custam apenas a reconexão.
+
+Uso:
+    python navegador_daemon.py iniciar [--sem-janela]
+    python navegador_daemon.py status
+    python navegador_daemon.py parar
+
+Com DAEMON_CONFIG['usar_daemon'] = True, a automação inicia o daemon sozinha
+quando ele não estiver respondendo.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import subprocess
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+from config import DAEMON_CONFIG
+from perfil_navegador import ARGUMENTOS_CHROMIUM
+
+class ErroDaemon(Exception):
+    """Falha ao iniciar ou contactar o navegador persistente"""
+
+# =========================================================================
+# PROCESSOS
+# =========================================================================
+
+def linha_de_comando(pid):
+    """Linha de comando do processo pid, ou None se ele não existe (ou não dá para ler)"""
+    try:
+        if sys.platform.startswith('linux'):
+            with open(f"/proc/{int(pid)}/cmdline", 'rb') as f:
+                return f.read().replace(b'\0', b' ').decode('utf-8', 'replace').strip() or None
+        if sys.platform == 'win32':
+            comando = ["powershell", "-NoProfile", "-Command",
+                       f"(Get-CimInstance Win32_Process -Filter 'ProcessId={int(pid)}').CommandLine"]
+        else:
+            comando = ["ps", "-o", "command=", "-p", str(int(pid))]
+        saida = subprocess.run(comando, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=10).stdout
+        return saida.decode('utf-8', 'replace').strip() or None
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+# =========================================================================
+# DAEMON
+# =========================================================================
+
+class DaemonNavegador:
+    """
+    Controla o Chromium persistente: verificação de saúde pelo endpoint
+    /json/version do CDP, início desacoplado do processo Python e parada
+    pelo PID gravado em daemon.json, na pasta do perfil.
+    """
+
+    def __init__(self, config=None):
+        config = config or DAEMON_CONFIG
+        self.host = config['host']
+        self.porta = config['porta_cdp']
+        self.pasta_perfil = Path(config['pasta_perfil'])
+        self.timeout_inicio_s = config['timeout_inicio_s']
+        self.timeout_saude_s = config['timeout_saude_s']
+        self.falhas_para_reiniciar = config.get('falhas_para_reiniciar', 3)
+        self.arquivo_estado = self.pasta_perfil / "daemon.json"
+
+    @property
+    def endpoint(self):
+        return f"http://{self.host}:{self.porta}"
+
+    # ---------------------------------------------------------------------
+    # Estado e saúde
+    # ---------------------------------------------------------------------
+
+    def estado(self):
+        """Conteúdo de daemon.json (pid, porta, início) ou {} sem daemon registrado"""
+        try:
+            with open(self.arquivo_estado, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def verificar_saude(self, timeout=None):
+        """
+        Consulta o CDP e devolve as informações da versão do navegador, ou
+        None se ele não respondeu dentro do timeout.
+        """
+        try:
+            with urllib.request.urlopen(f"{self.endpoint}/json/version",
+                                        timeout=timeout or self.timeout_saude_s) as resposta:
+                return json.load(resposta)
+        except (OSError, ValueError):
+            return None
+
+    # ---------------------------------------------------------------------
+    # Ciclo de vida
+    # ---------------------------------------------------------------------
+
+    def iniciar(self, executavel, headless=False):
+        """
+        Inicia o Chromium desacoplado deste processo e espera o CDP responder.
+
+        Args:
+            executavel: caminho do Chromium (playwright.chromium.executable_path)
+            headless: inicia sem janela
+
+        Returns:
+            dict: informações de /json/version
+        """
+        self.pasta_perfil.mkdir(parents=True, exist_ok=True)
+        argumentos = [
+            executavel,
+            f"--remote-debugging-port={self.porta}",
+            f"--user-data-dir={self.pasta_perfil}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            *ARGUMENTOS_CHROMIUM,
+        ]
+        if headless:
+            argumentos.append("--headless=new")
+        argumentos.append("about:blank")
+
+        opcoes = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
+        if sys.platform == 'win32':
+            opcoes['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            opcoes['start_new_session'] = True
+
+        try:
+            processo = subprocess.Popen(argumentos, **opcoes)
+        except OSError as e:
+            raise ErroDaemon(f"Não foi possível iniciar o Chromium ({executavel}): {e}")
+
+        with open(self.arquivo_estado, 'w', encoding='utf-8') as f:
+            json.dump({
+                'pid': processo.pid,
+                'porta': self.porta,
+                'headless': headless,
+                'inicio': datetime.now().isoformat(timespec='seconds')
+            }, f)
+
+        limite = time.time() + self.timeout_inicio_s
+        while time.time() < limite:
+            info = self.verificar_saude(timeout=1)
+            if info:
+                return info
+            if processo.poll() is not None:
+                raise ErroDaemon(f"O Chromium terminou ao iniciar (código {processo.returncode})")
+            time.sleep(0.2)
+
+        self.parar()
+        raise ErroDaemon(f"O Chromium não respondeu em {self.endpoint} após {self.timeout_inicio_s}s")
+
+    def processo_registrado(self, pid):
+        """
+        True se o PID é o Chromium iniciado por iniciar(): a linha de comando
+        tem a porta do CDP e a pasta do perfil. Depois de um reinício da
+        máquina o PID de daemon.json pode ser de outro processo.
+        """
+        linha = linha_de_comando(pid)
+        return bool(linha) and f"--remote-debugging-port={self.porta}" in linha \
+            and f"--user-data-dir={self.pasta_perfil}" in linha
+
+    def processo_ativo(self):
+        """True se o Chromium registrado em daemon.json ainda está rodando"""
+        pid = self.estado().get('pid')
+        return bool(pid) and self.processo_registrado(pid)
+
+    def parar(self):
+        """Encerra o Chromium registrado; devolve True se havia um processo"""
+        pid = self.estado().get('pid')
+        try:
+            os.remove(self.arquivo_estado)
+        except OSError:
+            pass
+        if not pid or not self.processo_registrado(pid):
+            return False
+
+        try:
+            if sys.platform == 'win32':
+                subprocess.run(["taskkill", "/PID", str(pid), "/T", "/F"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:
+                os.kill(pid, signal.SIGTERM)
+        except OSError:
+            return False
+        return True
+
+    def garantir(self, executavel, headless=False, falhas_para_reiniciar=None):
+        """
+        Devolve o endpoint CDP de um navegador saudável, reiniciando o
+        daemon se ele não responder. Com o processo vivo, uma resposta lenta
+        não basta: ele só é reiniciado depois de falhas_para_reiniciar
+        verificações seguidas sem resposta (padrão: DAEMON_CONFIG).
+
+        Returns:
+            tuple: (endpoint, reiniciado)
+        """
+        if falhas_para_reiniciar is None:
+            falhas_para_reiniciar = self.falhas_para_reiniciar
+        for tentativa in range(max(falhas_para_reiniciar, 1)):
+            if tentativa:
+                if not self.processo_ativo():
+                    break
+                time.sleep(0.5)
+            if self.verificar_saude():
+                return self.endpoint, False
+        self.parar()
+        self.iniciar(executavel, headless=headless)
+        return self.endpoint, True
+
+# =========================================================================
+# LINHA DE COMANDO
+# =========================================================================
+
+def caminho_chromium():
+    """Caminho do Chromium instalado pelo Playwright"""
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as playwright:
+        return playwright.chromium.executable_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Controla o navegador persistente da automação do Fênix.")
+    parser.add_argument("acao", choices=["iniciar", "status", "parar"])
+    parser.add_argument("--sem-janela", action="store_true", help="Inicia o Chromium sem janela")
+    args = parser.parse_args(argv)
+
+    daemon = DaemonNavegador()
+    if args.acao == "status":
+        info = daemon.verificar_saude()
+        if info:
+            print(f"✅ Navegador ativo em {daemon.endpoint}: {info.get('Browser')} (pid {daemon.estado().get('pid', '?')})")
+            return 0
+        print(f"❌ Nenhum navegador respondendo em {daemon.endpoint}")
+        return 1
+
+    if args.acao == "parar":
+        print("🔧 Navegador encerrado" if daemon.parar() else "ℹ️ Nenhum navegador registrado")
+        return 0
+
+    try:
+        endpoint, reiniciado = daemon.garantir(caminho_chromium(), headless=args.sem_janela)
+    except ErroDaemon as e:
+        print(f"❌ {e}")
+        return 2
+    print(f"✅ Navegador {'iniciado' if reiniciado else 'já estava ativo'} em {endpoint}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+Perfil de desempenho do navegador da automação do Fênix
+Bloqueio de requisições (imagens, fontes, analytics e, opcionalmente, hosts de terceiros) e
+CSS que desativa transições e animações, para que as páginas carreguem
+mais rápido e os menus do react-select abram e fechem sem esperar efeitos.
+"""
+
+import json
+from urllib.parse import urlsplit
+
+from config import NAVEGADOR_CONFIG
+
+# Argumentos do Chromium (navegador da automação e daemon persistente)
+ARGUMENTOS_CHROMIUM = [
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor',
+    '--no-sandbox'
+]
+
+# =========================================================================
+# CSS SEM ANIMAÇÕES
+# =========================================================================
+
+CSS_SEM_ANIMACOES = """
+*, *::before, *::after {
+    transition: none !important;
+    transition-duration: 0s !important;
+    transition-delay: 0s !important;
+    animation: none !important;
+    animation-duration: 0s !important;
+    animation-delay: 0s !important;
+    scroll-behavior: auto !important;
+}
+"""
+
+# Executado antes dos scripts de cada página (inclusive após navegações)
+SCRIPT_SEM_ANIMACOES = """
+(() => {
+    const aplicar = () => {
+        if (document.getElementById('fenixrpa-sem-animacoes')) return;
+        const estilo = document.createElement('style');
+        estilo.id = 'fenixrpa-sem-animacoes';
+        estilo.textContent = %s;
+        (document.head || document.documentElement).appendChild(estilo);
+    };
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', aplicar);
+    } else {
+        aplicar();
+    }
+})();
+"""
+
+# =========================================================================
+# FILTRO DE REQUISIÇÕES
+# =========================================================================
+
+def _host_casa(host, dominios):
+    """True se o host é um dos domínios ou um subdomínio deles"""
+    return any(host == dominio or host.endswith("." + dominio) for dominio in dominios)
+
+def deve_bloquear(url, tipo_recurso, config=None):
+    """
+    Decide se uma requisição do navegador deve ser abortada.
+
+    Navegações ('document') nunca são bloqueadas, para não interromper os
+    redirecionamentos do login; os demais recursos são bloqueados pelo tipo
+    (imagem, fonte...), por domínio de analytics ou, com bloquear_terceiros,
+    por estarem fora dos domínios permitidos.
+
+    Args:
+        url: URL da requisição
+        tipo_recurso: request.resource_type do Playwright
+        config: configuração do perfil (padrão: NAVEGADOR_CONFIG)
+    """
+    config = config or NAVEGADOR_CONFIG
+    if not config.get('bloquear_recursos') or tipo_recurso == 'document':
+        return False
+
+    partes = urlsplit(url)
+    if partes.scheme not in ('http', 'https'):
+        return False  # data:, blob: e afins não saem do navegador
+    host = (partes.hostname or "").lower()
+
+    if tipo_recurso in config.get('tipos_bloqueados', ()):
+        return True
+    if _host_casa(host, config.get('dominios_bloqueados', ())):
+        return True
+    if config.get('bloquear_terceiros') and not _host_casa(host, config.get('dominios_permitidos', ())):
+        return True
+    return False
+
+class FiltroRequisicoes:
+    """
+    Handler de context.route que aborta as requisições bloqueadas e conta
+    quantas foram abortadas e liberadas.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or NAVEGADOR_CONFIG
+        self.bloqueadas = 0
+        self.liberadas = 0
+
+    async def __call__(self, route):
+        requisicao = route.request
+        if deve_bloquear(requisicao.url, requisicao.resource_type, self.config):
+            self.bloqueadas += 1
+            await route.abort('blockedbyclient')
+        else:
+            self.liberadas += 1
+            await route.continue_()
+
+# Extensões usadas para bloquear por tipo sem interceptar as requisições
+EXTENSOES_POR_TIPO = {
+    'image': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'ico', 'bmp'],
+    'font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'media': ['mp4', 'webm', 'ogg', 'mp3', 'wav', 'm4a'],
+}
+
+def padroes_bloqueados(config=None):
+    """
+    Padrões de URL (Network.setBlockedURLs do Chromium) equivalentes a
+    tipos_bloqueados e dominios_bloqueados
+    """
+    config = config or NAVEGADOR_CONFIG
+    padroes = []
+    for tipo in config.get('tipos_bloqueados', ()):
+        for extensao in EXTENSOES_POR_TIPO.get(tipo, ()):
+            padroes += [f"*.{extensao}", f"*.{extensao}?*"]
+    for dominio in config.get('dominios_bloqueados', ()):
+        padroes += [f"*://{dominio}/*", f"*://*.{dominio}/*"]
+    return padroes
+
+class BloqueioPorCDP:
+    """
+    Bloqueia por padrões de URL em cada página do contexto pelo CDP
+    (Network.setBlockedURLs). Sem route() o Chromium mantém o cache HTTP,
+    e os bundles do portal não são baixados de novo a cada página.
+    """
+
+    def __init__(self, context, config=None):
+        self.context = context
+        self.padroes = padroes_bloqueados(config)
+        self.bloqueadas = 0
+        self.liberadas = None  # O Chromium não passa as liberadas pelo filtro
+
+    async def instalar(self, page):
+        sessao = await self.context.new_cdp_session(page)
+        sessao.on("Network.loadingFailed", self._contar)
+        await sessao.send("Network.enable")
+        await sessao.send("Network.setBlockedURLs", {'urls': self.padroes})
+
+    def _contar(self, evento):
+        if evento.get('blockedReason'):
+            self.bloqueadas += 1
+
+# =========================================================================
+# APLICAÇÃO NO CONTEXTO
+# =========================================================================
+
+def _chromium(context):
+    navegador = getattr(context, 'browser', None)
+    return getattr(getattr(navegador, 'browser_type', None), 'name', None) == 'chromium'
+
+def opcoes_contexto(config=None):
+    """Opções de browser.new_context() do perfil"""
+    config = config or NAVEGADOR_CONFIG
+    return {'reduced_motion': 'reduce'} if config.get('desativar_animacoes') else {}
+
+async def aplicar_perfil_desempenho(context, config=None):
+    """
+    Instala o filtro de requisições e o CSS sem animações em um contexto.
+
+    No Chromium, o bloqueio por tipo e por domínio de analytics usa
+    BloqueioPorCDP nas páginas do contexto (atuais e novas). Qualquer
+    route() desliga o cache HTTP do Chromium, seja qual for o padrão; por
+    isso o FiltroRequisicoes em route('**/*') só é usado com
+    bloquear_terceiros (que precisa do host de cada requisição) ou fora do
+    Chromium. Com bloquear_recursos=False nenhum filtro é instalado.
+
+    Returns:
+        BloqueioPorCDP ou FiltroRequisicoes instalado, ou None quando o
+        filtro está desligado
+    """
+    config = config or NAVEGADOR_CONFIG
+    if config.get('desativar_animacoes'):
+        await context.add_init_script(SCRIPT_SEM_ANIMACOES % json.dumps(CSS_SEM_ANIMACOES))
+
+    if not config.get('bloquear_recursos'):
+        return None
+    if _chromium(context) and not config.get('bloquear_terceiros'):
+        bloqueio = BloqueioPorCDP(context, config)
+        for page in context.pages:
+            await bloqueio.instalar(page)
+        context.on("page", bloqueio.instalar)
+        return bloqueio
+    filtro = FiltroRequisicoes(config)
+    await context.route("**/*", filtro)
+    return filtro
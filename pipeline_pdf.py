@@ -0,0 +1,236 @@
+"""
+Pipeline em estágios para geração dos PDFs
+busca dos arquivos (threads de I/O) -> otimização das imagens (pool de
+processos) -> renderização e gravação (thread de quem chamou), com filas
+limitadas entre os estágios. Rede, CPU e disco trabalham ao mesmo tempo e o
+tempo total se aproxima do estágio mais lento, não da soma dos estágios.
+"""
+
+import os
+import time
+import queue
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+PIPELINE_CONFIG = {
+    'threads_busca': 4,                                   # Downloads/cópias simultâneos
+    'processos_imagem': max(1, (os.cpu_count() or 2) - 1),  # Processos de otimização de imagens
+    'capacidade_fila': 8,                                 # Itens aguardando entre estágios
+}
+
+ESTAGIOS = ('busca', 'imagens', 'renderizacao')
+
+_FIM = object()
+
+_pool_imagens = None
+_lock_pool = threading.Lock()
+
+def obter_pool_imagens(processos=None):
+    """
+    Pool de processos de imagens do módulo, criado na primeira geração e
+    reaproveitado pelas seguintes (o app não sobe processos novos a cada
+    geração). Um pool quebrado (processo morto) é substituído.
+    """
+    global _pool_imagens
+    with _lock_pool:
+        if _pool_imagens is None or getattr(_pool_imagens, '_broken', False):
+            _pool_imagens = ProcessPoolExecutor(max_workers=processos or PIPELINE_CONFIG['processos_imagem'])
+        return _pool_imagens
+
+# =========================================================================
+# CONTADORES
+# =========================================================================
+
+class ContadoresPipeline:
+    """Vazão e ocupação de cada estágio, seguros para várias threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.inicio = time.perf_counter()
+        self.estagios = {
+            estagio: {'concluidos': 0, 'erros': 0, 'segundos_ocupado': 0.0}
+            for estagio in ESTAGIOS
+        }
+
+    def registrar(self, estagio, segundos, erro=False):
+        with self._lock:
+            contador = self.estagios[estagio]
+            contador['concluidos'] += 1
+            contador['segundos_ocupado'] += segundos
+            if erro:
+                contador['erros'] += 1
+
+    def resumo(self, filas=None):
+        """Fotografia dos contadores: concluídos, erros, itens/s e tempo médio por estágio"""
+        with self._lock:
+            decorrido = max(time.perf_counter() - self.inicio, 1e-6)
+            resumo = {'decorrido_s': round(decorrido, 2)}
+            for estagio, contador in self.estagios.items():
+                concluidos = contador['concluidos']
+                resumo[estagio] = {
+                    'concluidos': concluidos,
+                    'erros': contador['erros'],
+                    'itens_por_s': round(concluidos / decorrido, 2),
+                    'media_s': round(contador['segundos_ocupado'] / concluidos, 3) if concluidos else 0.0
+                }
+        if filas:
+            resumo['filas'] = {nome: fila.qsize() for nome, fila in filas.items()}
+        return resumo
+
+def _executar_cronometrado(funcao, trabalho):
+    """Roda a função no processo do pool e devolve também o tempo gasto nela"""
+    inicio = time.perf_counter()
+    resultado = funcao(trabalho)
+    return resultado, time.perf_counter() - inicio
+
+# =========================================================================
+# EXECUÇÃO
+# =========================================================================
+
+def executar_pipeline(trabalhos, buscar, processar, renderizar, ao_progredir=None,
+                      threads_busca=None, processos=None, capacidade_fila=None, usar_processos=True,
+                      executor=None):
+    """
+    Executa os trabalhos pelos três estágios.
+
+    Args:
+        trabalhos: iterável de trabalhos (pode ser um gerador, por exemplo
+            alimentado por uma listagem em andamento)
+        buscar: função(trabalho) -> trabalho, executada nas threads de busca
+        processar: função(trabalho) -> resultado, executada no pool de
+            processos (precisa ser uma função de módulo, serializável, e não
+            pode usar o Streamlit: erros a exibir voltam no resultado)
+        renderizar: função(trabalho, resultado, erro), executada na thread de
+            quem chamou (seguro para atualizar o Streamlit). erro é a exceção
+            da busca ou do processamento, ou None
+        ao_progredir: callback(resumo) após cada item renderizado
+        usar_processos: False usa threads no estágio de imagens (testes ou
+            ambientes sem multiprocessing)
+        executor: pool já criado para o estágio de imagens, compartilhado
+            entre pipelines simultâneos (não é encerrado aqui); padrão: o
+            pool do módulo (obter_pool_imagens, com processos na criação)
+
+    Returns:
+        dict: resumo final dos contadores (ContadoresPipeline.resumo)
+    """
+    threads_busca = threads_busca or PIPELINE_CONFIG['threads_busca']
+    processos = processos or PIPELINE_CONFIG['processos_imagem']
+    capacidade_fila = capacidade_fila or PIPELINE_CONFIG['capacidade_fila']
+
+    contadores = ContadoresPipeline()
+    # Trabalhos buscados aguardando o pool de imagens (put bloqueia quando cheia)
+    fila_buscados = queue.Queue(maxsize=capacidade_fila)
+    # Resultados aguardando a renderização; limitada pelas vagas abaixo
+    fila_prontos = queue.Queue()
+    # Itens entre o despacho para o pool e o fim da renderização
+    vagas = threading.BoundedSemaphore(capacidade_fila)
+    filas = {'buscados': fila_buscados, 'prontos': fila_prontos}
+
+    entrada = iter(trabalhos)
+    lock_entrada = threading.Lock()
+    erros_entrada = []
+
+    def _buscar():
+        while True:
+            with lock_entrada:
+                if erros_entrada:
+                    return
+                try:
+                    trabalho = next(entrada)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    erros_entrada.append(e)
+                    return
+
+            inicio = time.perf_counter()
+            erro = None
+            try:
+                trabalho = buscar(trabalho)
+            except Exception as e:
+                erro = e
+            contadores.registrar('busca', time.perf_counter() - inicio, erro is not None)
+            fila_buscados.put((trabalho, erro))
+
+    def _aguardar_busca(threads):
+        for thread in threads:
+            thread.join()
+        fila_buscados.put(_FIM)
+
+    def _despachar(executor):
+        despachados = 0
+        while True:
+            item = fila_buscados.get()
+            if item is _FIM:
+                fila_prontos.put((_FIM, despachados))
+                return
+            trabalho, erro = item
+            vagas.acquire()
+            despachados += 1
+            if erro is not None:
+                fila_prontos.put((trabalho, None, erro))
+                continue
+            try:
+                futuro = executor.submit(_executar_cronometrado, processar, trabalho)
+            except Exception as e:
+                fila_prontos.put((trabalho, None, e))
+                continue
+            futuro.add_done_callback(lambda f, t=trabalho: fila_prontos.put((t, f, None)))
+
+    if executor is not None:
+        gerenciador = nullcontext(executor)
+    elif usar_processos:
+        gerenciador = nullcontext(obter_pool_imagens(processos))
+    else:
+        gerenciador = ThreadPoolExecutor(max_workers=processos)
+
+    with gerenciador as executor:
+        threads = [
+            threading.Thread(target=_buscar, name=f"pipeline_busca_{i}", daemon=True)
+            for i in range(threads_busca)
+        ]
+        for thread in threads:
+            thread.start()
+        threading.Thread(target=_aguardar_busca, args=(threads,), name="pipeline_busca_fim", daemon=True).start()
+        threading.Thread(target=_despachar, args=(executor,), name="pipeline_despacho", daemon=True).start()
+
+        renderizados = 0
+        total = None
+        while total is None or renderizados < total:
+            item = fila_prontos.get()
+            if item[0] is _FIM:
+                total = item[1]
+                continue
+
+            trabalho, futuro, erro = item
+            vagas.release()
+            resultado = None
+            if futuro is not None:
+                try:
+                    resultado, segundos = futuro.result()
+                    contadores.registrar('imagens', segundos)
+                except Exception as e:
+                    erro = e
+                    contadores.registrar('imagens', 0.0, True)
+
+            inicio = time.perf_counter()
+            falhou = erro is not None
+            try:
+                renderizar(trabalho, resultado, erro)
+            except Exception:
+                falhou = True
+            contadores.registrar('renderizacao', time.perf_counter() - inicio, falhou)
+
+            renderizados += 1
+            if ao_progredir:
+                ao_progredir(contadores.resumo(filas))
+
+    if erros_entrada:
+        raise erros_entrada[0]
+
+    return contadores.resumo()
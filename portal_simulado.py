@@ -0,0 +1,799 @@
+"""
+Portal Fênix simulado (stand-in local) para testes e benchmarks da automação
+
+Servidor HTTP local que reproduz as páginas e a estrutura do DOM que a
+FenixAutomation procura: o login (botão inicial do Fênix e as telas de
+e-mail, senha, MFA e "manter conectado" da Microsoft), o layout do
+`__next` com o menu Submissão de Laudos → Upload de Laudos, o formulário
+do laudo com os dropdowns no estilo react-select (`css-…-control`,
+`singleValue`, `menu`, `option`, "Nenhum resultado"), a Matriz de Decisão
+com o botão "Adicionar linha da Matriz de decisão" e o fluxo Enviar →
+Assinatura Funcional → Confirmar. Os laudos confirmados ficam em
+laudos_recebidos, para conferir o que a automação realmente enviou.
+
+Latências e falhas são configuráveis (PORTAL_SIMULADO_CONFIG) e os
+sorteios usam uma semente, então o mesmo benchmark pode ser repetido.
+
+Uso:
+    python portal_simulado.py --porta 8765 --latencia-pagina 0.5
+    (com lancamento_fenix.FENIX_URL apontando para http://127.0.0.1:8765/)
+"""
+
+import sys
+import html
+import json
+import time
+import random
+import secrets
+import argparse
+import threading
+from datetime import datetime
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import urlsplit, parse_qs, quote
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+PORTAL_SIMULADO_CONFIG = {
+    'host': "127.0.0.1",
+    'porta': 0,                    # 0: porta livre escolhida pelo sistema
+    'latencia_pagina_s': 0.2,      # Atraso de cada página servida (navegações e POSTs)
+    'latencia_opcoes_s': 0.3,      # "Carregando..." da busca de UP antes das opções
+    'latencia_envio_s': 1.0,       # Enviar até a página de assinatura
+    'mfa_s': 0,                    # Tela de MFA aprovada sozinha após esse tempo (0: sem MFA)
+    # Falhas injetadas (probabilidade de 0 a 1)
+    'falha_pagina': 0.0,           # Upload de Laudos ou assinatura respondem 503
+    'falha_opcoes': 0.0,           # Busca de UP cadastrada responde "Nenhum resultado"
+    'falha_adicionar_linha': 0.0,  # Clique em "Adicionar linha" não cria a linha
+    'falha_envio': 0.0,            # Enviar mostra erro e o formulário continua aberto
+    'semente': None,               # Semente dos sorteios (None: aleatória)
+    'email': None,                 # Credenciais aceitas no login (None aceita qualquer)
+    'senha': None,
+}
+
+COOKIE_SESSAO = "fenix_sessao_simulada"
+
+# Opções dos dropdowns (as mesmas que a automação seleciona)
+OPCOES = {
+    'unf': ['BA', 'CS', 'ES', 'MA', 'MS', 'SP'],
+    'urgencia': ['Baixa', 'Média', 'Alta'],
+    'tipo_ocorrencia': ['Sinistro', 'Praga', 'Doença'],
+    'tipo_dano': ['D. Hídrico', 'Incêndio', 'Vendaval'],
+    'ocorrencia': ['Reboleiras', 'Área total'],
+    'severidade': ['Baixa', 'Média', 'Alta'],
+    'recomendacao': ['Manter Ciclo', 'Reavaliar', 'Antecipar Colheita', 'Antecipar Colheita Parcial',
+                     'Limpeza de Área', 'Limpeza de Área Parcial'],
+}
+
+# =========================================================================
+# PÁGINAS
+# =========================================================================
+
+_CSS = """
+body { font-family: sans-serif; margin: 0; background: #f3f4f6; }
+#__next > div { padding: 8px 16px; }
+.navegacao button, .btn { padding: 6px 12px; }
+#submenu a { display: block; padding: 4px 0; }
+.h-min-screen { background: #fff; min-height: 100vh; }
+.css-b62m3t-container { position: relative; min-width: 200px; }
+.css-1ek14t9-control { display: flex; align-items: center; border: 1px solid #ccc; min-height: 34px; background: #fff; cursor: default; }
+.css-1fdsijx-ValueContainer { flex: 1; display: flex; align-items: center; padding: 2px 8px; }
+.css-1jqq78o-placeholder { color: #888; margin-right: 4px; }
+.css-1dimb5e-singleValue { margin-right: 4px; }
+.sel-input { border: 0; outline: 0; width: 100%; min-width: 20px; }
+.css-1hb7zxy-IndicatorsContainer { display: flex; align-items: center; }
+.css-1xc3v61-indicatorContainer { padding: 0 8px; }
+.css-1nmdiq5-menu { position: absolute; top: 100%; left: 0; right: 0; z-index: 100; background: #fff; border: 1px solid #ccc; }
+.css-10wo9uf-option, .css-1wlit7h-NoOptionsMessage, .css-1wlit7h-loadingMessage { padding: 6px 8px; }
+.css-10wo9uf-option:hover { background: #deebff; }
+.cabecalho-laudo { display: grid; grid-template-columns: repeat(3, 1fr); gap: 12px; }
+.textos-laudo textarea { width: 100%; height: 60px; }
+.linha-matriz { display: flex; flex-wrap: wrap; gap: 8px; padding: 8px 0; border-bottom: 1px solid #eee; }
+.campo { min-width: 180px; }
+.erro { color: #b91c1c; margin-right: 12px; }
+.assinatura.selecionada { outline: 3px solid #2563eb; }
+"""
+
+# react-select simulado, Matriz de Decisão e envio (mesmo script em todas as páginas do portal)
+_JS = """
+const PORTAL = $portal;
+const OPCOES = $opcoes;
+
+let semente = PORTAL.semente >>> 0;
+function sorteio() {
+    semente = (semente + 0x6D2B79F5) >>> 0;
+    let t = semente;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+}
+const falhou = (chave) => sorteio() < (PORTAL[chave] || 0);
+
+function alternarSubmenu() {
+    const submenu = document.getElementById('submenu');
+    submenu.hidden = !submenu.hidden;
+}
+
+// ---- Dropdowns no estilo react-select ----
+let seletorAberto = null;
+let proximoId = 1;
+const CONTAINER = '.css-b62m3t-container';
+
+function mensagem(lista, classe, texto) {
+    lista.innerHTML = '';
+    const div = document.createElement('div');
+    div.className = classe;
+    div.textContent = texto;
+    lista.appendChild(div);
+}
+
+function mostrarOpcoes(lista, itens) {
+    if (!itens.length) {
+        mensagem(lista, 'css-1wlit7h-NoOptionsMessage', 'Nenhum resultado');
+        return;
+    }
+    lista.innerHTML = '';
+    for (const item of itens) {
+        const opcao = document.createElement('div');
+        opcao.className = 'css-10wo9uf-option';
+        opcao.setAttribute('role', 'option');
+        opcao.textContent = item;
+        lista.appendChild(opcao);
+    }
+}
+
+function filtrar(itens, texto) {
+    const busca = texto.toUpperCase();
+    return itens.filter((item) => item.toUpperCase().includes(busca));
+}
+
+function buscarUps(texto) {
+    if (falhou('falha_opcoes')) return [];
+    if (PORTAL.ups === null) return [texto.toUpperCase()];
+    return filtrar(PORTAL.ups, texto);
+}
+
+function abrirMenu(seletor) {
+    if (seletorAberto && seletorAberto !== seletor) fecharMenu();
+    seletorAberto = seletor;
+    let menu = seletor.querySelector('.css-1nmdiq5-menu');
+    if (!menu) {
+        menu = document.createElement('div');
+        menu.className = 'css-1nmdiq5-menu';
+        menu.setAttribute('aria-hidden', 'false');
+        menu.innerHTML = '<div class="css-1n6sfyn-menuList" role="listbox"></div>';
+        seletor.appendChild(menu);
+    }
+    const lista = menu.firstChild;
+    const texto = seletor.querySelector('input').value.trim();
+    clearTimeout(seletor.busca);
+    if (seletor.dataset.campo !== 'up') {
+        mostrarOpcoes(lista, filtrar(OPCOES[seletor.dataset.campo], texto));
+    } else if (!texto) {
+        mensagem(lista, 'css-1wlit7h-NoOptionsMessage', 'Digite a UP para pesquisar');
+    } else {
+        mensagem(lista, 'css-1wlit7h-loadingMessage', 'Carregando...');
+        seletor.busca = setTimeout(() => {
+            if (seletorAberto === seletor) mostrarOpcoes(lista, buscarUps(texto));
+        }, PORTAL.latencia_opcoes_s * 1000);
+    }
+}
+
+function fecharMenu() {
+    const seletor = seletorAberto;
+    if (!seletor) return;
+    seletorAberto = null;
+    clearTimeout(seletor.busca);
+    const menu = seletor.querySelector('.css-1nmdiq5-menu');
+    if (menu) menu.remove();
+    seletor.querySelector('input').value = '';
+    atualizarPlaceholder(seletor);
+}
+
+function atualizarPlaceholder(seletor) {
+    const vazio = !seletor.dataset.valor && !seletor.querySelector('input').value;
+    seletor.querySelector('.css-1jqq78o-placeholder').hidden = !vazio;
+}
+
+function definirValor(seletor, valor) {
+    seletor.dataset.valor = valor || '';
+    const valores = seletor.querySelector('.css-1fdsijx-ValueContainer');
+    const indicadores = seletor.querySelector('.css-1hb7zxy-IndicatorsContainer');
+    for (const antigo of seletor.querySelectorAll('.css-1dimb5e-singleValue, [aria-label="clear"]')) antigo.remove();
+    if (valor) {
+        const unico = document.createElement('div');
+        unico.className = 'css-1dimb5e-singleValue';
+        unico.textContent = valor;
+        valores.insertBefore(unico, valores.lastElementChild);
+        const limpar = document.createElement('div');
+        limpar.className = 'css-1xc3v61-indicatorContainer';
+        limpar.setAttribute('aria-label', 'clear');
+        limpar.textContent = '×';
+        indicadores.insertBefore(limpar, indicadores.firstChild);
+    }
+    atualizarPlaceholder(seletor);
+}
+
+document.addEventListener('mousedown', (evento) => {
+    const opcao = evento.target.closest('[role="option"]');
+    const limpar = evento.target.closest('[aria-label="clear"]');
+    const controle = evento.target.closest('.css-1ek14t9-control');
+    if (opcao) {
+        evento.preventDefault();
+        const seletor = opcao.closest(CONTAINER);
+        definirValor(seletor, opcao.textContent);
+        fecharMenu();
+    } else if (limpar) {
+        evento.preventDefault();
+        definirValor(limpar.closest(CONTAINER), null);
+    } else if (controle) {
+        evento.preventDefault();
+        const seletor = controle.closest(CONTAINER);
+        if (seletorAberto === seletor) fecharMenu(); else abrirMenu(seletor);
+        seletor.querySelector('input').focus();
+    } else {
+        fecharMenu();
+    }
+});
+
+document.addEventListener('input', (evento) => {
+    if (!evento.target.classList.contains('sel-input')) return;
+    const seletor = evento.target.closest(CONTAINER);
+    atualizarPlaceholder(seletor);
+    abrirMenu(seletor);
+});
+
+document.addEventListener('keydown', (evento) => {
+    if (!evento.target.classList || !evento.target.classList.contains('sel-input')) return;
+    const seletor = evento.target.closest(CONTAINER);
+    if (evento.key === 'Escape') {
+        fecharMenu();
+    } else if (evento.key === 'Enter') {
+        evento.preventDefault();
+        const primeira = seletorAberto === seletor && seletor.querySelector('[role="option"]');
+        if (primeira) {
+            definirValor(seletor, primeira.textContent);
+            fecharMenu();
+        }
+    } else if ((evento.key === 'Backspace' || evento.key === 'Delete') && !evento.target.value) {
+        definirValor(seletor, null);
+    }
+});
+
+// ---- Matriz de Decisão ----
+function numerarLinhas() {
+    document.querySelectorAll('#matriz .linha-matriz').forEach((linha, indice) => {
+        for (const campo of linha.querySelectorAll('[data-nome]')) {
+            campo.name = 'sinistros[' + indice + '].' + campo.dataset.nome;
+        }
+    });
+    for (const entrada of document.querySelectorAll('.sel-input:not([id])')) {
+        entrada.id = 'react-select-' + (proximoId++) + '-input';
+    }
+}
+
+function adicionarLinha() {
+    if (falhou('falha_adicionar_linha')) return;
+    const modelo = document.getElementById('modelo-linha').content.firstElementChild;
+    document.querySelector('#matriz > div').appendChild(modelo.cloneNode(true));
+    numerarLinhas();
+}
+
+function removerLinha(botao) {
+    botao.closest('.linha-matriz').remove();
+    numerarLinhas();
+}
+
+// ---- Envio e assinatura ----
+function valorDe(raiz, campo) {
+    const elemento = raiz.querySelector('[data-campo="' + campo + '"]');
+    if (!elemento) return '';
+    return elemento.matches(CONTAINER) ? elemento.dataset.valor || '' : elemento.value.trim();
+}
+
+function coletarLaudo() {
+    const laudo = {};
+    for (const campo of ['solicitante', 'data_visita', 'unf', 'urgencia', 'tipo_ocorrencia',
+                         'objetivo', 'diagnostico', 'licoes_aprendidas', 'consideracoes_finais']) {
+        laudo[campo] = valorDe(document.getElementById('form-laudo'), campo);
+    }
+    laudo.linhas = Array.from(document.querySelectorAll('#matriz .linha-matriz'), (linha) => ({
+        up: valorDe(linha, 'up'), tipo_dano: valorDe(linha, 'tipo_dano'), ocorrencia: valorDe(linha, 'ocorrencia'),
+        recomendacao_pct: valorDe(linha, 'recomendacao_pct'), severidade: valorDe(linha, 'severidade'),
+        recomendacao: valorDe(linha, 'recomendacao')
+    }));
+    return laudo;
+}
+
+function validarLaudo(laudo) {
+    for (const campo of ['data_visita', 'unf', 'objetivo']) {
+        if (!laudo[campo]) return 'Preencha o campo ' + campo;
+    }
+    if (!laudo.linhas.length) return 'Adicione ao menos uma linha na Matriz de decisão';
+    for (let i = 0; i < laudo.linhas.length; i++) {
+        for (const [campo, valor] of Object.entries(laudo.linhas[i])) {
+            if (!valor) return 'Linha ' + (i + 1) + ' da Matriz de decisão: preencha ' + campo;
+        }
+    }
+    return null;
+}
+
+function enviarLaudo() {
+    const erro = document.getElementById('erro-envio');
+    const laudo = coletarLaudo();
+    const problema = validarLaudo(laudo);
+    if (problema) {
+        erro.textContent = problema;
+        return;
+    }
+    erro.textContent = 'Enviando...';
+    setTimeout(() => {
+        if (falhou('falha_envio')) {
+            erro.textContent = 'Erro ao enviar o laudo. Tente novamente.';
+            return;
+        }
+        sessionStorage.setItem('laudo_pendente', JSON.stringify(laudo));
+        location.href = '/laudos/assinatura';
+    }, PORTAL.latencia_envio_s * 1000);
+}
+
+function alternarAssinatura(botao) {
+    botao.classList.toggle('selecionada');
+}
+
+function confirmarAssinatura() {
+    const erro = document.getElementById('erro-assinatura');
+    const pendente = sessionStorage.getItem('laudo_pendente');
+    if (!document.querySelector('.assinatura.selecionada')) {
+        erro.textContent = 'Selecione o tipo de assinatura';
+    } else if (!pendente) {
+        erro.textContent = 'Nenhum laudo aguardando assinatura';
+    } else {
+        const formulario = document.getElementById('form-confirmar');
+        formulario.elements.laudo.value = pendente;
+        sessionStorage.removeItem('laudo_pendente');
+        formulario.submit();
+    }
+}
+
+numerarLinhas();
+"""
+
+_DOCUMENTO = Template("""<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="utf-8"><title>$titulo</title><style>$css</style></head>
+<body>
+$corpo
+$scripts
+</body>
+</html>""")
+
+# Layout das páginas com login: cabeçalho, menu e o miolo no mesmo caminho
+# de divs do portal (//*[@id="__next"]/div[3]/div/div/div/div[2]/div/div/div/div/div[2]/...)
+_LAYOUT_PORTAL = Template("""<div id="__next">
+<div class="cabecalho"><div class="logo">Fênix Florestal</div><div class="usuario">$usuario</div></div>
+<div class="navegacao">
+  <button type="button" onclick="alternarSubmenu()">Submissão de Laudos</button>
+  <nav id="submenu"$submenu_oculto><a href="/laudos/upload">Upload de Laudos</a><a href="/">Meus Laudos</a></nav>
+</div>
+<div class="max-w-screen-xl mx-auto px-2 sm:px-4 lg:px-0 py-0 bg-white rounded-md shadow-md h-min-screen">
+ <div><div><div>
+  <div class="titulo"><h1>$titulo</h1></div>
+  <div class="z-0"><div><div><div><div>
+   <div class="etapas">$etapa</div>
+   <div class="sm:mx-0 lg:mt-4">$miolo</div>
+  </div></div></div></div></div>
+ </div></div></div>
+</div>
+</div>""")
+
+def _seletor(campo):
+    """Dropdown no estilo react-select (container > control > valueContainer + indicadores)"""
+    return (
+        f'<div class="css-b62m3t-container" data-campo="{campo}" data-valor="">'
+        '<div class="css-1ek14t9-control">'
+        '<div class="css-1fdsijx-ValueContainer">'
+        '<div class="css-1jqq78o-placeholder">- Selecione -</div>'
+        '<div class="css-19bb58m"><input class="sel-input" autocomplete="off" aria-autocomplete="list"></div>'
+        '</div>'
+        '<div class="css-1hb7zxy-IndicatorsContainer">'
+        '<span class="css-1u9des2-indicatorSeparator"></span>'
+        '<div class="css-1xc3v61-indicatorContainer" aria-hidden="true">▾</div>'
+        '</div></div></div>'
+    )
+
+def _campo_linha(rotulo, conteudo):
+    return f'<div class="campo"><span>{rotulo}</span><div>{conteudo}</div></div>'
+
+# Linha da Matriz de Decisão; os names sinistros[i].* são numerados pelo script
+_LINHA_MATRIZ = (
+    '<div class="flex flex-col lg:flex-row gap-2 linha-matriz">'
+    + _campo_linha("UP avaliada:", _seletor('up'))
+    + _campo_linha("Idade:", '<input data-nome="idade" readonly>')
+    + _campo_linha("Tipo Dano:", _seletor('tipo_dano'))
+    + _campo_linha("Ocorrência na UP:", _seletor('ocorrencia'))
+    + _campo_linha("Recomendação(%)",
+                   '<input type="number" step="0.01" data-nome="recomendacaoPct" data-campo="recomendacao_pct">')
+    + _campo_linha("Severidade:", _seletor('severidade'))
+    + _campo_linha("Recomendaçao:", _seletor('recomendacao'))
+    + '<button type="button" aria-label="Remover linha" title="Remover linha" onclick="removerLinha(this)">🗑</button>'
+    + '</div>'
+)
+
+def _textarea(nome, campo, rotulo):
+    return f'<label>{rotulo}<textarea name="{nome}" data-campo="{campo}"></textarea></label>'
+
+# Formulário do Upload de Laudos: form/div[1] cabeçalho e textos, form/div[2]
+# Matriz de Decisão (div[3]/button = adicionar linha), form/div[3]/button = Enviar
+_FORMULARIO_UPLOAD = (
+    '<div><div><form id="form-laudo" onsubmit="return false">'
+    '<div>'
+    '<div><div><div class="cabecalho-laudo">'
+    '<div><span>Solicitante</span><div><div><input placeholder="Solicitante" data-campo="solicitante"></div></div></div>'
+    '<div><div><span>Visita Campo</span></div><div><div><div><div>'
+    '<input placeholder="Data da visita de campo" data-campo="data_visita">'
+    '</div></div></div></div></div>'
+    '<div><span>UNF</span><div>' + _seletor('unf') + '</div></div>'
+    '<div><span>Status</span><div><div>Rascunho</div></div></div>'
+    '<div><span>Anexos</span><div><div>Nenhum arquivo</div></div></div>'
+    '<div>'
+    '<div><span>Urgência</span><div>' + _seletor('urgencia') + '</div></div>'
+    '<div><span>Tipo Ocorrência</span><div>' + _seletor('tipo_ocorrencia') + '</div></div>'
+    '</div>'
+    '</div></div></div>'
+    '<div class="textos-laudo">'
+    + _textarea("objetivo", "objetivo", "Objetivo")
+    + _textarea("diagnostico", "diagnostico", "Diagnóstico")
+    + _textarea("licoesAprendidas", "licoes_aprendidas", "Lições Aprendidas")
+    + _textarea("consideracoesFinais", "consideracoes_finais", "Considerações Finais")
+    + '</div>'
+    '</div>'
+    '<div><div>'
+    '<div><h2>Matriz de decisão</h2></div>'
+    '<div><fieldset id="matriz"><div>' + _LINHA_MATRIZ + '</div></fieldset></div>'
+    '<div class="absolute -right-4 bottom-12 z-50">'
+    '<button type="button" aria-label="Adicionar linha da Matriz de decisão" onclick="adicionarLinha()">'
+    '<svg class="h-8 w-8" stroke="currentColor" fill="currentColor" viewBox="0 0 1024 1024" width="32" height="32">'
+    '<path d="M512 64a448 448 0 1 0 0 896 448 448 0 0 0 0-896zm192 472H536v168h-48V536H320v-48h168V320h48v168h168z"/>'
+    '</svg></button></div>'
+    '</div></div>'
+    '<div><span class="erro" id="erro-envio"></span><button type="button" class="btn" onclick="enviarLaudo()">Enviar</button></div>'
+    '</form></div></div>'
+    '<template id="modelo-linha">' + _LINHA_MATRIZ + '</template>'
+)
+
+# Assinatura: miolo/button/div/div/div[1] = Assinatura Funcional, miolo/div[2]/button = Confirmar
+_ASSINATURA = (
+    '<div><p>Escolha como assinar o laudo</p></div>'
+    '<button type="button" class="assinatura" onclick="alternarAssinatura(this)"><div><div>'
+    '<div>Assinatura Funcional</div><div>Assina com o certificado do seu usuário</div>'
+    '</div></div></button>'
+    '<div><span class="erro" id="erro-assinatura"></span>'
+    '<button type="button" class="btn" onclick="confirmarAssinatura()">Confirmar</button></div>'
+)
+
+_FORM_CONFIRMAR = ('<form id="form-confirmar" method="post" action="/laudos/confirmar" hidden>'
+                   '<input type="hidden" name="laudo"></form>')
+
+# Telas do login (mesmos ids e names das páginas da Microsoft que TELAS_LOGIN reconhece)
+_LANDING = ('<div id="__next"><div><div class="logo">Fênix Florestal</div>'
+            '<div><button type="button" class="btn" onclick="location.href=\'/login\'">Entrar</button></div>'
+            '</div></div>')
+
+_LOGIN_EMAIL = ('<form method="get" action="/login/senha"><div>Entrar</div>'
+                '<input type="email" name="loginfmt" id="i0116" placeholder="Email, telefone ou Skype">'
+                '<input type="submit" id="idSIButton9" value="Avançar"></form>')
+
+_LOGIN_SENHA = Template('<form method="post" action="/login/senha"><div>$email</div>$erro'
+                        '<input type="hidden" name="loginfmt" value="$email">'
+                        '<input type="password" name="passwd" id="i0118" placeholder="Senha">'
+                        '<input type="submit" id="idSIButton9" value="Entrar"></form>')
+
+_LOGIN_MFA = Template('<div id="idDiv_SAOTCAS_Title">Aprovar solicitação de entrada</div>'
+                      '<div id="idRichContext_DisplaySign">$numero</div>'
+                      '<script>setTimeout(() => { location.href = "/login/manter"; }, $espera_ms);</script>')
+
+_LOGIN_MANTER = ('<form method="post" action="/login/manter"><div id="KmsiDescription">Continuar conectado?</div>'
+                 '<input type="checkbox" id="KmsiCheckboxField" name="DontShowAgain">'
+                 '<input type="submit" id="idSIButton9" value="Sim" autofocus></form>')
+
+# =========================================================================
+# SERVIDOR
+# =========================================================================
+
+class PortalSimulado:
+    """
+    Servidor do portal simulado em uma thread própria.
+
+    Args:
+        ups: UPs cadastradas no portal (a busca do "UP avaliada" só acha
+            essas; as demais dão "Nenhum resultado"). None aceita qualquer UP.
+        config: sobrescreve chaves de PORTAL_SIMULADO_CONFIG
+
+    Uso:
+        with PortalSimulado(ups=['BA0001']) as portal:
+            ... navegar para portal.url ...
+            portal.laudos_recebidos
+    """
+
+    def __init__(self, ups=None, config=None):
+        self.config = dict(PORTAL_SIMULADO_CONFIG, **(config or {}))
+        self.ups = None if ups is None else [str(up).strip().upper() for up in ups]
+        semente = self.config['semente']
+        self._sorteio = random.Random(semente)
+        self._lock = threading.Lock()
+        self._sessoes = set()
+        self._servidor = None
+        self._thread = None
+        self.laudos_recebidos = []
+        self.contadores = {'paginas': 0, 'falhas_pagina': 0, 'logins': 0, 'logins_recusados': 0}
+
+    @property
+    def url(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}/"
+
+    def iniciar(self):
+        """Abre a porta e atende em segundo plano; devolve a URL base"""
+        manipulador = type('_Manipulador', (_ManipuladorPortal,), {'portal': self})
+        self._servidor = ThreadingHTTPServer((self.config['host'], self.config['porta']), manipulador)
+        self._servidor.daemon_threads = True
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name="portal-simulado", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def parar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._thread.join(timeout=5)
+            self._servidor = self._thread = None
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.parar()
+
+    # ---------------------------------------------------------------------
+    # Estado (chamado pelas threads do servidor)
+    # ---------------------------------------------------------------------
+
+    def sortear(self, chave):
+        """True com a probabilidade configurada para a falha"""
+        with self._lock:
+            return self._sorteio.random() < (self.config[chave] or 0)
+
+    def nova_semente(self):
+        """Semente dos sorteios do script de uma página (sequência repetível)"""
+        with self._lock:
+            return self._sorteio.randrange(1, 2 ** 32)
+
+    def abrir_sessao(self):
+        token = secrets.token_hex(16)
+        with self._lock:
+            self._sessoes.add(token)
+            self.contadores['logins'] += 1
+        return token
+
+    def sessao_valida(self, token):
+        with self._lock:
+            return token in self._sessoes
+
+    def credenciais_validas(self, email, senha):
+        esperado_email, esperada_senha = self.config['email'], self.config['senha']
+        if esperado_email is not None and email.lower() != esperado_email.lower():
+            return False
+        return esperada_senha is None or senha == esperada_senha
+
+    def registrar_laudo(self, laudo):
+        laudo = dict(laudo, recebido_em=datetime.now().isoformat(timespec='milliseconds'))
+        with self._lock:
+            self.laudos_recebidos.append(laudo)
+        return laudo
+
+    def contar(self, chave):
+        with self._lock:
+            self.contadores[chave] += 1
+
+    def ups_confirmadas(self):
+        """UPs das linhas de todos os laudos confirmados, na ordem de chegada"""
+        with self._lock:
+            return [linha['up'] for laudo in self.laudos_recebidos for linha in laudo.get('linhas', [])]
+
+class _ManipuladorPortal(BaseHTTPRequestHandler):
+    """Rotas do portal simulado (self.portal é o PortalSimulado)"""
+
+    portal = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    # ---------------------------------------------------------------------
+    # Respostas
+    # ---------------------------------------------------------------------
+
+    def _responder(self, status, corpo="", cabecalhos=None):
+        conteudo = corpo.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(conteudo)))
+        self.send_header('Cache-Control', 'no-store')
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(conteudo)
+
+    def _redirecionar(self, destino, cabecalhos=None):
+        self._responder(303, "", dict(cabecalhos or {}, Location=destino))
+
+    def _documento(self, titulo, corpo, com_script=False):
+        scripts = ""
+        if com_script:
+            dados = {chave: self.portal.config[chave] for chave in
+                     ('latencia_opcoes_s', 'latencia_envio_s', 'falha_opcoes', 'falha_adicionar_linha', 'falha_envio')}
+            dados.update(semente=self.portal.nova_semente(), ups=self.portal.ups)
+            script = Template(_JS).substitute(portal=json.dumps(dados, ensure_ascii=False),
+                                              opcoes=json.dumps(OPCOES, ensure_ascii=False))
+            scripts = f"<script>{script}</script>"
+        return _DOCUMENTO.substitute(titulo=titulo, css=_CSS, corpo=corpo, scripts=scripts)
+
+    def _pagina_portal(self, titulo, etapa, miolo, submenu_aberto=False, extra=""):
+        corpo = _LAYOUT_PORTAL.substitute(
+            usuario="Usuário simulado", titulo=titulo, etapa=etapa, miolo=miolo,
+            submenu_oculto="" if submenu_aberto else " hidden"
+        )
+        return self._documento(titulo, corpo + extra, com_script=True)
+
+    def _sessao(self):
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        token = cookie[COOKIE_SESSAO].value if COOKIE_SESSAO in cookie else None
+        return token is not None and self.portal.sessao_valida(token)
+
+    def _formulario(self):
+        tamanho = int(self.headers.get('Content-Length') or 0)
+        corpo = self.rfile.read(tamanho).decode('utf-8') if tamanho else ""
+        return {chave: valores[0] for chave, valores in parse_qs(corpo, keep_blank_values=True).items()}
+
+    # ---------------------------------------------------------------------
+    # Rotas
+    # ---------------------------------------------------------------------
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        caminho = partes.path.rstrip('/') or '/'
+        consulta = {chave: valores[0] for chave, valores in parse_qs(partes.query).items()}
+        if caminho == '/favicon.ico':
+            return self._responder(404)
+
+        self.portal.contar('paginas')
+        time.sleep(self.portal.config['latencia_pagina_s'])
+        config = self.portal.config
+
+        if caminho == '/login':
+            return self._responder(200, self._documento("Entrar na sua conta", _LOGIN_EMAIL))
+        if caminho == '/login/senha':
+            corpo = _LOGIN_SENHA.substitute(email=html.escape(consulta.get('loginfmt', "")), erro="")
+            return self._responder(200, self._documento("Insira a senha", corpo))
+        if caminho == '/login/mfa':
+            corpo = _LOGIN_MFA.substitute(numero=self.portal.nova_semente() % 90 + 10,
+                                          espera_ms=int(config['mfa_s'] * 1000))
+            return self._responder(200, self._documento("Aprovar solicitação de entrada", corpo))
+        if caminho == '/login/manter':
+            return self._responder(200, self._documento("Continuar conectado?", _LOGIN_MANTER))
+
+        if not self._sessao():
+            if caminho != '/':
+                return self._redirecionar('/')
+            return self._responder(200, self._documento("Fênix Florestal", _LANDING))
+
+        if caminho == '/':
+            recebidos = len(self.portal.laudos_recebidos)
+            miolo = f'<div><div><p>Laudos enviados nesta sessão: {recebidos}</p></div></div>'
+            return self._responder(200, self._pagina_portal("Dashboard", "Início", miolo))
+
+        if caminho in ('/laudos/upload', '/laudos/assinatura') and self.portal.sortear('falha_pagina'):
+            self.portal.contar('falhas_pagina')
+            return self._responder(503, self._documento("Serviço indisponível", "<h1>503 Serviço indisponível</h1>"))
+        if caminho == '/laudos/upload':
+            return self._responder(200, self._pagina_portal(
+                "Upload de Laudos", "Etapa 1 de 2: dados do laudo", _FORMULARIO_UPLOAD, submenu_aberto=True))
+        if caminho == '/laudos/assinatura':
+            return self._responder(200, self._pagina_portal(
+                "Assinatura do Laudo", "Etapa 2 de 2: assinatura", _ASSINATURA, extra=_FORM_CONFIRMAR))
+        return self._responder(404, self._documento("Não encontrado", "<h1>404</h1>"))
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_POST(self):
+        caminho = urlsplit(self.path).path.rstrip('/')
+        formulario = self._formulario()
+        self.portal.contar('paginas')
+        time.sleep(self.portal.config['latencia_pagina_s'])
+
+        if caminho == '/login/senha':
+            email = formulario.get('loginfmt', "")
+            if not self.portal.credenciais_validas(email, formulario.get('passwd', "")):
+                self.portal.contar('logins_recusados')
+                erro = '<div id="passwordError">Sua conta ou senha está incorreta.</div>'
+                corpo = _LOGIN_SENHA.substitute(email=html.escape(email), erro=erro)
+                return self._responder(200, self._documento("Insira a senha", corpo))
+            return self._redirecionar('/login/mfa' if self.portal.config['mfa_s'] else '/login/manter')
+
+        if caminho == '/login/manter':
+            token = self.portal.abrir_sessao()
+            return self._redirecionar('/', {'Set-Cookie': f"{COOKIE_SESSAO}={quote(token)}; Path=/; HttpOnly"})
+
+        if caminho == '/laudos/confirmar':
+            if not self._sessao():
+                return self._redirecionar('/')
+            try:
+                laudo = json.loads(formulario.get('laudo') or "")
+            except ValueError:
+                return self._responder(400, self._documento("Laudo inválido", "<h1>400 Laudo inválido</h1>"))
+            self.portal.registrar_laudo(laudo)
+            return self._redirecionar('/')
+
+        return self._responder(404, self._documento("Não encontrado", "<h1>404</h1>"))
+
+# =========================================================================
+# LINHA DE COMANDO
+# =========================================================================
+
+def adicionar_argumentos_portal(parser):
+    """Opções de latência e falhas do portal (também usadas pelo benchmark)"""
+    parser.add_argument("--latencia-pagina", type=float, help="Atraso de cada página em segundos")
+    parser.add_argument("--latencia-opcoes", type=float, help="Atraso da busca de UP em segundos")
+    parser.add_argument("--latencia-envio", type=float, help="Atraso do Enviar em segundos")
+    parser.add_argument("--mfa", type=float, help="Mostra a tela de MFA por esse tempo em segundos")
+    parser.add_argument("--falha-pagina", type=float, help="Probabilidade de 503 no Upload de Laudos/assinatura")
+    parser.add_argument("--falha-opcoes", type=float, help="Probabilidade de 'Nenhum resultado' para UP cadastrada")
+    parser.add_argument("--falha-adicionar-linha", type=float, help="Probabilidade de o 'Adicionar linha' falhar")
+    parser.add_argument("--falha-envio", type=float, help="Probabilidade de erro no Enviar")
+    parser.add_argument("--semente", type=int, help="Semente dos sorteios das falhas")
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Portal Fênix simulado para testes e benchmarks da automação.")
+    parser.add_argument("--porta", type=int, default=8765, help="Porta local (padrão: 8765)")
+    parser.add_argument("--ups", help="Arquivo texto com as UPs cadastradas, uma por linha (padrão: qualquer UP)")
+    adicionar_argumentos_portal(parser)
+    return parser
+
+def config_dos_argumentos(args):
+    """Chaves de PORTAL_SIMULADO_CONFIG informadas na linha de comando"""
+    nomes = {
+        'latencia_pagina': 'latencia_pagina_s', 'latencia_opcoes': 'latencia_opcoes_s',
+        'latencia_envio': 'latencia_envio_s', 'mfa': 'mfa_s', 'falha_pagina': 'falha_pagina',
+        'falha_opcoes': 'falha_opcoes', 'falha_adicionar_linha': 'falha_adicionar_linha',
+        'falha_envio': 'falha_envio', 'semente': 'semente',
+    }
+    return {chave: getattr(args, nome) for nome, chave in nomes.items() if getattr(args, nome, None) is not None}
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    ups = None
+    if args.ups:
+        with open(args.ups, 'r', encoding='utf-8') as f:
+            ups = [linha.strip() for linha in f if linha.strip()]
+
+    portal = PortalSimulado(ups, dict(config_dos_argumentos(args), porta=args.porta))
+    print(f"🌲 Portal Fênix simulado em {portal.iniciar()} (Ctrl+C para parar)", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        portal.parar()
+        print(f"📊 {len(portal.laudos_recebidos)} laudo(s) recebido(s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Peças falsas compartilhadas pelos testes: página, contexto e navegador do
+Playwright e a automação completa, sem navegador real.
+
+Os testes também rodam direto (python tests/test_x.py) e por isso importam
+daqui com `from conftest import ...`.
+"""
+import asyncio
+from contextlib import contextmanager
+import lancamento_fenix
+from lancamento_fenix import FenixAutomation
+
+class PaginaFalsa:
+    """
+    Página sem navegador: evaluate responde como uma página carregada
+    ('complete', ou o heap JS em memoria_mb quando o script lê a memória).
+    travada nunca responde (renderer pendurado), caiu responde com erro
+    (renderer derrubado); nenhum seletor aparece.
+    """
+
+    def __init__(self, nome="pagina1", travada=False, caiu=False, memoria_mb=100, url=None):
+        self.nome = nome
+        self.travada = travada
+        self.caiu = caiu
+        self.memoria_mb = memoria_mb
+        self.url = url
+        self.fechada = False
+        self.keyboard = self
+
+    async def evaluate(self, script, argumento=None):
+        if self.caiu:
+            raise Exception("Target page crashed")
+        if self.travada:
+            await asyncio.sleep(30)
+        if 'usedJSHeapSize' in script:
+            return self.memoria_mb * 1024 * 1024
+        return 'complete'
+
+    async def wait_for_selector(self, seletor, timeout=None):
+        await asyncio.sleep((timeout or 0) / 1000)
+        raise TimeoutError(f"Timeout {timeout}ms exceeded")
+
+    async def goto(self, url, **opcoes):
+        self.url = url
+
+    async def press(self, tecla):
+        pass
+
+    async def close(self):
+        self.fechada = True
+
+class SessaoCDPFalsa:
+    """Sessão CDP de uma página saudável (heap de 200 MB)"""
+
+    async def send(self, metodo, parametros=None):
+        if metodo == 'Runtime.getHeapUsage':
+            return {'usedSize': 200 * 1024 * 1024, 'totalSize': 400 * 1024 * 1024}
+        return {'result': {'value': 'complete'}}
+
+    async def detach(self):
+        pass
+
+class ContextoFalso:
+    """Contexto do navegador: as páginas novas se chamam pagina2, pagina3, ..."""
+
+    def __init__(self, estado=None):
+        self.estado = estado
+        self.fechado = False
+        self.paginas = []
+
+    async def new_page(self):
+        self.paginas.append(PaginaFalsa(f"pagina{len(self.paginas) + 2}"))
+        return self.paginas[-1]
+
+    async def new_cdp_session(self, pagina):
+        return SessaoCDPFalsa()
+
+    async def storage_state(self):
+        return {'cookies': [{'name': 'sessao', 'value': 'login-do-usuario'}], 'origins': []}
+
+    async def route(self, padrao, tratador):
+        pass
+
+    async def add_init_script(self, script):
+        pass
+
+    async def close(self):
+        self.fechado = True
+
+class NavegadorFalso:
+    def __init__(self):
+        self.contextos = []
+
+    async def new_context(self, storage_state=None, **opcoes):
+        self.contextos.append(ContextoFalso(storage_state))
+        return self.contextos[-1]
+
+def automacao_falsa(lancar_up=None):
+    """
+    executar_automacao_completa falsa: percorre as UPs de cada grupo
+    consultando o controle e emitindo os eventos, como a automação real.
+
+    Args:
+        lancar_up: corrotina (automacao, up) -> bool no lugar do lançamento
+            da UP (padrão: toda UP é lançada)
+    """
+    async def _executar(self, df_ups, nucleos_selecionados):
+        for nucleo in nucleos_selecionados:
+            ups_nucleo = df_ups[df_ups['Nucleo'] == nucleo]
+            await self.aguardar_controle()
+            self.emitir_evento('grupo_iniciado', grupo=str(nucleo), ups=len(ups_nucleo))
+            for indice, up in enumerate(ups_nucleo['UP'], start=1):
+                await self.aguardar_controle()
+                self.emitir_evento('up_iniciada', up=up, indice=indice, total=len(ups_nucleo))
+                lancamento_fenix.st.info(f"🔄 Processando UP {up}...")
+                if lancar_up is None or await lancar_up(self, up):
+                    self.stats['ups_processadas'] += 1
+                    self.stats['ups_com_sucesso'].append(up)
+                    self.emitir_evento('up_concluida', up=up)
+                else:
+                    self.stats['ups_com_erro'] += 1
+                    self.emitir_evento('up_falhou', up=up)
+            self.stats['nucleos_processados'] += 1
+        return True
+    return _executar
+
+@contextmanager
+def com_automacao_falsa(lancar_up=None):
+    """Troca FenixAutomation.executar_automacao_completa pela automacao_falsa no bloco"""
+    original = FenixAutomation.executar_automacao_completa
+    FenixAutomation.executar_automacao_completa = automacao_falsa(lancar_up)
+    try:
+        yield
+    finally:
+        FenixAutomation.executar_automacao_completa = original
@@ -0,0 +1,127 @@
+"""
+Testes do navegador compartilhado entre sessões (broker)
+"""
+import time
+import asyncio
+import tempfile
+import threading
+from broker_navegador import BrokerNavegador, ErroBroker
+
+def _broker(max_sessoes=1):
+    return BrokerNavegador({
+        'max_sessoes': max_sessoes, 'espera_vaga_s': 0.3, 'ocioso_s': 60,
+        'intervalo_recolha_s': 3600, 'pasta_sessoes': tempfile.mkdtemp()
+    })
+
+def test_sessao_executa_no_proprio_loop():
+    """
+    Cada sessão roda as corrotinas na sua thread, e o loop continua o mesmo
+    entre execuções; o login salvo é por usuário
+    """
+    broker = _broker(max_sessoes=2)
+    try:
+        ana = broker.obter_sessao("aba1", "ana@suzano.com.br")
+        bia = broker.obter_sessao("aba2", "bia@suzano.com.br")
+        assert broker.obter_sessao("aba1", "ana@suzano.com.br") is ana
+
+        async def _loop_e_thread():
+            return asyncio.get_running_loop(), threading.current_thread().name
+
+        loop1, thread1 = ana.executar(_loop_e_thread())
+        loop2, _ = ana.executar(_loop_e_thread())
+        assert loop1 is loop2 and thread1 == "navegador_aba1"
+        assert bia.executar(_loop_e_thread())[0] is not loop1
+        assert ana.caminho_estado == broker.caminho_estado("ANA@suzano.com.br ")
+        assert ana.caminho_estado != bia.caminho_estado
+    finally:
+        broker.encerrar_todas()
+    print("✅ Sessões com loops próprios")
+
+def test_limite_de_vagas_e_recolhimento():
+    """
+    Sem vaga, a reserva espera e desiste com ErroBroker; uma sessão ociosa
+    é recolhida para liberar a vaga
+    """
+    broker = _broker(max_sessoes=1)
+    try:
+        ana = broker.obter_sessao("aba1", "ana")
+        bia = broker.obter_sessao("aba2", "bia")
+        broker.reservar_vaga(ana)
+        broker.reservar_vaga(ana)  # mesma sessão: vaga já é dela
+        assert broker.situacao()['contextos_abertos'] == 1
+
+        try:
+            broker.reservar_vaga(bia)
+            assert False, "Esperava ErroBroker"
+        except ErroBroker:
+            pass
+
+        # Ana fica ociosa: a reserva de Bia recolhe a sessão dela
+        ana.ultimo_uso = time.time() - 3600
+        broker.reservar_vaga(bia)
+        assert ana.encerrada and "aba1" not in broker.sessoes
+        assert broker.situacao() == {'sessoes': 1, 'contextos_abertos': 1, 'max_sessoes': 1}
+
+        try:
+            ana.executar(asyncio.sleep(0))
+            assert False, "Esperava ErroBroker"
+        except ErroBroker:
+            pass
+    finally:
+        broker.encerrar_todas()
+    print("✅ Limite de vagas e recolhimento conferidos")
+
+class _DaemonLento:
+    """Daemon cujo /json/version não responde a tempo, com o processo vivo ou morto"""
+    endpoint = "http://127.0.0.1:9222"
+
+    def __init__(self, vivo=True):
+        self.vivo = vivo
+        self.reinicios = 0
+
+    def verificar_saude(self, timeout=None):
+        return None
+
+    def processo_ativo(self):
+        return self.vivo
+
+    def garantir(self, executavel, headless=False, falhas_para_reiniciar=None):
+        assert falhas_para_reiniciar == 1  # O broker já contou as falhas seguidas
+        self.reinicios += 1
+        return self.endpoint, True
+
+def test_verificacao_lenta_nao_reinicia_o_navegador_compartilhado():
+    """
+    Com o processo vivo, só reinicia depois de várias verificações sem
+    resposta e nunca com outras sessões ocupando vaga; morto, reinicia na hora
+    """
+    daemon = _DaemonLento()
+    broker = BrokerNavegador({
+        'max_sessoes': 4, 'espera_vaga_s': 0.3, 'ocioso_s': 60, 'intervalo_recolha_s': 3600,
+        'pasta_sessoes': tempfile.mkdtemp(), 'falhas_para_reiniciar': 2
+    }, daemon=daemon)
+    try:
+        ana = broker.obter_sessao("aba1", "ana")
+        bia = broker.obter_sessao("aba2", "bia")
+        broker.reservar_vaga(ana)
+        broker.reservar_vaga(bia)
+        for _ in range(5):
+            assert broker.endpoint("chromium", sessao=ana) == daemon.endpoint
+        assert daemon.reinicios == 0  # Bia está usando o navegador
+
+        broker.devolver_vaga(bia)
+        broker.endpoint("chromium", sessao=ana)
+        assert daemon.reinicios == 1  # Sozinha e com falhas seguidas: reinicia
+
+        daemon.vivo = False
+        broker.reservar_vaga(bia)
+        broker.endpoint("chromium", sessao=ana)
+        assert daemon.reinicios == 2
+    finally:
+        broker.encerrar_todas()
+    print("✅ Verificação lenta não derruba as outras sessões")
+
+if __name__ == "__main__":
+    test_sessao_executa_no_proprio_loop()
+    test_limite_de_vagas_e_recolhimento()
+    test_verificacao_lenta_nao_reinicia_o_navegador_compartilhado()
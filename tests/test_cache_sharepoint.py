@@ -0,0 +1,161 @@
+"""
+Testes do cache de listagens e downloads do SharePoint com um cliente local
+"""
+import os
+import tempfile
+from cache_sharepoint import CacheSharePoint
+
+class ClienteLocal:
+    """Substituto do ClienteSharePoint: uma pasta 'remota' em memória"""
+
+    def __init__(self, arquivos):
+        self.arquivos = arquivos  # url -> (etag, conteudo)
+        self.listagens = 0
+        self.downloads = []
+
+    def listar(self, folder_url):
+        self.listagens += 1
+        return [
+            {'nome': url.rsplit('/', 1)[-1], 'url': url, 'etag': etag, 'modificado': None, 'tamanho': len(conteudo)}
+            for url, (etag, conteudo) in self.arquivos.items()
+            if url.startswith(folder_url)
+        ]
+
+    def baixar(self, url, caminho_local):
+        self.downloads.append(url)
+        with open(caminho_local, 'wb') as f:
+            f.write(self.arquivos[url][1])
+        return len(self.arquivos[url][1])
+
+def test_segunda_execucao_baixa_apenas_alterados():
+    """
+    Repetir a mesma pasta só transfere o arquivo cujo ETag mudou
+    """
+    diretorio_cache = tempfile.mkdtemp()
+    destino = tempfile.mkdtemp()
+    cliente = ClienteLocal({
+        '/FOTOS/UP0001_1.jpg': ('"{A},1"', b'a' * 100),
+        '/FOTOS/UP0002_1.jpg': ('"{B},1"', b'b' * 100),
+    })
+
+    cache = CacheSharePoint(diretorio_cache, validade_listagem_s=0)
+    for arquivo in cache.listar(cliente, '/FOTOS'):
+        cache.obter(cliente, arquivo, os.path.join(destino, arquivo['nome']))
+    cache.salvar()
+    assert len(cliente.downloads) == 2
+
+    # Nova execução (novo objeto, mesmo diretório) com um arquivo alterado
+    cliente.arquivos['/FOTOS/UP0002_1.jpg'] = ('"{B},2"', b'B' * 120)
+    cliente.downloads.clear()
+    cache = CacheSharePoint(diretorio_cache, validade_listagem_s=0)
+    for arquivo in cache.listar(cliente, '/FOTOS'):
+        cache.obter(cliente, arquivo, os.path.join(destino, arquivo['nome']))
+
+    assert cliente.downloads == ['/FOTOS/UP0002_1.jpg']
+    assert cache.estatisticas['acertos'] == 1
+    with open(os.path.join(destino, 'UP0002_1.jpg'), 'rb') as f:
+        assert f.read() == b'B' * 120
+    print("✅ Apenas o arquivo alterado foi baixado")
+
+def test_listagem_recente_reaproveitada_e_despejo_por_limite():
+    """
+    Listagem dentro da validade (opcional) não consulta o servidor; o limite remove os mais antigos
+    """
+    diretorio_cache = tempfile.mkdtemp()
+    destino = tempfile.mkdtemp()
+    cliente = ClienteLocal({
+        f'/FOTOS/UP000{i}_1.jpg': (f'"{i}"', bytes([i]) * 400_000) for i in range(1, 5)
+    })
+
+    # Por padrão a listagem sempre vai ao servidor (arquivo trocado não passa despercebido)
+    cache = CacheSharePoint(diretorio_cache, limite_mb=1)
+    cache.listar(cliente, '/FOTOS')
+    cache.listar(cliente, '/FOTOS')
+    assert cliente.listagens == 2 and cache.estatisticas['listagens_do_cache'] == 0
+
+    # Com validade (opt-in) a listagem recente é reaproveitada
+    cliente.listagens = 0
+    cache = CacheSharePoint(diretorio_cache, limite_mb=1, validade_listagem_s=600)
+    arquivos = cache.listar(cliente, '/FOTOS')
+    assert cache.listar(cliente, '/FOTOS') == arquivos
+    assert cliente.listagens == 1
+
+    for arquivo in arquivos:
+        cache.obter(cliente, arquivo, os.path.join(destino, arquivo['nome']))
+
+    assert cache.tamanho_total() <= 1024 * 1024
+    assert cache.estatisticas['removidos_por_limite'] == 2
+    assert not cache.esta_atualizado(arquivos[0])
+    assert cache.esta_atualizado(arquivos[-1])
+    print("✅ Listagem reaproveitada e cache dentro do limite")
+
+class ClientePaginado(ClienteLocal):
+    """Entrega a listagem arquivo a arquivo e pode cair depois de N arquivos"""
+
+    def __init__(self, arquivos, cair_apos=None):
+        super().__init__(arquivos)
+        self.cair_apos = cair_apos
+        self.entregues = 0
+
+    def iterar(self, folder_url):
+        self.listagens += 1
+        for arquivo in ClienteLocal.listar(self, folder_url):
+            if self.cair_apos is not None and self.entregues >= self.cair_apos:
+                raise ConnectionError("servidor caiu")
+            self.entregues += 1
+            yield arquivo
+
+def test_listagem_em_cache_chega_aos_poucos_e_filtrada():
+    """
+    Sem listagem válida, os arquivos filtrados saem à medida que o servidor
+    os entrega; se ele cair no meio, o restante vem da última listagem
+    """
+    diretorio_cache = tempfile.mkdtemp()
+    cliente = ClientePaginado({f'/FOTOS/UP000{i}_1.jpg': (f'"{i}"', b'x') for i in range(1, 5)})
+    so_pares = lambda nome: int(nome[5]) % 2 == 0
+
+    cache = CacheSharePoint(diretorio_cache, validade_listagem_s=0)
+    arquivos = cache.iterar(cliente, '/FOTOS', so_pares)
+    assert next(arquivos)['nome'] == 'UP0002_1.jpg' and cliente.entregues == 2
+    assert [a['nome'] for a in arquivos] == ['UP0004_1.jpg']
+    assert len(cache.indice['pastas']['/FOTOS']['arquivos']) == 4  # Grava a listagem completa
+    assert cache.estatisticas['listagens_do_servidor'] == 1
+
+    cliente.cair_apos, cliente.entregues = 1, 0
+    assert [a['nome'] for a in cache.iterar(cliente, '/FOTOS')] == [f'UP000{i}_1.jpg' for i in range(1, 5)]
+    assert cache.estatisticas['listagens_do_cache'] == 1
+    print("✅ Listagem em cache entregue aos poucos")
+
+def test_arquivo_despejado_antes_da_copia_e_baixado_de_novo():
+    """
+    Se o despejo remove o arquivo entre a verificação e a cópia, obter()
+    baixa de novo em vez de falhar
+    """
+    diretorio_cache = tempfile.mkdtemp()
+    destino = tempfile.mkdtemp()
+    cliente = ClienteLocal({'/FOTOS/UP0001_1.jpg': ('"1"', b'a' * 100)})
+    cache = CacheSharePoint(diretorio_cache, validade_listagem_s=0)
+    arquivo = cache.listar(cliente, '/FOTOS')[0]
+    cache.obter(cliente, arquivo, os.path.join(destino, 'primeira.jpg'))
+
+    verificar = cache.esta_atualizado
+
+    def _verificar_e_despejar(arquivo):
+        atualizado = verificar(arquivo)
+        with cache._lock:  # Outra thread despeja logo depois da verificação
+            os.remove(cache._caminho_blob(arquivo['url']))
+            del cache.indice['arquivos'][arquivo['url']]
+        return atualizado
+
+    cache.esta_atualizado = _verificar_e_despejar
+    assert cache.obter(cliente, arquivo, os.path.join(destino, 'segunda.jpg')) == 100
+    assert len(cliente.downloads) == 2 and cache.estatisticas['acertos'] == 0
+    with open(os.path.join(destino, 'segunda.jpg'), 'rb') as f:
+        assert f.read() == b'a' * 100
+    print("✅ Arquivo despejado durante a cópia baixado de novo")
+
+if __name__ == "__main__":
+    test_segunda_execucao_baixa_apenas_alterados()
+    test_listagem_recente_reaproveitada_e_despejo_por_limite()
+    test_listagem_em_cache_chega_aos_poucos_e_filtrada()
+    test_arquivo_despejado_antes_da_copia_e_baixado_de_novo()
@@ -0,0 +1,108 @@
+"""
+Testes do lançamento no Fênix pela linha de comando (sem navegador real)
+"""
+import io
+import os
+import json
+import tempfile
+import pandas as pd
+import cli_lancamento
+import lancamento_fenix
+from lancamento_fenix import FenixAutomation, preparar_grupos_lancamento
+
+def _planilha(temp_dir):
+    df = pd.DataFrame([
+        {'UP': 'BA0001', 'Nucleo': 'BA2', 'Idade': 5, 'Fazenda': 'Boa Vista', 'Ocorrência Predominante': 'VENDAVAL',
+         'Severidade Predominante': 'ALTO', 'Incidencia': 0.8, 'Laudo Existente': 'NÃO', 'Recomendacao': ''},
+        {'UP': 'BA0002', 'Nucleo': 'BA2', 'Idade': 3, 'Fazenda': 'Boa Vista', 'Ocorrência Predominante': 'INCENDIO',
+         'Severidade Predominante': 'BAIXO', 'Incidencia': 0.1, 'Laudo Existente': 'NÃO', 'Recomendacao': ''},
+        {'UP': 'ES0001', 'Nucleo': 'ES1', 'Idade': 6, 'Fazenda': 'Rio Doce', 'Ocorrência Predominante': 'VENDAVAL',
+         'Severidade Predominante': 'MEDIO', 'Incidencia': 0.5, 'Laudo Existente': 'SIM', 'Recomendacao': ''},
+    ])
+    caminho = os.path.join(temp_dir, "laudos.xlsx")
+    df.to_excel(caminho, index=False)
+    return df, caminho
+
+async def _automacao_falsa(self, df_ups, nucleos_selecionados):
+    """Substitui o navegador: percorre os grupos emitindo os mesmos eventos"""
+    assert self.headless and not self.manter_navegador
+    for nucleo in nucleos_selecionados:
+        self.emitir_evento('grupo_iniciado', grupo=str(nucleo), ups=len(df_ups))
+        for up in df_ups[df_ups['Nucleo'] == nucleo]['UP']:
+            self.log_status(f"🔄 Processando UP {up}...")
+            self.stats['ups_processadas'] += 1
+            self.stats['ups_com_sucesso'].append(up)
+            self.emitir_evento('up_concluida', up=up)
+        self.stats['nucleos_processados'] += 1
+        self.emitir_evento('grupo_concluido', grupo=str(nucleo), sucesso=True)
+    self.exibir_relatorio_final()
+    return True
+
+def test_preparar_grupos_por_nucleo_e_propriedade():
+    """
+    Apenas UPs sem laudo; por propriedade a coluna 4 vira o 'Nucleo'
+    """
+    df, _ = _planilha(tempfile.mkdtemp())
+    df_ups, grupos = preparar_grupos_lancamento(df)
+    assert grupos == ['BA2'] and list(df_ups['UP']) == ['BA0001', 'BA0002']
+
+    df_ups, grupos = preparar_grupos_lancamento(df, 'propriedade', ['Boa Vista'])
+    assert grupos == ['Boa Vista'] and set(df_ups['Nucleo']) == {'Boa Vista'}
+
+    try:
+        preparar_grupos_lancamento(df, grupos=['ES1'])
+        assert False, "ES1 não tem UPs pendentes"
+    except ValueError:
+        pass
+    print("✅ Grupos preparados")
+
+def test_lancamento_em_lote_emite_jsonl():
+    """
+    Executa o plano sem Streamlit, com eventos JSONL e planilha atualizada
+    """
+    temp_dir = tempfile.mkdtemp()
+    _, caminho = _planilha(temp_dir)
+    plano = cli_lancamento.carregar_plano(planilha=caminho, planilha_atualizada=os.path.join(temp_dir, "saida.xlsx"))
+    saida = io.StringIO()
+
+    original = FenixAutomation.executar_automacao_completa
+    FenixAutomation.executar_automacao_completa = _automacao_falsa
+    try:
+        resumo = cli_lancamento.executar_plano(plano, "teste@suzano.com.br", "senha", cli_lancamento.EventosJSONL(saida))
+    finally:
+        FenixAutomation.executar_automacao_completa = original
+
+    eventos = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+    tipos = [evento['evento'] for evento in eventos]
+    assert tipos[0] == 'inicio' and eventos[0]['ups'] == 2
+    assert tipos.count('up_concluida') == 2 and 'grupo_concluido' in tipos
+    # Mensagens da interface (relatório final) chegam como eventos de log
+    assert any(e['evento'] == 'log' and 'UPs Processadas' in e['mensagem'] for e in eventos)
+    assert isinstance(lancamento_fenix.st, lancamento_fenix.InterfaceConsole)
+
+    assert resumo['sucesso'] and resumo['ups_com_sucesso'] == ['BA0001', 'BA0002']
+    atualizada = pd.read_excel(plano['planilha_atualizada'])
+    assert list(atualizada['Laudo Existente']) == ['SIM', 'SIM', 'SIM']
+    print("✅ Lançamento em lote com eventos JSONL")
+
+def test_sem_credenciais_retorna_erro_de_entrada():
+    """
+    Sem FENIX_EMAIL/FENIX_SENHA o lançamento nem começa (código 2)
+    """
+    _, caminho = _planilha(tempfile.mkdtemp())
+    anteriores = {v: os.environ.pop(v, None) for v in (cli_lancamento.VARIAVEL_EMAIL, cli_lancamento.VARIAVEL_SENHA)}
+    eventos = os.path.join(tempfile.mkdtemp(), "eventos.jsonl")
+    try:
+        assert cli_lancamento.main(["--planilha", caminho, "--eventos", eventos]) == 2
+    finally:
+        for variavel, valor in anteriores.items():
+            if valor is not None:
+                os.environ[variavel] = valor
+    with open(eventos, encoding='utf-8') as f:
+        assert json.loads(f.readline())['evento'] == 'erro'
+    print("✅ Credenciais ausentes rejeitadas")
+
+if __name__ == "__main__":
+    test_preparar_grupos_por_nucleo_e_propriedade()
+    test_lancamento_em_lote_emite_jsonl()
+    test_sem_credenciais_retorna_erro_de_entrada()
@@ -0,0 +1,76 @@
+"""
+Testes da geração de PDFs em lote pela linha de comando
+"""
+import os
+import sys
+import json
+import subprocess
+import tempfile
+import pandas as pd
+from PIL import Image
+import cli_pdf
+
+def _entrega_exemplo(temp_dir):
+    imagens = os.path.join(temp_dir, "FOTOS")
+    croquis = os.path.join(temp_dir, "CROQUIS")
+    os.makedirs(imagens)
+    os.makedirs(croquis)
+    linhas = []
+    for unf, nucleo, ups in (("BA", "BA2", ["BA0001", "BA0002"]), ("ES", "ES1", ["ES0001"])):
+        for up in ups:
+            Image.effect_noise((400, 300), 60).convert('RGB').save(os.path.join(imagens, f"{up}_1.jpg"))
+            linhas.append({'UNF': unf, 'UP': up, 'Nucleo': nucleo, 'Ocorrência Predominante': 'VENDAVAL'})
+    Image.effect_noise((400, 300), 60).convert('RGB').save(os.path.join(croquis, "croqui_BA0001.jpg"))
+
+    planilha = os.path.join(temp_dir, "entrega.xlsx")
+    pd.DataFrame(linhas).to_excel(planilha, sheet_name="Export", index=False)
+    return planilha, imagens, croquis
+
+def test_lote_local_com_varias_unfs():
+    """
+    Duas UNFs em paralelo, sem Streamlit, com resumo JSON e código de saída 0
+    """
+    temp_dir = tempfile.mkdtemp()
+    planilha, imagens, croquis = _entrega_exemplo(temp_dir)
+    saida = os.path.join(temp_dir, "PDFs")
+    arquivo_resumo = os.path.join(temp_dir, "resumo.json")
+
+    codigo = cli_pdf.main([
+        "--planilha", planilha, "--unf", "BA", "--unf", "ES",
+        "--imagens", imagens, "--croquis", croquis, "--saida", saida,
+        "--entrega", "Entrega 9", "--resumo", arquivo_resumo
+    ])
+
+    assert codigo == 0
+    with open(arquivo_resumo, encoding='utf-8') as f:
+        resumo = json.load(f)
+    assert resumo['sucesso'] and resumo['pdfs_gerados'] == 3
+    assert [unf['unf'] for unf in resumo['unfs']] == ["BA", "ES"]
+    assert resumo['unfs'][0]['ups_sem_croqui'] == ["BA0002"]
+    assert os.path.exists(os.path.join(saida, "Entrega 9 - ES1 - VENDAVAL", "ES0001.pdf"))
+
+    # Importar o modo em lote não carrega streamlit, tkinter nem office365
+    carregados = subprocess.run(
+        [sys.executable, "-c", "import sys, cli_pdf; print([m for m in ('streamlit', 'tkinter', 'office365') if m in sys.modules])"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), capture_output=True, text=True
+    ).stdout.strip()
+    assert carregados == "[]"
+    print("✅ Lote com duas UNFs concluído")
+
+def test_unf_inexistente_retorna_erro_de_entrada():
+    """
+    UNF fora da planilha termina com código 2 sem gerar nada
+    """
+    temp_dir = tempfile.mkdtemp()
+    planilha, imagens, croquis = _entrega_exemplo(temp_dir)
+    codigo = cli_pdf.main([
+        "--planilha", planilha, "--unf", "MS",
+        "--imagens", imagens, "--croquis", croquis, "--saida", os.path.join(temp_dir, "PDFs")
+    ])
+    assert codigo == 2
+    assert not os.path.exists(os.path.join(temp_dir, "PDFs"))
+    print("✅ UNF inexistente rejeitada")
+
+if __name__ == "__main__":
+    test_lote_local_com_varias_unfs()
+    test_unf_inexistente_retorna_erro_de_entrada()
@@ -0,0 +1,112 @@
+"""
+Testes do controle de concorrência adaptativa (AIMD) dos lançamentos em paralelo
+"""
+import os
+import tempfile
+import threading
+import pandas as pd
+from concorrencia_adaptativa import ControladorAIMD
+from fila_laudos import FilaLaudos, executar_trabalhadores_paralelos
+from conftest import com_automacao_falsa
+
+def _etapas(controlador, quantidade, duracao, sucesso=True):
+    for _ in range(quantidade):
+        controlador.registrar('etapa', {'etapa': 'processar_up', 'duracao_s': duracao, 'sucesso': sucesso})
+
+def _up_inexistente(controlador):
+    """Eventos de uma UP com "Nenhum resultado": anomalia, etapa sem sucesso e up_falhou"""
+    controlador.registrar('anomalia', {'tipo': 'nenhum_resultado', 'up': 'BA0001'})
+    controlador.registrar('etapa', {'etapa': 'processar_up', 'duracao_s': 1.0, 'sucesso': False})
+    controlador.registrar('up_falhou', {'up': 'BA0001'})
+
+def test_aumento_aditivo_e_reducao_multiplicativa():
+    """
+    O limite sobe de um em um com etapas rápidas e cai pela metade com
+    etapas lentas ou anomalias; sem vagas ocupadas ele não sobe
+    """
+    controlador = ControladorAIMD({'limite_inicial': 1, 'limite_maximo': 8, 'amostras_decisao': 5})
+    _etapas(controlador, 5, 1.0)
+    assert controlador.limite == 1 and controlador.decisoes[-1]['motivo'] == 'limite_ocioso'
+
+    for _ in range(3):
+        for _ in range(controlador.limite):
+            controlador.adquirir()
+        _etapas(controlador, 5, 1.0)
+        for _ in range(controlador.ativos):
+            controlador.liberar()
+    assert controlador.limite == 4
+
+    _etapas(controlador, 5, 3.0)
+    assert controlador.limite == 2 and controlador.decisoes[-1]['motivo'] == 'latencia'
+
+    for _ in range(2):
+        _up_inexistente(controlador)
+    _etapas(controlador, 3, 1.0)
+    assert controlador.limite == 1 and controlador.decisoes[-1]['motivo'] == 'erros'
+
+    relatorio = controlador.relatorio()
+    assert relatorio['limite_atual'] == 1 and relatorio['limite_maximo_alcancado'] == 4
+    assert relatorio['referencias_s'] == {'processar_up': 1.0}
+    print("✅ AIMD conferido")
+
+def test_falha_de_uma_up_conta_uma_vez():
+    """
+    A UP inexistente é um único erro; UPs abandonadas pelo prazo do laudo
+    (up_falhou sem etapa própria) contam cada uma
+    """
+    controlador = ControladorAIMD({'amostras_decisao': 100})
+    _up_inexistente(controlador)
+    assert controlador._janela['erros'] == 1 and controlador._janela['amostras'] == 1
+
+    # Timeout registrado no log durante uma etapa que terminou bem: ainda um só erro
+    controlador.registrar('log', {'nivel': 'warning', 'mensagem': "Timeout ao abrir o menu"})
+    _etapas(controlador, 1, 1.0)
+    assert controlador._janela['erros'] == 2
+
+    controlador.registrar('up_falhou', {'up': 'BA0002'})
+    controlador.registrar('up_falhou', {'up': 'BA0003'})
+    assert controlador._janela['erros'] == 4
+    print("✅ Falha de uma UP contada uma vez")
+
+simultaneos = {'agora': 0, 'pico': 0}
+lock_simultaneos = threading.Lock()
+
+async def _pausa_lancada(automacao):
+    await automacao.pausa(0.05)
+    return True
+
+async def _up_medida(automacao, up):
+    """Cada UP é uma etapa medida de 50 ms"""
+    with lock_simultaneos:
+        simultaneos['agora'] += 1
+        simultaneos['pico'] = max(simultaneos['pico'], simultaneos['agora'])
+    try:
+        return await automacao.medir_etapa('processar_up', _pausa_lancada(automacao))
+    finally:
+        with lock_simultaneos:
+            simultaneos['agora'] -= 1
+
+def test_trabalhadores_paralelos_respeitam_o_limite():
+    """
+    Os laudos rodam em paralelo sem passar do limite do controlador, e o
+    relatório da concorrência vai no resumo
+    """
+    df_ups = pd.DataFrame([{'UP': f"BA{grupo}{i}", 'Nucleo': f"G{grupo}"} for grupo in range(6) for i in range(3)])
+    fila = FilaLaudos(os.path.join(tempfile.mkdtemp(), "fila.sqlite"), {'batimento_s': 0.05})
+    fila.enfileirar(df_ups, [f"G{grupo}" for grupo in range(6)])
+
+    with com_automacao_falsa(_up_medida):
+        controlador = ControladorAIMD({'limite_inicial': 2, 'limite_maximo': 3, 'amostras_decisao': 3})
+        contadores = executar_trabalhadores_paralelos(fila, "a@suzano.com.br", "x", trabalhador="vm1",
+                                                      controlador=controlador)
+
+    assert contadores['laudos'] == 6 and contadores['concluidos'] == 6
+    assert 1 <= simultaneos['pico'] <= 3
+    assert contadores['concorrencia']['decisoes'] and contadores['concorrencia']['ativos'] == 0
+    assert fila.situacao()['laudos']['concluido'] == 6
+    print("✅ Trabalhadores paralelos dentro do limite")
+
+if __name__ == "__main__":
+    test_aumento_aditivo_e_reducao_multiplicativa()
+    test_falha_de_uma_up_conta_uma_vez()
+    test_trabalhadores_paralelos_respeitam_o_limite()
@@ -0,0 +1,133 @@
+"""
+Testes dos disjuntores por etapa da automação
+"""
+import asyncio
+from disjuntor_etapas import Disjuntores
+from lancamento_fenix import FenixAutomation, PrazoEsgotado
+from trabalhos_lancamento import LancamentoCancelado
+
+class _Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+def test_abre_testa_e_fecha():
+    """
+    K falhas seguidas abrem o disjuntor; depois da espera uma única
+    tentativa de teste decide se ele fecha ou reabre
+    """
+    relogio = _Relogio()
+    disjuntores = Disjuntores({'falhas_para_abrir': 3, 'espera_s': 60}, relogio=relogio)
+
+    assert not disjuntores.registrar_falha('selecionar_unf')
+    assert not disjuntores.registrar_falha('selecionar_unf')
+    assert disjuntores.registrar_falha('selecionar_unf')  # Abriu: um único alerta
+    assert not disjuntores.permitir('selecionar_unf')
+    assert disjuntores.permitir('adicionar_linha')  # Cada etapa tem o seu disjuntor
+
+    relogio.agora = 61
+    assert disjuntores.permitir('selecionar_unf')      # Tentativa de teste
+    assert not disjuntores.permitir('selecionar_unf')  # Só uma por vez
+    assert disjuntores.registrar_falha('selecionar_unf')  # Teste falhou: reabre
+
+    relogio.agora = 200
+    assert disjuntores.permitir('selecionar_unf')
+    assert disjuntores.registrar_sucesso('selecionar_unf')  # Teste passou: fecha
+    assert disjuntores.situacao()['selecionar_unf'] == {'estado': 'fechado', 'falhas_seguidas': 0,
+                                                        'puladas': 2, 'aberturas': 2}
+    print("✅ Disjuntor abre, testa e fecha")
+
+def test_etapa_pulada_com_disjuntor_aberto():
+    """
+    Com o disjuntor aberto a etapa não roda mais; abertura gera um único alerta
+    """
+    eventos = []
+    automacao = FenixAutomation(headless=True, manter_navegador=False,
+                                ao_evento=lambda evento, dados: eventos.append((evento, dados.get('etapa'))))
+    automacao.disjuntores = Disjuntores({'falhas_para_abrir': 2, 'espera_s': 3600})
+    chamadas = []
+
+    async def _botao_quebrado():
+        chamadas.append(1)
+        return False
+
+    async def _cenario():
+        return [await automacao.executar_com_disjuntor('adicionar_linha', _botao_quebrado()) for _ in range(5)]
+
+    assert asyncio.run(_cenario()) == [False] * 5
+    assert len(chamadas) == 2
+    assert eventos.count(('disjuntor_aberto', 'adicionar_linha')) == 1
+    assert eventos.count(('etapa_pulada', 'adicionar_linha')) == 3
+    assert sum("adicionar_linha" in erro for erro in automacao.stats['erros']) == 1
+    print("✅ Etapa pulada com disjuntor aberto")
+
+def test_teste_sem_resultado_libera_o_meio_aberto():
+    """
+    Tentativa de teste que termina em prazo esgotado, resultado falso sem
+    tempo ou cancelamento não decide o disjuntor, mas libera o próximo teste
+    """
+    relogio = _Relogio()
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.disjuntores = Disjuntores({'falhas_para_abrir': 1, 'espera_s': 60}, relogio=relogio)
+    automacao.disjuntores.registrar_falha('selecionar_unf')
+    relogio.agora = 61
+
+    async def _prazo_esgotado():
+        raise PrazoEsgotado("página travada")
+
+    async def _falso_sem_tempo():
+        await asyncio.sleep(0.05)
+        return False
+
+    async def _cancelado():
+        raise LancamentoCancelado("concessão perdida")
+
+    async def _cenario():
+        try:
+            await automacao.executar_com_disjuntor('selecionar_unf', _prazo_esgotado())
+        except PrazoEsgotado:
+            pass
+        assert automacao.disjuntores.situacao()['selecionar_unf']['estado'] == 'meio_aberto'
+
+        with automacao.orcamento(0.01):
+            assert await automacao.executar_com_disjuntor('selecionar_unf', _falso_sem_tempo()) is False
+
+        try:
+            await automacao.executar_com_disjuntor('selecionar_unf', _cancelado())
+        except LancamentoCancelado:
+            pass
+
+    asyncio.run(_cenario())
+    situacao = automacao.disjuntores.situacao()['selecionar_unf']
+    assert situacao['estado'] == 'meio_aberto' and situacao['aberturas'] == 1
+    assert automacao.disjuntores.permitir('selecionar_unf')  # O teste não ficou preso
+    print("✅ Teste sem resultado libera o meio-aberto")
+
+def test_selecionar_unf_deixa_o_prazo_sair():
+    """Página travada durante a seleção da UNF derruba a UP, não vira 'UNF não encontrada'"""
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+
+    class _PaginaTravada:
+        async def wait_for_selector(self, seletor, timeout=None):
+            raise PrazoEsgotado("página travada")
+
+    async def _sem_pausa(segundos):
+        return None
+
+    automacao.page = _PaginaTravada()
+    automacao.pausa = _sem_pausa
+    try:
+        asyncio.run(automacao.selecionar_unf('UNF 1'))
+    except PrazoEsgotado:
+        pass
+    else:
+        raise AssertionError("PrazoEsgotado engolido pela seleção da UNF")
+    print("✅ Seleção da UNF deixa o prazo sair")
+
+if __name__ == "__main__":
+    test_abre_testa_e_fecha()
+    test_etapa_pulada_com_disjuntor_aberto()
+    test_teste_sem_resultado_libera_o_meio_aberto()
+    test_selecionar_unf_deixa_o_prazo_sair()
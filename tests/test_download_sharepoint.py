@@ -0,0 +1,103 @@
+"""
+Testes da etapa de busca do pipeline (downloads do SharePoint) contra um servidor HTTP local
+"""
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+import cria_pdf
+from cria_pdf import ClienteSharePoint, DownloadsCompartilhados
+
+CONTEUDO = {
+    'UP0001_1.jpg': b'a' * 300_000,
+    'UP0002_1.jpg': b'b' * 10,
+    'croqui_nucleo.jpg': b'c' * 1000,
+}
+
+class _Handler(BaseHTTPRequestHandler):
+    falhas_restantes = {'UP0001_1.jpg': 2}
+    requisicoes = []
+
+    def do_GET(self):
+        nome = next((n for n in CONTEUDO if n in self.path), None)
+        self.requisicoes.append((nome, self.headers.get('Cookie')))
+        if nome is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.falhas_restantes.get(nome, 0) > 0:
+            self.falhas_restantes[nome] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(CONTEUDO[nome])))
+        self.end_headers()
+        self.wfile.write(CONTEUDO[nome])
+
+    def log_message(self, *args):
+        pass
+
+def _contexto_falso(base_url):
+    def autenticar(request):
+        request.headers['Cookie'] = 'FedAuth=teste'
+    return SimpleNamespace(base_url=base_url, authentication_context=SimpleNamespace(authenticate_request=autenticar))
+
+def test_downloads_paralelos_com_novas_tentativas():
+    """
+    Threads da busca baixam em paralelo, repetem em HTTP 503, baixam uma vez
+    URLs repetidas e relançam o 404 para a UP
+    """
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    espera_original = cria_pdf.DOWNLOAD_CONFIG['espera_inicial']
+    cria_pdf.DOWNLOAD_CONFIG['espera_inicial'] = 0.01
+
+    try:
+        ctx = _contexto_falso(f"http://127.0.0.1:{servidor.server_port}/sites/TESTE")
+        destino = tempfile.mkdtemp()
+        tarefas = [
+            ('/sites/TESTE/FOTOS/UP0001_1.jpg', os.path.join(destino, 'UP0001_image.jpg')),
+            ('/sites/TESTE/FOTOS/UP0002_1.jpg', os.path.join(destino, 'UP0002_image.jpg')),
+            ('/sites/TESTE/CROQUIS/croqui_nucleo.jpg', os.path.join(destino, 'UP0001_croqui.jpg')),
+            ('/sites/TESTE/CROQUIS/croqui_nucleo.jpg', os.path.join(destino, 'UP0002_croqui.jpg')),
+            ('/sites/TESTE/FOTOS/inexistente.jpg', os.path.join(destino, 'UP0003_image.jpg')),
+        ]
+        cliente = ClienteSharePoint(ctx, max_workers=3)
+        downloads = DownloadsCompartilhados(cliente)
+        erros = {}
+
+        def _buscar(tarefa):
+            url, caminho = tarefa
+            try:
+                downloads.obter(url, caminho)
+            except Exception as e:
+                erros[caminho] = str(e)
+
+        try:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                list(executor.map(_buscar, tarefas))
+        finally:
+            cliente.fechar()
+
+        assert list(erros) == [os.path.join(destino, 'UP0003_image.jpg')]
+        with open(os.path.join(destino, 'UP0001_image.jpg'), 'rb') as f:
+            assert f.read() == CONTEUDO['UP0001_1.jpg']
+        with open(os.path.join(destino, 'UP0002_croqui.jpg'), 'rb') as f:
+            assert f.read() == CONTEUDO['croqui_nucleo.jpg']
+        assert not any(n.endswith('.part') for n in os.listdir(destino))
+
+        bytes_esperados = len(CONTEUDO['UP0001_1.jpg']) + len(CONTEUDO['UP0002_1.jpg']) + len(CONTEUDO['croqui_nucleo.jpg'])
+        assert downloads.bytes_transferidos == bytes_esperados
+        assert sum(1 for nome, _ in _Handler.requisicoes if nome == 'croqui_nucleo.jpg') == 1
+        assert sum(1 for nome, _ in _Handler.requisicoes if nome == 'UP0001_1.jpg') == 3
+        assert all(cookie == 'FedAuth=teste' for _, cookie in _Handler.requisicoes)
+        print("✅ Downloads paralelos concluídos")
+    finally:
+        cria_pdf.DOWNLOAD_CONFIG['espera_inicial'] = espera_original
+        servidor.shutdown()
+
+if __name__ == "__main__":
+    test_downloads_paralelos_com_novas_tentativas()
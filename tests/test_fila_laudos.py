@@ -0,0 +1,130 @@
+"""
+Testes da fila de laudos em SQLite (reivindicação, concessão e trabalhador sem navegador real)
+"""
+import os
+import tempfile
+import pandas as pd
+from lancamento_fenix import FenixAutomation
+from fila_laudos import FilaLaudos, executar_trabalhador
+from conftest import com_automacao_falsa
+
+def _fila(**config):
+    return FilaLaudos(os.path.join(tempfile.mkdtemp(), "fila.sqlite"), config)
+
+def _ups():
+    return pd.DataFrame([
+        {'UP': 'BA0001', 'Nucleo': 'BA2'},
+        {'UP': 'BA0002', 'Nucleo': 'BA2'},
+        {'UP': 'ES0001', 'Nucleo': 'ES1'},
+    ])
+
+def test_reivindicacao_e_concessao():
+    """
+    Cada trabalhador recebe um laudo diferente; concessão expirada volta para
+    a fila e, esgotadas as tentativas, o laudo é dado como falho
+    """
+    fila = _fila(max_tentativas=2)
+    fila.enfileirar(_ups(), ['BA2', 'ES1'], lote="entrega5")
+
+    primeiro = fila.reivindicar("vm1")
+    segundo = fila.reivindicar("vm2")
+    assert {primeiro['grupo'], segundo['grupo']} == {'BA2', 'ES1'}
+    assert list(primeiro['df_ups']['UP']) == ['BA0001', 'BA0002']
+    assert fila.reivindicar("vm3") is None
+    assert fila.renovar(primeiro['id'], "vm1") and not fila.renovar(primeiro['id'], "vm2")
+
+    # vm2 parou de bater: a concessão expira e vm3 assume o laudo
+    assert fila.renovar(segundo['id'], "vm2", concessao_s=-1)
+    retomado = fila.reivindicar("vm3", concessao_s=-1)
+    assert retomado['id'] == segundo['id'] and retomado['tentativas'] == 2
+    assert not fila.concluir(segundo['id'], "vm2", {'sucesso': True})
+
+    # vm3 também some: sem tentativas restantes, o laudo falha
+    assert fila.reivindicar("vm4") is None
+    assert fila.concluir(primeiro['id'], "vm1", {'sucesso': True, 'ups_com_sucesso': ['BA0001', 'BA0002']})
+
+    situacao = fila.situacao("entrega5")
+    assert situacao['laudos'] == {'pendente': 0, 'em_execucao': 0, 'concluido': 1, 'falhou': 1, 'revisar': 0}
+    assert situacao['trabalhadores']['vm1']['ups_por_hora'] == 2.0
+    print("✅ Reivindicação e concessão conferidas")
+
+def test_trabalhador_esvazia_a_fila():
+    """
+    O trabalhador lança os laudos um a um e a visão do coordenador soma a vazão
+    """
+    with com_automacao_falsa():
+        fila = _fila(batimento_s=0.05)
+        fila.enfileirar(_ups(), ['BA2', 'ES1'])
+        eventos = []
+        contadores = executar_trabalhador(fila, "a@suzano.com.br", "x", trabalhador="vm1",
+                                          ao_evento=lambda evento, dados: eventos.append(evento))
+
+    assert contadores == {'trabalhador': "vm1", 'laudos': 2, 'concluidos': 2, 'falhas': 0, 'abandonados': 0,
+                          'disjuntores': {}}
+    assert eventos.count('laudo_reivindicado') == 2 and eventos.count('laudo_concluido') == 2
+
+    situacao = fila.situacao()
+    assert situacao['laudos']['concluido'] == 2 and situacao['em_execucao'] == []
+    assert situacao['ups_por_hora'] == 3.0
+    print("✅ Trabalhador esvaziou a fila")
+
+def test_envio_confere_a_concessao_e_laudo_enviado_vai_para_revisao():
+    """
+    Sem concessão o Enviar não acontece; laudo que expirou depois do Enviar
+    não volta para a fila, fica para revisão manual
+    """
+    fila = _fila()
+    fila.enfileirar(_ups(), ['BA2', 'ES1'])
+    primeiro = fila.reivindicar("vm1")
+    segundo = fila.reivindicar("vm2")
+
+    # vm1 perdeu a concessão para vm3 antes de chegar ao Enviar
+    assert fila.renovar(primeiro['id'], "vm1", concessao_s=-1)
+    assert not fila.marcar_envio(primeiro['id'], "vm1")
+    assert fila.reivindicar("vm3", concessao_s=-1)['id'] == primeiro['id']
+
+    # vm2 passou do Enviar e sumiu: ninguém relança o laudo
+    assert fila.marcar_envio(segundo['id'], "vm2", concessao_s=-1)
+    reivindicado = fila.reivindicar("vm4")  # Só o laudo de vm3, também expirado, antes do Enviar
+    assert reivindicado['id'] == primeiro['id']
+    assert fila.situacao()['laudos']['revisar'] == 1
+    assert not fila.concluir(segundo['id'], "vm2", {'sucesso': True})
+    print("✅ Envio conferido e laudo enviado deixado para revisão")
+
+def test_controle_interrompe_antes_do_enviar_sem_concessao():
+    """
+    enviar_laudo chama antes_do_envio; sem concessão o laudo é abandonado sem finalizar
+    """
+    enviados = []
+
+    async def _automacao_ate_o_envio(self, df_ups, nucleos_selecionados):
+        for _ in nucleos_selecionados:
+            await self.aguardar_controle()
+            await self.enviar_laudo()
+        return True
+
+    async def _finalizar(self):
+        enviados.append(True)
+        return True
+
+    original = FenixAutomation.executar_automacao_completa, FenixAutomation.finalizar_laudo
+    FenixAutomation.executar_automacao_completa = _automacao_ate_o_envio
+    FenixAutomation.finalizar_laudo = _finalizar
+    try:
+        fila = _fila(batimento_s=60)
+        fila.enfileirar(_ups(), ['BA2'])
+        marcar_envio = fila.marcar_envio
+        fila.marcar_envio = lambda *args: False  # Concessão tomada por outro trabalhador
+        contadores = executar_trabalhador(fila, "a@suzano.com.br", "x", trabalhador="vm1")
+        fila.marcar_envio = marcar_envio
+    finally:
+        FenixAutomation.executar_automacao_completa, FenixAutomation.finalizar_laudo = original
+
+    assert enviados == [] and contadores['abandonados'] == 1
+    print("✅ Envio interrompido sem concessão")
+
+if __name__ == "__main__":
+    test_reivindicacao_e_concessao()
+    test_trabalhador_esvazia_a_fila()
+    test_envio_confere_a_concessao_e_laudo_enviado_vai_para_revisao()
+    test_controle_interrompe_antes_do_enviar_sem_concessao()
@@ -0,0 +1,97 @@
+"""
+Testes do lançamento em pipeline (próximo laudo preparado em outra aba, sem navegador real)
+"""
+import asyncio
+import pandas as pd
+from lancamento_fenix import FenixAutomation
+from conftest import PaginaFalsa, ContextoFalso
+
+linha_do_tempo = []
+falhar_preparo = set()
+trocar_aba = set()
+
+async def _preparar_laudo(self, nucleo, ups_nucleo):
+    linha_do_tempo.append(('preparar_inicio', nucleo, self.page.nome))
+    await asyncio.sleep(0.02)
+    linha_do_tempo.append(('preparar_fim', nucleo, self.page.nome))
+    if nucleo in falhar_preparo:
+        falhar_preparo.discard(nucleo)
+        return False
+    return True
+
+async def _processar_ups_nucleo(self, ups_nucleo):
+    nucleo = ups_nucleo['Nucleo'].iloc[0]
+    linha_do_tempo.append(('ups', nucleo, self.page.nome))
+    if nucleo in trocar_aba:  # Como recuperar_laudo: abre outra aba no lugar da atual
+        trocar_aba.discard(nucleo)
+        self.page = await self.context.new_page()
+    return True
+
+async def _finalizar_laudo(self):
+    linha_do_tempo.append(('finalizar_inicio', None, self.page.nome))
+    await asyncio.sleep(0.05)
+    linha_do_tempo.append(('finalizar_fim', None, self.page.nome))
+    return True
+
+def _executar(grupos):
+    """Roda o pipeline com as etapas do portal substituídas"""
+    linha_do_tempo.clear()
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.context = ContextoFalso()
+    automacao.page = PaginaFalsa("pagina1")
+    df_ups = pd.DataFrame([{'UP': f"{grupo}-{i}", 'Nucleo': grupo} for grupo in grupos for i in range(2)])
+
+    falsas = {'preparar_laudo': _preparar_laudo, 'processar_ups_nucleo': _processar_ups_nucleo,
+              'finalizar_laudo': _finalizar_laudo}
+    originais = {nome: getattr(FenixAutomation, nome) for nome in falsas}
+    try:
+        for nome, funcao in falsas.items():
+            setattr(FenixAutomation, nome, funcao)
+        asyncio.run(automacao.processar_grupos_em_pipeline(df_ups, grupos))
+    finally:
+        for nome, funcao in originais.items():
+            setattr(FenixAutomation, nome, funcao)
+    return automacao
+
+def test_proximo_laudo_preparado_durante_o_envio():
+    """
+    O laudo N+1 é preparado na outra aba enquanto o N é enviado, e as abas se alternam
+    """
+    automacao = _executar(['BA2', 'BA3', 'BA4'])
+
+    assert automacao.stats['nucleos_processados'] == 3
+    assert [nome for passo, _, nome in linha_do_tempo if passo == 'ups'] == ['pagina1', 'pagina2', 'pagina1']
+    # A preparação do BA3 começa antes do fim do envio do BA2
+    assert linha_do_tempo.index(('preparar_inicio', 'BA3', 'pagina2')) < linha_do_tempo.index(('finalizar_fim', None, 'pagina1'))
+    assert automacao.page.nome == 'pagina1' and automacao.context.paginas[0].fechada
+    print("✅ Próximo laudo preparado durante o envio")
+
+def test_preparo_antecipado_que_falha_e_refeito():
+    """
+    Se a preparação antecipada falhar, o laudo é preparado de novo na vez dele
+    """
+    falhar_preparo.add('BA3')
+    automacao = _executar(['BA2', 'BA3'])
+
+    assert automacao.stats['nucleos_processados'] == 2
+    preparos_ba3 = [nome for passo, nucleo, nome in linha_do_tempo if passo == 'preparar_inicio' and nucleo == 'BA3']
+    assert preparos_ba3 == ['pagina2', 'pagina1']
+    print("✅ Preparação refeita após falha")
+
+def test_abas_abertas_pela_copia_sao_fechadas():
+    """
+    Aba aberta pela cópia no meio do laudo (recuperação) também é fechada
+    no fim; a aba da automação principal continua aberta
+    """
+    trocar_aba.add('BA3')
+    automacao = _executar(['BA2', 'BA3'])
+
+    assert [aba.nome for aba in automacao.context.paginas] == ['pagina2', 'pagina3']
+    assert all(aba.fechada for aba in automacao.context.paginas)
+    assert automacao.page.nome == 'pagina1' and not automacao.page.fechada
+    print("✅ Abas extras fechadas")
+
+if __name__ == "__main__":
+    test_proximo_laudo_preparado_durante_o_envio()
+    test_preparo_antecipado_que_falha_e_refeito()
+    test_abas_abertas_pela_copia_sao_fechadas()
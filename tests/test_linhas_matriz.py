@@ -0,0 +1,148 @@
+"""
+Testes do provisionamento das linhas da Matriz de Decisão, sem navegador real
+"""
+import asyncio
+import pandas as pd
+import lancamento_fenix
+from interface_console import InterfaceConsole
+from lancamento_fenix import FenixAutomation, SCRIPT_CONTAR_LINHAS, SCRIPT_REMOVER_LINHAS
+from conftest import PaginaFalsa
+
+class _Botao:
+    def __init__(self, pagina):
+        self.pagina = pagina
+
+    async def click(self):
+        if self.pagina.cliques == self.pagina.falha_no_clique:
+            raise Exception("Element is not attached to the DOM")
+        self.pagina.cliques += 1
+        self.pagina.pendentes += 1
+
+class _Pagina(PaginaFalsa):
+    """Matriz falsa: o botão adiciona linhas e o script de remoção tira as sobrando"""
+
+    def __init__(self, linhas=1, falha_no_clique=None, remove=True):
+        super().__init__()
+        self.linhas = linhas
+        self.cliques = 0
+        self.pendentes = 0  # Linhas clicadas que o React ainda não desenhou
+        self.buscas_botao = 0
+        self.falha_no_clique = falha_no_clique
+        self.remove = remove
+        self.leituras = 0
+
+    async def evaluate(self, script, argumento=None):
+        if script == SCRIPT_CONTAR_LINHAS:
+            # Cada leitura desenha uma das linhas pendentes
+            self.leituras += 1
+            if self.pendentes:
+                self.pendentes -= 1
+                self.linhas += 1
+            return self.linhas
+        assert script == SCRIPT_REMOVER_LINHAS
+        if not self.remove:
+            return 0
+        removidas = self.linhas - argumento
+        self.linhas = argumento
+        return removidas
+
+    async def wait_for_selector(self, seletor, timeout=None):
+        self.buscas_botao += 1
+        return _Botao(self)
+
+def _ups(quantidade):
+    return pd.DataFrame([
+        {'UP': f"BA000{i}", 'Incidencia': 0.5, 'Severidade Predominante': 'ALTO', 'Idade': 5,
+         'Ocorrência Predominante': 'VENDAVAL'}
+        for i in range(1, quantidade + 1)
+    ])
+
+def _executar(corrotina):
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        return asyncio.run(corrotina)
+    finally:
+        lancamento_fenix.usar_interface_na_thread(None)
+
+def test_linhas_criadas_de_uma_vez():
+    """
+    O botão é localizado uma vez e clicado as vezes que faltam; o total é conferido com uma leitura
+    """
+    pagina = _Pagina()
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.page = pagina
+
+    _executar(automacao.provisionar_linhas_matriz(5))
+    assert pagina.linhas == 5 and pagina.cliques == 4 and pagina.buscas_botao == 1
+    assert automacao.linhas_matriz == 5 and pagina.leituras > 2  # Esperou o React desenhar
+    print("✅ Linhas da matriz criadas de uma vez")
+
+def test_clique_que_falha_no_meio_recontagem_das_linhas():
+    """
+    Se um clique falha no meio, linhas_matriz fica com o total que está no DOM
+    """
+    pagina = _Pagina(falha_no_clique=2)
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.page = pagina
+
+    _executar(automacao.provisionar_linhas_matriz(5))
+    assert pagina.cliques == 2 and automacao.linhas_matriz == pagina.linhas == 3
+    print("✅ Linhas recontadas após clique com falha")
+
+def test_ups_usam_linhas_provisionadas_e_sobras_sao_removidas():
+    """
+    Com as linhas provisionadas nenhuma linha é adicionada entre as UPs; a
+    linha da UP pulada é removida antes do envio
+    """
+    pagina = _Pagina(linhas=4)
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.page = pagina
+    automacao.linhas_matriz = 4
+    linhas = []
+    adicionadas = []
+
+    async def _processar_up(up_data, up_index=0):
+        linhas.append((up_data['UP'], up_index))
+        if up_data['UP'] == 'BA0002':
+            return False
+        automacao.stats['ups_processadas'] += 1
+        return True
+
+    async def _adicionar_linha():
+        adicionadas.append(1)
+        return True
+
+    automacao.processar_up = _processar_up
+    automacao.adicionar_linha_matriz = _adicionar_linha
+
+    assert _executar(automacao.processar_ups_nucleo(_ups(4)))
+    assert linhas == [('BA0001', 0), ('BA0002', 1), ('BA0003', 1), ('BA0004', 2)]
+    assert adicionadas == []
+    assert pagina.linhas == 3 and automacao.linhas_matriz == 3
+    print("✅ UPs usam as linhas provisionadas e as sobras são removidas")
+
+def test_linhas_vazias_que_nao_saem_impedem_o_envio():
+    """
+    Sem conseguir remover as linhas vazias, o laudo não segue para o Enviar
+    """
+    pagina = _Pagina(linhas=3, remove=False)
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.page = pagina
+    automacao.linhas_matriz = 3
+
+    async def _processar_up(up_data, up_index=0):
+        if up_data['UP'] == 'BA0002':
+            return False
+        automacao.stats['ups_processadas'] += 1
+        return True
+
+    automacao.processar_up = _processar_up
+    assert not _executar(automacao.processar_ups_nucleo(_ups(3)))
+    assert any("Linhas vazias" in erro for erro in automacao.stats['erros'])
+    print("✅ Linhas vazias impedem o envio")
+
+if __name__ == "__main__":
+    test_linhas_criadas_de_uma_vez()
+    test_clique_que_falha_no_meio_recontagem_das_linhas()
+    test_ups_usam_linhas_provisionadas_e_sobras_sao_removidas()
+    test_linhas_vazias_que_nao_saem_impedem_o_envio()
@@ -0,0 +1,84 @@
+"""
+Testes do link direto para o Upload de Laudos, sem navegador real
+"""
+import asyncio
+import lancamento_fenix
+from interface_console import InterfaceConsole
+from lancamento_fenix import FenixAutomation, CACHE_NAVEGACAO, FENIX_URL, SELETOR_FORMULARIO_UPLOAD
+from conftest import PaginaFalsa
+
+URL_UPLOAD = FENIX_URL + "laudos/upload"
+
+class _Pagina(PaginaFalsa):
+    def __init__(self, upload_abre=True):
+        super().__init__(url=FENIX_URL)
+        self.upload_abre = upload_abre
+        self.gotos = []
+
+    async def goto(self, url, **opcoes):
+        self.gotos.append(url)
+        await super().goto(url)
+
+    async def wait_for_selector(self, seletor, timeout=None):
+        if seletor == SELETOR_FORMULARIO_UPLOAD and self.url == URL_UPLOAD and self.upload_abre:
+            return object()
+        raise TimeoutError(f"Timeout {timeout}ms exceeded")
+
+    async def query_selector(self, seletor):
+        return object() if self.url == URL_UPLOAD and seletor == SELETOR_FORMULARIO_UPLOAD else None
+
+def _navegar(pagina, vezes):
+    """Navega vezes seguidas, contando as navegações pelo menu"""
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.page = pagina
+    menus = []
+
+    async def _menu():
+        menus.append(pagina.url)
+        pagina.url = URL_UPLOAD
+        return True
+
+    automacao.navegar_pelo_menu = _menu
+
+    async def _cenario():
+        return [await automacao.navegar_para_upload() for _ in range(vezes)]
+
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        return asyncio.run(_cenario()), menus
+    finally:
+        lancamento_fenix.usar_interface_na_thread(None)
+
+def test_menu_so_na_primeira_vez():
+    """
+    A primeira navegação passa pelo menu e memoriza o endereço; as
+    seguintes vão direto pelo goto
+    """
+    CACHE_NAVEGACAO['url_upload'] = None
+    pagina = _Pagina()
+    try:
+        resultados, menus = _navegar(pagina, 3)
+        assert resultados == [True, True, True]
+        assert len(menus) == 1 and pagina.gotos == [URL_UPLOAD, URL_UPLOAD]
+        assert CACHE_NAVEGACAO['url_upload'] == URL_UPLOAD
+    finally:
+        CACHE_NAVEGACAO['url_upload'] = None
+    print("✅ Menu só na primeira navegação")
+
+def test_link_direto_que_falha_volta_ao_menu():
+    """
+    Se o formulário não aparecer pelo link direto, o menu é usado e o endereço é aprendido de novo
+    """
+    CACHE_NAVEGACAO['url_upload'] = URL_UPLOAD
+    pagina = _Pagina(upload_abre=False)
+    try:
+        resultados, menus = _navegar(pagina, 1)
+        assert resultados == [True] and len(menus) == 1
+        assert CACHE_NAVEGACAO['url_upload'] == URL_UPLOAD
+    finally:
+        CACHE_NAVEGACAO['url_upload'] = None
+    print("✅ Link direto com falha volta ao menu")
+
+if __name__ == "__main__":
+    test_menu_so_na_primeira_vez()
+    test_link_direto_que_falha_volta_ao_menu()
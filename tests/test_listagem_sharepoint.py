@@ -0,0 +1,91 @@
+"""
+Testes da listagem paginada e filtrada do SharePoint
+"""
+import json
+import threading
+from types import SimpleNamespace
+from cache_sharepoint import versao_arquivo
+from cria_pdf import iterar_arquivos_sharepoint, filtro_imagens_das_ups, filtro_croquis_das_ups, LOCK_AUTENTICACAO
+
+class _RequisicaoFalsa:
+    """Responde RenderListDataAsStream em duas páginas"""
+
+    def __init__(self):
+        self.urls = []
+        self.paginas = [
+            {'Row': [
+                {'FileLeafRef': 'ABC001_1.jpg', 'FileRef': '/sites/T/Docs/FOTOS/ABC001_1.jpg', 'UniqueId': '{A1}',
+                 '_UIVersionString': '3.0', 'Modified': '01/02/2025 10:15', 'Modified.': '2025-02-01T10:15:42Z',
+                 'File_x0020_Size': '10', 'FSObjType': '0'},
+                {'FileLeafRef': 'Antigas', 'FileRef': '/sites/T/Docs/FOTOS/Antigas', 'FSObjType': '1'},
+                {'FileLeafRef': 'ZZZ999_1.jpg', 'FileRef': '/sites/T/Docs/FOTOS/ZZZ999_1.jpg', 'Modified': '1', 'File_x0020_Size': '10', 'FSObjType': '0'},
+            ], 'NextHref': '?Paged=TRUE&p_ID=3'},
+            {'Row': [
+                {'FileLeafRef': 'abc002_2.jpg', 'FileRef': '/sites/T/Docs/FOTOS/abc002_2.jpg', 'Modified': '2', 'File_x0020_Size': '20', 'FSObjType': '0'},
+            ]},
+        ]
+
+        self.assinadas = 0
+        self.digests_pedidos = 0
+        self.lock_livre_no_envio = []
+        self.authenticate_request = self._assinar
+
+    def _assinar(self, request):
+        self.assinadas += 1
+        request.headers['Cookie'] = "FedAuth=teste"
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        """Sessão HTTP falsa: o envio não pode segurar o lock de autenticação"""
+        assert headers['Cookie'] == "FedAuth=teste"
+        if url.endswith("/_api/contextinfo"):
+            self.digests_pedidos += 1
+            info = {'FormDigestValue': "0xDIGEST", 'FormDigestTimeoutSeconds': 1800}
+            return SimpleNamespace(json=lambda: info, raise_for_status=lambda: None)
+        assert headers['X-RequestDigest'] == "0xDIGEST"
+        self.urls.append(url)
+        resultado = []
+
+        def _tentar_lock():
+            # Adquire e libera na mesma thread (o lock é um RLock)
+            livre = LOCK_AUTENTICACAO.acquire(blocking=False)
+            if livre:
+                LOCK_AUTENTICACAO.release()
+            resultado.append(livre)
+
+        outra = threading.Thread(target=_tentar_lock)
+        outra.start()
+        outra.join()
+        self.lock_livre_no_envio.append(resultado[0])
+        view_xml = json.loads(data)['parameters']['ViewXml']
+        assert 'RowLimit Paged' in view_xml and "'UniqueId'" in view_xml and "'_UIVersionString'" in view_xml
+        pagina = self.paginas[len(self.urls) - 1]
+        return SimpleNamespace(json=lambda: pagina, raise_for_status=lambda: None)
+
+def test_listagem_paginada_filtrada_por_ups():
+    """
+    Percorre todas as páginas, ignora subpastas e devolve só arquivos das UPs
+    """
+    requisicao = _RequisicaoFalsa()
+    ctx = SimpleNamespace(base_url="https://empresa.sharepoint.com/sites/T", authentication_context=requisicao)
+
+    arquivos = iterar_arquivos_sharepoint(ctx, "/sites/T/Docs/FOTOS", filtro=filtro_imagens_das_ups(['ABC001', 'ABC002']),
+                                          sessao=requisicao)
+    primeiro = next(arquivos)
+    # Gerador: a segunda página só é pedida quando consumida
+    assert len(requisicao.urls) == 1
+    restantes = list(arquivos)
+
+    assert [primeiro['nome']] + [a['nome'] for a in restantes] == ['ABC001_1.jpg', 'abc002_2.jpg']
+    assert "GetList(@lista)" in requisicao.urls[0] and "Docs'" in requisicao.urls[0]
+    assert requisicao.urls[1].endswith("&Paged=TRUE&p_ID=3")
+    # Cada página é assinada sob o lock, mas enviada fora dele; o digest é pedido uma vez
+    assert requisicao.assinadas == 3 and requisicao.lock_livre_no_envio == [True, True]
+    assert requisicao.digests_pedidos == 1
+    # Versão pelo id + versão da lista e data ISO (com segundos), não a data formatada
+    assert primeiro['modificado'] == '2025-02-01T10:15:42Z'
+    assert versao_arquivo(primeiro) == "ver:{A1}:3.0:2025-02-01T10:15:42Z:10"
+    assert filtro_croquis_das_ups(['ABC001'])("Croqui_abc001_final.png")
+    print("✅ Listagem paginada e filtrada")
+
+if __name__ == "__main__":
+    test_listagem_paginada_filtrada_por_ups()
@@ -0,0 +1,136 @@
+"""
+Testes do login automático guiado pelas telas da página, sem navegador real
+"""
+import time
+import asyncio
+import lancamento_fenix
+from interface_console import InterfaceConsole
+from lancamento_fenix import FenixAutomation
+
+SELETOR_DA_TELA = {
+    'inicial': 'xpath=//*[@id="__next"]/div[1]/div[2]/button',
+    'email': '#i0116',
+    'senha': '#i0118',
+    'mfa': '#idRichContext_DisplaySign',
+    'manter_conectado': '#KmsiCheckboxField',
+    'fenix': 'button:has-text("Submissão de Laudos")',
+    'erro': '#passwordError',
+}
+
+class _Elemento:
+    def __init__(self, pagina, tela):
+        self.pagina = pagina
+        self.tela = tela
+
+    async def is_visible(self):
+        return True
+
+    async def click(self):
+        self.pagina.acao(self.tela, 'clique')
+
+    async def fill(self, valor):
+        self.pagina.acoes.append((self.tela, valor))
+
+    async def inner_text(self):
+        return "42" if self.tela == 'mfa' else "Senha incorreta."
+
+    async def get_attribute(self, nome):
+        return SELETOR_DA_TELA[self.tela].lstrip('#')
+
+class _PaginaLogin:
+    """
+    Portal falso: cada ação leva à próxima tela do roteiro depois de um
+    atraso (tela em branco no meio, como nos redirecionamentos)
+    """
+
+    def __init__(self, roteiro, tela='inicial'):
+        self.roteiro = roteiro  # tela -> (próxima tela, atraso em s)
+        self.tela = tela
+        self.acoes = []
+        self.ouvintes = []
+        self.keyboard = self
+
+    def on(self, evento, ouvinte):
+        self.ouvintes.append(ouvinte)
+
+    def remove_listener(self, evento, ouvinte):
+        self.ouvintes.remove(ouvinte)
+
+    async def query_selector(self, seletor):
+        if self.tela is not None and SELETOR_DA_TELA[self.tela] == seletor:
+            return _Elemento(self, self.tela)
+        return None
+
+    async def press(self, tecla):
+        self.acao(self.tela, tecla)
+
+    def acao(self, tela, acao):
+        self.acoes.append((tela, acao))
+        if tela in self.roteiro:
+            self.trocar(*self.roteiro[tela])
+
+    def trocar(self, proxima, atraso):
+        self.tela = None
+        loop = asyncio.get_running_loop()
+
+        def _chegar():
+            self.tela = proxima
+            for ouvinte in self.ouvintes:
+                ouvinte(None)
+            if proxima == 'mfa':  # Aprovado no celular depois de um tempo
+                seguinte, espera = self.roteiro['mfa']
+                loop.call_later(espera, setattr, self, 'tela', seguinte)
+
+        loop.call_later(atraso, _chegar)
+
+def _login(pagina):
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.email, automacao.senha = "ana@suzano.com.br", "segredo"
+    automacao.page = pagina
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        inicio = time.monotonic()
+        resultado = asyncio.run(automacao.fazer_login_automatico())
+        return resultado, time.monotonic() - inicio
+    finally:
+        lancamento_fenix.usar_interface_na_thread(None)
+
+def test_login_com_mfa_sem_pausas_fixas():
+    """
+    Cada tela é tratada assim que aparece, mesmo com atrasos diferentes, e o
+    MFA é acompanhado até a aprovação
+    """
+    pagina = _PaginaLogin({
+        'inicial': ('email', 0.1),
+        'email': ('senha', 0.6),  # Tela de senha atrasada
+        'senha': ('mfa', 0.05),
+        'mfa': ('manter_conectado', 0.4),
+        'manter_conectado': ('fenix', 0.1),
+    })
+    sucesso, duracao = _login(pagina)
+
+    assert sucesso and duracao < 3
+    assert pagina.acoes == [
+        ('inicial', 'clique'),
+        ('email', "ana@suzano.com.br"), ('email', 'Enter'),
+        ('senha', "segredo"), ('senha', 'Enter'),
+        ('manter_conectado', 'Enter'),
+    ]
+    assert pagina.ouvintes == []
+    print("✅ Login com MFA sem pausas fixas")
+
+def test_login_ja_feito_e_senha_recusada():
+    """
+    Sessão já logada termina na hora; senha recusada falha sem esperar o prazo
+    """
+    sucesso, duracao = _login(_PaginaLogin({}, tela='fenix'))
+    assert sucesso and duracao < 0.5
+
+    pagina = _PaginaLogin({'email': ('senha', 0.05), 'senha': ('erro', 0.05)}, tela='email')
+    sucesso, duracao = _login(pagina)
+    assert not sucesso and duracao < 2
+    print("✅ Login já feito e senha recusada")
+
+if __name__ == "__main__":
+    test_login_com_mfa_sem_pausas_fixas()
+    test_login_ja_feito_e_senha_recusada()
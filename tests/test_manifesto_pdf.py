@@ -0,0 +1,59 @@
+"""
+Testes do manifesto de build incremental dos PDFs
+"""
+import os
+import tempfile
+from cria_pdf import (
+    calcular_assinatura_up, carregar_manifesto, salvar_manifesto,
+    pdf_esta_atualizado, podar_manifestos
+)
+
+def test_assinatura_muda_com_os_dados():
+    """
+    A assinatura deve mudar quando um campo ou a imagem de origem muda
+    """
+    temp_dir = tempfile.mkdtemp()
+    imagem = os.path.join(temp_dir, "ABC123_1.jpg")
+    with open(imagem, 'wb') as f:
+        f.write(b'imagem')
+
+    up_data = {'UP': 'ABC123', 'Nucleo': 'Núcleo Teste', 'Incidencia': '10'}
+    base = calcular_assinatura_up(up_data, imagem, None)
+
+    assert calcular_assinatura_up(dict(up_data), imagem, None) == base
+    assert calcular_assinatura_up({**up_data, 'Incidencia': '20'}, imagem, None) != base
+
+    with open(imagem, 'wb') as f:
+        f.write(b'imagem alterada')
+    assert calcular_assinatura_up(up_data, imagem, None) != base
+    print("✅ Assinatura reflete dados e arquivos de origem")
+
+def test_poda_remove_ups_que_sairam_da_entrega():
+    """
+    UPs registradas no manifesto que não estão mais na planilha têm o PDF removido
+    """
+    output_dir = tempfile.mkdtemp()
+    pasta = os.path.join(output_dir, "Entrega 1 - Núcleo A - Incêndio")
+    os.makedirs(pasta)
+
+    manifesto = carregar_manifesto(pasta)
+    for up in ("UP0001", "UP0002"):
+        pdf_path = os.path.join(pasta, f"{up}.pdf")
+        with open(pdf_path, 'wb') as f:
+            f.write(b'%PDF')
+        manifesto['ups'][up] = {'assinatura': up, 'pdf': f"{up}.pdf", 'unf': 'UNF SP', 'tamanho_mb': 0.01}
+    salvar_manifesto(pasta, manifesto)
+
+    assert pdf_esta_atualizado(carregar_manifesto(pasta), "UP0001", "UP0001", os.path.join(pasta, "UP0001.pdf"))
+
+    removidas = podar_manifestos(output_dir, "Entrega 1", "UNF SP", {pasta: {"UP0001"}})
+
+    assert removidas == ["Entrega 1 - Núcleo A - Incêndio/UP0002"]
+    assert os.path.exists(os.path.join(pasta, "UP0001.pdf"))
+    assert not os.path.exists(os.path.join(pasta, "UP0002.pdf"))
+    assert set(carregar_manifesto(pasta)['ups']) == {"UP0001"}
+    print("✅ PDFs obsoletos removidos")
+
+if __name__ == "__main__":
+    test_assinatura_muda_com_os_dados()
+    test_poda_remove_ups_que_sairam_da_entrega()
@@ -0,0 +1,140 @@
+"""
+Testes do navegador persistente (daemon) acessado via CDP
+"""
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import subprocess
+from navegador_daemon import DaemonNavegador, ErroDaemon
+
+# Substituto do Chromium: responde ao /json/version na porta pedida
+CHROMIUM_FALSO = '''#!{python}
+import sys, json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+porta = int([a for a in sys.argv if a.startswith("--remote-debugging-port=")][0].split("=")[1])
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        corpo = json.dumps({{"Browser": "Chromium/Falso", "webSocketDebuggerUrl": "ws://x"}}).encode()
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(corpo)
+    def log_message(self, *args):
+        pass
+HTTPServer(("127.0.0.1", porta), Handler).serve_forever()
+'''
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _daemon(temp_dir):
+    return DaemonNavegador({
+        'host': "127.0.0.1", 'porta_cdp': _porta_livre(), 'pasta_perfil': os.path.join(temp_dir, "perfil"),
+        'timeout_inicio_s': 10, 'timeout_saude_s': 1
+    })
+
+def test_garantir_inicia_reaproveita_e_para():
+    """
+    Sem navegador respondendo, garantir() inicia o daemon; com ele saudável,
+    apenas devolve o endpoint; parar() encerra o processo registrado
+    """
+    if sys.platform == 'win32':
+        return
+    temp_dir = tempfile.mkdtemp()
+    executavel = os.path.join(temp_dir, "chromium")
+    with open(executavel, 'w') as f:
+        f.write(CHROMIUM_FALSO.format(python=sys.executable))
+    os.chmod(executavel, 0o755)
+
+    daemon = _daemon(temp_dir)
+    assert daemon.verificar_saude() is None
+    try:
+        endpoint, reiniciado = daemon.garantir(executavel)
+        assert reiniciado and endpoint == daemon.endpoint
+        assert daemon.verificar_saude()['Browser'] == "Chromium/Falso"
+        assert daemon.estado()['pid']
+
+        # Segunda conexão: nenhum processo novo
+        pid = daemon.estado()['pid']
+        assert daemon.garantir(executavel) == (daemon.endpoint, False)
+        assert daemon.estado()['pid'] == pid
+    finally:
+        assert daemon.parar()
+
+    limite = time.time() + 5
+    while daemon.verificar_saude() is not None and time.time() < limite:
+        time.sleep(0.1)
+    assert daemon.verificar_saude() is None
+    assert daemon.estado() == {}
+    print("✅ Daemon iniciado, reaproveitado e encerrado")
+
+def test_parar_nao_mata_processo_alheio():
+    """
+    daemon.json com o PID de outro processo (ex.: depois de reiniciar a
+    máquina): parar() apaga o estado e não encerra nada
+    """
+    if sys.platform == 'win32':
+        return
+    daemon = _daemon(tempfile.mkdtemp())
+    daemon.pasta_perfil.mkdir(parents=True)
+    alheio = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        with open(daemon.arquivo_estado, 'w', encoding='utf-8') as f:
+            json.dump({'pid': alheio.pid, 'porta': daemon.porta}, f)
+        assert not daemon.processo_registrado(alheio.pid)
+        assert not daemon.parar()
+        assert alheio.poll() is None and daemon.estado() == {}
+    finally:
+        alheio.kill()
+        alheio.wait()
+    print("✅ Processo alheio preservado")
+
+def test_executavel_invalido():
+    """
+    Falha ao iniciar vira ErroDaemon
+    """
+    daemon = _daemon(tempfile.mkdtemp())
+    try:
+        daemon.garantir("/caminho/inexistente/chromium")
+        assert False, "Esperava ErroDaemon"
+    except ErroDaemon:
+        pass
+    print("✅ Executável inválido rejeitado")
+
+def test_resposta_lenta_nao_reinicia_chromium_vivo():
+    """
+    Com o processo vivo, garantir() só reinicia depois de
+    falhas_para_reiniciar verificações seguidas sem resposta
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        daemon = _daemon(temp_dir)
+        respostas = [None, None, {'Browser': "Chromium/Falso"}]
+        reinicios = []
+        daemon.verificar_saude = lambda timeout=None: respostas.pop(0) if respostas else None
+        daemon.processo_ativo = lambda: True
+        daemon.parar = lambda: reinicios.append('parar')
+        daemon.iniciar = lambda executavel, headless=False: reinicios.append('iniciar')
+
+        assert daemon.garantir("chromium") == (daemon.endpoint, False)  # Respondeu na 3ª verificação
+        assert reinicios == []
+
+        assert daemon.garantir("chromium") == (daemon.endpoint, True)  # 3 falhas seguidas
+        assert reinicios == ['parar', 'iniciar']
+
+        # Processo morto: não adianta esperar
+        reinicios.clear()
+        respostas[:] = [None, {'Browser': "Chromium/Falso"}]
+        daemon.processo_ativo = lambda: False
+        assert daemon.garantir("chromium") == (daemon.endpoint, True)
+        assert reinicios == ['parar', 'iniciar']
+    print("✅ Resposta lenta não reinicia o Chromium vivo")
+
+if __name__ == "__main__":
+    test_garantir_inicia_reaproveita_e_para()
+    test_parar_nao_mata_processo_alheio()
+    test_executavel_invalido()
+    test_resposta_lenta_nao_reinicia_chromium_vivo()
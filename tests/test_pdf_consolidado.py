@@ -0,0 +1,84 @@
+"""
+Testes do PDF consolidado (uma página por UP, dividido em volumes)
+"""
+import os
+import tempfile
+from PIL import Image
+from cria_pdf import create_pdf_consolidado, get_file_size_mb, _gerar_documento_consolidado
+
+def _paginas(temp_dir, quantidade, croqui_compartilhado):
+    paginas = []
+    for i in range(quantidade):
+        imagem = os.path.join(temp_dir, f"UP{i:04d}_1.jpg")
+        Image.effect_noise((800, 600), 80).convert('RGB').save(imagem, 'JPEG', quality=95)
+        up = f"UP{i:04d}"
+        dados = {campo: 'N/A' for campo in (
+            'UP-C-R', 'Nucleo', 'Data_Ocorrência', 'Idade', 'Quant.Ocorrências',
+            'Ocorrência Predominante', 'Severidade Predominante', 'Area UP',
+            'Area Liquida', 'Incidencia', 'Quantidade de Imagens*', 'Recomendacao'
+        )}
+        dados['UP'] = up
+        paginas.append({'up': up, 'dados': dados, 'imagem': imagem, 'croqui': croqui_compartilhado})
+    return paginas
+
+def test_consolidado_embute_imagem_repetida_uma_vez():
+    """
+    Um croqui compartilhado e o placeholder não aumentam o tamanho a cada página
+    """
+    temp_dir = tempfile.mkdtemp()
+    croqui = os.path.join(temp_dir, "croqui_nucleo.jpg")
+    Image.effect_noise((800, 600), 80).convert('RGB').save(croqui, 'JPEG', quality=95)
+
+    paginas = _paginas(temp_dir, 4, croqui)
+    paginas.append({**paginas[0], 'up': 'SEMIMG', 'imagem': None, 'croqui': None})
+    paginas.append({**paginas[0], 'up': 'SEMIMG2', 'imagem': None, 'croqui': None})
+
+    volumes, sucesso = create_pdf_consolidado(paginas, os.path.join(temp_dir, "Entrega.pdf"))
+    assert sucesso
+    assert len(volumes) == 1
+    caminho, _, ups = volumes[0]
+    assert ups == [p['up'] for p in paginas]
+
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+    # 4 imagens + 1 croqui compartilhado + 1 placeholder
+    assert conteudo.count(b'/Subtype /Image') == 6
+    print("✅ Imagens repetidas embutidas uma única vez")
+
+def test_consolidado_divide_em_volumes():
+    """
+    Com um limite pequeno o documento é dividido em volumes " - Vol NN"
+    """
+    temp_dir = tempfile.mkdtemp()
+    paginas = _paginas(temp_dir, 6, None)
+
+    volumes, sucesso = create_pdf_consolidado(paginas, os.path.join(temp_dir, "Entrega.pdf"), limite_mb=0.2)
+    assert sucesso
+    assert len(volumes) > 1
+    assert [up for _, _, ups in volumes for up in ups] == [p['up'] for p in paginas]
+    for caminho, _, _ in volumes:
+        assert " - Vol " in os.path.basename(caminho)
+        assert get_file_size_mb(caminho) <= 0.2
+    print(f"✅ Documento dividido em {len(volumes)} volumes")
+
+def test_sem_manifesto_volumes_antigos_sao_removidos():
+    """
+    Sem build incremental, os volumes de uma geração anterior saem pelo nome
+    quando o documento passa a caber em um arquivo
+    """
+    temp_dir = tempfile.mkdtemp()
+    pasta = os.path.join(temp_dir, "Entrega")
+    os.makedirs(pasta)
+    paginas = _paginas(temp_dir, 2, None)
+    for nome in ("Entrega - Vol 01.pdf", "Entrega - Vol 02.pdf", "Outra - Vol 01.pdf"):
+        open(os.path.join(pasta, nome), 'wb').close()
+
+    volumes, sucesso, _ = _gerar_documento_consolidado(pasta, paginas)
+    assert sucesso and [os.path.basename(caminho) for caminho, _, _ in volumes] == ["Entrega.pdf"]
+    assert sorted(os.listdir(pasta)) == ["Entrega.pdf", "Outra - Vol 01.pdf"]
+    print("✅ Volumes antigos removidos sem manifesto")
+
+if __name__ == "__main__":
+    test_consolidado_embute_imagem_repetida_uma_vez()
+    test_consolidado_divide_em_volumes()
+    test_sem_manifesto_volumes_antigos_sao_removidos()
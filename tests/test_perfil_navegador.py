@@ -0,0 +1,124 @@
+"""
+Testes do perfil de desempenho do navegador (filtro de requisições)
+"""
+import asyncio
+from types import SimpleNamespace
+from perfil_navegador import (deve_bloquear, FiltroRequisicoes, BloqueioPorCDP, opcoes_contexto,
+                               padroes_bloqueados, aplicar_perfil_desempenho)
+from config import NAVEGADOR_CONFIG
+
+# O bloqueio vem desligado por padrão; os testes ligam
+LIGADO = dict(NAVEGADOR_CONFIG, bloquear_recursos=True)
+
+def test_decisao_do_filtro():
+    """
+    Bloqueia imagens, fontes, analytics e, se ligado, terceiros; libera o
+    portal, o login da Microsoft e qualquer navegação
+    """
+    portal = "https://fenixflorestal.suzanonet.com.br"
+    assert not deve_bloquear(f"{portal}/_next/static/chunks/main.js", "script", LIGADO)
+    assert not deve_bloquear(f"{portal}/api/laudos", "fetch", LIGADO)
+    assert not deve_bloquear("https://aadcdn.msftauth.net/shared/1.0/content/js/ConvergedLogin.js", "script", LIGADO)
+    assert deve_bloquear(f"{portal}/logo.png", "image", LIGADO)
+    assert deve_bloquear(f"{portal}/fonts/inter.woff2", "font", LIGADO)
+    assert deve_bloquear("https://www.googletagmanager.com/gtm.js?id=GTM-X", "script", LIGADO)
+    assert not deve_bloquear("https://cdn.terceiro.com/widget.js", "script", LIGADO)
+    assert deve_bloquear("https://cdn.terceiro.com/widget.js", "script", dict(LIGADO, bloquear_terceiros=True))
+    assert not deve_bloquear("https://adfs.terceiro.com/login", "document", LIGADO)
+    assert not deve_bloquear("data:image/png;base64,AAAA", "image", LIGADO)
+
+    # Filtro desligado: nada é bloqueado
+    assert not NAVEGADOR_CONFIG['bloquear_recursos']
+    assert not deve_bloquear(f"{portal}/logo.png", "image")
+    assert opcoes_contexto(dict(NAVEGADOR_CONFIG, desativar_animacoes=False)) == {}
+    print("✅ Decisões do filtro conferidas")
+
+def test_handler_aborta_e_conta():
+    """
+    O handler de context.route aborta as bloqueadas e continua as demais
+    """
+    chamadas = []
+
+    class RotaFalsa:
+        def __init__(self, url, tipo):
+            self.request = SimpleNamespace(url=url, resource_type=tipo)
+
+        async def abort(self, motivo=None):
+            chamadas.append(('abort', self.request.url))
+
+        async def continue_(self):
+            chamadas.append(('continue', self.request.url))
+
+    filtro = FiltroRequisicoes(LIGADO)
+
+    async def _rodar():
+        await filtro(RotaFalsa("https://fenixflorestal.suzanonet.com.br/", "document"))
+        await filtro(RotaFalsa("https://fenixflorestal.suzanonet.com.br/foto.jpg", "image"))
+
+    asyncio.run(_rodar())
+    assert [acao for acao, _ in chamadas] == ['continue', 'abort']
+    assert filtro.bloqueadas == 1 and filtro.liberadas == 1
+    print("✅ Handler de rotas conferido")
+
+class _SessaoCDP:
+    def __init__(self):
+        self.comandos = {}
+        self.eventos = {}
+
+    def on(self, evento, tratador):
+        self.eventos[evento] = tratador
+
+    async def send(self, metodo, parametros=None):
+        self.comandos[metodo] = parametros
+
+class _Contexto:
+    def __init__(self, navegador):
+        self.browser = SimpleNamespace(browser_type=SimpleNamespace(name=navegador))
+        self.pages = ['aba1']
+        self.sessoes = []
+        self.rotas = []
+        self.ao_abrir = None
+
+    async def new_cdp_session(self, page):
+        self.sessoes.append(_SessaoCDP())
+        return self.sessoes[-1]
+
+    def on(self, evento, tratador):
+        self.ao_abrir = tratador
+
+    async def route(self, padrao, tratador):
+        self.rotas.append(padrao)
+
+    async def add_init_script(self, script):
+        pass
+
+def test_chromium_bloqueia_sem_interceptar():
+    """
+    No Chromium o bloqueio vai pelo CDP em cada aba (sem route, o cache HTTP
+    continua); bloquear_terceiros volta ao route('**/*')
+    """
+    padroes = padroes_bloqueados(LIGADO)
+    assert "*.png" in padroes and "*.woff2?*" in padroes
+    assert "*://*.googletagmanager.com/*" in padroes and not any(".js" in p for p in padroes)
+
+    contexto = _Contexto('chromium')
+    bloqueio = asyncio.run(aplicar_perfil_desempenho(contexto, LIGADO))
+    assert isinstance(bloqueio, BloqueioPorCDP) and contexto.rotas == []
+    assert contexto.sessoes[0].comandos["Network.setBlockedURLs"] == {'urls': padroes}
+    asyncio.run(contexto.ao_abrir('aba2'))  # Aba nova recebe o mesmo bloqueio
+    assert len(contexto.sessoes) == 2
+    contexto.sessoes[1].eventos["Network.loadingFailed"]({'blockedReason': 'inspector'})
+    contexto.sessoes[1].eventos["Network.loadingFailed"]({'errorText': 'net::ERR_ABORTED'})
+    assert bloqueio.bloqueadas == 1
+
+    contexto = _Contexto('chromium')
+    filtro = asyncio.run(aplicar_perfil_desempenho(contexto, dict(LIGADO, bloquear_terceiros=True)))
+    assert isinstance(filtro, FiltroRequisicoes) and contexto.rotas == ["**/*"]
+    contexto = _Contexto('firefox')
+    assert isinstance(asyncio.run(aplicar_perfil_desempenho(contexto, LIGADO)), FiltroRequisicoes)
+    print("✅ Bloqueio pelo CDP no Chromium")
+
+if __name__ == "__main__":
+    test_decisao_do_filtro()
+    test_handler_aborta_e_conta()
+    test_chromium_bloqueia_sem_interceptar()
@@ -0,0 +1,78 @@
+"""
+Testes do pipeline em estágios da geração de PDFs
+"""
+import time
+import threading
+from pipeline_pdf import executar_pipeline, obter_pool_imagens
+
+def _dobrar(trabalho):
+    return trabalho['valor'] * 2
+
+def test_pipeline_com_erros_na_busca():
+    """
+    Todos os trabalhos chegam à renderização, com o erro da busca quando houver
+    """
+    em_andamento = [0]
+    maximo = [0]
+    lock = threading.Lock()
+
+    def buscar(trabalho):
+        with lock:
+            em_andamento[0] += 1
+            maximo[0] = max(maximo[0], em_andamento[0])
+        time.sleep(0.005)
+        if trabalho['valor'] == 3:
+            raise IOError("arquivo indisponível")
+        return trabalho
+
+    renderizados = {}
+
+    def renderizar(trabalho, resultado, erro):
+        with lock:
+            em_andamento[0] -= 1
+        renderizados[trabalho['valor']] = erro if erro is not None else resultado
+
+    resumo = executar_pipeline(({'valor': i} for i in range(20)), buscar, _dobrar, renderizar,
+                               threads_busca=3, processos=2, capacidade_fila=2, usar_processos=False)
+
+    assert sorted(renderizados) == list(range(20))
+    assert isinstance(renderizados[3], IOError)
+    assert renderizados[5] == 10
+    assert resumo['busca']['erros'] == 1 and resumo['renderizacao']['concluidos'] == 20
+    # Filas limitadas: busca + fila + vagas do pool + renderização
+    assert maximo[0] <= 3 + 2 + 2 + 1
+    print("✅ Pipeline com threads concluído")
+
+def test_pipeline_com_pool_de_processos():
+    """
+    O estágio de imagens roda em processos e o progresso é reportado por item
+    """
+    progresso = []
+    resultados = []
+    executar_pipeline([{'valor': i} for i in range(6)], lambda t: t, _dobrar,
+                      lambda t, r, e: resultados.append(r),
+                      ao_progredir=lambda resumo: progresso.append(resumo['renderizacao']['concluidos']),
+                      processos=2)
+
+    assert sorted(resultados) == [0, 2, 4, 6, 8, 10]
+    assert progresso == [1, 2, 3, 4, 5, 6]
+    print("✅ Pipeline com processos concluído")
+
+def test_pool_de_processos_reaproveitado_entre_geracoes():
+    """
+    Sem executor informado, as gerações usam o mesmo pool do módulo, que
+    continua aberto depois de cada uma
+    """
+    pool = obter_pool_imagens()
+    for _ in range(2):
+        resultados = []
+        executar_pipeline([{'valor': 1}], lambda t: t, _dobrar, lambda t, r, e: resultados.append(r))
+        assert resultados == [2]
+    assert obter_pool_imagens() is pool
+    assert pool.submit(_dobrar, {'valor': 4}).result() == 8
+    print("✅ Pool de processos reaproveitado")
+
+if __name__ == "__main__":
+    test_pipeline_com_erros_na_busca()
+    test_pipeline_com_pool_de_processos()
+    test_pool_de_processos_reaproveitado_entre_geracoes()
@@ -0,0 +1,176 @@
+"""
+Testes do portal Fênix simulado e das medições do benchmark (sem navegador)
+"""
+import json
+import urllib.error
+import urllib.request
+from http.cookiejar import CookieJar
+from urllib.parse import urlencode
+from portal_simulado import PortalSimulado, COOKIE_SESSAO
+import benchmark_fenix
+from benchmark_fenix import ColetorTempos, gerar_plano, resumir, comparar, completo, formatar_relatorio
+
+SEM_LATENCIA = {'latencia_pagina_s': 0, 'email': "teste@fenix.local", 'senha': "segredo"}
+
+def _navegador():
+    cookies = CookieJar()
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies)), cookies
+
+def _abrir(abridor, url, dados=None):
+    """GET (ou POST com dados), seguindo os redirecionamentos; devolve (status, url final, html)"""
+    corpo = urlencode(dados).encode() if dados is not None else None
+    try:
+        with abridor.open(url, corpo, timeout=10) as resposta:
+            return resposta.status, resposta.url, resposta.read().decode('utf-8')
+    except urllib.error.HTTPError as e:
+        return e.code, e.url, e.read().decode('utf-8')
+
+def _entrar(portal, abridor, senha="segredo"):
+    return _abrir(abridor, portal.url + "login/senha", {'loginfmt': "teste@fenix.local", 'passwd': senha})
+
+def test_login_recusa_senha_e_abre_sessao():
+    """
+    Senha errada mostra #passwordError; a certa passa por "manter conectado" e cria a sessão
+    """
+    with PortalSimulado(config=SEM_LATENCIA) as portal:
+        abridor, cookies = _navegador()
+        _, _, pagina = _abrir(abridor, portal.url + "laudos/upload")
+        assert 'id="__next"' in pagina and "Submissão de Laudos" not in pagina  # Sem sessão: tela inicial
+
+        _, _, pagina = _entrar(portal, abridor, senha="errada")
+        assert 'id="passwordError"' in pagina and portal.contadores['logins_recusados'] == 1
+
+        _, url, pagina = _entrar(portal, abridor)
+        assert url.endswith("/login/manter") and 'id="KmsiCheckboxField"' in pagina
+        _, url, pagina = _abrir(abridor, portal.url + "login/manter", {})
+        assert url == portal.url and "Submissão de Laudos" in pagina and "Dashboard" in pagina
+        assert any(cookie.name == COOKIE_SESSAO for cookie in cookies)
+    print("✅ Login simulado")
+
+def test_upload_tem_a_estrutura_procurada_pela_automacao():
+    """
+    A página de upload traz os pontos de apoio dos seletores da automação
+    """
+    with PortalSimulado(config=SEM_LATENCIA) as portal:
+        abridor, _ = _navegador()
+        _entrar(portal, abridor)
+        _abrir(abridor, portal.url + "login/manter", {})
+        status, _, pagina = _abrir(abridor, portal.url + "laudos/upload")
+
+    assert status == 200
+    for trecho in ('Upload de Laudos', 'placeholder="Data da visita de campo"', 'css-1ek14t9-control',
+                   'aria-label="Adicionar linha da Matriz de decisão"', 'UP avaliada:', 'Tipo Dano:',
+                   'Recomendaçao:', 'lg:flex-row', 'Nenhum resultado', 'singleValue', '>Enviar<',
+                   'aria-label="Remover linha"'):
+        assert trecho in pagina, trecho
+    print("✅ Estrutura do Upload de Laudos")
+
+def test_falha_injetada_e_laudo_confirmado():
+    """
+    falha_pagina=1 devolve 503 no upload; o POST de confirmação registra o laudo
+    """
+    with PortalSimulado(ups=['BA0001'], config=dict(SEM_LATENCIA, falha_pagina=1, semente=1)) as portal:
+        abridor, _ = _navegador()
+        _entrar(portal, abridor)
+        _abrir(abridor, portal.url + "login/manter", {})
+        status, _, _ = _abrir(abridor, portal.url + "laudos/upload")
+        assert status == 503 and portal.contadores['falhas_pagina'] == 1
+
+        laudo = {'unf': 'BA', 'linhas': [{'up': 'BA0001', 'recomendacao': 'Reavaliar'}]}
+        _, url, _ = _abrir(abridor, portal.url + "laudos/confirmar", {'laudo': json.dumps(laudo)})
+        assert url == portal.url
+        assert portal.ups_confirmadas() == ['BA0001'] and 'recebido_em' in portal.laudos_recebidos[0]
+    print("✅ Falha injetada e laudo confirmado")
+
+def test_coletor_e_resumo_dos_tempos():
+    """
+    UPs e laudos são cronometrados pelos eventos; UP abandonada por prazo conta só como falha
+    """
+    agora = [0.0]
+    coletor = ColetorTempos(relogio=lambda: agora[0])
+    for momento, evento, dados in [
+        (0, 'grupo_iniciado', {'grupo': 'BA2'}), (1, 'up_iniciada', {'up': 'BA0001'}),
+        (4, 'up_concluida', {'up': 'BA0001'}), (4, 'up_iniciada', {'up': 'BA0002'}),
+        (9, 'up_concluida', {'up': 'BA0002'}), (9, 'up_falhou', {'up': 'BA0003'}),
+        (9, 'etapa', {'etapa': 'processar_up', 'duracao_s': 3.0}),
+        (10, 'log', {'nivel': 'info', 'mensagem': "📤 Enviando laudo..."}),
+        (11, 'log', {'nivel': 'error', 'mensagem': "❌ Laudo recusado: preencha severidade"}),
+        (12, 'grupo_concluido', {'grupo': 'BA2', 'sucesso': True}),
+    ]:
+        agora[0] = momento
+        coletor(evento, dados)
+
+    assert coletor.ups == [3, 5] and coletor.laudos == [12] and coletor.ups_falhas == ['BA0003']
+    assert coletor.etapas == {'processar_up': [3.0]}
+    assert coletor.erros == ["❌ Laudo recusado: preencha severidade"]
+    assert resumir(coletor.ups) == {'n': 2, 'media_s': 4, 'mediana_s': 4, 'p95_s': 5, 'min_s': 3, 'max_s': 5}
+    assert resumir([]) == {'n': 0}
+    print("✅ Tempos coletados")
+
+def test_plano_repetivel_e_comparacao():
+    """
+    O plano depende só da semente; a comparação aponta as métricas que pioraram
+    """
+    df_ups, grupos, catalogo = gerar_plano(2, 3, ups_inexistentes=1, semente=5)
+    assert grupos == ['BA2', 'BA3'] and len(df_ups) == 6 and len(catalogo) == 5
+    assert set(df_ups['UNF']) == {'BA'} and set(df_ups['Laudo Existente']) == {'NÃO'}
+    assert gerar_plano(2, 3, ups_inexistentes=1, semente=5)[2] == catalogo
+    try:
+        gerar_plano(100, 1)
+        assert False, "há menos núcleos que laudos"
+    except ValueError:
+        pass
+
+    referencia = {'por_up': {'media_s': 10.0, 'p95_s': 12.0}, 'vazao': {'s_por_up': 11.0}}
+    resultado = {'por_up': {'media_s': 10.5, 'p95_s': 15.0}, 'vazao': {'s_por_up': 8.0}}
+    regressoes = comparar(resultado, referencia, tolerancia=0.1)
+    assert len(regressoes) == 1 and regressoes[0].startswith("por_up.p95_s")
+
+    portal = {'laudos_confirmados': 2, 'laudos_esperados': 2, 'ups_faltando': [], 'ups_duplicadas': []}
+    assert completo({'portal': portal})
+    assert not completo({'portal': dict(portal, ups_faltando=['BA20001'])})
+    print("✅ Plano e comparação")
+
+def _resultado(ups_faltando, s_por_up):
+    return {
+        'parametros': {}, 'duracao_s': 10.0, 'vazao': {'s_por_laudo': 10.0, 's_por_up': s_por_up},
+        'por_up': {'n': 0}, 'por_laudo': {'n': 0}, 'etapas': {},
+        'portal': {'laudos_confirmados': 1, 'laudos_esperados': 1, 'ups_confirmadas': 2, 'ups_esperadas': 2,
+                   'ups_faltando': ups_faltando, 'ups_duplicadas': []},
+        'automacao': {'erros': ["❌ Erro na UP BA20001: timeout"] if ups_faltando else []},
+    }
+
+def test_execucao_incompleta_nao_e_comparada(tmp_path=None):
+    """
+    Os erros logados saem no relatório; sem todas as UPs no portal a
+    referência não é comparada (a execução falha por estar incompleta)
+    """
+    import tempfile
+    pasta = tmp_path or tempfile.mkdtemp()
+    referencia = f"{pasta}/referencia.json"
+    with open(referencia, 'w', encoding='utf-8') as f:
+        json.dump(_resultado([], 1.0), f)
+
+    relatorio = formatar_relatorio(_resultado(['BA20001'], 0.5))
+    assert "Erros da automação (1)" in relatorio and "BA20001: timeout" in relatorio
+
+    executar_original = benchmark_fenix.executar_benchmark
+    try:
+        for faltando, s_por_up, codigo, regressoes in ((['BA20001'], 0.5, 1, None), ([], 5.0, 1, 1), ([], 1.0, 0, 0)):
+            benchmark_fenix.executar_benchmark = lambda *args, **kwargs: _resultado(faltando, s_por_up)
+            saida = f"{pasta}/resultado.json"
+            assert benchmark_fenix.main(["--referencia", referencia, "--resultado", saida]) == codigo
+            with open(saida, 'r', encoding='utf-8') as f:
+                salvo = json.load(f)
+            assert (len(salvo['regressoes']) if 'regressoes' in salvo else None) == regressoes
+    finally:
+        benchmark_fenix.executar_benchmark = executar_original
+    print("✅ Execução incompleta fora da comparação")
+
+if __name__ == "__main__":
+    test_login_recusa_senha_e_abre_sessao()
+    test_upload_tem_a_estrutura_procurada_pela_automacao()
+    test_falha_injetada_e_laudo_confirmado()
+    test_coletor_e_resumo_dos_tempos()
+    test_plano_repetivel_e_comparacao()
+    test_execucao_incompleta_nao_e_comparada()
@@ -0,0 +1,215 @@
+"""
+Testes dos prazos (orçamento de tempo) de laudos e UPs, sem navegador real
+"""
+import ast
+import time
+import asyncio
+import pandas as pd
+import lancamento_fenix
+from config import AUTOMATION_CONFIG
+from interface_console import InterfaceConsole
+from lancamento_fenix import FenixAutomation, PrazoEsgotado
+
+class _PaginaLenta:
+    """Cada seletor demora o timeout inteiro e não aparece (como um fallback quebrado)"""
+
+    def __init__(self):
+        self.timeouts = []
+        self.keyboard = self
+
+    async def wait_for_selector(self, seletor, timeout=None):
+        self.timeouts.append(timeout)
+        await asyncio.sleep(timeout / 1000)
+        raise TimeoutError(f"Timeout {timeout}ms exceeded")
+
+    async def press(self, tecla):
+        pass
+
+def _automacao():
+    automacao = FenixAutomation(headless=True, manter_navegador=False, ao_evento=lambda evento, dados: None)
+    automacao.page = _PaginaLenta()
+    return automacao
+
+def test_esperas_limitadas_ao_prazo():
+    """
+    O timeout das esperas sai do prazo mais próximo; sem tempo, a espera
+    falha na hora e o prazo fica marcado como estourado
+    """
+    automacao = _automacao()
+
+    async def _cenario():
+        with automacao.orcamento(10):
+            with automacao.orcamento(0.2) as prazo_up:
+                try:
+                    await automacao.page.wait_for_selector("#a", timeout=3000)
+                except TimeoutError:
+                    pass
+                inicio = time.monotonic()
+                for _ in range(3):
+                    try:
+                        await automacao.page.wait_for_selector("#b", timeout=3000)
+                    except PrazoEsgotado:
+                        pass
+                assert time.monotonic() - inicio < 0.05
+            assert prazo_up.estourado
+            assert automacao.prazo_restante() > 9
+        assert automacao.prazo_restante() is None
+
+    asyncio.run(_cenario())
+    assert len(automacao.page.timeouts) == 1 and automacao.page.timeouts[0] <= 200
+    print("✅ Esperas limitadas ao prazo")
+
+def test_up_abandonada_por_prazo():
+    """
+    A UP que estoura o prazo é abandonada e registrada; a próxima UP usa a
+    mesma linha da matriz
+    """
+    automacao = _automacao()
+    linhas = []
+    limpezas = []
+
+    async def _processar_up(up_data, up_index=0):
+        linhas.append((up_data['UP'], up_index))
+        if up_data['UP'] == 'BA0001':
+            for _ in range(20):  # Fallbacks que engolem as falhas
+                try:
+                    await automacao.page.wait_for_selector("#fallback", timeout=3000)
+                except Exception:
+                    continue
+        automacao.stats['ups_processadas'] += 1
+        return True
+
+    async def _limpar(up_index):
+        limpezas.append(up_index)
+
+    automacao.processar_up = _processar_up
+    automacao.limpar_campo_up_avaliada = _limpar
+    eventos = []
+    automacao.ao_evento = lambda evento, dados: eventos.append((evento, dados.get('up')))
+
+    df = pd.DataFrame([
+        {'UP': up, 'Incidencia': 0.5, 'Severidade Predominante': 'ALTO', 'Idade': 5, 'Ocorrência Predominante': 'VENDAVAL'}
+        for up in ('BA0001', 'BA0002')
+    ])
+    anterior = AUTOMATION_CONFIG['prazo_up_s']
+    AUTOMATION_CONFIG['prazo_up_s'] = 0.2
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        inicio = time.monotonic()
+        assert asyncio.run(automacao.processar_ups_nucleo(df))
+        assert time.monotonic() - inicio < 2
+    finally:
+        AUTOMATION_CONFIG['prazo_up_s'] = anterior
+        lancamento_fenix.usar_interface_na_thread(None)
+
+    assert linhas == [('BA0001', 0), ('BA0002', 0)] and limpezas == [0]
+    assert automacao.stats['ups_com_sucesso'] == ['BA0002']
+    assert automacao.stats['ups_processadas'] == 1 and automacao.stats['ups_com_erro'] == 1
+    assert ('up_prazo_esgotado', 'BA0001') in eventos and ('up_falhou', 'BA0001') in eventos
+    print("✅ UP abandonada por prazo")
+
+def test_acao_sem_timeout_nao_passa_do_prazo_da_up():
+    """
+    Ações em ElementHandle usam o timeout padrão do Playwright (30s); a UP
+    inteira é cortada no prazo e abandonada
+    """
+    automacao = _automacao()
+    limpezas = []
+
+    async def _processar_up(up_data, up_index=0):
+        await asyncio.sleep(30)  # ex.: elemento.click() sem timeout próprio
+        return True
+
+    async def _limpar(up_index):
+        limpezas.append(up_index)
+
+    automacao.processar_up = _processar_up
+    automacao.limpar_campo_up_avaliada = _limpar
+    anterior = AUTOMATION_CONFIG['prazo_up_s']
+    AUTOMATION_CONFIG['prazo_up_s'] = 0.2
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        inicio = time.monotonic()
+        assert not asyncio.run(automacao.lancar_up_com_prazo({'UP': 'BA0001'}, 0))
+        assert time.monotonic() - inicio < 2
+    finally:
+        AUTOMATION_CONFIG['prazo_up_s'] = anterior
+        lancamento_fenix.usar_interface_na_thread(None)
+
+    assert limpezas == [0] and automacao.stats['ups_com_erro'] == 1
+    print("✅ Ação sem timeout cortada no prazo da UP")
+
+def test_up_com_excecoes_tratadas_e_cortada_no_prazo():
+    """
+    As etapas da UP tratam as próprias falhas com 'except Exception', que
+    deixa passar o cancelamento do prazo; um 'except:' o engoliria
+    """
+    automacao = _automacao()
+    passos = []
+
+    async def _processar_up(up_data, up_index=0):
+        for passo in range(10):
+            try:
+                await asyncio.sleep(0.5)  # ex.: clique que falha e é tolerado
+            except Exception:
+                pass
+            passos.append(passo)
+        return True
+
+    async def _limpar(up_index):
+        pass
+
+    automacao.processar_up = _processar_up
+    automacao.limpar_campo_up_avaliada = _limpar
+    anterior = AUTOMATION_CONFIG['prazo_up_s']
+    AUTOMATION_CONFIG['prazo_up_s'] = 0.2
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        inicio = time.monotonic()
+        assert not asyncio.run(automacao.lancar_up_com_prazo({'UP': 'BA0001'}, 0))
+        assert time.monotonic() - inicio < 1 and passos == []
+    finally:
+        AUTOMATION_CONFIG['prazo_up_s'] = anterior
+        lancamento_fenix.usar_interface_na_thread(None)
+
+    # Nenhum 'except:' na automação: todos deixam o cancelamento passar
+    arvore = ast.parse(open(lancamento_fenix.__file__, encoding='utf-8').read())
+    sem_tipo = [no.lineno for no in ast.walk(arvore) if isinstance(no, ast.ExceptHandler) and no.type is None]
+    assert sem_tipo == [], sem_tipo
+    print("✅ UP cortada no prazo apesar das exceções tratadas")
+
+def test_pagina_travada_espera_a_acao_sair():
+    """
+    Com a página travada, esperar_pagina só levanta PrazoEsgotado depois de
+    a ação cancelada terminar (ela não segue clicando em outra página)
+    """
+    automacao = _automacao()
+    eventos = []
+
+    async def _acao():
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            await asyncio.sleep(0.05)  # Limpeza da ação antes de sair
+            eventos.append('acao_saiu')
+            raise
+
+    async def _rodar():
+        automacao._pagina_travada = asyncio.Event()
+        asyncio.get_running_loop().call_later(0.05, automacao.interromper_esperas)
+        try:
+            with automacao.orcamento(10):
+                await automacao.esperar_pagina(_acao())
+        except PrazoEsgotado:
+            eventos.append('prazo_esgotado')
+
+    asyncio.run(_rodar())
+    assert eventos == ['acao_saiu', 'prazo_esgotado']
+    print("✅ Ação interrompida aguardada antes do prazo esgotado")
+
+if __name__ == "__main__":
+    test_esperas_limitadas_ao_prazo()
+    test_up_abandonada_por_prazo()
+    test_acao_sem_timeout_nao_passa_do_prazo_da_up()
+    test_up_com_excecoes_tratadas_e_cortada_no_prazo()
+    test_pagina_travada_espera_a_acao_sair()
@@ -0,0 +1,92 @@
+"""
+Testes do preenchimento em lote de inputs e textareas, sem navegador real
+"""
+import asyncio
+import lancamento_fenix
+from interface_console import InterfaceConsole
+from lancamento_fenix import FenixAutomation, SCRIPT_PREENCHER_CAMPOS, SCRIPT_LER_CAMPOS, TEXTOS_PADRAO
+from conftest import PaginaFalsa
+
+class _Campo:
+    def __init__(self, pagina, seletor):
+        self.pagina = pagina
+        self.seletor = seletor
+
+    async def fill(self, valor):
+        self.pagina.valores[self.seletor] = valor
+        self.pagina.fills.append(self.seletor)
+
+class _Pagina(PaginaFalsa):
+    """
+    Formulário falso: evaluate executa os scripts sobre um dicionário de
+    campos; campos em 'reformata' mudam o valor (como um seletor de data)
+    """
+
+    def __init__(self, seletores, reformata=()):
+        super().__init__()
+        self.valores = {seletor: "" for seletor in seletores}
+        self.reformata = set(reformata)
+        self.avaliacoes = 0
+        self.fills = []
+
+    async def evaluate(self, script, argumento):
+        self.avaliacoes += 1
+        if script == SCRIPT_PREENCHER_CAMPOS:
+            usados = []
+            for campo in argumento:
+                seletor = next((s for s in campo['seletores'] if s in self.valores), None)
+                if seletor is not None:
+                    self.valores[seletor] = campo['valor'][:5] if seletor in self.reformata else campo['valor']
+                usados.append(seletor)
+            return usados
+        assert script == SCRIPT_LER_CAMPOS
+        return [self.valores.get(seletor) if seletor else None for seletor in argumento]
+
+    async def wait_for_selector(self, seletor, timeout=None):
+        if seletor not in self.valores:
+            raise TimeoutError(f"Timeout {timeout}ms exceeded")
+        return _Campo(self, seletor)
+
+def _executar(corrotina):
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        return asyncio.run(corrotina)
+    finally:
+        lancamento_fenix.usar_interface_na_thread(None)
+
+def test_textos_em_um_unico_script():
+    """
+    Os quatro textos entram em um evaluate e são conferidos em outro, sem fill nem pausas
+    """
+    seletores = ['textarea[name="objetivo"]', 'textarea[name="diagnostico"]',
+                 'textarea[name="licoesAprendidas"]', 'textarea[name="consideracoesFinais"]']
+    pagina = _Pagina(seletores)
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.page = pagina
+
+    assert _executar(automacao.preencher_campos_texto("BA2"))
+    assert pagina.avaliacoes == 2 and pagina.fills == []
+    assert pagina.valores['textarea[name="objetivo"]'] == TEXTOS_PADRAO['objetivo_nucleo'].format(nome="BA2")
+    assert pagina.valores['textarea[name="diagnostico"]'] == TEXTOS_PADRAO['diagnostico']
+    print("✅ Textos preenchidos em um único script")
+
+def test_campo_nao_confirmado_vai_campo_a_campo():
+    """
+    Campo ausente ou com valor diferente na leitura é preenchido com fill()
+    """
+    pagina = _Pagina(['#solicitante', '#data'], reformata=['#data'])
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.page = pagina
+    campos = [("Solicitante", "Geocat", ['#solicitante']),
+              ("Data de Visita", "19/10/2026", ['#data']),
+              ("Ausente", "x", ['#nao-existe'])]
+
+    pendentes = _executar(automacao.preencher_campos_em_lote(campos))
+    assert [nome for nome, _, _ in pendentes] == ["Data de Visita", "Ausente"]
+    assert _executar(automacao.preencher_campo(['#data'], "19/10/2026"))
+    assert pagina.valores == {'#solicitante': "Geocat", '#data': "19/10/2026"}
+    print("✅ Campo não confirmado vai campo a campo")
+
+if __name__ == "__main__":
+    test_textos_em_um_unico_script()
+    test_campo_nao_confirmado_vai_campo_a_campo()
@@ -0,0 +1,88 @@
+"""
+Testes da reciclagem do contexto do navegador entre laudos, sem navegador real
+"""
+import asyncio
+import pandas as pd
+import lancamento_fenix
+from config import RECICLAGEM_CONFIG
+from interface_console import InterfaceConsole
+from lancamento_fenix import FenixAutomation
+from conftest import PaginaFalsa, ContextoFalso, NavegadorFalso
+
+def _automacao():
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.browser = NavegadorFalso()
+    automacao.context = ContextoFalso()
+    automacao.page = PaginaFalsa()
+    logins = []
+
+    async def _navegar():
+        return True
+
+    async def _login():
+        logins.append(automacao.context)
+        return True
+
+    automacao.navegar_para_fenix = _navegar
+    automacao.aguardar_login = _login
+    return automacao, logins
+
+def test_recicla_a_cada_n_laudos_sem_novo_login():
+    """
+    Depois de a_cada_laudos laudos o contexto é trocado por um novo com o
+    storage_state do antigo, antes do próximo laudo
+    """
+    automacao, logins = _automacao()
+    contexto_antigo = automacao.context
+    grupos = []
+
+    async def _nucleo(nucleo, ups_nucleo):
+        grupos.append((nucleo, automacao.context))
+        return True
+
+    automacao.processar_nucleo_completo = _nucleo
+    df = pd.DataFrame([{'UP': f"BA{i}", 'Nucleo': f"BA{i}"} for i in range(5)])
+    anterior = dict(RECICLAGEM_CONFIG)
+    RECICLAGEM_CONFIG.update({'reciclar': True, 'a_cada_laudos': 2, 'a_cada_s': 0, 'memoria_mb': 0})
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        async def _cenario():
+            for nucleo in df['Nucleo']:
+                await automacao.reciclar_se_preciso()
+                await automacao.processar_nucleo_completo(nucleo, df[df['Nucleo'] == nucleo])
+                automacao.uso_contexto['laudos'] += 1
+        asyncio.run(_cenario())
+    finally:
+        RECICLAGEM_CONFIG.clear()
+        RECICLAGEM_CONFIG.update(anterior)
+        lancamento_fenix.usar_interface_na_thread(None)
+
+    contextos = [contexto for _, contexto in grupos]
+    assert contextos[0] is contextos[1] is contexto_antigo
+    assert contextos[2] is contextos[3] is automacao.browser.contextos[0]
+    assert contextos[4] is automacao.browser.contextos[1]
+    assert contexto_antigo.fechado and automacao.browser.contextos[0].fechado
+    assert automacao.browser.contextos[0].estado['cookies'][0]['value'] == 'login-do-usuario'
+    assert automacao.reciclagens == 2 and len(logins) == 2
+    print("✅ Contexto reciclado a cada N laudos")
+
+def test_recicla_por_memoria():
+    """
+    Página com heap JS acima de memoria_mb é reciclada; abaixo, não
+    """
+    automacao, _ = _automacao()
+    automacao.uso_contexto['laudos'] = 1
+    anterior = dict(RECICLAGEM_CONFIG)
+    RECICLAGEM_CONFIG.update({'reciclar': True, 'a_cada_laudos': 0, 'a_cada_s': 0, 'memoria_mb': 500})
+    try:
+        assert asyncio.run(automacao.motivo_reciclagem()) is None
+        automacao.page = PaginaFalsa(memoria_mb=900)
+        assert "900 MB" in asyncio.run(automacao.motivo_reciclagem())
+    finally:
+        RECICLAGEM_CONFIG.clear()
+        RECICLAGEM_CONFIG.update(anterior)
+    print("✅ Reciclagem por memória")
+
+if __name__ == "__main__":
+    test_recicla_a_cada_n_laudos_sem_novo_login()
+    test_recicla_por_memoria()
@@ -0,0 +1,90 @@
+"""
+Testes da recuperação do laudo em página nova a partir do diário, sem navegador real
+"""
+import asyncio
+import pandas as pd
+import lancamento_fenix
+from interface_console import InterfaceConsole
+from lancamento_fenix import FenixAutomation
+from conftest import PaginaFalsa, ContextoFalso
+
+def _ups():
+    return pd.DataFrame([
+        {'UP': f"BA000{i}", 'Nucleo': 'BA2', 'Incidencia': 0.5, 'Severidade Predominante': 'ALTO',
+         'Idade': 5, 'Ocorrência Predominante': 'VENDAVAL'}
+        for i in range(1, 6)
+    ])
+
+def test_laudo_recuperado_continua_da_linha_que_falhou():
+    """
+    A página trava na 4ª UP: o laudo é refeito em uma página nova (cabeçalho,
+    textos e as 3 linhas confirmadas) e continua da 4ª linha
+    """
+    automacao = FenixAutomation(headless=True, manter_navegador=False)
+    automacao.context = ContextoFalso()
+    pagina1 = PaginaFalsa("pagina1")
+    automacao.page = pagina1
+    passos = []
+    eventos = []
+    reposicoes = []
+    lotes = []
+    automacao.ao_evento = lambda evento, dados: eventos.append(evento)
+
+    async def _passo(nome):
+        passos.append((nome, automacao.page.nome))
+        return True
+
+    async def _processar_up(up_data, up_index=0, reposicao=False):
+        passos.append((up_data['UP'], up_index, automacao.page.nome))
+        if reposicao:
+            reposicoes.append(up_data['UP'])
+            return True
+        if up_data['UP'] == 'BA0004' and automacao.page.nome == 'pagina1':
+            pagina1.caiu = True
+            return False
+        automacao.stats['ups_processadas'] += 1
+        return True
+
+    async def _lote(campos):
+        lotes.append([(valor, seletores[0]) for _, valor, seletores in campos])
+        return []
+
+    automacao.navegar_para_upload = lambda: _passo('navegar')
+    automacao.preencher_informacoes_basicas = lambda nucleo, ups_nucleo: _passo('cabecalho')
+    automacao.preencher_campos_texto = lambda nucleo, tipo_organizacao: _passo('textos')
+    automacao.adicionar_linha_matriz = lambda: _passo('adicionar_linha')
+    automacao.processar_up = _processar_up
+    automacao.preencher_campos_em_lote = _lote
+
+    async def _cenario():
+        with automacao.orcamento(600) as prazo_laudo:
+            limite = prazo_laudo.limite
+            assert await automacao.preparar_laudo('BA2', _ups())
+            resultado = await automacao.processar_ups_nucleo(_ups())
+            # A recuperação não empurra o prazo do laudo
+            assert prazo_laudo.limite == limite
+            return resultado
+
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        assert asyncio.run(_cenario())
+    finally:
+        lancamento_fenix.usar_interface_na_thread(None)
+
+    inicio_recuperacao = passos.index(('navegar', 'pagina2'))
+    assert [passo for passo in passos[inicio_recuperacao:] if len(passo) == 3] == [
+        ('BA0001', 0, 'pagina2'), ('BA0002', 1, 'pagina2'), ('BA0003', 2, 'pagina2'),
+        ('BA0004', 3, 'pagina2'), ('BA0005', 4, 'pagina2'),
+    ]
+    # As linhas já confirmadas voltam sem contar de novo e com a Recomendação (%) em um só lote
+    assert reposicoes == ['BA0001', 'BA0002', 'BA0003']
+    assert lotes == [[('50.00', automacao.seletores_recomendacao_pct(linha)[0]) for linha in range(3)]]
+    assert automacao.stats['ups_com_sucesso'] == ['BA0001', 'BA0002', 'BA0003', 'BA0004', 'BA0005']
+    assert automacao.stats['ups_processadas'] == 5 and automacao.stats['ups_com_erro'] == 0
+    assert pagina1.fechada and automacao.page.nome == 'pagina2'
+    assert automacao.diario.recuperacoes == 1 and len(automacao.diario.linhas) == 5
+    assert eventos.count('laudo_recuperado') == 1 and 'up_falhou' not in eventos
+    print("✅ Laudo recuperado a partir do diário")
+
+if __name__ == "__main__":
+    test_laudo_recuperado_continua_da_linha_que_falhou()
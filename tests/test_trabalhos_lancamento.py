@@ -0,0 +1,112 @@
+"""
+Testes dos lançamentos em segundo plano (fila de trabalhos, sem navegador real)
+"""
+import time
+import threading
+import pandas as pd
+import lancamento_fenix
+from interface_console import InterfacePorThread
+from trabalhos_lancamento import FilaTrabalhos, TrabalhoLancamento
+from conftest import com_automacao_falsa
+
+def _ups():
+    return pd.DataFrame([
+        {'UP': f"BA000{i}", 'Nucleo': 'BA2'} for i in range(1, 4)
+    ])
+
+liberar_primeira_up = threading.Event()
+
+async def _up_liberada(automacao, up):
+    while not liberar_primeira_up.is_set():
+        await automacao.pausa(0.01)
+    return True
+
+def _com_automacao_falsa(teste):
+    def _executar():
+        with com_automacao_falsa(_up_liberada):
+            teste()
+    return _executar
+
+def _esperar(condicao, timeout=5):
+    limite = time.time() + timeout
+    while not condicao() and time.time() < limite:
+        time.sleep(0.02)
+    return condicao()
+
+@_com_automacao_falsa
+def test_trabalho_concluido_com_situacao():
+    """
+    O trabalho roda em segundo plano e a situação acompanha UPs e mensagens;
+    a interface do app (fora da thread do trabalho) não é trocada
+    """
+    anterior = lancamento_fenix.st
+    liberar_primeira_up.set()
+    fila = FilaTrabalhos()
+    id_trabalho = fila.enviar(TrabalhoLancamento(_ups(), ['BA2'], email="a@suzano.com.br", senha="x", headless=True))
+    assert fila.aguardar(timeout=10)
+
+    situacao = fila.obter(id_trabalho).situacao()
+    assert situacao['estado'] == 'concluido', situacao
+    assert situacao['ups_concluidas'] == 3 and situacao['progresso'] == 1.0
+    assert situacao['resumo']['ups_com_sucesso'] == ['BA0001', 'BA0002', 'BA0003']
+    assert any("Processando UP BA0003" in linha for linha in situacao['log'])
+    assert fila.obter(id_trabalho).senha is None
+
+    # A interface do módulo continua a mesma para as outras threads
+    assert isinstance(lancamento_fenix.st, InterfacePorThread)
+    assert anterior in (lancamento_fenix.st, lancamento_fenix.st._padrao)
+    print("✅ Trabalho concluído em segundo plano")
+
+@_com_automacao_falsa
+def test_pausar_retomar_e_cancelar():
+    """
+    Pausa entre UPs, retoma e cancela; trabalhos na fila são cancelados sem rodar
+    """
+    liberar_primeira_up.clear()
+    fila = FilaTrabalhos()
+    primeiro = TrabalhoLancamento(_ups(), ['BA2'], email="a@suzano.com.br", senha="x", headless=True)
+    segundo = TrabalhoLancamento(_ups(), ['BA2'], email="a@suzano.com.br", senha="x", headless=True)
+    fila.enviar(primeiro)
+    fila.enviar(segundo)
+
+    assert _esperar(lambda: primeiro.situacao()['up_atual'] == 'BA0001')
+    fila.cancelar(segundo.id)
+    assert segundo.estado == 'cancelado'
+
+    fila.pausar(primeiro.id)
+    liberar_primeira_up.set()
+    assert _esperar(lambda: primeiro.ups_concluidas == 1)
+    time.sleep(0.3)
+    assert primeiro.ups_concluidas == 1 and primeiro.estado == 'pausado'
+
+    fila.cancelar(primeiro.id)
+    assert fila.aguardar(timeout=10)
+    assert primeiro.estado == 'cancelado' and primeiro.ups_concluidas == 1
+    assert segundo.iniciado_em is None
+    print("✅ Pausa, retomada e cancelamento conferidos")
+
+def test_cada_sessao_ve_e_controla_so_os_seus_trabalhos():
+    """
+    Listagem e controles filtram pelo dono; sem dono (scripts) a fila inteira aparece
+    """
+    fila = FilaTrabalhos(executar=lambda trabalho: {'sucesso': True})
+    fila._thread = threading.current_thread()  # Não inicia a thread: os trabalhos ficam na fila
+    de_ana = TrabalhoLancamento(_ups(), ['BA2'], headless=True, dono='sessao-ana')
+    de_bia = TrabalhoLancamento(_ups(), ['BA2'], headless=True, dono='sessao-bia')
+    fila.enviar(de_ana)
+    fila.enviar(de_bia)
+
+    assert [t['id'] for t in fila.listar('sessao-ana')] == [de_ana.id]
+    assert {t['id'] for t in fila.listar()} == {de_ana.id, de_bia.id}
+    assert fila.obter(de_bia.id, 'sessao-ana') is None
+
+    fila.cancelar(de_bia.id, 'sessao-ana')
+    assert de_bia.estado == 'na_fila'
+    fila.cancelar(de_bia.id, 'sessao-bia')
+    assert de_bia.estado == 'cancelado'
+    print("✅ Trabalhos separados por sessão")
+
+if __name__ == "__main__":
+    test_trabalho_concluido_com_situacao()
+    test_pausar_retomar_e_cancelar()
+    test_cada_sessao_ve_e_controla_so_os_seus_trabalhos()
@@ -0,0 +1,109 @@
+"""
+Testes da vigia (watchdog) da automação, sem navegador real
+"""
+import time
+import asyncio
+import lancamento_fenix
+from interface_console import InterfaceConsole
+from lancamento_fenix import FenixAutomation, PrazoEsgotado
+from conftest import PaginaFalsa, ContextoFalso
+
+def _automacao(eventos):
+    return FenixAutomation(headless=True, manter_navegador=False,
+                           ao_evento=lambda evento, dados: eventos.append(evento))
+
+def test_pagina_travada_interrompe_a_espera():
+    """
+    Sem resposta às sondagens, a página é dada como travada em segundos e a
+    espera em curso é interrompida; uma página nova volta a valer
+    """
+    eventos = []
+    automacao = _automacao(eventos)
+    automacao.page = PaginaFalsa(travada=True)
+
+    async def _cenario():
+        async with automacao.vigiar({'intervalo_s': 0.05, 'timeout_sondagem_s': 0.05}) as vigia:
+            inicio = time.monotonic()
+            with automacao.orcamento(60) as prazo:
+                try:
+                    await automacao.page.wait_for_selector("#matriz", timeout=15000)
+                except PrazoEsgotado:
+                    pass
+            assert time.monotonic() - inicio < 2 and prazo.estourado
+            automacao.page = PaginaFalsa()
+            assert not automacao._pagina_travada.is_set()
+        return vigia.relatorio()
+
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        relatorio = asyncio.run(_cenario())
+    finally:
+        lancamento_fenix.usar_interface_na_thread(None)
+
+    assert relatorio['travamentos'] == 1 and relatorio['falhas_sondagem'] >= 2
+    assert eventos.count('pagina_travada') == 1
+    assert automacao._pagina_travada is None
+    print("✅ Página travada interrompe a espera")
+
+def test_pagina_que_volta_a_responder_e_liberada():
+    """
+    Um soluço curto dá a página como travada; quando as sondagens voltam a
+    responder, as esperas da mesma página deixam de falhar na hora
+    """
+    eventos = []
+    automacao = _automacao(eventos)
+    pagina = PaginaFalsa(travada=True)
+    automacao.page = pagina
+
+    async def _cenario():
+        async with automacao.vigiar({'intervalo_s': 0.05, 'timeout_sondagem_s': 0.05}):
+            while not automacao._pagina_travada.is_set():
+                await asyncio.sleep(0.02)
+            pagina.travada = False
+            while automacao._pagina_travada.is_set():
+                await asyncio.sleep(0.02)
+            with automacao.orcamento(60) as prazo:
+                try:
+                    await automacao.page.wait_for_selector("#matriz", timeout=100)
+                except TimeoutError:
+                    pass
+            assert not prazo.estourado
+
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        asyncio.run(asyncio.wait_for(_cenario(), 5))
+    finally:
+        lancamento_fenix.usar_interface_na_thread(None)
+
+    assert eventos.count('pagina_travada') == 1 and eventos.count('pagina_recuperada') == 1
+    print("✅ Página recuperada volta a valer")
+
+def test_atraso_do_loop_e_memoria():
+    """
+    Trabalho síncrono no event loop aparece como atraso; o heap JS sai da sessão CDP
+    """
+    automacao = _automacao([])
+    automacao.context = ContextoFalso()
+    automacao.page = PaginaFalsa()
+
+    async def _cenario():
+        async with automacao.vigiar({'intervalo_s': 0.05, 'atraso_loop_alerta_s': 0.1}):
+            await asyncio.sleep(0.1)
+            time.sleep(0.3)  # Bloqueia o event loop
+            await asyncio.sleep(0.2)
+
+    lancamento_fenix.usar_interface_na_thread(InterfaceConsole())
+    try:
+        asyncio.run(_cenario())
+    finally:
+        lancamento_fenix.usar_interface_na_thread(None)
+
+    relatorio = automacao.vigia.relatorio()
+    assert relatorio['atraso_loop_max_s'] >= 0.2 and relatorio['atrasos_alerta'] >= 1
+    assert relatorio['memoria_max_mb'] == 200.0 and relatorio['travamentos'] == 0
+    print("✅ Atraso do event loop e memória medidos")
+
+if __name__ == "__main__":
+    test_pagina_travada_interrompe_a_espera()
+    test_pagina_que_volta_a_responder_e_liberada()
+    test_atraso_do_loop_e_memoria()
@@ -0,0 +1,287 @@
+"""
+Trabalhos de lançamento em segundo plano
+
+Os lançamentos enviados pelo app entram em uma fila e rodam, um após o
+outro, em uma thread do processo, sem prender a execução do Streamlit.
+Cada trabalho tem um ID e uma situação resumida (UP atual, contadores,
+previsão de término e últimas mensagens) que a interface consulta
+periodicamente; trabalhos podem ser pausados, retomados e cancelados entre
+uma UP e a próxima.
+
+A fila é do processo, mas cada trabalho guarda o seu dono (a sessão do app
+que o enviou): a listagem e os controles recebem o dono e só enxergam os
+trabalhos dele.
+"""
+
+import time
+import uuid
+import queue
+import asyncio
+import threading
+from collections import OrderedDict, deque
+
+from config import AUTOMATION_CONFIG
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+TRABALHOS_CONFIG = {
+    'linhas_log': 50,           # Últimas mensagens guardadas por trabalho
+    'intervalo_pausa_s': 0.5,   # Verificação do pedido de retomada/cancelamento
+    'max_historico': 20,        # Trabalhos encerrados mantidos na lista
+}
+
+ESTADOS_FINAIS = ('concluido', 'falhou', 'cancelado')
+
+class LancamentoCancelado(BaseException):
+    """
+    Interrompe a automação a pedido do usuário. Herda de BaseException para
+    atravessar os 'except Exception' das etapas da automação, como o
+    asyncio.CancelledError.
+    """
+
+# =========================================================================
+# TRABALHO
+# =========================================================================
+
+class TrabalhoLancamento:
+    """
+    Um lançamento enviado para a fila: dados, situação e controle de
+    pausa/cancelamento (consultado pela automação entre as UPs).
+    """
+
+    def __init__(self, df_ups, grupos, tipo_organizacao='nucleo', email=None, senha=None,
+                 headless=None, descricao=None, dono=None):
+        self.id = uuid.uuid4().hex[:8]
+        self.dono = dono
+        self.df_ups = df_ups
+        self.grupos = list(grupos)
+        self.tipo_organizacao = tipo_organizacao
+        self.email = email
+        self.senha = senha
+        self.headless = AUTOMATION_CONFIG['headless'] if headless is None else headless
+        self.descricao = descricao or ", ".join(str(grupo) for grupo in self.grupos)
+
+        self.estado = 'na_fila'
+        self.criado_em = time.time()
+        self.iniciado_em = None
+        self.concluido_em = None
+        self.total_ups = len(df_ups)
+        self.ups_concluidas = 0
+        self.ups_com_erro = 0
+        self.grupo_atual = None
+        self.up_atual = None
+        self.resumo = None
+        self.erro = None
+
+        self._log = deque(maxlen=TRABALHOS_CONFIG['linhas_log'])
+        self._lock = threading.Lock()
+        self._pausado = threading.Event()
+        self._cancelado = threading.Event()
+
+    # ---------------------------------------------------------------------
+    # Eventos da automação
+    # ---------------------------------------------------------------------
+
+    def registrar_evento(self, evento, dados):
+        """Callback ao_evento da automação: atualiza a situação do trabalho"""
+        with self._lock:
+            if evento == 'log':
+                self._log.append(f"{time.strftime('%H:%M:%S')} {dados.get('mensagem', '')}")
+            elif evento == 'grupo_iniciado':
+                self.grupo_atual = dados.get('grupo')
+            elif evento == 'up_iniciada':
+                self.up_atual = dados.get('up')
+            elif evento == 'up_concluida':
+                self.ups_concluidas += 1
+            elif evento == 'up_falhou':
+                self.ups_com_erro += 1
+
+    async def aguardar_liberacao(self):
+        """Espera enquanto pausado; levanta LancamentoCancelado se cancelado"""
+        while self._pausado.is_set() and not self._cancelado.is_set():
+            await asyncio.sleep(TRABALHOS_CONFIG['intervalo_pausa_s'])
+        if self._cancelado.is_set():
+            raise LancamentoCancelado(self.id)
+
+    # ---------------------------------------------------------------------
+    # Controle
+    # ---------------------------------------------------------------------
+
+    def pausar(self):
+        if self.estado == 'executando':
+            self._pausado.set()
+            self.estado = 'pausado'
+
+    def retomar(self):
+        if self.estado == 'pausado':
+            self._pausado.clear()
+            self.estado = 'executando'
+
+    def cancelar(self):
+        """Cancela: na fila, imediatamente; em execução, antes da próxima UP"""
+        self._cancelado.set()
+        if self.estado == 'na_fila':
+            self.estado = 'cancelado'
+            self.concluido_em = time.time()
+        elif self.estado not in ESTADOS_FINAIS:
+            self.estado = 'cancelando'
+
+    @property
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    # ---------------------------------------------------------------------
+    # Situação
+    # ---------------------------------------------------------------------
+
+    def situacao(self):
+        """Resumo leve para a interface consultar a cada atualização"""
+        with self._lock:
+            processadas = self.ups_concluidas + self.ups_com_erro
+            decorrido = (self.concluido_em or time.time()) - self.iniciado_em if self.iniciado_em else 0
+            previsao = previsao_max = None
+            if self.estado in ('executando', 'pausado'):
+                restantes = max(self.total_ups - processadas, 0)
+                previsao_max = restantes * AUTOMATION_CONFIG['prazo_up_s']  # Cada UP tem prazo máximo
+                if processadas:
+                    previsao = round(decorrido / processadas * restantes)
+            return {
+                'id': self.id,
+                'dono': self.dono,
+                'descricao': self.descricao,
+                'estado': self.estado,
+                'grupo_atual': self.grupo_atual,
+                'up_atual': self.up_atual,
+                'total_ups': self.total_ups,
+                'ups_concluidas': self.ups_concluidas,
+                'ups_com_erro': self.ups_com_erro,
+                'progresso': processadas / self.total_ups if self.total_ups else 0.0,
+                'decorrido_s': round(decorrido),
+                'previsao_s': previsao,
+                'previsao_max_s': previsao_max,
+                'log': list(self._log),
+                'resumo': self.resumo,
+                'erro': self.erro
+            }
+
+# =========================================================================
+# FILA
+# =========================================================================
+
+def _executar_no_fenix(trabalho):
+    """Executa o trabalho com a automação real, sem interface"""
+    from lancamento_fenix import executar_lancamento_em_lote
+    return executar_lancamento_em_lote(
+        trabalho.df_ups, trabalho.grupos, trabalho.tipo_organizacao, trabalho.email, trabalho.senha,
+        headless=trabalho.headless, ao_evento=trabalho.registrar_evento, controle=trabalho,
+        somente_nesta_thread=True
+    )
+
+class FilaTrabalhos:
+    """
+    Fila de trabalhos do processo: uma thread executa os lançamentos na
+    ordem de envio, um de cada vez (um navegador e um login por vez).
+    """
+
+    def __init__(self, executar=None):
+        self._executar = executar or _executar_no_fenix
+        self._trabalhos = OrderedDict()
+        self._fila = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def enviar(self, trabalho):
+        """Coloca o trabalho na fila e devolve o seu ID"""
+        with self._lock:
+            self._trabalhos[trabalho.id] = trabalho
+            self._limpar_historico()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._trabalhar, name="trabalhos_lancamento", daemon=True)
+                self._thread.start()
+        self._fila.put(trabalho)
+        return trabalho.id
+
+    def obter(self, id_trabalho, dono=None):
+        """Trabalho pelo ID; com dono, só se foi ele quem o enviou"""
+        with self._lock:
+            trabalho = self._trabalhos.get(id_trabalho)
+        if trabalho is not None and dono is not None and trabalho.dono != dono:
+            return None
+        return trabalho
+
+    def listar(self, dono=None):
+        """Situação dos trabalhos (do dono, se informado), do mais recente ao mais antigo"""
+        with self._lock:
+            trabalhos = [trabalho for trabalho in self._trabalhos.values() if dono is None or trabalho.dono == dono]
+        return [trabalho.situacao() for trabalho in reversed(trabalhos)]
+
+    def pausar(self, id_trabalho, dono=None):
+        self._controlar(id_trabalho, 'pausar', dono)
+
+    def retomar(self, id_trabalho, dono=None):
+        self._controlar(id_trabalho, 'retomar', dono)
+
+    def cancelar(self, id_trabalho, dono=None):
+        self._controlar(id_trabalho, 'cancelar', dono)
+
+    def aguardar(self, timeout=None):
+        """Espera a fila esvaziar (uso em scripts e testes)"""
+        limite = time.time() + timeout if timeout else None
+        while self._fila.unfinished_tasks:
+            if limite and time.time() > limite:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _controlar(self, id_trabalho, acao, dono=None):
+        trabalho = self.obter(id_trabalho, dono)
+        if trabalho is not None:
+            getattr(trabalho, acao)()
+
+    def _limpar_historico(self):
+        encerrados = [id_trabalho for id_trabalho, trabalho in self._trabalhos.items()
+                      if trabalho.estado in ESTADOS_FINAIS]
+        for id_trabalho in encerrados[:max(len(encerrados) - TRABALHOS_CONFIG['max_historico'], 0)]:
+            del self._trabalhos[id_trabalho]
+
+    def _trabalhar(self):
+        while True:
+            trabalho = self._fila.get()
+            try:
+                if not trabalho.cancelado:
+                    self._executar_trabalho(trabalho)
+            finally:
+                self._fila.task_done()
+
+    def _executar_trabalho(self, trabalho):
+        trabalho.estado = 'executando'
+        trabalho.iniciado_em = time.time()
+        try:
+            trabalho.resumo = self._executar(trabalho)
+            trabalho.estado = 'concluido' if trabalho.resumo.get('sucesso') else 'falhou'
+        except LancamentoCancelado:
+            trabalho.estado = 'cancelado'
+        except Exception as e:
+            trabalho.erro = str(e)
+            trabalho.estado = 'falhou'
+        finally:
+            trabalho.concluido_em = time.time()
+            trabalho.up_atual = None
+            trabalho.senha = None  # Não guarda a senha além da execução
+
+# =========================================================================
+# FILA DO PROCESSO
+# =========================================================================
+
+_fila = None
+_lock_fila = threading.Lock()
+
+def obter_fila():
+    """Fila única do processo (cada sessão do app vê só os seus trabalhos)"""
+    global _fila
+    with _lock_fila:
+        if _fila is None:
+            _fila = FilaTrabalhos()
+        return _fila
@@ -0,0 +1,173 @@
+"""
+Vigia (watchdog) da automação
+
+Roda ao lado da automação enquanto os laudos são lançados. A cada
+intervalo_s ele:
+- mede o atraso do event loop do asyncio (trabalho síncrono travando a automação)
+- sonda a página com um evaluate barato em uma sessão CDP própria, que não
+  disputa o canal das ações da automação, e lê o heap JS do renderer
+
+Depois de falhas_para_travada sondagens seguidas sem resposta a página é
+dada como travada: as esperas em curso são interrompidas na hora (em vez de
+esgotar timeouts de 15s encadeados) e a recuperação do laudo assume. Os
+números vão para o relatório da execução.
+"""
+
+import time
+import asyncio
+
+# =========================================================================
+# CONFIGURAÇÕES
+# =========================================================================
+
+VIGIA_CONFIG = {
+    'usar_vigia': True,
+    'intervalo_s': 2,              # Tempo entre sondagens
+    'timeout_sondagem_s': 3,       # Sem resposta nesse tempo, a sondagem falhou
+    'falhas_para_travada': 2,      # Sondagens seguidas sem resposta que marcam a página como travada
+    'interromper_travada': True,   # Interrompe as esperas em curso quando a página trava
+    'atraso_loop_alerta_s': 1.0,   # Atraso do event loop que gera alerta
+    'memoria_alerta_mb': 1500,     # Heap JS do renderer que gera alerta
+}
+
+# =========================================================================
+# VIGIA
+# =========================================================================
+
+class Vigia:
+    """Tarefa assíncrona que vigia a página e o event loop de uma FenixAutomation"""
+
+    def __init__(self, automacao, config=None, relogio=time.monotonic):
+        self.automacao = automacao
+        self.config = dict(VIGIA_CONFIG, **(config or {}))
+        self._relogio = relogio
+        self._tarefa = None
+        self._sessao_cdp = None
+        self._pagina_cdp = None
+        self._falhas_seguidas = 0
+        self._alerta_memoria = False
+        self.sondagens = 0
+        self.falhas_sondagem = 0
+        self.travamentos = 0
+        self.latencia_max_s = 0.0
+        self.atrasos_loop = []
+        self.atrasos_alerta = 0
+        self.memoria_max_mb = None
+
+    # ---------------------------------------------------------------------
+    # Sondagens
+    # ---------------------------------------------------------------------
+
+    async def _sessao(self, pagina):
+        """Sessão CDP própria da página vigiada (refeita quando a página muda)"""
+        if self._pagina_cdp is not pagina:
+            await self._desanexar()
+            self._pagina_cdp = pagina
+            contexto = getattr(self.automacao, 'context', None)
+            try:
+                self._sessao_cdp = await contexto.new_cdp_session(pagina)
+            except Exception:
+                self._sessao_cdp = None  # Sem CDP (ex.: outro navegador): sonda pela própria página
+        return self._sessao_cdp
+
+    async def _desanexar(self):
+        if self._sessao_cdp is not None:
+            try:
+                await asyncio.wait_for(self._sessao_cdp.detach(), timeout=1)
+            except Exception:
+                pass
+        self._sessao_cdp = self._pagina_cdp = None
+
+    async def sondar(self):
+        """True se a página respondeu a tempo; registra latência e memória"""
+        pagina = self.automacao.page
+        if pagina is None:
+            return True
+        pagina = getattr(pagina, '_pagina', pagina)  # Sem o limite de prazo da automação
+        timeout = self.config['timeout_sondagem_s']
+        inicio = self._relogio()
+        try:
+            sessao = await self._sessao(pagina)
+            if sessao is not None:
+                await asyncio.wait_for(sessao.send('Runtime.evaluate', {'expression': 'document.readyState',
+                                                                        'returnByValue': True}), timeout)
+                heap = await asyncio.wait_for(sessao.send('Runtime.getHeapUsage'), timeout)
+                self._registrar_memoria(heap.get('usedSize', 0) / 1024 / 1024)
+            else:
+                await asyncio.wait_for(pagina.evaluate('document.readyState'), timeout)
+            resposta = True
+        except Exception:
+            resposta = False
+        self.sondagens += 1
+        self.latencia_max_s = max(self.latencia_max_s, self._relogio() - inicio)
+        return resposta
+
+    def _registrar_memoria(self, memoria_mb):
+        self.memoria_max_mb = max(self.memoria_max_mb or 0, round(memoria_mb, 1))
+        if memoria_mb >= self.config['memoria_alerta_mb'] and not self._alerta_memoria:
+            self._alerta_memoria = True
+            self.automacao.log_status(f"🐕 Memória da página em {memoria_mb:.0f} MB (alerta em "
+                                      f"{self.config['memoria_alerta_mb']} MB)", "warning")
+
+    def registrar_sondagem(self, resposta):
+        """Conta as falhas seguidas e dá a página como travada no limite; uma resposta a libera"""
+        if resposta:
+            if self._falhas_seguidas >= self.config['falhas_para_travada']:
+                self.automacao.log_status("🐕 Página voltou a responder", "info")
+                self.automacao.emitir_evento('pagina_recuperada', sondagens=self._falhas_seguidas)
+                self.automacao.retomar_esperas()
+            self._falhas_seguidas = 0
+            return
+        self.falhas_sondagem += 1
+        self._falhas_seguidas += 1
+        if self._falhas_seguidas == self.config['falhas_para_travada']:
+            self.travamentos += 1
+            self.automacao.log_status(f"🐕 Página sem resposta há {self._falhas_seguidas} sondagens: travada", "warning")
+            self.automacao.emitir_evento('pagina_travada', sondagens=self._falhas_seguidas)
+            if self.config['interromper_travada']:
+                self.automacao.interromper_esperas()
+
+    def registrar_atraso_loop(self, atraso):
+        self.atrasos_loop.append(atraso)
+        if atraso >= self.config['atraso_loop_alerta_s']:
+            self.atrasos_alerta += 1
+            self.automacao.log_status(f"🐕 Event loop atrasado {atraso:.1f}s (algo síncrono travou a automação)", "warning")
+
+    # ---------------------------------------------------------------------
+    # Ciclo de vida
+    # ---------------------------------------------------------------------
+
+    async def _executar(self):
+        intervalo = self.config['intervalo_s']
+        while True:
+            inicio = self._relogio()
+            await asyncio.sleep(intervalo)
+            self.registrar_atraso_loop(max(self._relogio() - inicio - intervalo, 0.0))
+            self.registrar_sondagem(await self.sondar())
+
+    def iniciar(self):
+        self._tarefa = asyncio.ensure_future(self._executar())
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+        await self._desanexar()
+
+    def relatorio(self):
+        """Resumo da vigia para o relatório da execução"""
+        atrasos = self.atrasos_loop
+        return {
+            'sondagens': self.sondagens,
+            'falhas_sondagem': self.falhas_sondagem,
+            'travamentos': self.travamentos,
+            'latencia_max_s': round(self.latencia_max_s, 3),
+            'atraso_loop_max_s': round(max(atrasos), 3) if atrasos else 0.0,
+            'atraso_loop_medio_s': round(sum(atrasos) / len(atrasos), 3) if atrasos else 0.0,
+            'atrasos_alerta': self.atrasos_alerta,
+            'memoria_max_mb': self.memoria_max_mb
+        }